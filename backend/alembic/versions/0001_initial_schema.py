@@ -0,0 +1,1137 @@
+"""Esquema inicial
+
+Equivale al esquema que creaba init_db() con Base.metadata.create_all().
+Bases de datos existentes creadas de esa forma deben marcarse con
+`alembic stamp 0001` antes de ejecutar `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 07:24:55.288118+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+ENUM_TYPES = (
+    "assetstatus",
+    "assettype",
+    "eventpriority",
+    "eventstatus",
+    "eventtype",
+    "fueltype",
+    "gpsstatus",
+    "projectphase",
+    "projectstatus",
+    "reportformat",
+    "reportstatus",
+    "reporttype",
+    "rfidtagtype",
+    "rfidtransactiontype",
+    "transactiontype",
+    "vehiclestatus",
+    "voicecommandtype",
+    "voiceinteractionstatus",
+)
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('alert_rules',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('event_type', sa.Enum('EMPLOYEE_CHECK_IN', 'EMPLOYEE_CHECK_OUT', 'EMPLOYEE_OVERTIME', 'ASSET_CHECKOUT', 'ASSET_CHECKIN', 'ASSET_MAINTENANCE', 'ASSET_LOST', 'ASSET_FOUND', 'FUEL_REFILL', 'FUEL_LOW_LEVEL', 'FUEL_THEFT', 'UNAUTHORIZED_ACCESS', 'SECURITY_BREACH', 'EMERGENCY', 'PROJECT_START', 'PROJECT_PHASE_CHANGE', 'PROJECT_DELAY', 'PROJECT_COMPLETION', 'SYSTEM_ERROR', 'CAMERA_OFFLINE', 'SENSOR_OFFLINE', 'GPS_SIGNAL_LOST', 'VOICE_COMMAND', 'VOICE_RESPONSE', 'VOICE_ERROR', name='eventtype'), nullable=False),
+    sa.Column('conditions', sa.JSON(), nullable=False),
+    sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='eventpriority'), nullable=True),
+    sa.Column('notification_enabled', sa.Boolean(), nullable=True),
+    sa.Column('notification_methods', sa.JSON(), nullable=True),
+    sa.Column('notification_recipients', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('cooldown_minutes', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alert_rules_id'), 'alert_rules', ['id'], unique=False)
+    op.create_table('asset_locations',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('location_type', sa.String(length=50), nullable=False),
+    sa.Column('address', sa.String(length=200), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_asset_locations_id'), 'asset_locations', ['id'], unique=False)
+    op.create_table('employees',
+    sa.Column('first_name', sa.String(length=100), nullable=False),
+    sa.Column('last_name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('employee_id', sa.String(length=50), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('department', sa.String(length=100), nullable=True),
+    sa.Column('hire_date', sa.DateTime(), nullable=True),
+    sa.Column('rfid_tag', sa.String(length=50), nullable=True),
+    sa.Column('face_encoding', sa.Text(), nullable=True),
+    sa.Column('is_present', sa.Boolean(), nullable=True),
+    sa.Column('last_check_in', sa.DateTime(), nullable=True),
+    sa.Column('last_check_out', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_index(op.f('ix_employees_employee_id'), 'employees', ['employee_id'], unique=True)
+    op.create_index(op.f('ix_employees_id'), 'employees', ['id'], unique=False)
+    op.create_index(op.f('ix_employees_rfid_tag'), 'employees', ['rfid_tag'], unique=True)
+    op.create_table('fuel_tanks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('fuel_type', sa.Enum('DIESEL', 'GASOLINE', 'LPG', 'HYDRAULIC_OIL', 'ENGINE_OIL', name='fueltype'), nullable=False),
+    sa.Column('capacity_liters', sa.Float(), nullable=False),
+    sa.Column('current_level_liters', sa.Float(), nullable=True),
+    sa.Column('min_level_liters', sa.Float(), nullable=True),
+    sa.Column('max_level_liters', sa.Float(), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('last_maintenance', sa.DateTime(), nullable=True),
+    sa.Column('next_maintenance', sa.DateTime(), nullable=True),
+    sa.Column('sensor_id', sa.String(length=50), nullable=True),
+    sa.Column('sensor_type', sa.String(length=50), nullable=True),
+    sa.Column('calibration_factor', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fuel_tanks_id'), 'fuel_tanks', ['id'], unique=False)
+    op.create_table('projects',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('project_code', sa.String(length=50), nullable=False),
+    sa.Column('client_name', sa.String(length=200), nullable=True),
+    sa.Column('client_contact', sa.String(length=200), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('planned_end_date', sa.Date(), nullable=True),
+    sa.Column('actual_end_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.Enum('PLANNING', 'ACTIVE', 'ON_HOLD', 'COMPLETED', 'CANCELLED', name='projectstatus'), nullable=True),
+    sa.Column('current_phase', sa.Enum('PREPARATION', 'EXCAVATION', 'LEVELING', 'COMPACTION', 'FINISHING', 'CLEANUP', name='projectphase'), nullable=True),
+    sa.Column('budget_total', sa.Float(), nullable=True),
+    sa.Column('budget_fuel', sa.Float(), nullable=True),
+    sa.Column('budget_equipment', sa.Float(), nullable=True),
+    sa.Column('budget_labor', sa.Float(), nullable=True),
+    sa.Column('actual_cost_fuel', sa.Float(), nullable=True),
+    sa.Column('actual_cost_equipment', sa.Float(), nullable=True),
+    sa.Column('actual_cost_labor', sa.Float(), nullable=True),
+    sa.Column('actual_cost_total', sa.Float(), nullable=True),
+    sa.Column('location_name', sa.String(length=200), nullable=True),
+    sa.Column('address', sa.String(length=300), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('hours_planned', sa.Float(), nullable=True),
+    sa.Column('hours_actual', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('special_requirements', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_projects_id'), 'projects', ['id'], unique=False)
+    op.create_index(op.f('ix_projects_project_code'), 'projects', ['project_code'], unique=True)
+    op.create_table('report_recipients',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('whatsapp', sa.String(length=20), nullable=True),
+    sa.Column('preferred_format', sa.Enum('PDF', 'EXCEL', 'CSV', 'JSON', 'HTML', name='reportformat'), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('receive_daily', sa.Boolean(), nullable=True),
+    sa.Column('receive_weekly', sa.Boolean(), nullable=True),
+    sa.Column('receive_monthly', sa.Boolean(), nullable=True),
+    sa.Column('receive_alerts', sa.Boolean(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('last_sent', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_recipients_id'), 'report_recipients', ['id'], unique=False)
+    op.create_table('report_templates',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('report_type', sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', 'QUARTERLY', 'YEARLY', 'CUSTOM', name='reporttype'), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('format', sa.Enum('PDF', 'EXCEL', 'CSV', 'JSON', 'HTML', name='reportformat'), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('is_auto_generated', sa.Boolean(), nullable=True),
+    sa.Column('generation_schedule', sa.String(length=100), nullable=True),
+    sa.Column('template_content', sa.Text(), nullable=True),
+    sa.Column('template_file_path', sa.String(length=300), nullable=True),
+    sa.Column('css_styles', sa.Text(), nullable=True),
+    sa.Column('data_sources', sa.JSON(), nullable=True),
+    sa.Column('required_parameters', sa.JSON(), nullable=True),
+    sa.Column('default_filters', sa.JSON(), nullable=True),
+    sa.Column('default_recipients', sa.JSON(), nullable=True),
+    sa.Column('distribution_method', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('version', sa.String(length=20), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_templates_id'), 'report_templates', ['id'], unique=False)
+    op.create_table('rfid_readers',
+    sa.Column('reader_id', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('location', sa.String(length=200), nullable=False),
+    sa.Column('reader_type', sa.String(length=50), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('manufacturer', sa.String(length=100), nullable=True),
+    sa.Column('firmware_version', sa.String(length=50), nullable=True),
+    sa.Column('supported_frequencies', sa.JSON(), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('mac_address', sa.String(length=17), nullable=True),
+    sa.Column('port', sa.Integer(), nullable=True),
+    sa.Column('protocol', sa.String(length=20), nullable=True),
+    sa.Column('is_online', sa.Boolean(), nullable=True),
+    sa.Column('last_heartbeat', sa.DateTime(), nullable=True),
+    sa.Column('signal_strength', sa.Float(), nullable=True),
+    sa.Column('read_power', sa.Float(), nullable=True),
+    sa.Column('read_sensitivity', sa.Float(), nullable=True),
+    sa.Column('read_timeout_ms', sa.Integer(), nullable=True),
+    sa.Column('total_reads', sa.Integer(), nullable=True),
+    sa.Column('successful_reads', sa.Integer(), nullable=True),
+    sa.Column('failed_reads', sa.Integer(), nullable=True),
+    sa.Column('average_read_time_ms', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rfid_readers_id'), 'rfid_readers', ['id'], unique=False)
+    op.create_index(op.f('ix_rfid_readers_reader_id'), 'rfid_readers', ['reader_id'], unique=True)
+    op.create_table('rfid_zones',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('zone_type', sa.String(length=50), nullable=False),
+    sa.Column('location', sa.String(length=200), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('radius_meters', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('requires_authorization', sa.Boolean(), nullable=True),
+    sa.Column('allowed_tag_types', sa.JSON(), nullable=True),
+    sa.Column('restricted_hours', sa.JSON(), nullable=True),
+    sa.Column('alert_on_unauthorized', sa.Boolean(), nullable=True),
+    sa.Column('alert_recipients', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rfid_zones_id'), 'rfid_zones', ['id'], unique=False)
+    op.create_table('voice_devices',
+    sa.Column('device_id', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('device_type', sa.String(length=50), nullable=False),
+    sa.Column('location', sa.String(length=100), nullable=False),
+    sa.Column('microphone_model', sa.String(length=100), nullable=True),
+    sa.Column('speaker_model', sa.String(length=100), nullable=True),
+    sa.Column('sample_rate', sa.Integer(), nullable=True),
+    sa.Column('channels', sa.Integer(), nullable=True),
+    sa.Column('volume_level', sa.Float(), nullable=True),
+    sa.Column('noise_reduction', sa.Boolean(), nullable=True),
+    sa.Column('echo_cancellation', sa.Boolean(), nullable=True),
+    sa.Column('auto_gain_control', sa.Boolean(), nullable=True),
+    sa.Column('is_online', sa.Boolean(), nullable=True),
+    sa.Column('last_heartbeat', sa.DateTime(), nullable=True),
+    sa.Column('firmware_version', sa.String(length=50), nullable=True),
+    sa.Column('total_interactions', sa.Integer(), nullable=True),
+    sa.Column('average_response_time_ms', sa.Float(), nullable=True),
+    sa.Column('error_count', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voice_devices_device_id'), 'voice_devices', ['device_id'], unique=True)
+    op.create_index(op.f('ix_voice_devices_id'), 'voice_devices', ['id'], unique=False)
+    op.create_table('assets',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('asset_code', sa.String(length=50), nullable=False),
+    sa.Column('asset_type', sa.Enum('VEHICLE', 'TOOL', 'EQUIPMENT', 'MACHINERY', 'FUEL_TANK', name='assettype'), nullable=False),
+    sa.Column('status', sa.Enum('AVAILABLE', 'IN_USE', 'MAINTENANCE', 'OUT_OF_SERVICE', 'LOST', name='assetstatus'), nullable=True),
+    sa.Column('rfid_tag', sa.String(length=50), nullable=True),
+    sa.Column('serial_number', sa.String(length=100), nullable=True),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('brand', sa.String(length=100), nullable=True),
+    sa.Column('current_location_id', sa.Integer(), nullable=True),
+    sa.Column('location_description', sa.String(length=200), nullable=True),
+    sa.Column('license_plate', sa.String(length=20), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=True),
+    sa.Column('fuel_capacity', sa.Float(), nullable=True),
+    sa.Column('current_fuel_level', sa.Float(), nullable=True),
+    sa.Column('tool_category', sa.String(length=100), nullable=True),
+    sa.Column('tool_condition', sa.String(length=50), nullable=True),
+    sa.Column('purchase_price', sa.Float(), nullable=True),
+    sa.Column('current_value', sa.Float(), nullable=True),
+    sa.Column('maintenance_cost', sa.Float(), nullable=True),
+    sa.Column('last_maintenance', sa.DateTime(), nullable=True),
+    sa.Column('next_maintenance', sa.DateTime(), nullable=True),
+    sa.Column('total_usage_hours', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['current_location_id'], ['asset_locations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assets_asset_code'), 'assets', ['asset_code'], unique=True)
+    op.create_index(op.f('ix_assets_id'), 'assets', ['id'], unique=False)
+    op.create_index(op.f('ix_assets_rfid_tag'), 'assets', ['rfid_tag'], unique=True)
+    op.create_table('check_ins',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('check_in_time', sa.DateTime(), nullable=False),
+    sa.Column('check_out_time', sa.DateTime(), nullable=True),
+    sa.Column('location', sa.String(length=100), nullable=True),
+    sa.Column('method', sa.String(length=20), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_check_ins_id'), 'check_ins', ['id'], unique=False)
+    op.create_table('geofences',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('geofence_type', sa.String(length=50), nullable=False),
+    sa.Column('center_latitude', sa.Float(), nullable=False),
+    sa.Column('center_longitude', sa.Float(), nullable=False),
+    sa.Column('radius_meters', sa.Float(), nullable=True),
+    sa.Column('polygon_coordinates', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('alert_on_enter', sa.Boolean(), nullable=True),
+    sa.Column('alert_on_exit', sa.Boolean(), nullable=True),
+    sa.Column('alert_recipients', sa.JSON(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_geofences_id'), 'geofences', ['id'], unique=False)
+    op.create_table('project_employees',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=False),
+    sa.Column('assigned_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('hours_planned', sa.Float(), nullable=True),
+    sa.Column('hours_actual', sa.Float(), nullable=True),
+    sa.Column('hourly_rate', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_employees_id'), 'project_employees', ['id'], unique=False)
+    op.create_table('project_expenses',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('expense_type', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.String(length=200), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('expense_date', sa.Date(), nullable=False),
+    sa.Column('location', sa.String(length=200), nullable=True),
+    sa.Column('receipt_number', sa.String(length=100), nullable=True),
+    sa.Column('receipt_image_path', sa.String(length=300), nullable=True),
+    sa.Column('is_approved', sa.Boolean(), nullable=True),
+    sa.Column('approved_by_id', sa.Integer(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_expenses_id'), 'project_expenses', ['id'], unique=False)
+    op.create_table('project_phases',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('phase_name', sa.Enum('PREPARATION', 'EXCAVATION', 'LEVELING', 'COMPACTION', 'FINISHING', 'CLEANUP', name='projectphase'), nullable=False),
+    sa.Column('phase_order', sa.Integer(), nullable=False),
+    sa.Column('planned_start_date', sa.Date(), nullable=True),
+    sa.Column('planned_end_date', sa.Date(), nullable=True),
+    sa.Column('actual_start_date', sa.Date(), nullable=True),
+    sa.Column('actual_end_date', sa.Date(), nullable=True),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('hours_planned', sa.Float(), nullable=True),
+    sa.Column('hours_actual', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_phases_id'), 'project_phases', ['id'], unique=False)
+    op.create_table('report_schedules',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('cron_expression', sa.String(length=100), nullable=False),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('next_run', sa.DateTime(), nullable=True),
+    sa.Column('last_run', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('max_retries', sa.Integer(), nullable=True),
+    sa.Column('retry_delay_minutes', sa.Integer(), nullable=True),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('filters', sa.JSON(), nullable=True),
+    sa.Column('recipients', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['report_templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_schedules_id'), 'report_schedules', ['id'], unique=False)
+    op.create_table('reports',
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('report_type', sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', 'QUARTERLY', 'YEARLY', 'CUSTOM', name='reporttype'), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=True),
+    sa.Column('report_date', sa.Date(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('format', sa.Enum('PDF', 'EXCEL', 'CSV', 'JSON', 'HTML', name='reportformat'), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'GENERATING', 'COMPLETED', 'FAILED', 'SENT', name='reportstatus'), nullable=True),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('file_path', sa.String(length=300), nullable=True),
+    sa.Column('file_size_bytes', sa.Integer(), nullable=True),
+    sa.Column('file_hash', sa.String(length=64), nullable=True),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.Column('generated_by_id', sa.Integer(), nullable=True),
+    sa.Column('generation_time_seconds', sa.Float(), nullable=True),
+    sa.Column('is_auto_generated', sa.Boolean(), nullable=True),
+    sa.Column('recipients', sa.JSON(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_via', sa.String(length=50), nullable=True),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('filters', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['generated_by_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['template_id'], ['report_templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reports_id'), 'reports', ['id'], unique=False)
+    op.create_index(op.f('ix_reports_report_date'), 'reports', ['report_date'], unique=False)
+    op.create_table('rfid_zone_readers',
+    sa.Column('zone_id', sa.Integer(), nullable=False),
+    sa.Column('reader_id', sa.Integer(), nullable=False),
+    sa.Column('is_primary', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['reader_id'], ['rfid_readers.id'], ),
+    sa.ForeignKeyConstraint(['zone_id'], ['rfid_zones.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rfid_zone_readers_id'), 'rfid_zone_readers', ['id'], unique=False)
+    op.create_table('routes',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('route_type', sa.String(length=50), nullable=False),
+    sa.Column('waypoints', sa.JSON(), nullable=False),
+    sa.Column('total_distance_km', sa.Float(), nullable=True),
+    sa.Column('estimated_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_recurring', sa.Boolean(), nullable=True),
+    sa.Column('frequency_days', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_routes_id'), 'routes', ['id'], unique=False)
+    op.create_table('vehicles',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('license_plate', sa.String(length=20), nullable=False),
+    sa.Column('vehicle_type', sa.String(length=50), nullable=False),
+    sa.Column('make', sa.String(length=50), nullable=True),
+    sa.Column('model', sa.String(length=50), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Enum('AVAILABLE', 'IN_USE', 'MAINTENANCE', 'OUT_OF_SERVICE', 'LOST', name='vehiclestatus'), nullable=True),
+    sa.Column('is_gps_enabled', sa.Boolean(), nullable=True),
+    sa.Column('gps_device_id', sa.String(length=50), nullable=True),
+    sa.Column('fuel_capacity', sa.Float(), nullable=True),
+    sa.Column('current_fuel_level', sa.Float(), nullable=True),
+    sa.Column('max_speed', sa.Float(), nullable=True),
+    sa.Column('engine_hours', sa.Float(), nullable=True),
+    sa.Column('current_project_id', sa.Integer(), nullable=True),
+    sa.Column('current_operator_id', sa.Integer(), nullable=True),
+    sa.Column('assigned_since', sa.DateTime(), nullable=True),
+    sa.Column('last_maintenance', sa.DateTime(), nullable=True),
+    sa.Column('next_maintenance', sa.DateTime(), nullable=True),
+    sa.Column('maintenance_hours', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['current_operator_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['current_project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_vehicles_gps_device_id'), 'vehicles', ['gps_device_id'], unique=True)
+    op.create_index(op.f('ix_vehicles_id'), 'vehicles', ['id'], unique=False)
+    op.create_index(op.f('ix_vehicles_license_plate'), 'vehicles', ['license_plate'], unique=True)
+    op.create_table('voice_interactions',
+    sa.Column('session_id', sa.String(length=100), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('location', sa.String(length=100), nullable=True),
+    sa.Column('audio_file_path', sa.String(length=300), nullable=True),
+    sa.Column('audio_duration_seconds', sa.Float(), nullable=True),
+    sa.Column('audio_quality_score', sa.Float(), nullable=True),
+    sa.Column('raw_transcript', sa.Text(), nullable=True),
+    sa.Column('processed_transcript', sa.Text(), nullable=True),
+    sa.Column('language_detected', sa.String(length=10), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('command_type', sa.Enum('FUEL_LEVEL', 'EMPLOYEE_STATUS', 'ASSET_LOCATION', 'PROJECT_STATUS', 'WEATHER', 'CHECKOUT_ASSET', 'CHECKIN_ASSET', 'REPORT_ISSUE', 'CHECK_IN', 'CHECK_OUT', 'REQUEST_HELP', 'SYSTEM_STATUS', 'EMERGENCY', 'TEST_VOICE', name='voicecommandtype'), nullable=True),
+    sa.Column('command_parameters', sa.JSON(), nullable=True),
+    sa.Column('response_text', sa.Text(), nullable=True),
+    sa.Column('response_audio_path', sa.String(length=300), nullable=True),
+    sa.Column('response_duration_seconds', sa.Float(), nullable=True),
+    sa.Column('status', sa.Enum('LISTENING', 'PROCESSING', 'RESPONDING', 'COMPLETED', 'FAILED', 'TIMEOUT', name='voiceinteractionstatus'), nullable=True),
+    sa.Column('processing_time_ms', sa.Integer(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('device_id', sa.String(length=50), nullable=True),
+    sa.Column('microphone_id', sa.String(length=50), nullable=True),
+    sa.Column('speaker_id', sa.String(length=50), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voice_interactions_id'), 'voice_interactions', ['id'], unique=False)
+    op.create_index(op.f('ix_voice_interactions_session_id'), 'voice_interactions', ['session_id'], unique=False)
+    op.create_table('voice_profiles',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('voice_id', sa.String(length=100), nullable=False),
+    sa.Column('voice_encoding', sa.JSON(), nullable=True),
+    sa.Column('accent', sa.String(length=50), nullable=True),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('speaking_rate', sa.Float(), nullable=True),
+    sa.Column('pitch_range', sa.JSON(), nullable=True),
+    sa.Column('preferred_voice_commands', sa.JSON(), nullable=True),
+    sa.Column('custom_commands', sa.JSON(), nullable=True),
+    sa.Column('total_interactions', sa.Integer(), nullable=True),
+    sa.Column('successful_interactions', sa.Integer(), nullable=True),
+    sa.Column('average_confidence', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('last_used', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voice_profiles_id'), 'voice_profiles', ['id'], unique=False)
+    op.create_index(op.f('ix_voice_profiles_voice_id'), 'voice_profiles', ['voice_id'], unique=True)
+    op.create_table('voice_training_data',
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('audio_file_path', sa.String(length=300), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=True),
+    sa.Column('intent', sa.String(length=100), nullable=True),
+    sa.Column('entities', sa.JSON(), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('speaker_id', sa.String(length=100), nullable=True),
+    sa.Column('recording_quality', sa.String(length=20), nullable=True),
+    sa.Column('background_noise_level', sa.String(length=20), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('verified_by_id', sa.Integer(), nullable=True),
+    sa.Column('verified_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['verified_by_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voice_training_data_id'), 'voice_training_data', ['id'], unique=False)
+    op.create_table('asset_transactions',
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_type', sa.String(length=20), nullable=False),
+    sa.Column('location_from_id', sa.Integer(), nullable=True),
+    sa.Column('location_to_id', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('expected_return_date', sa.DateTime(), nullable=True),
+    sa.Column('actual_return_date', sa.DateTime(), nullable=True),
+    sa.Column('is_returned', sa.Boolean(), nullable=True),
+    sa.Column('is_overdue', sa.Boolean(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['location_from_id'], ['asset_locations.id'], ),
+    sa.ForeignKeyConstraint(['location_to_id'], ['asset_locations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_asset_transactions_id'), 'asset_transactions', ['id'], unique=False)
+    op.create_table('events',
+    sa.Column('event_type', sa.Enum('EMPLOYEE_CHECK_IN', 'EMPLOYEE_CHECK_OUT', 'EMPLOYEE_OVERTIME', 'ASSET_CHECKOUT', 'ASSET_CHECKIN', 'ASSET_MAINTENANCE', 'ASSET_LOST', 'ASSET_FOUND', 'FUEL_REFILL', 'FUEL_LOW_LEVEL', 'FUEL_THEFT', 'UNAUTHORIZED_ACCESS', 'SECURITY_BREACH', 'EMERGENCY', 'PROJECT_START', 'PROJECT_PHASE_CHANGE', 'PROJECT_DELAY', 'PROJECT_COMPLETION', 'SYSTEM_ERROR', 'CAMERA_OFFLINE', 'SENSOR_OFFLINE', 'GPS_SIGNAL_LOST', 'VOICE_COMMAND', 'VOICE_RESPONSE', 'VOICE_ERROR', name='eventtype'), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'RESOLVED', 'CANCELLED', 'ESCALATED', name='eventstatus'), nullable=True),
+    sa.Column('priority', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='eventpriority'), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('camera_id', sa.String(length=50), nullable=True),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('asset_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('ai_confidence', sa.Float(), nullable=True),
+    sa.Column('detected_at', sa.DateTime(), nullable=False),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('acknowledged_at', sa.DateTime(), nullable=True),
+    sa.Column('acknowledged_by_id', sa.Integer(), nullable=True),
+    sa.Column('notification_sent', sa.Boolean(), nullable=True),
+    sa.Column('notification_method', sa.String(length=50), nullable=True),
+    sa.Column('notification_recipients', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['acknowledged_by_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_events_detected_at'), 'events', ['detected_at'], unique=False)
+    op.create_index(op.f('ix_events_event_type'), 'events', ['event_type'], unique=False)
+    op.create_index(op.f('ix_events_id'), 'events', ['id'], unique=False)
+    op.create_index(op.f('ix_events_status'), 'events', ['status'], unique=False)
+    op.create_table('fuel_alerts',
+    sa.Column('alert_type', sa.String(length=50), nullable=False),
+    sa.Column('tank_id', sa.Integer(), nullable=True),
+    sa.Column('asset_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('is_resolved', sa.Boolean(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('resolved_by_id', sa.Integer(), nullable=True),
+    sa.Column('notification_sent', sa.Boolean(), nullable=True),
+    sa.Column('notification_recipients', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['resolved_by_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['tank_id'], ['fuel_tanks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fuel_alerts_id'), 'fuel_alerts', ['id'], unique=False)
+    op.create_table('fuel_consumption',
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('fuel_type', sa.Enum('DIESEL', 'GASOLINE', 'LPG', 'HYDRAULIC_OIL', 'ENGINE_OIL', name='fueltype'), nullable=False),
+    sa.Column('consumption_liters', sa.Float(), nullable=False),
+    sa.Column('hours_worked', sa.Float(), nullable=True),
+    sa.Column('consumption_per_hour', sa.Float(), nullable=True),
+    sa.Column('work_type', sa.String(length=100), nullable=True),
+    sa.Column('weather_conditions', sa.String(length=100), nullable=True),
+    sa.Column('operator_id', sa.Integer(), nullable=True),
+    sa.Column('efficiency_rating', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['operator_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fuel_consumption_date'), 'fuel_consumption', ['date'], unique=False)
+    op.create_index(op.f('ix_fuel_consumption_id'), 'fuel_consumption', ['id'], unique=False)
+    op.create_table('fuel_transactions',
+    sa.Column('transaction_type', sa.Enum('REFILL', 'CONSUMPTION', 'TRANSFER', 'THEFT', 'LEAK', 'MAINTENANCE', name='transactiontype'), nullable=False),
+    sa.Column('fuel_type', sa.Enum('DIESEL', 'GASOLINE', 'LPG', 'HYDRAULIC_OIL', 'ENGINE_OIL', name='fueltype'), nullable=False),
+    sa.Column('quantity_liters', sa.Float(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=True),
+    sa.Column('total_cost', sa.Float(), nullable=True),
+    sa.Column('tank_id', sa.Integer(), nullable=True),
+    sa.Column('asset_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('supplier', sa.String(length=200), nullable=True),
+    sa.Column('invoice_number', sa.String(length=100), nullable=True),
+    sa.Column('receipt_image_path', sa.String(length=300), nullable=True),
+    sa.Column('level_before', sa.Float(), nullable=True),
+    sa.Column('level_after', sa.Float(), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('verified_by_id', sa.Integer(), nullable=True),
+    sa.Column('verified_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['tank_id'], ['fuel_tanks.id'], ),
+    sa.ForeignKeyConstraint(['verified_by_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fuel_transactions_id'), 'fuel_transactions', ['id'], unique=False)
+    op.create_table('geofence_violations',
+    sa.Column('geofence_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('violation_type', sa.String(length=50), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('speed', sa.Float(), nullable=True),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_acknowledged', sa.Boolean(), nullable=True),
+    sa.Column('acknowledged_by_id', sa.Integer(), nullable=True),
+    sa.Column('acknowledged_at', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['acknowledged_by_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['geofence_id'], ['geofences.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_geofence_violations_id'), 'geofence_violations', ['id'], unique=False)
+    op.create_index(op.f('ix_geofence_violations_timestamp'), 'geofence_violations', ['timestamp'], unique=False)
+    op.create_table('gps_locations',
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('device_id', sa.String(length=50), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('altitude', sa.Float(), nullable=True),
+    sa.Column('accuracy', sa.Float(), nullable=True),
+    sa.Column('speed', sa.Float(), nullable=True),
+    sa.Column('heading', sa.Float(), nullable=True),
+    sa.Column('course', sa.Float(), nullable=True),
+    sa.Column('gps_status', sa.Enum('ONLINE', 'OFFLINE', 'LOW_SIGNAL', 'NO_SIGNAL', name='gpsstatus'), nullable=True),
+    sa.Column('satellite_count', sa.Integer(), nullable=True),
+    sa.Column('signal_strength', sa.Float(), nullable=True),
+    sa.Column('location_name', sa.String(length=200), nullable=True),
+    sa.Column('address', sa.String(length=300), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('battery_level', sa.Float(), nullable=True),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_gps_locations_device_id'), 'gps_locations', ['device_id'], unique=False)
+    op.create_index(op.f('ix_gps_locations_id'), 'gps_locations', ['id'], unique=False)
+    op.create_table('project_assets',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_date', sa.Date(), nullable=False),
+    sa.Column('return_date', sa.Date(), nullable=True),
+    sa.Column('hours_used', sa.Float(), nullable=True),
+    sa.Column('fuel_consumed', sa.Float(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_project_assets_id'), 'project_assets', ['id'], unique=False)
+    op.create_table('report_data',
+    sa.Column('report_id', sa.Integer(), nullable=False),
+    sa.Column('data_type', sa.String(length=50), nullable=False),
+    sa.Column('data_json', sa.JSON(), nullable=False),
+    sa.Column('summary_stats', sa.JSON(), nullable=True),
+    sa.Column('source_table', sa.String(length=100), nullable=True),
+    sa.Column('query_execution_time_ms', sa.Integer(), nullable=True),
+    sa.Column('record_count', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_data_id'), 'report_data', ['id'], unique=False)
+    op.create_table('report_logs',
+    sa.Column('report_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('user_agent', sa.String(length=500), nullable=True),
+    sa.Column('execution_time_ms', sa.Integer(), nullable=True),
+    sa.Column('error_code', sa.String(length=50), nullable=True),
+    sa.Column('stack_trace', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_logs_id'), 'report_logs', ['id'], unique=False)
+    op.create_table('rfid_tags',
+    sa.Column('tag_id', sa.String(length=100), nullable=False),
+    sa.Column('tag_type', sa.Enum('EMPLOYEE', 'ASSET', 'VEHICLE', 'TOOL', 'FUEL_TANK', 'CONTAINER', name='rfidtagtype'), nullable=False),
+    sa.Column('description', sa.String(length=200), nullable=True),
+    sa.Column('frequency', sa.String(length=20), nullable=True),
+    sa.Column('protocol', sa.String(length=50), nullable=True),
+    sa.Column('chip_type', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_lost', sa.Boolean(), nullable=True),
+    sa.Column('battery_level', sa.Float(), nullable=True),
+    sa.Column('last_seen', sa.DateTime(), nullable=True),
+    sa.Column('current_location', sa.String(length=200), nullable=True),
+    sa.Column('last_reader_id', sa.String(length=50), nullable=True),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('asset_id', sa.Integer(), nullable=True),
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('read_range_meters', sa.Float(), nullable=True),
+    sa.Column('read_timeout_seconds', sa.Integer(), nullable=True),
+    sa.Column('retry_attempts', sa.Integer(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('installation_date', sa.DateTime(), nullable=True),
+    sa.Column('warranty_expiry', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rfid_tags_id'), 'rfid_tags', ['id'], unique=False)
+    op.create_index(op.f('ix_rfid_tags_tag_id'), 'rfid_tags', ['tag_id'], unique=True)
+    op.create_table('route_trips',
+    sa.Column('route_id', sa.Integer(), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=False),
+    sa.Column('driver_id', sa.Integer(), nullable=False),
+    sa.Column('planned_start', sa.DateTime(), nullable=True),
+    sa.Column('actual_start', sa.DateTime(), nullable=True),
+    sa.Column('planned_end', sa.DateTime(), nullable=True),
+    sa.Column('actual_end', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('distance_traveled_km', sa.Float(), nullable=True),
+    sa.Column('fuel_consumed_liters', sa.Float(), nullable=True),
+    sa.Column('duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['driver_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['route_id'], ['routes.id'], ),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_route_trips_id'), 'route_trips', ['id'], unique=False)
+    op.create_table('voice_commands',
+    sa.Column('interaction_id', sa.Integer(), nullable=False),
+    sa.Column('command_type', sa.Enum('FUEL_LEVEL', 'EMPLOYEE_STATUS', 'ASSET_LOCATION', 'PROJECT_STATUS', 'WEATHER', 'CHECKOUT_ASSET', 'CHECKIN_ASSET', 'REPORT_ISSUE', 'CHECK_IN', 'CHECK_OUT', 'REQUEST_HELP', 'SYSTEM_STATUS', 'EMERGENCY', 'TEST_VOICE', name='voicecommandtype'), nullable=False),
+    sa.Column('command_text', sa.String(length=500), nullable=False),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('entities', sa.JSON(), nullable=True),
+    sa.Column('intent_confidence', sa.Float(), nullable=True),
+    sa.Column('entity_confidence', sa.Float(), nullable=True),
+    sa.Column('processing_time_ms', sa.Integer(), nullable=True),
+    sa.Column('is_executed', sa.Boolean(), nullable=True),
+    sa.Column('execution_result', sa.JSON(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('context_data', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['interaction_id'], ['voice_interactions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_voice_commands_id'), 'voice_commands', ['id'], unique=False)
+    op.create_table('event_logs',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['employees.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_event_logs_id'), 'event_logs', ['id'], unique=False)
+    op.create_table('rfid_alerts',
+    sa.Column('alert_type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=True),
+    sa.Column('reader_id', sa.Integer(), nullable=True),
+    sa.Column('zone_id', sa.Integer(), nullable=True),
+    sa.Column('is_resolved', sa.Boolean(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('resolved_by_id', sa.Integer(), nullable=True),
+    sa.Column('notification_sent', sa.Boolean(), nullable=True),
+    sa.Column('notification_recipients', sa.JSON(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['reader_id'], ['rfid_readers.id'], ),
+    sa.ForeignKeyConstraint(['resolved_by_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['rfid_tags.id'], ),
+    sa.ForeignKeyConstraint(['zone_id'], ['rfid_zones.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rfid_alerts_id'), 'rfid_alerts', ['id'], unique=False)
+    op.create_table('rfid_transactions',
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('reader_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_type', sa.Enum('CHECK_IN', 'CHECK_OUT', 'TRANSFER', 'MAINTENANCE', 'INVENTORY', 'FUEL_REFILL', name='rfidtransactiontype'), nullable=False),
+    sa.Column('read_time', sa.DateTime(), nullable=False),
+    sa.Column('processed_time', sa.DateTime(), nullable=True),
+    sa.Column('raw_data', sa.Text(), nullable=True),
+    sa.Column('rssi', sa.Float(), nullable=True),
+    sa.Column('antenna_id', sa.String(length=20), nullable=True),
+    sa.Column('read_count', sa.Integer(), nullable=True),
+    sa.Column('location', sa.String(length=200), nullable=True),
+    sa.Column('gps_latitude', sa.Float(), nullable=True),
+    sa.Column('gps_longitude', sa.Float(), nullable=True),
+    sa.Column('is_processed', sa.Boolean(), nullable=True),
+    sa.Column('processing_result', sa.String(length=50), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('processing_time_ms', sa.Integer(), nullable=True),
+    sa.Column('employee_id', sa.Integer(), nullable=True),
+    sa.Column('asset_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('metadata', sa.JSON(), nullable=True),
+    sa.Column('session_id', sa.String(length=100), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['reader_id'], ['rfid_readers.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['rfid_tags.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rfid_transactions_id'), 'rfid_transactions', ['id'], unique=False)
+    op.create_index(op.f('ix_rfid_transactions_read_time'), 'rfid_transactions', ['read_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_rfid_transactions_read_time'), table_name='rfid_transactions')
+    op.drop_index(op.f('ix_rfid_transactions_id'), table_name='rfid_transactions')
+    op.drop_table('rfid_transactions')
+    op.drop_index(op.f('ix_rfid_alerts_id'), table_name='rfid_alerts')
+    op.drop_table('rfid_alerts')
+    op.drop_index(op.f('ix_event_logs_id'), table_name='event_logs')
+    op.drop_table('event_logs')
+    op.drop_index(op.f('ix_voice_commands_id'), table_name='voice_commands')
+    op.drop_table('voice_commands')
+    op.drop_index(op.f('ix_route_trips_id'), table_name='route_trips')
+    op.drop_table('route_trips')
+    op.drop_index(op.f('ix_rfid_tags_tag_id'), table_name='rfid_tags')
+    op.drop_index(op.f('ix_rfid_tags_id'), table_name='rfid_tags')
+    op.drop_table('rfid_tags')
+    op.drop_index(op.f('ix_report_logs_id'), table_name='report_logs')
+    op.drop_table('report_logs')
+    op.drop_index(op.f('ix_report_data_id'), table_name='report_data')
+    op.drop_table('report_data')
+    op.drop_index(op.f('ix_project_assets_id'), table_name='project_assets')
+    op.drop_table('project_assets')
+    op.drop_index(op.f('ix_gps_locations_id'), table_name='gps_locations')
+    op.drop_index(op.f('ix_gps_locations_device_id'), table_name='gps_locations')
+    op.drop_table('gps_locations')
+    op.drop_index(op.f('ix_geofence_violations_timestamp'), table_name='geofence_violations')
+    op.drop_index(op.f('ix_geofence_violations_id'), table_name='geofence_violations')
+    op.drop_table('geofence_violations')
+    op.drop_index(op.f('ix_fuel_transactions_id'), table_name='fuel_transactions')
+    op.drop_table('fuel_transactions')
+    op.drop_index(op.f('ix_fuel_consumption_id'), table_name='fuel_consumption')
+    op.drop_index(op.f('ix_fuel_consumption_date'), table_name='fuel_consumption')
+    op.drop_table('fuel_consumption')
+    op.drop_index(op.f('ix_fuel_alerts_id'), table_name='fuel_alerts')
+    op.drop_table('fuel_alerts')
+    op.drop_index(op.f('ix_events_status'), table_name='events')
+    op.drop_index(op.f('ix_events_id'), table_name='events')
+    op.drop_index(op.f('ix_events_event_type'), table_name='events')
+    op.drop_index(op.f('ix_events_detected_at'), table_name='events')
+    op.drop_table('events')
+    op.drop_index(op.f('ix_asset_transactions_id'), table_name='asset_transactions')
+    op.drop_table('asset_transactions')
+    op.drop_index(op.f('ix_voice_training_data_id'), table_name='voice_training_data')
+    op.drop_table('voice_training_data')
+    op.drop_index(op.f('ix_voice_profiles_voice_id'), table_name='voice_profiles')
+    op.drop_index(op.f('ix_voice_profiles_id'), table_name='voice_profiles')
+    op.drop_table('voice_profiles')
+    op.drop_index(op.f('ix_voice_interactions_session_id'), table_name='voice_interactions')
+    op.drop_index(op.f('ix_voice_interactions_id'), table_name='voice_interactions')
+    op.drop_table('voice_interactions')
+    op.drop_index(op.f('ix_vehicles_license_plate'), table_name='vehicles')
+    op.drop_index(op.f('ix_vehicles_id'), table_name='vehicles')
+    op.drop_index(op.f('ix_vehicles_gps_device_id'), table_name='vehicles')
+    op.drop_table('vehicles')
+    op.drop_index(op.f('ix_routes_id'), table_name='routes')
+    op.drop_table('routes')
+    op.drop_index(op.f('ix_rfid_zone_readers_id'), table_name='rfid_zone_readers')
+    op.drop_table('rfid_zone_readers')
+    op.drop_index(op.f('ix_reports_report_date'), table_name='reports')
+    op.drop_index(op.f('ix_reports_id'), table_name='reports')
+    op.drop_table('reports')
+    op.drop_index(op.f('ix_report_schedules_id'), table_name='report_schedules')
+    op.drop_table('report_schedules')
+    op.drop_index(op.f('ix_project_phases_id'), table_name='project_phases')
+    op.drop_table('project_phases')
+    op.drop_index(op.f('ix_project_expenses_id'), table_name='project_expenses')
+    op.drop_table('project_expenses')
+    op.drop_index(op.f('ix_project_employees_id'), table_name='project_employees')
+    op.drop_table('project_employees')
+    op.drop_index(op.f('ix_geofences_id'), table_name='geofences')
+    op.drop_table('geofences')
+    op.drop_index(op.f('ix_check_ins_id'), table_name='check_ins')
+    op.drop_table('check_ins')
+    op.drop_index(op.f('ix_assets_rfid_tag'), table_name='assets')
+    op.drop_index(op.f('ix_assets_id'), table_name='assets')
+    op.drop_index(op.f('ix_assets_asset_code'), table_name='assets')
+    op.drop_table('assets')
+    op.drop_index(op.f('ix_voice_devices_id'), table_name='voice_devices')
+    op.drop_index(op.f('ix_voice_devices_device_id'), table_name='voice_devices')
+    op.drop_table('voice_devices')
+    op.drop_index(op.f('ix_rfid_zones_id'), table_name='rfid_zones')
+    op.drop_table('rfid_zones')
+    op.drop_index(op.f('ix_rfid_readers_reader_id'), table_name='rfid_readers')
+    op.drop_index(op.f('ix_rfid_readers_id'), table_name='rfid_readers')
+    op.drop_table('rfid_readers')
+    op.drop_index(op.f('ix_report_templates_id'), table_name='report_templates')
+    op.drop_table('report_templates')
+    op.drop_index(op.f('ix_report_recipients_id'), table_name='report_recipients')
+    op.drop_table('report_recipients')
+    op.drop_index(op.f('ix_projects_project_code'), table_name='projects')
+    op.drop_index(op.f('ix_projects_id'), table_name='projects')
+    op.drop_table('projects')
+    op.drop_index(op.f('ix_fuel_tanks_id'), table_name='fuel_tanks')
+    op.drop_table('fuel_tanks')
+    op.drop_index(op.f('ix_employees_rfid_tag'), table_name='employees')
+    op.drop_index(op.f('ix_employees_id'), table_name='employees')
+    op.drop_index(op.f('ix_employees_employee_id'), table_name='employees')
+    op.drop_table('employees')
+    op.drop_index(op.f('ix_asset_locations_id'), table_name='asset_locations')
+    op.drop_table('asset_locations')
+    op.drop_index(op.f('ix_alert_rules_id'), table_name='alert_rules')
+    op.drop_table('alert_rules')
+
+    # Tipos ENUM de PostgreSQL creados implícitamente por create_table
+    bind = op.get_bind()
+    for name in ENUM_TYPES:
+        sa.Enum(name=name).drop(bind, checkfirst=True)
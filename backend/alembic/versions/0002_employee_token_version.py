@@ -0,0 +1,29 @@
+"""Versión de token por empleado
+
+Permite invalidar los tokens emitidos (por ejemplo al cambiar la contraseña).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 07:40:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'employees',
+        sa.Column('token_version', sa.Integer(), server_default='0', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('employees', 'token_version')
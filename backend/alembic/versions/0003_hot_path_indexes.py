@@ -0,0 +1,60 @@
+"""Índices compuestos y parciales para las consultas frecuentes
+
+- check_ins (employee_id) WHERE check_out_time IS NULL: check_out_employee
+- check_ins (employee_id, check_in_time): get_employee_check_ins (recorrido
+  hacia atrás para ORDER BY check_in_time DESC)
+- gps_locations (vehicle_id, created_at): historial por vehículo
+- rfid_transactions (tag_id, read_time) y (reader_id, read_time)
+- events (status, detected_at): reemplaza al índice simple sobre status
+
+Los índices se crean con CONCURRENTLY para no bloquear escrituras en tablas
+grandes, por eso se ejecutan fuera de la transacción de la migración.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 07:45:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    ('ix_check_ins_employee_id_open', 'check_ins', ['employee_id'],
+     {'postgresql_where': sa.text('check_out_time IS NULL')}),
+    ('ix_check_ins_employee_id_check_in_time', 'check_ins', ['employee_id', 'check_in_time'], {}),
+    ('ix_gps_locations_vehicle_id_created_at', 'gps_locations', ['vehicle_id', 'created_at'], {}),
+    ('ix_rfid_transactions_tag_id_read_time', 'rfid_transactions', ['tag_id', 'read_time'], {}),
+    ('ix_rfid_transactions_reader_id_read_time', 'rfid_transactions', ['reader_id', 'read_time'], {}),
+    ('ix_events_status_detected_at', 'events', ['status', 'detected_at'], {}),
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True, **kwargs
+            )
+        op.drop_index(
+            'ix_events_status', table_name='events',
+            postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_events_status', 'events', ['status'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
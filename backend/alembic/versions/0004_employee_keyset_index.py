@@ -0,0 +1,33 @@
+"""Índice para paginación por cursor de empleados
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 08:10:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_employees_last_name_id', 'employees', ['last_name', 'id'],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_employees_last_name_id', table_name='employees',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,89 @@
+"""Búsqueda difusa de empleados (pg_trgm)
+
+Agrega employees.search_text (nombre, apellido, legajo y email en minúsculas
+y sin acentos, mantenido por la aplicación y completado con la misma
+normalización) y un índice GIN de trigramas
+para que ILIKE '%texto%' y similarity() no recorran la tabla completa.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 08:40:00.000000+00:00
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+
+def _normalize_search_text(*parts) -> str:
+    """
+    Copia congelada de app.models.employee.normalize_search_text al momento
+    de esta migración: el backfill no debe cambiar si la aplicación cambia.
+    """
+    joined = " ".join(str(p) for p in parts if p)
+    decomposed = unicodedata.normalize("NFKD", joined)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('employees', sa.Column('search_text', sa.Text(), nullable=True))
+    _backfill_search_text()
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_employees_search_text_trgm', 'employees', ['search_text'],
+            postgresql_using='gin',
+            postgresql_ops={'search_text': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def _backfill_search_text() -> None:
+    """
+    Completar search_text con la misma normalización que usa la aplicación
+    al escribir (unaccent/lower en SQL no aplica NFKD ni colapsa
+    espacios y las filas existentes quedarían distintas). Con --sql no hay
+    filas que leer: el backfill queda para la próxima escritura de cada fila.
+    """
+    if op.get_context().as_sql:
+        return
+    bind = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, first_name, last_name, employee_id, email FROM employees "
+        "WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    update = sa.text("UPDATE employees SET search_text = :search_text WHERE id = :id")
+    after = 0
+    while True:
+        rows = bind.execute(select_batch, {"after": after, "limit": BACKFILL_BATCH}).all()
+        if not rows:
+            break
+        bind.execute(update, [
+            {"id": row.id, "search_text": _normalize_search_text(
+                row.first_name, row.last_name, row.employee_id, row.email
+            )}
+            for row in rows
+        ])
+        after = rows[-1].id
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_employees_search_text_trgm', table_name='employees',
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column('employees', 'search_text')
@@ -0,0 +1,172 @@
+"""Particionado mensual de gps_locations
+
+gps_locations pasa a ser una tabla particionada por rango sobre created_at
+con una partición por mes. La tabla existente no se copia: se adjunta como
+partición gps_locations_legacy que cubre desde MINVALUE hasta el inicio del
+mes siguiente, de modo que la migración no reescribe filas.
+
+- created_at pasa a NOT NULL y la clave primaria a (id, created_at), como
+  exige el particionado (nada referencia gps_locations.id). Los CHECK se
+  agregan NOT VALID y se confirman enseguida; el backfill por rangos de id
+  y las validaciones corren cada uno en su propia transacción, sin el
+  bloqueo exclusivo, así las escrituras siguen durante los recorridos
+- Los índices equivalentes sobre la tabla existente se crean con
+  CONCURRENTLY antes de adjuntarla, así el índice de la tabla padre los
+  reutiliza en lugar de construirlos con bloqueo
+- Un CHECK validado con la cota superior evita el recorrido de validación
+  de ATTACH PARTITION
+- gps_locations_default recibe filas fuera de rango (relojes desfasados)
+- Se crean los próximos meses; el resto lo mantiene GPSPartitionManager
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 10:20:00.000000+00:00
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+PREMAKE_MONTHS = 3
+BACKFILL_BATCH = 50000  # ids por UPDATE del backfill de created_at
+
+
+def _add_months(day: datetime, months: int) -> datetime:
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def _bound(day: datetime) -> str:
+    return day.strftime("%Y-%m-%d 00:00:00+00")
+
+
+def upgrade() -> None:
+    this_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    legacy_upper = _bound(_add_months(this_month, 1))
+
+    # created_at NOT NULL sin recorrer la tabla con bloqueo exclusivo: los
+    # CHECK NOT VALID solo toman el bloqueo un instante (se confirman al
+    # entrar al bloque autocommit) y rigen desde ya para las filas nuevas
+    op.execute(
+        "ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_created_at_not_null "
+        "CHECK (created_at IS NOT NULL) NOT VALID"
+    )
+    op.execute(
+        "ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_legacy_bound "
+        f"CHECK (created_at < '{legacy_upper}') NOT VALID"
+    )
+    with op.get_context().autocommit_block():
+        _backfill_created_at()
+        # VALIDATE toma SHARE UPDATE EXCLUSIVE: no frena inserciones ni lecturas
+        op.execute("ALTER TABLE gps_locations VALIDATE CONSTRAINT gps_locations_created_at_not_null")
+        op.execute("ALTER TABLE gps_locations VALIDATE CONSTRAINT gps_locations_legacy_bound")
+    # Con el CHECK validado, SET NOT NULL no vuelve a recorrer la tabla
+    op.execute("ALTER TABLE gps_locations ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER TABLE gps_locations DROP CONSTRAINT gps_locations_created_at_not_null")
+
+    # Índices que la tabla padre va a reutilizar al adjuntar
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS gps_locations_legacy_id_created_at "
+            "ON gps_locations (id, created_at)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gps_locations_legacy_device_id_created_at "
+            "ON gps_locations (device_id, created_at)"
+        )
+
+    # ATTACH solo reutiliza un índice de la partición si respalda la misma restricción
+    op.execute("ALTER TABLE gps_locations DROP CONSTRAINT gps_locations_pkey")
+    op.execute(
+        "ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_legacy_pkey "
+        "PRIMARY KEY USING INDEX gps_locations_legacy_id_created_at"
+    )
+
+    op.execute("ALTER TABLE gps_locations RENAME TO gps_locations_legacy")
+    op.execute("ALTER INDEX ix_gps_locations_id RENAME TO ix_gps_locations_legacy_id")
+    op.execute("ALTER INDEX ix_gps_locations_device_id RENAME TO ix_gps_locations_legacy_device_id")
+    op.execute(
+        "ALTER INDEX ix_gps_locations_vehicle_id_created_at "
+        "RENAME TO ix_gps_locations_legacy_vehicle_id_created_at"
+    )
+
+    op.execute(
+        "CREATE TABLE gps_locations (LIKE gps_locations_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER SEQUENCE gps_locations_id_seq OWNED BY gps_locations.id")
+    op.execute("ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_pkey PRIMARY KEY (id, created_at)")
+    op.execute(
+        "ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_vehicle_id_fkey "
+        "FOREIGN KEY (vehicle_id) REFERENCES vehicles (id)"
+    )
+    op.execute(
+        "ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_project_id_fkey "
+        "FOREIGN KEY (project_id) REFERENCES projects (id)"
+    )
+    op.execute("CREATE INDEX ix_gps_locations_device_id ON gps_locations (device_id)")
+    op.execute("CREATE INDEX ix_gps_locations_vehicle_id_created_at ON gps_locations (vehicle_id, created_at)")
+    op.execute("CREATE INDEX ix_gps_locations_device_id_created_at ON gps_locations (device_id, created_at)")
+
+    op.execute(
+        "ALTER TABLE gps_locations ATTACH PARTITION gps_locations_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{legacy_upper}')"
+    )
+    op.execute("ALTER TABLE gps_locations_legacy DROP CONSTRAINT gps_locations_legacy_bound")
+
+    op.execute("CREATE TABLE gps_locations_default PARTITION OF gps_locations DEFAULT")
+    for offset in range(1, PREMAKE_MONTHS + 1):
+        start = _add_months(this_month, offset)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS gps_locations_p{start:%Y_%m} PARTITION OF gps_locations "
+            f"FOR VALUES FROM ('{_bound(start)}') TO ('{_bound(_add_months(start, 1))}')"
+        )
+
+
+def _backfill_created_at() -> None:
+    """
+    Completar created_at nulo por rangos de id (índice de la clave primaria),
+    cada UPDATE en su propia transacción. Con --sql se emite un solo UPDATE.
+    """
+    update = (
+        "UPDATE gps_locations SET created_at = COALESCE(updated_at, now()) "
+        "WHERE created_at IS NULL"
+    )
+    if op.get_context().as_sql:
+        op.execute(update)
+        return
+    bind = op.get_bind()
+    last_id = bind.execute(sa.text("SELECT max(id) FROM gps_locations")).scalar() or 0
+    batch = sa.text(update + " AND id > :after AND id <= :until")
+    for after in range(0, last_id, BACKFILL_BATCH):
+        bind.execute(batch, {"after": after, "until": after + BACKFILL_BATCH})
+
+
+def downgrade() -> None:
+    # Volver a una tabla simple: se conserva gps_locations_legacy y se le
+    # copian las filas del resto de las particiones
+    op.execute("ALTER TABLE gps_locations DETACH PARTITION gps_locations_legacy")
+    op.execute("INSERT INTO gps_locations_legacy SELECT * FROM gps_locations")
+    op.execute("ALTER SEQUENCE gps_locations_id_seq OWNED BY gps_locations_legacy.id")
+    op.execute("DROP TABLE gps_locations CASCADE")
+
+    op.execute("ALTER TABLE gps_locations_legacy RENAME TO gps_locations")
+    op.execute("ALTER TABLE gps_locations DROP CONSTRAINT gps_locations_legacy_pkey")
+    op.execute("ALTER TABLE gps_locations ADD CONSTRAINT gps_locations_pkey PRIMARY KEY (id)")
+    op.execute("ALTER INDEX ix_gps_locations_legacy_id RENAME TO ix_gps_locations_id")
+    op.execute("ALTER INDEX ix_gps_locations_legacy_device_id RENAME TO ix_gps_locations_device_id")
+    op.execute(
+        "ALTER INDEX ix_gps_locations_legacy_vehicle_id_created_at "
+        "RENAME TO ix_gps_locations_vehicle_id_created_at"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_gps_locations_legacy_device_id_created_at")
+    op.execute("ALTER TABLE gps_locations ALTER COLUMN created_at DROP NOT NULL")
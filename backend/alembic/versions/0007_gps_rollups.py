@@ -0,0 +1,50 @@
+"""Resúmenes horarios y diarios de GPS por dispositivo
+
+Tabla gps_rollups que la ingesta mantiene de forma incremental (UPSERT que
+suma deltas) y que scripts/db/gps_rollups_backfill.py recalcula desde
+gps_locations para períodos anteriores.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 11:40:00.000000+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('gps_rollups',
+    sa.Column('device_id', sa.String(length=50), nullable=False),
+    sa.Column('vehicle_id', sa.Integer(), nullable=True),
+    sa.Column('bucket', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('distance_km', sa.Float(), nullable=False),
+    sa.Column('moving_seconds', sa.Float(), nullable=False),
+    sa.Column('idle_seconds', sa.Float(), nullable=False),
+    sa.Column('max_speed_kmh', sa.Float(), nullable=False),
+    sa.Column('fix_count', sa.Integer(), nullable=False),
+    sa.Column('last_fix_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('device_id', 'bucket', 'bucket_start', name='uq_gps_rollups_device_bucket')
+    )
+    op.create_index(op.f('ix_gps_rollups_id'), 'gps_rollups', ['id'], unique=False)
+    op.create_index('ix_gps_rollups_bucket_start', 'gps_rollups', ['bucket', 'bucket_start'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_gps_rollups_bucket_start', table_name='gps_rollups')
+    op.drop_index(op.f('ix_gps_rollups_id'), table_name='gps_rollups')
+    op.drop_table('gps_rollups')
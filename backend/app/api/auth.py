@@ -1,19 +1,21 @@
 # S.A.M.I. - API de Autenticación
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import (
     authenticate_user, 
     create_access_token, 
-    get_password_hash,
-    get_current_active_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    get_password_hash_async,
+    get_current_active_user
 )
+from ..core.rate_limit import check_login_rate, reset_login_rate
+from ..core.principal_cache import Principal, principal_cache
 from ..models.employee import Employee
 from ..core.config import settings
 
@@ -52,10 +54,11 @@ class UserLogin(BaseModel):
     password: str
 
 @router.post("/register", response_model=UserResponse)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Registrar nuevo usuario"""
     # Verificar si el usuario ya existe
-    db_user = db.query(Employee).filter(Employee.email == user.email).first()
+    result = await db.execute(select(Employee).where(Employee.email == user.email))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(
             status_code=400,
@@ -63,7 +66,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Crear nuevo usuario
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = Employee(
         first_name=user.first_name,
         last_name=user.last_name,
@@ -74,18 +77,29 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Iniciar sesión y obtener token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    # Limitar intentos antes de tocar la base de datos o bcrypt
+    client_ip = request.client.host if request.client else "unknown"
+    allowed, retry_after = await check_login_rate(form_data.username, client_ip)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(max(1, retry_after))},
+        )
+    
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -93,24 +107,31 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    await reset_login_rate(form_data.username)
+    
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": str(user.id), "ver": user.token_version or 0},
+        expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: Employee = Depends(get_current_active_user)):
+async def read_users_me(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Obtener información del usuario actual"""
-    return current_user
+    return await db.get(Employee, current_user.id)
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: Employee = Depends(get_current_active_user)):
+async def refresh_token(current_user: Principal = Depends(get_current_active_user)):
     """Renovar token de acceso"""
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": str(current_user.id)}, expires_delta=access_token_expires
+        data={"sub": str(current_user.id), "ver": current_user.token_version},
+        expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -124,26 +145,31 @@ async def logout():
 async def change_password(
     current_password: str,
     new_password: str,
-    current_user: Employee = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cambiar contraseña"""
-    from ..core.security import verify_password, get_password_hash
+    from ..core.security import verify_password_async
+    
+    db_user = await db.get(Employee, current_user.id)
     
     # Verificar contraseña actual
-    if not verify_password(current_password, current_user.password_hash):
+    if not await verify_password_async(current_password, db_user.password_hash):
         raise HTTPException(
             status_code=400,
             detail="Incorrect current password"
         )
     
-    # Actualizar contraseña
-    current_user.password_hash = get_password_hash(new_password)
-    db.commit()
+    # Actualizar contraseña e invalidar tokens emitidos
+    previous_version = db_user.token_version or 0
+    db_user.password_hash = await get_password_hash_async(new_password)
+    db_user.token_version = previous_version + 1
+    await db.commit()
+    await principal_cache.invalidate(db_user.id, previous_version)
     
     return {"message": "Password updated successfully"}
 
 @router.get("/verify-token")
-async def verify_token(current_user: Employee = Depends(get_current_active_user)):
+async def verify_token(current_user: Principal = Depends(get_current_active_user)):
     """Verificar validez del token"""
     return {"valid": True, "user": current_user}
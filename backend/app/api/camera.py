@@ -2,25 +2,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
-import cv2
-import numpy as np
 from datetime import datetime
+from pydantic import BaseModel
 import base64
-import io
-from PIL import Image
 
 from ..core.database import get_db
 from ..core.security import get_current_active_user, require_role, ROLE_MANAGER
-from ..models.employee import Employee
-from ..services.camera_service import CameraService, CameraConfig, DetectionEvent
-from ..services.ai_service import AIService
+from ..core.principal_cache import Principal
+from ..services import get_camera_service, get_ai_service
 
 router = APIRouter()
 
-# Instancia global del servicio de cámaras
-camera_service = CameraService()
-ai_service = None
-
 # Modelos Pydantic
 class CameraStatusResponse(BaseModel):
     camera_id: str
@@ -57,27 +49,10 @@ class ImageCaptureResponse(BaseModel):
     timestamp: datetime
     error: Optional[str] = None
 
-@router.on_event("startup")
-async def startup_camera_service():
-    """Inicializar servicio de cámaras al arrancar"""
-    global ai_service
-    try:
-        # Inicializar servicio de IA
-        ai_service = AIService()
-        await ai_service.initialize()
-        
-        # Inicializar servicio de cámaras
-        await camera_service.initialize(ai_service)
-        
-        # Iniciar todas las cámaras
-        await camera_service.start_all_cameras()
-        
-    except Exception as e:
-        print(f"Error inicializando servicio de cámaras: {e}")
-
 @router.get("/status", response_model=Dict)
 async def get_cameras_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    camera_service=Depends(get_camera_service)
 ):
     """Obtener estado de todas las cámaras"""
     return await camera_service.get_all_cameras_status()
@@ -85,7 +60,8 @@ async def get_cameras_status(
 @router.get("/{camera_id}/status", response_model=CameraStatusResponse)
 async def get_camera_status(
     camera_id: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    camera_service=Depends(get_camera_service)
 ):
     """Obtener estado de una cámara específica"""
     status = await camera_service.get_camera_status(camera_id)
@@ -98,7 +74,8 @@ async def get_camera_status(
 @router.post("/{camera_id}/start")
 async def start_camera(
     camera_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service)
 ):
     """Iniciar una cámara específica"""
     success = await camera_service.start_camera(camera_id)
@@ -114,7 +91,8 @@ async def start_camera(
 @router.post("/{camera_id}/stop")
 async def stop_camera(
     camera_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service)
 ):
     """Detener una cámara específica"""
     success = await camera_service.stop_camera(camera_id)
@@ -129,7 +107,8 @@ async def stop_camera(
 
 @router.post("/start-all")
 async def start_all_cameras(
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service)
 ):
     """Iniciar todas las cámaras"""
     success = await camera_service.start_all_cameras()
@@ -144,7 +123,8 @@ async def start_all_cameras(
 
 @router.post("/stop-all")
 async def stop_all_cameras(
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service)
 ):
     """Detener todas las cámaras"""
     success = await camera_service.stop_all_cameras()
@@ -161,7 +141,8 @@ async def stop_all_cameras(
 async def update_camera_config(
     camera_id: str,
     config: CameraConfigRequest,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service)
 ):
     """Actualizar configuración de una cámara"""
     config_dict = config.dict(exclude_unset=True)
@@ -178,7 +159,8 @@ async def update_camera_config(
 @router.post("/{camera_id}/capture", response_model=ImageCaptureResponse)
 async def capture_image(
     camera_id: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    camera_service=Depends(get_camera_service)
 ):
     """Capturar imagen de una cámara"""
     try:
@@ -193,6 +175,8 @@ async def capture_image(
             )
         
         # Convertir frame a base64
+        import cv2
+        
         _, buffer = cv2.imencode('.jpg', frame)
         image_base64 = base64.b64encode(buffer).decode('utf-8')
         
@@ -216,7 +200,9 @@ async def add_employee_face(
     camera_id: str,
     employee_id: int,
     employee_name: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service),
+    ai_service=Depends(get_ai_service)
 ):
     """Agregar cara de empleado usando captura de cámara"""
     try:
@@ -232,6 +218,7 @@ async def add_employee_face(
         # Guardar imagen temporalmente
         import tempfile
         import os
+        import cv2
         
         with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
             cv2.imwrite(temp_file.name, frame)
@@ -263,7 +250,7 @@ async def get_recent_events(
     limit: int = 50,
     event_type: Optional[str] = None,
     camera_id: Optional[str] = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener eventos recientes de detección"""
     # Esta función debería obtener eventos de la base de datos
@@ -277,7 +264,9 @@ async def get_recent_events(
 @router.post("/test-detection")
 async def test_detection(
     camera_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    camera_service=Depends(get_camera_service),
+    ai_service=Depends(get_ai_service)
 ):
     """Probar detección de eventos en una cámara"""
     try:
@@ -317,7 +306,9 @@ async def test_detection(
 
 @router.get("/system/status")
 async def get_system_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    camera_service=Depends(get_camera_service),
+    ai_service=Depends(get_ai_service)
 ):
     """Obtener estado del sistema de cámaras"""
     camera_status = await camera_service.get_system_status()
@@ -1,17 +1,28 @@
 # S.A.M.I. - API de Empleados
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import select, func, and_, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
+import logging
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import get_current_active_user, require_role, ROLE_ADMIN, ROLE_MANAGER
-from ..models.employee import Employee, CheckIn, EmployeeRole
+from ..core.principal_cache import Principal, invalidate_principal
+from ..core.pagination import Page, decode_cursor, build_page
+from ..models.employee import Employee, CheckIn, EmployeeRole, normalize_search_text
+from ..services.employee_search_service import EmployeeSearchService
+from ..services.presence_service import presence_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Índice global de autocompletado de empleados
+employee_search = EmployeeSearchService()
+
 # Modelos Pydantic
 class EmployeeCreate(BaseModel):
     first_name: str
@@ -51,6 +62,13 @@ class EmployeeResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class EmployeeSuggestion(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    employee_id: str
+    email: Optional[str]
+
 class CheckInCreate(BaseModel):
     employee_id: int
     location: Optional[str] = None
@@ -68,53 +86,110 @@ class CheckInResponse(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("/", response_model=List[EmployeeResponse])
+async def _get_active_employee(db: AsyncSession, employee_id: int) -> Optional[Employee]:
+    """Obtener empleado no eliminado por ID"""
+    result = await db.execute(
+        select(Employee).where(
+            and_(Employee.id == employee_id, Employee.is_deleted == False)
+        )
+    )
+    return result.scalars().first()
+
+async def _exists(db: AsyncSession, condition) -> bool:
+    """Verificar si existe algún empleado que cumpla la condición"""
+    result = await db.execute(select(Employee.id).where(condition).limit(1))
+    return result.first() is not None
+
+@router.get("/", response_model=Page[EmployeeResponse])
 async def get_employees(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
     role: Optional[str] = None,
     department: Optional[str] = None,
     is_present: Optional[bool] = None,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Obtener lista de empleados con filtros"""
-    query = db.query(Employee).filter(Employee.is_deleted == False)
-    
-    # Filtros
+    """
+    Obtener lista de empleados con filtros, paginada por (last_name, id).
+    Con `search` los resultados se ordenan por relevancia (similitud de trigramas).
+    """
+    query = select(Employee).where(Employee.is_deleted == False)
+    
+    # Búsqueda difusa sobre search_text (índice GIN pg_trgm)
+    rank = None
     if search:
-        query = query.filter(
+        term = normalize_search_text(search)
+        rank = func.similarity(Employee.search_text, term)
+        query = query.where(
             or_(
-                Employee.first_name.ilike(f"%{search}%"),
-                Employee.last_name.ilike(f"%{search}%"),
-                Employee.employee_id.ilike(f"%{search}%"),
-                Employee.email.ilike(f"%{search}%")
+                Employee.search_text.ilike(f"%{term}%"),
+                Employee.search_text.op("%")(term)
             )
         )
     
     if role:
-        query = query.filter(Employee.role == role)
+        query = query.where(Employee.role == role)
     
     if department:
-        query = query.filter(Employee.department == department)
+        query = query.where(Employee.department == department)
     
     if is_present is not None:
-        query = query.filter(Employee.is_present == is_present)
+        query = query.where(Employee.is_present == is_present)
+    
+    if rank is not None:
+        return await _ranked_employee_page(db, query, rank, cursor, skip, limit)
+    
+    # Paginación: cursor opaco; offset solo como compatibilidad
+    if cursor:
+        last_name, last_id = decode_cursor(cursor, str, int)
+        query = query.where(tuple_(Employee.last_name, Employee.id) > (last_name, last_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    query = query.order_by(Employee.last_name, Employee.id).limit(limit + 1)
+    result = await db.execute(query)
     
-    employees = query.offset(skip).limit(limit).all()
-    return employees
+    return build_page(result.scalars().all(), limit, lambda e: (e.last_name, e.id))
+
+async def _ranked_employee_page(db: AsyncSession, query, rank, cursor: Optional[str], skip: int, limit: int):
+    """Página de resultados de búsqueda ordenada por (relevancia DESC, id)"""
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, float, int)
+        query = query.where(
+            or_(rank < last_rank, and_(rank == last_rank, Employee.id > last_id))
+        )
+    elif skip:
+        query = query.offset(skip)
+    
+    query = query.add_columns(rank).order_by(rank.desc(), Employee.id).limit(limit + 1)
+    result = await db.execute(query)
+    
+    page = build_page(result.all(), limit, lambda row: (row[1], row[0].id))
+    page["items"] = [row[0] for row in page["items"]]
+    return page
+
+@router.get("/autocomplete", response_model=List[EmployeeSuggestion])
+async def autocomplete_employees(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Sugerencias por prefijo para el buscador (índice en memoria)"""
+    await employee_search.ensure_loaded(db)
+    return employee_search.search_prefix(q, limit)
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
 async def get_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener empleado por ID"""
-    employee = db.query(Employee).filter(
-        and_(Employee.id == employee_id, Employee.is_deleted == False)
-    ).first()
+    employee = await _get_active_employee(db, employee_id)
     
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -124,30 +199,29 @@ async def get_employee(
 @router.post("/", response_model=EmployeeResponse)
 async def create_employee(
     employee: EmployeeCreate,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(require_role(ROLE_ADMIN))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_role(ROLE_ADMIN))
 ):
     """Crear nuevo empleado"""
     # Verificar si el email ya existe
-    existing_employee = db.query(Employee).filter(Employee.email == employee.email).first()
-    if existing_employee:
+    if await _exists(db, Employee.email == employee.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Verificar si el employee_id ya existe
-    existing_id = db.query(Employee).filter(Employee.employee_id == employee.employee_id).first()
-    if existing_id:
+    if await _exists(db, Employee.employee_id == employee.employee_id):
         raise HTTPException(status_code=400, detail="Employee ID already exists")
     
     # Verificar si el RFID tag ya existe
     if employee.rfid_tag:
-        existing_rfid = db.query(Employee).filter(Employee.rfid_tag == employee.rfid_tag).first()
-        if existing_rfid:
+        if await _exists(db, Employee.rfid_tag == employee.rfid_tag):
             raise HTTPException(status_code=400, detail="RFID tag already assigned")
     
     db_employee = Employee(**employee.dict())
     db.add(db_employee)
-    db.commit()
-    db.refresh(db_employee)
+    await db.commit()
+    await db.refresh(db_employee)
+    employee_search.upsert(db_employee)
+    await presence_service.employee_created(db_employee)
     
     return db_employee
 
@@ -155,27 +229,23 @@ async def create_employee(
 async def update_employee(
     employee_id: int,
     employee_update: EmployeeUpdate,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Actualizar empleado"""
-    db_employee = db.query(Employee).filter(
-        and_(Employee.id == employee_id, Employee.is_deleted == False)
-    ).first()
+    db_employee = await _get_active_employee(db, employee_id)
     
     if not db_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
     # Verificar email único
     if employee_update.email and employee_update.email != db_employee.email:
-        existing = db.query(Employee).filter(Employee.email == employee_update.email).first()
-        if existing:
+        if await _exists(db, Employee.email == employee_update.email):
             raise HTTPException(status_code=400, detail="Email already registered")
     
     # Verificar RFID único
     if employee_update.rfid_tag and employee_update.rfid_tag != db_employee.rfid_tag:
-        existing = db.query(Employee).filter(Employee.rfid_tag == employee_update.rfid_tag).first()
-        if existing:
+        if await _exists(db, Employee.rfid_tag == employee_update.rfid_tag):
             raise HTTPException(status_code=400, detail="RFID tag already assigned")
     
     # Actualizar campos
@@ -183,21 +253,21 @@ async def update_employee(
     for field, value in update_data.items():
         setattr(db_employee, field, value)
     
-    db.commit()
-    db.refresh(db_employee)
+    await db.commit()
+    await db.refresh(db_employee)
+    await invalidate_principal(db_employee)
+    employee_search.upsert(db_employee)
     
     return db_employee
 
 @router.delete("/{employee_id}")
 async def delete_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(require_role(ROLE_ADMIN))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_role(ROLE_ADMIN))
 ):
     """Eliminar empleado (soft delete)"""
-    db_employee = db.query(Employee).filter(
-        and_(Employee.id == employee_id, Employee.is_deleted == False)
-    ).first()
+    db_employee = await _get_active_employee(db, employee_id)
     
     if not db_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -205,21 +275,22 @@ async def delete_employee(
     # Soft delete
     db_employee.is_deleted = True
     db_employee.deleted_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    await invalidate_principal(db_employee)
+    employee_search.remove(db_employee.id)
+    await presence_service.employee_deleted(db_employee.id)
     
     return {"message": "Employee deleted successfully"}
 
 @router.post("/check-in", response_model=CheckInResponse)
 async def check_in_employee(
     check_in: CheckInCreate,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Registrar entrada de empleado"""
     # Verificar que el empleado existe
-    employee = db.query(Employee).filter(
-        and_(Employee.id == check_in.employee_id, Employee.is_deleted == False)
-    ).first()
+    employee = await _get_active_employee(db, check_in.employee_id)
     
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -233,7 +304,8 @@ async def check_in_employee(
         employee_id=check_in.employee_id,
         check_in_time=datetime.utcnow(),
         location=check_in.location,
-        method=check_in.method
+        method=check_in.method,
+        employee=employee
     )
     
     # Actualizar estado del empleado
@@ -241,22 +313,20 @@ async def check_in_employee(
     employee.last_check_in = datetime.utcnow()
     
     db.add(db_check_in)
-    db.commit()
-    db.refresh(db_check_in)
+    await db.commit()
+    await presence_service.mark_present(employee.id)
     
     return db_check_in
 
 @router.post("/check-out", response_model=CheckInResponse)
 async def check_out_employee(
     employee_id: int,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Registrar salida de empleado"""
     # Verificar que el empleado existe
-    employee = db.query(Employee).filter(
-        and_(Employee.id == employee_id, Employee.is_deleted == False)
-    ).first()
+    employee = await _get_active_employee(db, employee_id)
     
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -266,12 +336,17 @@ async def check_out_employee(
         raise HTTPException(status_code=400, detail="Employee is not checked in")
     
     # Obtener el último check-in
-    last_check_in = db.query(CheckIn).filter(
-        and_(
-            CheckIn.employee_id == employee_id,
-            CheckIn.check_out_time.is_(None)
+    result = await db.execute(
+        select(CheckIn)
+        .options(selectinload(CheckIn.employee))
+        .where(
+            and_(
+                CheckIn.employee_id == employee_id,
+                CheckIn.check_out_time.is_(None)
+            )
         )
-    ).first()
+    )
+    last_check_in = result.scalars().first()
     
     if not last_check_in:
         raise HTTPException(status_code=400, detail="No active check-in found")
@@ -283,37 +358,59 @@ async def check_out_employee(
     employee.is_present = False
     employee.last_check_out = datetime.utcnow()
     
-    db.commit()
-    db.refresh(last_check_in)
+    await db.commit()
+    await presence_service.mark_absent(employee.id)
     
     return last_check_in
 
-@router.get("/{employee_id}/check-ins", response_model=List[CheckInResponse])
+@router.get("/{employee_id}/check-ins", response_model=Page[CheckInResponse])
 async def get_employee_check_ins(
     employee_id: int,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Obtener historial de check-ins de un empleado"""
-    check_ins = db.query(CheckIn).filter(CheckIn.employee_id == employee_id)\
-        .order_by(CheckIn.check_in_time.desc())\
-        .offset(skip).limit(limit).all()
+    """Obtener historial de check-ins de un empleado, paginado por (check_in_time, id)"""
+    query = (
+        select(CheckIn)
+        .options(selectinload(CheckIn.employee))
+        .where(CheckIn.employee_id == employee_id)
+    )
+    
+    # Paginación: cursor opaco; offset solo como compatibilidad
+    if cursor:
+        last_time, last_id = decode_cursor(cursor, datetime, int)
+        query = query.where(tuple_(CheckIn.check_in_time, CheckIn.id) < (last_time, last_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    query = query.order_by(CheckIn.check_in_time.desc(), CheckIn.id.desc()).limit(limit + 1)
+    result = await db.execute(query)
     
-    return check_ins
+    return build_page(result.scalars().all(), limit, lambda c: (c.check_in_time, c.id))
 
 @router.get("/present/count")
 async def get_present_employees_count(
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Obtener conteo de empleados presentes"""
-    total_present = db.query(Employee).filter(
-        and_(Employee.is_present == True, Employee.is_deleted == False)
-    ).count()
+    """Obtener conteo de empleados presentes (contadores en Redis)"""
+    try:
+        return await presence_service.get_counts()
+    except Exception as e:
+        logger.warning(f"Presencia en Redis no disponible, consultando la base de datos: {e}")
+    
+    total_present = await db.scalar(
+        select(func.count(Employee.id)).where(
+            and_(Employee.is_present == True, Employee.is_deleted == False)
+        )
+    )
     
-    total_employees = db.query(Employee).filter(Employee.is_deleted == False).count()
+    total_employees = await db.scalar(
+        select(func.count(Employee.id)).where(Employee.is_deleted == False)
+    )
     
     return {
         "present": total_present,
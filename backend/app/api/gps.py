@@ -1,19 +1,28 @@
 # S.A.M.I. - API GPS
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+import hmac
+import logging
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
-from ..core.database import get_db
-from ..core.security import get_current_active_user, require_role, ROLE_MANAGER
-from ..models.employee import Employee
-from ..services.gps_service import GPSService
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, get_db, get_async_db
+from ..core.security import get_current_active_user, require_role, resolve_token, ROLE_MANAGER
+from ..core.principal_cache import Principal
+from ..models.gps import Geofence, parse_polygon
+from ..services import get_gps_service
+from ..services.gps_ingest import BINARY_MEDIA_TYPE, IngestBusy, parse_binary, parse_json
+from ..services.gps_wire import COMPACT_MEDIA_TYPE
+from ..services.gps_live import LiveClient, live_hub
 
 router = APIRouter()
-
-# Instancia global del servicio GPS
-gps_service = GPSService()
+logger = logging.getLogger(__name__)
 
 # Modelos Pydantic
 class GPSLocation(BaseModel):
@@ -41,11 +50,61 @@ class VehicleLocation(BaseModel):
     timestamp: datetime
     signal_strength: Optional[float] = None
     satellite_count: Optional[int] = None
+    age_seconds: Optional[float] = None
+    stale: bool = False
 
 class NearbyVehiclesRequest(BaseModel):
     latitude: float
     longitude: float
     radius_km: float = 5.0
+    limit: Optional[int] = None
+
+class GeofenceCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    geofence_type: str = "worksite"
+    center_latitude: Optional[float] = None
+    center_longitude: Optional[float] = None
+    radius_meters: Optional[float] = None
+    polygon_coordinates: Optional[List] = None  # [[lat, lng], ...]
+    is_active: bool = True
+    alert_on_enter: bool = False
+    alert_on_exit: bool = False
+    alert_recipients: Optional[List] = None
+    project_id: Optional[int] = None
+
+class GeofenceUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    geofence_type: Optional[str] = None
+    center_latitude: Optional[float] = None
+    center_longitude: Optional[float] = None
+    radius_meters: Optional[float] = None
+    polygon_coordinates: Optional[List] = None
+    is_active: Optional[bool] = None
+    alert_on_enter: Optional[bool] = None
+    alert_on_exit: Optional[bool] = None
+    alert_recipients: Optional[List] = None
+    project_id: Optional[int] = None
+
+class GeofenceResponse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+    geofence_type: str
+    center_latitude: float
+    center_longitude: float
+    radius_meters: Optional[float]
+    polygon_coordinates: Optional[List]
+    is_active: bool
+    alert_on_enter: bool
+    alert_on_exit: bool
+    alert_recipients: Optional[List]
+    project_id: Optional[int]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
 
 class GeofenceAlert(BaseModel):
     type: str
@@ -55,17 +114,10 @@ class GeofenceAlert(BaseModel):
     data: Dict
     timestamp: datetime
 
-@router.on_event("startup")
-async def startup_gps_service():
-    """Inicializar servicio GPS al arrancar"""
-    try:
-        await gps_service.initialize()
-    except Exception as e:
-        print(f"Error inicializando servicio GPS: {e}")
-
 @router.get("/vehicles", response_model=Dict)
 async def get_all_vehicles_locations(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Obtener ubicaciones de todos los vehículos"""
     return await gps_service.get_all_vehicles_locations()
@@ -73,7 +125,8 @@ async def get_all_vehicles_locations(
 @router.get("/vehicles/{vehicle_id}/location", response_model=VehicleLocation)
 async def get_vehicle_location(
     vehicle_id: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Obtener ubicación actual de un vehículo específico"""
     location = await gps_service.get_vehicle_location(vehicle_id)
@@ -92,9 +145,17 @@ async def get_vehicle_history(
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: Employee = Depends(get_current_active_user)
+    tolerance: Optional[float] = Query(None, gt=0, description="Desvío máximo en metros al simplificar"),
+    zoom: Optional[float] = Query(None, ge=0, le=22, description="Zoom del mapa; define la tolerancia"),
+    max_points: Optional[int] = Query(None, ge=2, le=20000),
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
-    """Obtener historial de ubicaciones de un vehículo"""
+    """
+    Obtener historial de ubicaciones de un vehículo. Con `tolerance`, `zoom`
+    o `max_points` devuelve el recorrido simplificado para el mapa en lugar
+    de los primeros `limit` puntos crudos.
+    """
     try:
         # Usar fechas por defecto si no se proporcionan
         if not start_time:
@@ -102,32 +163,115 @@ async def get_vehicle_history(
         if not end_time:
             end_time = datetime.utcnow()
         
+        if tolerance is not None or zoom is not None or max_points is not None:
+            track = await gps_service.get_vehicle_track(
+                vehicle_id, start_time, end_time,
+                tolerance_m=tolerance, zoom=zoom, max_points=max_points
+            )
+            return {
+                "vehicle_id": vehicle_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "locations": track["locations"],
+                "total": len(track["locations"]),
+                "simplified": True,
+                "original_total": track["original_points"],
+                "tolerance_m": track["tolerance_m"]
+            }
+        
         history = await gps_service.get_vehicle_history(
-            vehicle_id, start_time, end_time
+            vehicle_id, start_time, end_time, limit
         )
         
         return {
             "vehicle_id": vehicle_id,
             "start_time": start_time,
             "end_time": end_time,
-            "locations": history[:limit],
-            "total": len(history)
+            "locations": history,
+            "total": len(history),
+            "simplified": False
         }
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.websocket("/ws")
+async def gps_live_positions(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    vehicles: Optional[str] = Query(None, description="IDs separados por coma; todos si se omite"),
+    gps_service=Depends(get_gps_service)
+):
+    """
+    Posiciones en vivo. Al conectar se envía {"type": "snapshot"} con el
+    estado actual y luego, una vez por tick, {"type": "positions"} solo con
+    los vehículos que cambiaron. El cliente puede cambiar el filtro con
+    {"action": "subscribe", "vehicles": [...] | null}; cualquier otro valor de
+    "vehicles" cierra la conexión con 1003.
+    """
+    # Los navegadores no envían Authorization en el handshake: token en la URL
+    async with AsyncSessionLocal() as db:
+        user = await resolve_token(db, token)
+    if user is None or not user.is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    client = LiveClient(websocket)
+    client.subscribe(vehicles.split(",") if vehicles else None, await gps_service.positions.get_all())
+    live_hub.register(client)
+    sender = asyncio.create_task(client.run())
+    receiver = None
+    close_code = None
+    try:
+        while True:
+            # Si falla el envío (socket roto) se deja de leer en lugar de esperar al cliente
+            receiver = asyncio.ensure_future(websocket.receive_json())
+            done, _ = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if sender in done:
+                sender.result()
+                break
+            message = receiver.result()
+            if not isinstance(message, dict) or message.get("action") != "subscribe":
+                continue
+            vehicles = message.get("vehicles")
+            if vehicles is not None and not (
+                isinstance(vehicles, list) and all(isinstance(v, str) for v in vehicles)
+            ):
+                # Un string suelto se separaría en caracteres: se rechaza
+                logger.warning(f"Suscripción inválida en posiciones en vivo: {vehicles!r}")
+                close_code = status.WS_1003_UNSUPPORTED_DATA
+                break
+            client.subscribe(vehicles, await gps_service.positions.get_all())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Conexión de posiciones en vivo cerrada: {e}")
+    finally:
+        live_hub.unregister(client)
+        tasks = [task for task in (sender, receiver) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if close_code is not None:
+            try:
+                await websocket.close(code=close_code)
+            except Exception:
+                pass
+
 @router.post("/vehicles/nearby")
 async def get_nearby_vehicles(
     request: NearbyVehiclesRequest,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Obtener vehículos cerca de una ubicación"""
     try:
         nearby_vehicles = await gps_service.get_vehicles_near_location(
             request.latitude,
             request.longitude,
-            request.radius_km
+            request.radius_km,
+            request.limit
         )
         
         return {
@@ -141,12 +285,30 @@ async def get_nearby_vehicles(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/vehicles/nearest")
+async def get_nearest_vehicles(
+    latitude: float = Query(...),
+    longitude: float = Query(...),
+    k: int = Query(5, ge=1, le=100),
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
+):
+    """Obtener los k vehículos más cercanos a una ubicación"""
+    vehicles = await gps_service.get_nearest_vehicles(latitude, longitude, k)
+    return {
+        "center_latitude": latitude,
+        "center_longitude": longitude,
+        "vehicles": vehicles,
+        "count": len(vehicles)
+    }
+
 @router.get("/vehicles/{vehicle_id}/distance")
 async def calculate_distance_to_vehicle(
     vehicle_id: str,
     latitude: float = Query(...),
     longitude: float = Query(...),
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Calcular distancia a un vehículo específico"""
     try:
@@ -180,7 +342,7 @@ async def calculate_distance_to_vehicle(
 async def get_recent_gps_alerts(
     limit: int = Query(50, ge=1, le=200),
     severity: Optional[str] = Query(None),
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener alertas GPS recientes"""
     # Esta función debería consultar la base de datos
@@ -193,7 +355,7 @@ async def get_recent_gps_alerts(
 @router.post("/alerts/{alert_id}/acknowledge")
 async def acknowledge_gps_alert(
     alert_id: int,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Reconocer una alerta GPS"""
     return {
@@ -203,54 +365,109 @@ async def acknowledge_gps_alert(
         "message": "Alerta GPS reconocida correctamente"
     }
 
-@router.get("/geofences")
+async def _get_active_geofence(db: AsyncSession, geofence_id: int) -> Optional[Geofence]:
+    """Obtener geofence no eliminada por ID"""
+    result = await db.execute(
+        select(Geofence).where(and_(Geofence.id == geofence_id, Geofence.is_deleted == False))
+    )
+    return result.scalars().first()
+
+def _validate_geometry(geofence: Geofence):
+    """Una geofence necesita un radio o un polígono de al menos 3 vértices"""
+    try:
+        polygon = parse_polygon(geofence.polygon_coordinates)
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid polygon_coordinates")
+    if geofence.polygon_coordinates and not polygon:
+        raise HTTPException(status_code=400, detail="Polygon needs at least 3 points")
+    if not polygon and not geofence.radius_meters:
+        raise HTTPException(status_code=400, detail="Geofence needs radius_meters or polygon_coordinates")
+    if geofence.center_latitude is None or geofence.center_longitude is None:
+        # Centro por defecto de un polígono: promedio de sus vértices
+        geofence.center_latitude = sum(p[0] for p in polygon) / len(polygon)
+        geofence.center_longitude = sum(p[1] for p in polygon) / len(polygon)
+
+@router.get("/geofences", response_model=Dict)
 async def get_geofences(
-    current_user: Employee = Depends(get_current_active_user)
+    include_inactive: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener geofences configuradas"""
-    # Esta función debería consultar la base de datos
+    query = select(Geofence).where(Geofence.is_deleted == False).order_by(Geofence.id)
+    if not include_inactive:
+        query = query.where(Geofence.is_active == True)
+    result = await db.execute(query)
+    geofences = [GeofenceResponse.model_validate(g) for g in result.scalars()]
     return {
-        "geofences": [],
-        "total": 0,
-        "message": "Funcionalidad en desarrollo"
+        "geofences": geofences,
+        "total": len(geofences)
     }
 
-@router.post("/geofences")
+@router.post("/geofences", response_model=GeofenceResponse)
 async def create_geofence(
-    geofence_data: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    geofence: GeofenceCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    gps_service=Depends(get_gps_service)
 ):
     """Crear nueva geofence"""
-    return {
-        "message": "Geofence creada correctamente",
-        "geofence_data": geofence_data
-    }
+    db_geofence = Geofence(**geofence.dict())
+    _validate_geometry(db_geofence)
+    db.add(db_geofence)
+    await db.commit()
+    await db.refresh(db_geofence)
+    gps_service.geofences.upsert(db_geofence)
+    
+    return db_geofence
 
-@router.put("/geofences/{geofence_id}")
+@router.put("/geofences/{geofence_id}", response_model=GeofenceResponse)
 async def update_geofence(
     geofence_id: int,
-    geofence_data: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    geofence_update: GeofenceUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    gps_service=Depends(get_gps_service)
 ):
     """Actualizar geofence"""
-    return {
-        "message": f"Geofence {geofence_id} actualizada correctamente",
-        "geofence_data": geofence_data
-    }
+    db_geofence = await _get_active_geofence(db, geofence_id)
+    
+    if not db_geofence:
+        raise HTTPException(status_code=404, detail="Geofence not found")
+    
+    for field, value in geofence_update.dict(exclude_unset=True).items():
+        setattr(db_geofence, field, value)
+    _validate_geometry(db_geofence)
+    
+    await db.commit()
+    await db.refresh(db_geofence)
+    gps_service.geofences.upsert(db_geofence)
+    
+    return db_geofence
 
 @router.delete("/geofences/{geofence_id}")
 async def delete_geofence(
     geofence_id: int,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    gps_service=Depends(get_gps_service)
 ):
-    """Eliminar geofence"""
-    return {
-        "message": f"Geofence {geofence_id} eliminada correctamente"
-    }
+    """Eliminar geofence (soft delete)"""
+    db_geofence = await _get_active_geofence(db, geofence_id)
+    
+    if not db_geofence:
+        raise HTTPException(status_code=404, detail="Geofence not found")
+    
+    db_geofence.is_deleted = True
+    db_geofence.deleted_at = datetime.utcnow()
+    await db.commit()
+    gps_service.geofences.remove(geofence_id)
+    
+    return {"message": "Geofence deleted successfully"}
 
 @router.get("/routes")
 async def get_routes(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener rutas configuradas"""
     # Esta función debería consultar la base de datos
@@ -263,7 +480,7 @@ async def get_routes(
 @router.post("/routes")
 async def create_route(
     route_data: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Crear nueva ruta"""
     return {
@@ -274,7 +491,7 @@ async def create_route(
 @router.get("/routes/{route_id}/trips")
 async def get_route_trips(
     route_id: int,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener viajes de una ruta"""
     return {
@@ -289,7 +506,7 @@ async def start_route_trip(
     route_id: int,
     vehicle_id: str,
     driver_id: int,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Iniciar viaje de una ruta"""
     return {
@@ -303,31 +520,15 @@ async def start_route_trip(
 @router.get("/statistics")
 async def get_gps_statistics(
     period: str = Query("today", regex="^(today|week|month|year)$"),
-    current_user: Employee = Depends(get_current_active_user)
+    vehicle_id: Optional[str] = Query(None),
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
-    """Obtener estadísticas GPS"""
+    """Obtener estadísticas GPS (sumas de los resúmenes horarios/diarios)"""
     try:
-        # Calcular estadísticas basadas en el período
-        end_time = datetime.utcnow()
-        
-        if period == "today":
-            start_time = end_time - timedelta(days=1)
-        elif period == "week":
-            start_time = end_time - timedelta(weeks=1)
-        elif period == "month":
-            start_time = end_time - timedelta(days=30)
-        elif period == "year":
-            start_time = end_time - timedelta(days=365)
-        
-        # Esta función debería calcular estadísticas de la base de datos
+        statistics = await gps_service.get_statistics(period, vehicle_id)
         return {
-            "period": period,
-            "start_time": start_time,
-            "end_time": end_time,
-            "total_locations": 0,
-            "active_vehicles": len(gps_service.vehicles),
-            "total_distance_km": 0.0,
-            "average_speed_kmh": 0.0,
+            **statistics,
             "alerts_count": 0,
             "geofence_violations": 0
         }
@@ -335,9 +536,37 @@ async def get_gps_statistics(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/export")
+async def export_gps_history(
+    start_time: datetime = Query(...),
+    end_time: datetime = Query(...),
+    format: str = Query("ndjson", regex="^(ndjson|csv|parquet)$"),
+    vehicle_id: Optional[str] = Query(None),
+    project_id: Optional[int] = Query(None),
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    gps_service=Depends(get_gps_service)
+):
+    """Exportar historial GPS en NDJSON, CSV o Parquet, transmitido por bloques"""
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time debe ser posterior a start_time")
+    try:
+        encoder, body = gps_service.export_locations(format, start_time, end_time, vehicle_id, project_id)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Exportación Parquet no disponible (falta pyarrow)")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filename = f"gps_{vehicle_id or project_id or 'all'}_{start_time:%Y%m%d}_{end_time:%Y%m%d}.{encoder.extension}"
+    return StreamingResponse(
+        body,
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/devices")
 async def get_gps_devices(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Obtener dispositivos GPS"""
     return {
@@ -348,7 +577,8 @@ async def get_gps_devices(
 @router.get("/devices/{device_id}/status")
 async def get_device_status(
     device_id: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Obtener estado de un dispositivo GPS"""
     if device_id not in gps_service.gps_devices:
@@ -367,7 +597,8 @@ async def get_device_status(
 @router.post("/devices/{device_id}/test")
 async def test_device_connection(
     device_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    gps_service=Depends(get_gps_service)
 ):
     """Probar conexión con un dispositivo GPS"""
     try:
@@ -395,17 +626,30 @@ async def test_device_connection(
 
 @router.get("/system/status")
 async def get_system_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Obtener estado del sistema GPS"""
     return await gps_service.get_system_status()
 
+@router.get("/scheduler/status")
+async def get_scheduler_status(
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
+):
+    """Latencia y atraso de sondeo por dispositivo"""
+    return {
+        "summary": gps_service.scheduler.get_stats(),
+        "devices": gps_service.scheduler.get_device_stats()
+    }
+
 @router.post("/simulate/location")
 async def simulate_vehicle_location(
     vehicle_id: str,
     latitude: float,
     longitude: float,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    gps_service=Depends(get_gps_service)
 ):
     """Simular ubicación de vehículo para pruebas"""
     try:
@@ -440,9 +684,39 @@ async def simulate_vehicle_location(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def verify_device_key(x_device_key: Optional[str] = Header(None)):
+    """Los trackers se autentican con una clave compartida, no con usuarios"""
+    if not settings.gps_ingest_api_key:
+        raise HTTPException(status_code=503, detail="Ingesta GPS deshabilitada (falta GPS_INGEST_API_KEY)")
+    if not x_device_key or not hmac.compare_digest(x_device_key, settings.gps_ingest_api_key):
+        raise HTTPException(status_code=401, detail="Clave de dispositivo inválida")
+
+@router.post("/ingest")
+async def ingest_gps_fixes(
+    request: Request,
+    _: None = Depends(verify_device_key),
+    gps_service=Depends(get_gps_service)
+):
+    """Recibir un lote de fixes de trackers en JSON, binario o compacto"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    try:
+        if content_type in (BINARY_MEDIA_TYPE, "application/octet-stream"):
+            batch = parse_binary(body)
+        elif content_type == COMPACT_MEDIA_TYPE:
+            batch = gps_service.decode_compact(body)
+        else:
+            batch = parse_json(body)
+        return await gps_service.ingest_fixes(batch)
+    except IngestBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/health")
 async def health_check(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    gps_service=Depends(get_gps_service)
 ):
     """Verificar salud del sistema GPS"""
     status = await gps_service.get_system_status()
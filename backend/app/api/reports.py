@@ -7,14 +7,11 @@ from pydantic import BaseModel
 
 from ..core.database import get_db
 from ..core.security import get_current_active_user, require_role, ROLE_MANAGER
-from ..models.employee import Employee
-from ..services.report_service import ReportService
+from ..core.principal_cache import Principal
+from ..services import get_report_service
 
 router = APIRouter()
 
-# Instancia global del servicio de reportes
-report_service = ReportService()
-
 # Modelos Pydantic
 class ReportGenerationRequest(BaseModel):
     template_name: str
@@ -47,17 +44,10 @@ class ReportSchedule(BaseModel):
     cron_expression: str
     is_active: bool
 
-@router.on_event("startup")
-async def startup_report_service():
-    """Inicializar servicio de reportes al arrancar"""
-    try:
-        await report_service.initialize()
-    except Exception as e:
-        print(f"Error inicializando servicio de reportes: {e}")
-
 @router.get("/templates", response_model=List[ReportTemplate])
 async def get_report_templates(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Obtener plantillas de reportes disponibles"""
     templates = await report_service.get_available_templates()
@@ -66,7 +56,8 @@ async def get_report_templates(
 @router.get("/templates/{template_name}")
 async def get_report_template(
     template_name: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Obtener plantilla de reporte específica"""
     templates = await report_service.get_available_templates()
@@ -81,7 +72,8 @@ async def get_report_template(
 async def generate_report(
     request: ReportGenerationRequest,
     background_tasks: BackgroundTasks,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Generar reporte específico"""
     try:
@@ -111,7 +103,8 @@ async def generate_daily_report(
     report_date: Optional[date] = None,
     recipients: Optional[List[str]] = None,
     background_tasks: BackgroundTasks = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Generar reporte diario operativo"""
     try:
@@ -133,7 +126,8 @@ async def generate_weekly_report(
     week_start: Optional[date] = None,
     recipients: Optional[List[str]] = None,
     background_tasks: BackgroundTasks = None,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Generar reporte semanal de proyectos"""
     try:
@@ -159,7 +153,8 @@ async def generate_monthly_report(
     year: Optional[int] = None,
     recipients: Optional[List[str]] = None,
     background_tasks: BackgroundTasks = None,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Generar reporte mensual financiero"""
     try:
@@ -189,7 +184,8 @@ async def get_report_history(
     template_name: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Obtener historial de reportes generados"""
     try:
@@ -220,7 +216,8 @@ async def get_report_history(
 
 @router.get("/schedules", response_model=List[ReportSchedule])
 async def get_report_schedules(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Obtener programaciones de reportes"""
     schedules = []
@@ -232,7 +229,8 @@ async def get_report_schedules(
 @router.post("/schedules")
 async def create_report_schedule(
     schedule: ReportSchedule,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Crear nueva programación de reporte"""
     try:
@@ -261,7 +259,8 @@ async def create_report_schedule(
 async def update_report_schedule(
     schedule_name: str,
     schedule: ReportSchedule,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Actualizar programación de reporte"""
     try:
@@ -282,7 +281,8 @@ async def update_report_schedule(
 @router.delete("/schedules/{schedule_name}")
 async def delete_report_schedule(
     schedule_name: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Eliminar programación de reporte"""
     try:
@@ -302,7 +302,8 @@ async def delete_report_schedule(
 @router.post("/schedules/{schedule_name}/activate")
 async def activate_schedule(
     schedule_name: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Activar programación de reporte"""
     try:
@@ -321,7 +322,8 @@ async def activate_schedule(
 @router.post("/schedules/{schedule_name}/deactivate")
 async def deactivate_schedule(
     schedule_name: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Desactivar programación de reporte"""
     try:
@@ -340,7 +342,8 @@ async def deactivate_schedule(
 @router.get("/statistics")
 async def get_report_statistics(
     period: str = Query("month", regex="^(week|month|year)$"),
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Obtener estadísticas de reportes"""
     try:
@@ -392,7 +395,8 @@ async def get_report_statistics(
 
 @router.get("/system/status")
 async def get_system_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Obtener estado del sistema de reportes"""
     return await report_service.get_system_status()
@@ -400,7 +404,8 @@ async def get_system_status(
 @router.post("/test/email")
 async def test_email_configuration(
     recipients: List[str],
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    report_service=Depends(get_report_service)
 ):
     """Probar configuración de email"""
     try:
@@ -434,7 +439,8 @@ async def test_email_configuration(
 
 @router.get("/health")
 async def health_check(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    report_service=Depends(get_report_service)
 ):
     """Verificar salud del sistema de reportes"""
     status = await report_service.get_system_status()
@@ -7,14 +7,11 @@ from pydantic import BaseModel
 
 from ..core.database import get_db
 from ..core.security import get_current_active_user, require_role, ROLE_MANAGER
-from ..models.employee import Employee
-from ..services.rfid_service import RFIDService
+from ..core.principal_cache import Principal
+from ..services import get_rfid_service
 
 router = APIRouter()
 
-# Instancia global del servicio RFID
-rfid_service = RFIDService()
-
 # Modelos Pydantic
 class RFIDReaderStatus(BaseModel):
     reader_id: str
@@ -49,18 +46,10 @@ class ReaderConfigRequest(BaseModel):
     baudrate: Optional[int] = None
     enabled: Optional[bool] = None
 
-@router.on_event("startup")
-async def startup_rfid_service():
-    """Inicializar servicio RFID al arrancar"""
-    try:
-        await rfid_service.initialize()
-        await rfid_service.start_all_readers()
-    except Exception as e:
-        print(f"Error inicializando servicio RFID: {e}")
-
 @router.get("/readers/status", response_model=Dict)
 async def get_readers_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Obtener estado de todos los lectores RFID"""
     return await rfid_service.get_all_readers_status()
@@ -68,7 +57,8 @@ async def get_readers_status(
 @router.get("/readers/{reader_id}/status", response_model=RFIDReaderStatus)
 async def get_reader_status(
     reader_id: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Obtener estado de un lector RFID específico"""
     status = await rfid_service.get_reader_status(reader_id)
@@ -81,7 +71,8 @@ async def get_reader_status(
 @router.post("/readers/{reader_id}/start")
 async def start_reader(
     reader_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Iniciar un lector RFID específico"""
     success = await rfid_service.start_reader(reader_id)
@@ -97,7 +88,8 @@ async def start_reader(
 @router.post("/readers/{reader_id}/stop")
 async def stop_reader(
     reader_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Detener un lector RFID específico"""
     success = await rfid_service.stop_reader(reader_id)
@@ -112,7 +104,8 @@ async def stop_reader(
 
 @router.post("/readers/start-all")
 async def start_all_readers(
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Iniciar todos los lectores RFID"""
     success = await rfid_service.start_all_readers()
@@ -127,7 +120,8 @@ async def start_all_readers(
 
 @router.post("/readers/stop-all")
 async def stop_all_readers(
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Detener todos los lectores RFID"""
     success = await rfid_service.stop_all_readers()
@@ -144,7 +138,8 @@ async def stop_all_readers(
 async def update_reader_config(
     reader_id: str,
     config: ReaderConfigRequest,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Actualizar configuración de un lector RFID"""
     config_dict = config.dict(exclude_unset=True)
@@ -161,7 +156,8 @@ async def update_reader_config(
 @router.post("/readers/{reader_id}/test")
 async def test_reader(
     reader_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Probar conexión con un lector RFID"""
     result = await rfid_service.test_reader(reader_id)
@@ -178,7 +174,7 @@ async def test_reader(
 async def get_recent_transactions(
     limit: int = 50,
     reader_id: Optional[str] = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener transacciones RFID recientes"""
     # Esta función debería consultar la base de datos
@@ -192,7 +188,7 @@ async def get_recent_transactions(
 @router.get("/transactions/{transaction_id}")
 async def get_transaction(
     transaction_id: int,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener transacción RFID específica"""
     # Esta función debería consultar la base de datos
@@ -205,7 +201,7 @@ async def get_transaction(
 async def get_recent_alerts(
     limit: int = 50,
     severity: Optional[str] = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener alertas RFID recientes"""
     # Esta función debería consultar la base de datos
@@ -218,7 +214,7 @@ async def get_recent_alerts(
 @router.post("/alerts/{alert_id}/acknowledge")
 async def acknowledge_alert(
     alert_id: int,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Reconocer una alerta RFID"""
     # Esta función debería actualizar la base de datos
@@ -234,7 +230,7 @@ async def get_rfid_tags(
     skip: int = 0,
     limit: int = 100,
     tag_type: Optional[str] = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener lista de tags RFID"""
     # Esta función debería consultar la base de datos
@@ -247,7 +243,7 @@ async def get_rfid_tags(
 @router.post("/tags")
 async def create_rfid_tag(
     tag_data: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Crear nuevo tag RFID"""
     # Esta función debería crear en la base de datos
@@ -260,7 +256,7 @@ async def create_rfid_tag(
 async def update_rfid_tag(
     tag_id: str,
     tag_data: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Actualizar tag RFID"""
     # Esta función debería actualizar en la base de datos
@@ -272,7 +268,7 @@ async def update_rfid_tag(
 @router.delete("/tags/{tag_id}")
 async def delete_rfid_tag(
     tag_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Eliminar tag RFID"""
     # Esta función debería eliminar de la base de datos
@@ -282,7 +278,7 @@ async def delete_rfid_tag(
 
 @router.get("/zones")
 async def get_rfid_zones(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener zonas RFID"""
     # Esta función debería consultar la base de datos
@@ -295,7 +291,7 @@ async def get_rfid_zones(
 @router.post("/zones")
 async def create_rfid_zone(
     zone_data: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Crear nueva zona RFID"""
     # Esta función debería crear en la base de datos
@@ -307,7 +303,8 @@ async def create_rfid_zone(
 @router.get("/statistics")
 async def get_rfid_statistics(
     period: str = "today",  # today, week, month
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Obtener estadísticas de RFID"""
     # Esta función debería calcular estadísticas de la base de datos
@@ -322,7 +319,8 @@ async def get_rfid_statistics(
 
 @router.get("/system/status")
 async def get_system_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Obtener estado del sistema RFID"""
     return await rfid_service.get_system_status()
@@ -331,7 +329,8 @@ async def get_system_status(
 async def simulate_transaction(
     reader_id: str,
     tag_id: str,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Simular transacción RFID para pruebas"""
     try:
@@ -357,7 +356,8 @@ async def simulate_transaction(
 
 @router.get("/health")
 async def health_check(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    rfid_service=Depends(get_rfid_service)
 ):
     """Verificar salud del sistema RFID"""
     status = await rfid_service.get_system_status()
@@ -12,16 +12,11 @@ from pydantic import BaseModel
 
 from ..core.database import get_db
 from ..core.security import get_current_active_user, require_role, ROLE_MANAGER
-from ..models.employee import Employee
-from ..services.voice_service import VoiceService
-from ..services.ai_service import AIService
+from ..core.principal_cache import Principal
+from ..services import get_voice_service
 
 router = APIRouter()
 
-# Instancia global del servicio de voz
-voice_service = VoiceService()
-ai_service = None
-
 # Modelos Pydantic
 class VoiceInteractionRequest(BaseModel):
     audio_data: str  # Base64 encoded audio
@@ -55,25 +50,11 @@ class VoiceStatusResponse(BaseModel):
     commands_count: int
     last_updated: datetime
 
-@router.on_event("startup")
-async def startup_voice_service():
-    """Inicializar servicio de voz al arrancar"""
-    global ai_service
-    try:
-        # Inicializar servicio de IA
-        ai_service = AIService()
-        await ai_service.initialize()
-        
-        # Inicializar servicio de voz
-        await voice_service.initialize()
-        
-    except Exception as e:
-        print(f"Error inicializando servicio de voz: {e}")
-
 @router.post("/interact", response_model=VoiceInteractionResponse)
 async def voice_interaction(
     request: VoiceInteractionRequest,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Procesar interacción de voz completa"""
     try:
@@ -135,7 +116,8 @@ async def voice_interaction(
 async def record_and_process(
     duration: float = 5.0,
     location: Optional[str] = None,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Grabar audio del micrófono y procesarlo"""
     try:
@@ -160,7 +142,8 @@ async def record_and_process(
 @router.post("/transcribe", response_model=Dict)
 async def transcribe_audio(
     file: UploadFile = File(...),
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Transcribir archivo de audio"""
     try:
@@ -200,7 +183,8 @@ async def transcribe_audio(
 @router.post("/speak")
 async def speak_text(
     text: str,
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Sintetizar y reproducir texto"""
     try:
@@ -221,7 +205,8 @@ async def speak_text(
 
 @router.get("/commands", response_model=List[VoiceCommandResponse])
 async def get_voice_commands(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Obtener comandos de voz disponibles"""
     commands = await voice_service.get_available_commands()
@@ -231,7 +216,8 @@ async def get_voice_commands(
 @router.post("/commands", response_model=VoiceCommandResponse)
 async def add_voice_command(
     command: VoiceCommandRequest,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    voice_service=Depends(get_voice_service)
 ):
     """Agregar nuevo comando de voz"""
     try:
@@ -254,7 +240,8 @@ async def add_voice_command(
 
 @router.get("/status", response_model=VoiceStatusResponse)
 async def get_voice_status(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Obtener estado del servicio de voz"""
     status = await voice_service.get_system_status()
@@ -263,7 +250,8 @@ async def get_voice_status(
 
 @router.post("/test")
 async def test_voice_system(
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER)),
+    voice_service=Depends(get_voice_service)
 ):
     """Probar sistema de voz completo"""
     try:
@@ -286,7 +274,8 @@ async def test_voice_system(
 @router.post("/recognize-employee")
 async def recognize_employee_voice(
     file: UploadFile = File(...),
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    voice_service=Depends(get_voice_service)
 ):
     """Reconocer empleado por voz"""
     try:
@@ -334,7 +323,7 @@ async def recognize_employee_voice(
 
 @router.get("/devices")
 async def get_voice_devices(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Obtener dispositivos de audio disponibles"""
     try:
@@ -374,7 +363,7 @@ async def get_voice_devices(
 @router.post("/configure")
 async def configure_voice_system(
     config: Dict,
-    current_user: Employee = Depends(require_role(ROLE_MANAGER))
+    current_user: Principal = Depends(require_role(ROLE_MANAGER))
 ):
     """Configurar sistema de voz"""
     try:
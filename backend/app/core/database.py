@@ -1,27 +1,60 @@
 # S.A.M.I. - Configuración de Base de Datos
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 import redis
+import redis.asyncio as aioredis
 from .config import settings
 
-# Configuración de PostgreSQL
+def _async_database_url() -> str:
+    """URL del motor asíncrono (asyncpg) derivada de la configuración"""
+    if settings.async_database_url:
+        return settings.async_database_url
+    url = settings.database_url
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+# Configuración de PostgreSQL (motor síncrono, pool acotado)
 engine = create_engine(
     settings.database_url,
-    poolclass=StaticPool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
     pool_pre_ping=True,
-    pool_recycle=300,
+    pool_recycle=settings.db_pool_recycle,
     echo=settings.debug
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Configuración de PostgreSQL (motor asíncrono con asyncpg)
+async_engine = create_async_engine(
+    _async_database_url(),
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    echo=settings.debug
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base para los modelos
 Base = declarative_base()
 
 # Configuración de Redis
 redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+async_redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
 
 def get_db():
     """Dependencia para obtener sesión de base de datos"""
@@ -31,20 +64,50 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependencia para obtener sesión asíncrona de base de datos"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def get_redis():
     """Dependencia para obtener cliente Redis"""
     return redis_client
 
+def get_async_redis():
+    """Dependencia para obtener cliente Redis asíncrono"""
+    return async_redis_client
+
+# Directorio que contiene alembic.ini
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Clave del advisory lock que serializa migraciones entre workers
+MIGRATION_LOCK_KEY = 5_301_000
+
 def init_db():
-    """Inicializar base de datos"""
-    from ..models import Base
-    Base.metadata.create_all(bind=engine)
+    """Inicializar base de datos aplicando las migraciones pendientes"""
+    from alembic import command
+    from alembic.config import Config
+    
+    alembic_cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    alembic_cfg.attributes["configure_logger"] = False
+    
+    with engine.connect() as connection:
+        # Un solo worker migra; el resto espera y encuentra la base al día
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+        try:
+            alembic_cfg.attributes["connection"] = connection
+            command.upgrade(alembic_cfg, "head")
+            connection.commit()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
 
 def check_db_connection():
     """Verificar conexión a base de datos"""
     try:
         db = SessionLocal()
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         db.close()
         return True
     except Exception as e:
@@ -59,3 +122,9 @@ def check_redis_connection():
     except Exception as e:
         print(f"Error de conexión a Redis: {e}")
         return False
+
+async def close_db():
+    """Cerrar los pools de conexiones"""
+    await async_engine.dispose()
+    engine.dispose()
+    await async_redis_client.close()
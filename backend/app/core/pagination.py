@@ -0,0 +1,43 @@
+# S.A.M.I. - Paginación por cursor (keyset)
+import base64
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """Envoltorio de respuesta paginada"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+def encode_cursor(*values) -> str:
+    """Codificar la clave de ordenamiento del último elemento como token opaco"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Decodificar un token de cursor validando cantidad y tipos de valores"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor mal formado")
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_page(rows: list, limit: int, cursor_key) -> dict:
+    """Armar la página a partir de limit + 1 filas leídas"""
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor(*cursor_key(items[-1])) if has_more else None
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
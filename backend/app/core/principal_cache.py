@@ -0,0 +1,196 @@
+# S.A.M.I. - Caché de Usuarios Autenticados
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import async_redis_client
+from ..models.employee import Employee
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "sami:principal"
+INVALIDATE_CHANNEL = "sami:principal:invalidate"  # Canal pub/sub con el id del usuario modificado
+
+@dataclass(frozen=True)
+class Principal:
+    """Datos mínimos del usuario autenticado necesarios para autorización"""
+    id: int
+    role: str
+    is_active: bool
+    token_version: int = 0
+
+class PrincipalCache:
+    """
+    Caché de dos niveles (LRU en proceso + Redis) de usuarios autenticados.
+    Las invalidaciones se publican por Redis pub/sub y cada worker borra su
+    LRU al recibirlas; si la suscripción se corta, al reconectar se vacía el
+    LRU completo. Mientras Redis no responde, otro worker puede seguir
+    aceptando a un usuario dado de baja hasta `ttl_seconds` (mantenerlo corto).
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, redis_ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[float, Principal]]" = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.last_error = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Escuchar las invalidaciones publicadas por otros workers"""
+        if not self._task:
+            self._task = asyncio.create_task(self._listen())
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        delay = 1.0
+        while True:
+            pubsub = async_redis_client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Lo publicado mientras no había suscripción se perdió
+                self._entries.clear()
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._drop_local(int(message["data"]))
+                        self.invalidations += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Suscripción a invalidaciones de usuarios interrumpida: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                await pubsub.close()
+
+    def _drop_local(self, user_id: int):
+        for key in [k for k in self._entries if k[0] == user_id]:
+            del self._entries[key]
+
+    @staticmethod
+    def _redis_key(user_id: int, token_version: int) -> str:
+        return f"{REDIS_KEY_PREFIX}:{user_id}:{token_version}"
+
+    def _get_local(self, key: Tuple[int, int]) -> Optional[Principal]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return principal
+
+    def _set_local(self, key: Tuple[int, int], principal: Principal):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, db: AsyncSession, user_id: int, token_version: int) -> Optional[Principal]:
+        """Resolver usuario: LRU local, luego Redis, luego base de datos"""
+        key = (user_id, token_version)
+
+        principal = self._get_local(key)
+        if principal is not None:
+            self.hits += 1
+            return principal
+
+        try:
+            cached = await async_redis_client.get(self._redis_key(user_id, token_version))
+            if cached:
+                principal = Principal(**json.loads(cached))
+                self._set_local(key, principal)
+                self.redis_hits += 1
+                return principal
+        except Exception as e:
+            logger.warning(f"Error leyendo caché de usuarios en Redis: {e}")
+
+        self.misses += 1
+        result = await db.execute(
+            select(
+                Employee.id,
+                Employee.role,
+                Employee.is_active,
+                Employee.is_deleted,
+                Employee.token_version
+            ).where(Employee.id == user_id)
+        )
+        row = result.first()
+        if row is None or (row.token_version or 0) != token_version:
+            return None
+
+        principal = Principal(
+            id=row.id,
+            role=row.role,
+            is_active=bool(row.is_active) and not row.is_deleted,
+            token_version=row.token_version or 0
+        )
+        self._set_local(key, principal)
+
+        try:
+            await async_redis_client.set(
+                self._redis_key(user_id, token_version),
+                json.dumps(asdict(principal)),
+                ex=self.redis_ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Error escribiendo caché de usuarios en Redis: {e}")
+
+        return principal
+
+    async def invalidate(self, user_id: int, token_version: int = 0):
+        """Eliminar las entradas de un usuario en todos los workers (llamar tras modificarlo)"""
+        self._drop_local(user_id)
+
+        try:
+            await async_redis_client.delete(self._redis_key(user_id, token_version))
+            await async_redis_client.publish(INVALIDATE_CHANNEL, user_id)
+        except Exception as e:
+            logger.warning(f"Error invalidando caché de usuarios en Redis: {e}")
+
+    def get_stats(self) -> dict:
+        """Obtener estadísticas de la caché"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "subscribed": self._task is not None,
+            "last_error": self.last_error
+        }
+
+# Instancia global de la caché
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_max_entries,
+    redis_ttl_seconds=settings.principal_cache_redis_ttl_seconds
+)
+
+async def invalidate_principal(employee: Employee):
+    """Invalidar la caché para un empleado"""
+    await principal_cache.invalidate(employee.id, employee.token_version or 0)
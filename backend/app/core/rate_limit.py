@@ -0,0 +1,95 @@
+# S.A.M.I. - Limitación de Intentos (Token Bucket en Redis)
+import logging
+import time
+from typing import List, Tuple
+
+from .config import settings
+from .database import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Token bucket atómico sobre varias claves: solo consume si todas tienen saldo.
+# KEYS: claves de los buckets
+# ARGV: now, ttl, y por cada clave capacity, refill_per_second
+_TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local tokens = {}
+local allowed = 1
+local retry_after = 0
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[1 + i * 2])
+    local refill = tonumber(ARGV[2 + i * 2])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local current = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    current = math.min(capacity, current + math.max(0, now - ts) * refill)
+    tokens[i] = current
+    if current < 1 then
+        allowed = 0
+        retry_after = math.max(retry_after, (1 - current) / refill)
+    end
+end
+
+for i, key in ipairs(KEYS) do
+    local current = tokens[i]
+    if allowed == 1 then
+        current = current - 1
+    end
+    redis.call('HSET', key, 'tokens', current, 'ts', now)
+    redis.call('EXPIRE', key, ttl)
+end
+
+return {allowed, math.ceil(retry_after)}
+"""
+
+class TokenBucketLimiter:
+    """Limitador de tasa con buckets compartidos en Redis"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._script = async_redis_client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    def key(self, scope: str, value: str) -> str:
+        return f"{self.prefix}:{scope}:{value.lower()}"
+
+    async def acquire(self, buckets: List[Tuple[str, int, float]]) -> Tuple[bool, int]:
+        """
+        Consumir un token de cada bucket (clave, capacidad, periodo en segundos).
+        Retorna (permitido, segundos hasta el próximo intento).
+        """
+        keys = [key for key, _, _ in buckets]
+        args = [time.time(), int(max(period for _, _, period in buckets))]
+        for _, capacity, period in buckets:
+            args.extend([capacity, capacity / period])
+
+        try:
+            allowed, retry_after = await self._script(keys=keys, args=args)
+            return bool(allowed), int(retry_after)
+        except Exception as e:
+            # Si Redis no está disponible no se bloquea el acceso
+            logger.warning(f"Error en limitador de intentos: {e}")
+            return True, 0
+
+    async def reset(self, key: str):
+        """Restablecer un bucket"""
+        try:
+            await async_redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"Error restableciendo limitador de intentos: {e}")
+
+# Limitador global de intentos de login
+login_limiter = TokenBucketLimiter("sami:login")
+
+async def check_login_rate(email: str, client_ip: str) -> Tuple[bool, int]:
+    """Verificar límites de intentos de login por email y por IP"""
+    period = settings.lockout_duration_minutes * 60
+    return await login_limiter.acquire([
+        (login_limiter.key("email", email), settings.max_login_attempts, period),
+        (login_limiter.key("ip", client_ip), settings.login_max_attempts_per_ip, period),
+    ])
+
+async def reset_login_rate(email: str):
+    """Restablecer el contador por email tras un login exitoso"""
+    await login_limiter.reset(login_limiter.key("email", email))
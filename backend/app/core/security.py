@@ -1,19 +1,32 @@
 # S.A.M.I. - Seguridad y Autenticación
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .config import settings
-from .database import get_db
+from .database import get_async_db
+from .principal_cache import Principal, principal_cache
 from ..models.employee import Employee
 
 # Configuración de seguridad
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Pool acotado para bcrypt, fuera del hilo del event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="password-hash"
+)
+
+# Hash de referencia para emails inexistentes (se genera en el primer uso)
+_dummy_hash: Optional[str] = None
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar contraseña"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -22,6 +35,18 @@ def get_password_hash(password: str) -> str:
     """Generar hash de contraseña"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verificar contraseña en el pool de hashing"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, verify_password, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    """Generar hash de contraseña en el pool de hashing"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crear token de acceso JWT"""
     to_encode = data.copy()
@@ -42,49 +67,58 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Employee:
-    """Obtener usuario actual desde token"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    token = credentials.credentials
-    payload = verify_token(token)
-    
+async def resolve_token(db: AsyncSession, token: Optional[str]) -> Optional[Principal]:
+    """Usuario de un token JWT (vía caché); None si el token no es válido"""
+    payload = verify_token(token) if token else None
     if payload is None:
-        raise credentials_exception
+        return None
     
     user_id: int = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        return None
     
-    user = db.query(Employee).filter(Employee.id == user_id).first()
+    try:
+        return await principal_cache.get(db, int(user_id), int(payload.get("ver", 0)))
+    except (TypeError, ValueError):
+        return None
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Obtener usuario actual desde token (resuelto vía caché)"""
+    user = await resolve_token(db, credentials.credentials)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return user
 
-def get_current_active_user(current_user: Employee = Depends(get_current_user)) -> Employee:
+def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Obtener usuario activo actual"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def authenticate_user(db: Session, email: str, password: str) -> Union[Employee, bool]:
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Union[Employee, bool]:
     """Autenticar usuario"""
-    user = db.query(Employee).filter(Employee.email == email).first()
+    result = await db.execute(select(Employee).where(Employee.email == email))
+    user = result.scalars().first()
     if not user:
+        # Mismo costo que un email existente: la demora no revela qué cuentas existen
+        global _dummy_hash
+        if _dummy_hash is None:
+            _dummy_hash = await get_password_hash_async("sami-dummy-password")
+        await verify_password_async(password, _dummy_hash)
         return False
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return False
     return user
 
-def check_permissions(user: Employee, required_role: str) -> bool:
+def check_permissions(user: Principal, required_role: str) -> bool:
     """Verificar permisos de usuario"""
     role_hierarchy = {
         "operator": 1,
@@ -100,7 +134,7 @@ def check_permissions(user: Employee, required_role: str) -> bool:
 
 def require_role(required_role: str):
     """Decorator para requerir rol específico"""
-    def role_checker(current_user: Employee = Depends(get_current_active_user)):
+    def role_checker(current_user: Principal = Depends(get_current_active_user)):
         if not check_permissions(current_user, required_role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -3,62 +3,76 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 import uvicorn
 import logging
 from contextlib import asynccontextmanager
 
 from .core.config import settings
-from .core.database import init_db, check_db_connection, check_redis_connection
+from .core.database import init_db, close_db
+from .core.principal_cache import principal_cache
 from .api import api_router
+from .services import service_registry
+from .services.system_service import SystemService
+from .services.presence_service import presence_service
+from .services.gps_live import live_hub
 
 # Configurar logging
 logging.basicConfig(
-    level=getattr(logging, settings.log_level),gitb
+    level=getattr(logging, settings.log_level),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Instancia global del servicio de sistema (sondeo de salud en segundo plano)
+system_service = SystemService()
+
+# Los servicios se sondean a partir de que quedan inicializados en este proceso
+service_registry.add_listener(system_service.register_service)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestión del ciclo de vida de la aplicación"""
     # Startup
     logger.info("Iniciando S.A.M.I. - Sistema Automático de Monitoreo Inteligente")
     
-    # Verificar conexiones
-    if not check_db_connection():
+    # Verificar conexiones (primer sondeo) e iniciar sondeo en segundo plano
+    await system_service.initialize()
+    
+    if not system_service.is_up("database"):
         logger.error("No se pudo conectar a la base de datos")
         raise Exception("Database connection failed")
     
-    if not check_redis_connection():
+    if not system_service.is_up("redis"):
         logger.error("No se pudo conectar a Redis")
         raise Exception("Redis connection failed")
     
-    # Inicializar base de datos
-    init_db()
-    logger.info("Base de datos inicializada")
+    # Aplicar migraciones pendientes
+    if settings.run_migrations_on_startup:
+        init_db()
+        logger.info("Base de datos inicializada")
+    
+    # Contadores de presencia en Redis (reconciliados contra Postgres)
+    await presence_service.initialize()
     
-    # Inicializar servicios de IA
-    try:
-        from .services.ai_service import AIService
-        ai_service = AIService()
-        await ai_service.initialize()
-        logger.info("Servicio de IA inicializado")
-    except Exception as e:
-        logger.warning(f"Error inicializando servicio de IA: {e}")
+    # Invalidaciones de la caché de usuarios hechas en otros workers
+    await principal_cache.start()
     
-    # Inicializar servicio de voz
-    try:
-        from .services.voice_service import VoiceService
-        voice_service = VoiceService()
-        await voice_service.initialize()
-        logger.info("Servicio de voz inicializado")
-    except Exception as e:
-        logger.warning(f"Error inicializando servicio de voz: {e}")
+    # Inicializar los servicios alojados en este proceso (IA, voz, cámaras, ...);
+    # el resto se carga en su primer uso
+    await service_registry.start_hosted()
+    logger.info(f"Servicios alojados: {settings.hosted_services or 'ninguno'}")
     
     yield
     
     # Shutdown
     logger.info("Cerrando S.A.M.I.")
+    await system_service.shutdown()
+    await presence_service.shutdown()
+    await principal_cache.shutdown()
+    await live_hub.shutdown()
+    await service_registry.shutdown()
+    await close_db()
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -101,31 +115,29 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Verificación de salud del sistema"""
-    db_status = check_db_connection()
-    redis_status = check_redis_connection()
+    """Verificación de salud del sistema (desde el último sondeo)"""
+    health = system_service.get_health()
     
-    status_code = 200 if db_status and redis_status else 503
+    status_code = 200 if health["healthy"] else 503
     
     return JSONResponse(
         status_code=status_code,
-        content={
+        content=jsonable_encoder({
             "status": "healthy" if status_code == 200 else "unhealthy",
-            "database": "connected" if db_status else "disconnected",
-            "redis": "connected" if redis_status else "disconnected",
+            "database": health["database"],
+            "redis": health["redis"],
+            "checked_at": health["checked_at"],
             "version": settings.app_version
-        }
+        })
     )
 
 @app.get("/status")
 async def system_status():
-    """Estado detallado del sistema"""
-    from .services.system_service import SystemService
-    
-    system_service = SystemService()
-    status = await system_service.get_system_status()
-    
-    return status
+    """Estado detallado del sistema (desde el último sondeo)"""
+    system_status = await system_service.get_system_status()
+    system_status["services"] = service_registry.get_stats()
+    system_status["presence"] = presence_service.get_stats()
+    return system_status
 
 # Manejo de errores globales
 @app.exception_handler(HTTPException)
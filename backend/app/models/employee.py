@@ -1,8 +1,16 @@
 # S.A.M.I. - Modelo de Empleado
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Index, text, event
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin, SoftDeleteMixin
 from enum import Enum
+import unicodedata
+
+def normalize_search_text(*parts) -> str:
+    """Normalizar texto para búsqueda: minúsculas, sin acentos, espacios simples"""
+    joined = " ".join(str(p) for p in parts if p)
+    decomposed = unicodedata.normalize("NFKD", joined)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
 
 class EmployeeRole(str, Enum):
     OPERATOR = "operator"
@@ -12,6 +20,22 @@ class EmployeeRole(str, Enum):
 
 class Employee(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "employees"
+    __table_args__ = (
+        # Listado paginado por cursor (last_name, id) de empleados no eliminados
+        Index(
+            "ix_employees_last_name_id",
+            "last_name",
+            "id",
+            postgresql_where=text("is_deleted = false")
+        ),
+        # Búsqueda difusa por trigramas sobre el texto normalizado
+        Index(
+            "ix_employees_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"}
+        ),
+    )
     
     # Información personal
     first_name = Column(String(100), nullable=False)
@@ -28,6 +52,10 @@ class Employee(Base, TimestampMixin, SoftDeleteMixin):
     # Identificación
     rfid_tag = Column(String(50), unique=True, nullable=True, index=True)
     face_encoding = Column(Text, nullable=True)  # Encoding facial para reconocimiento
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # Se incrementa para invalidar tokens emitidos
+    
+    # Búsqueda: nombre, apellido, legajo y email normalizados (ver normalize_search_text)
+    search_text = Column(Text, nullable=True)
     
     # Estado
     is_present = Column(Boolean, default=False)
@@ -52,8 +80,26 @@ class Employee(Base, TimestampMixin, SoftDeleteMixin):
             not self.last_check_out or self.last_check_in > self.last_check_out
         )
 
+@event.listens_for(Employee, "before_insert")
+@event.listens_for(Employee, "before_update")
+def _update_search_text(mapper, connection, target):
+    """Mantener search_text sincronizado con los campos buscables"""
+    target.search_text = normalize_search_text(
+        target.first_name, target.last_name, target.employee_id, target.email
+    )
+
 class CheckIn(Base, TimestampMixin):
     __tablename__ = "check_ins"
+    __table_args__ = (
+        # Check-in abierto de un empleado (check_out_employee)
+        Index(
+            "ix_check_ins_employee_id_open",
+            "employee_id",
+            postgresql_where=text("check_out_time IS NULL")
+        ),
+        # Historial por empleado ordenado por fecha (se recorre hacia atrás para DESC)
+        Index("ix_check_ins_employee_id_check_in_time", "employee_id", "check_in_time"),
+    )
     
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
     check_in_time = Column(DateTime, nullable=False)
@@ -1,5 +1,5 @@
 # S.A.M.I. - Modelos de Eventos
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin
 import enum
@@ -59,12 +59,16 @@ class EventPriority(str, enum.Enum):
 
 class Event(Base, TimestampMixin):
     __tablename__ = "events"
+    __table_args__ = (
+        # Eventos por estado ordenados por fecha de detección
+        Index("ix_events_status_detected_at", "status", "detected_at"),
+    )
     
     # Información básica
     event_type = Column(Enum(EventType), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
-    status = Column(Enum(EventStatus), default=EventStatus.PENDING, index=True)
+    status = Column(Enum(EventStatus), default=EventStatus.PENDING)
     priority = Column(Enum(EventPriority), default=EventPriority.MEDIUM)
     
     # Ubicación y contexto
@@ -79,7 +83,7 @@ class Event(Base, TimestampMixin):
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     
     # Datos adicionales (JSON)
-    metadata = Column(JSON, nullable=True)
+    extra_metadata = Column("metadata", JSON, nullable=True)
     ai_confidence = Column(Float, nullable=True)  # Confianza de la IA (0-1)
     
     # Timestamps
@@ -123,7 +127,7 @@ class EventLog(Base, TimestampMixin):
     action = Column(String(100), nullable=False)  # 'created', 'updated', 'resolved', 'escalated'
     description = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
-    metadata = Column(JSON, nullable=True)
+    extra_metadata = Column("metadata", JSON, nullable=True)
     
     # Relaciones
     event = relationship("Event")
@@ -1,8 +1,24 @@
 # S.A.M.I. - Modelos de GPS y Vehículos
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from .base import Base, TimestampMixin, SoftDeleteMixin
 import enum
+from typing import List, Optional, Tuple
+
+def parse_polygon(coordinates) -> Optional[List[Tuple[float, float]]]:
+    """Vértices (lat, lng) de polygon_coordinates: [[lat, lng], ...] o [{"latitude", "longitude"}, ...]"""
+    if not coordinates:
+        return None
+    points = []
+    for point in coordinates:
+        if isinstance(point, dict):
+            points.append((float(point["latitude"]), float(point["longitude"])))
+        else:
+            points.append((float(point[0]), float(point[1])))
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()  # Anillo cerrado
+    return points if len(points) >= 3 else None
 
 class VehicleStatus(str, enum.Enum):
     AVAILABLE = "available"
@@ -60,6 +76,17 @@ class Vehicle(Base, TimestampMixin, SoftDeleteMixin):
 
 class GPSLocation(Base, TimestampMixin):
     __tablename__ = "gps_locations"
+    __table_args__ = (
+        # Historial de ubicaciones por vehículo o dispositivo
+        Index("ix_gps_locations_vehicle_id_created_at", "vehicle_id", "created_at"),
+        Index("ix_gps_locations_device_id_created_at", "device_id", "created_at"),
+        # Una partición por mes (migración 0006, services/gps_partitions.py)
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    # La clave de partición debe formar parte de la clave primaria
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     
     # Identificación
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True)
@@ -87,7 +114,7 @@ class GPSLocation(Base, TimestampMixin):
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     
     # Datos adicionales
-    metadata = Column(JSON, nullable=True)
+    extra_metadata = Column("metadata", JSON, nullable=True)
     battery_level = Column(Float, nullable=True)  # Nivel de batería del dispositivo
     temperature = Column(Float, nullable=True)  # Temperatura del dispositivo
     
@@ -98,6 +125,31 @@ class GPSLocation(Base, TimestampMixin):
     def __repr__(self):
         return f"<GPSLocation(vehicle_id={self.vehicle_id}, lat={self.latitude}, lng={self.longitude}, speed={self.speed})>"
 
+class GPSRollup(Base, TimestampMixin):
+    """Resumen por dispositivo y hora o día, mantenido en la ingesta (services/gps_rollups.py)"""
+    __tablename__ = "gps_rollups"
+    __table_args__ = (
+        UniqueConstraint("device_id", "bucket", "bucket_start", name="uq_gps_rollups_device_bucket"),
+        Index("ix_gps_rollups_bucket_start", "bucket", "bucket_start"),
+    )
+    
+    # Identificación
+    device_id = Column(String(50), nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=True)
+    bucket = Column(String(10), nullable=False)  # 'hour' o 'day'
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    
+    # Acumulados del período
+    distance_km = Column(Float, nullable=False, default=0.0)
+    moving_seconds = Column(Float, nullable=False, default=0.0)
+    idle_seconds = Column(Float, nullable=False, default=0.0)
+    max_speed_kmh = Column(Float, nullable=False, default=0.0)
+    fix_count = Column(Integer, nullable=False, default=0)
+    last_fix_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<GPSRollup(device_id='{self.device_id}', bucket='{self.bucket}', start='{self.bucket_start}')>"
+
 class Geofence(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "geofences"
     
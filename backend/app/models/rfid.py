@@ -1,5 +1,5 @@
 # S.A.M.I. - Modelos de RFID
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON
+from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampMixin, SoftDeleteMixin
 import enum
@@ -54,7 +54,7 @@ class RFIDTag(Base, TimestampMixin, SoftDeleteMixin):
     retry_attempts = Column(Integer, default=3)
     
     # Metadatos
-    metadata = Column(JSON, nullable=True)
+    extra_metadata = Column("metadata", JSON, nullable=True)
     installation_date = Column(DateTime, nullable=True)
     warranty_expiry = Column(DateTime, nullable=True)
     
@@ -118,6 +118,11 @@ class RFIDReader(Base, TimestampMixin, SoftDeleteMixin):
 
 class RFIDTransaction(Base, TimestampMixin):
     __tablename__ = "rfid_transactions"
+    __table_args__ = (
+        # Transacciones por tag y por lector en un rango de tiempo
+        Index("ix_rfid_transactions_tag_id_read_time", "tag_id", "read_time"),
+        Index("ix_rfid_transactions_reader_id_read_time", "reader_id", "read_time"),
+    )
     
     # Información básica
     tag_id = Column(Integer, ForeignKey("rfid_tags.id"), nullable=False)
@@ -151,7 +156,7 @@ class RFIDTransaction(Base, TimestampMixin):
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     
     # Metadatos
-    metadata = Column(JSON, nullable=True)
+    extra_metadata = Column("metadata", JSON, nullable=True)
     session_id = Column(String(100), nullable=True)
     
     # Relaciones
@@ -229,7 +234,7 @@ class RFIDAlert(Base, TimestampMixin):
     notification_recipients = Column(JSON, nullable=True)
     
     # Metadatos
-    metadata = Column(JSON, nullable=True)
+    extra_metadata = Column("metadata", JSON, nullable=True)
     
     # Relaciones
     tag = relationship("RFIDTag")
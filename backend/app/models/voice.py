@@ -1,7 +1,7 @@
 # S.A.M.I. - Modelos de Interacción por Voz
 from sqlalchemy import Column, String, Integer, DateTime, Boolean, Text, ForeignKey, Float, Enum, JSON
 from sqlalchemy.orm import relationship
-from .base import Base, TimestampMixin
+from .base import Base, TimestampMixin, SoftDeleteMixin
 import enum
 
 class VoiceCommandType(str, enum.Enum):
@@ -1,22 +1,63 @@
 # S.A.M.I. - Servicios del Sistema
-from .ai_service import AIService
-from .voice_service import VoiceService
-from .camera_service import CameraService
-from .rfid_service import RFIDService
-from .gps_service import GPSService
-from .fuel_service import FuelService
-from .report_service import ReportService
-from .notification_service import NotificationService
-from .system_service import SystemService
+#
+# Las clases se importan de forma perezosa: importar este paquete no carga
+# OpenCV, Whisper/PyTorch ni pandas/reportlab hasta que se usa el servicio.
+import importlib
+
+from .registry import ServiceRegistry
+
+_EXPORTS = {
+    "AIService": "ai_service",
+    "VoiceService": "voice_service",
+    "CameraService": "camera_service",
+    "RFIDService": "rfid_service",
+    "GPSService": "gps_service",
+    "ReportService": "report_service",
+    "SystemService": "system_service",
+    "EmployeeSearchService": "employee_search_service",
+}
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module_name}", __name__), name)
+
+# Instancia global del registro de servicios
+service_registry = ServiceRegistry()
+service_registry.register("ai", "ai_service:AIService")
+service_registry.register(
+    "camera", "camera_service:CameraService",
+    depends=("ai",), start="start_all_cameras", stop="stop_all_cameras"
+)
+service_registry.register("voice", "voice_service:VoiceService")
+service_registry.register(
+    "gps", "gps_service:GPSService",
+    start="start_gps_monitoring", stop="stop_gps_monitoring"
+)
+service_registry.register(
+    "rfid", "rfid_service:RFIDService",
+    start="start_all_readers", stop="stop_all_readers"
+)
+service_registry.register("reports", "report_service:ReportService")
+
+# Accesores para inyección de dependencias (Depends); en tests se reemplazan
+# con app.dependency_overrides
+get_ai_service = service_registry.dependency("ai")
+get_camera_service = service_registry.dependency("camera")
+get_voice_service = service_registry.dependency("voice")
+get_gps_service = service_registry.dependency("gps")
+get_rfid_service = service_registry.dependency("rfid")
+get_report_service = service_registry.dependency("reports")
 
 __all__ = [
-    "AIService",
-    "VoiceService", 
-    "CameraService",
-    "RFIDService",
-    "GPSService",
-    "FuelService",
-    "ReportService",
-    "NotificationService",
-    "SystemService"
+    *_EXPORTS,
+    "ServiceRegistry",
+    "service_registry",
+    "get_ai_service",
+    "get_camera_service",
+    "get_voice_service",
+    "get_gps_service",
+    "get_rfid_service",
+    "get_report_service"
 ]
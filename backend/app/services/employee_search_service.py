@@ -0,0 +1,132 @@
+# S.A.M.I. - Índice de Autocompletado de Empleados
+import asyncio
+import bisect
+import logging
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..models.employee import Employee, normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+class EmployeeSearchService:
+    """Índice de prefijos en memoria para autocompletado de empleados"""
+
+    def __init__(self):
+        self._keys: List[tuple] = []  # (token normalizado, id) ordenados
+        self._tokens: Dict[int, List[str]] = {}
+        self._summaries: Dict[int, Dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _tokenize(employee: Employee) -> List[str]:
+        """Tokens por los que se puede encontrar a un empleado"""
+        tokens = set(normalize_search_text(
+            employee.first_name, employee.last_name, employee.employee_id
+        ).split())
+        full_name = normalize_search_text(employee.first_name, employee.last_name)
+        if full_name:
+            tokens.add(full_name)
+        if employee.email:
+            tokens.add(normalize_search_text(employee.email))
+        return sorted(tokens)
+
+    @staticmethod
+    def _summary(employee: Employee) -> Dict:
+        return {
+            "id": employee.id,
+            "first_name": employee.first_name,
+            "last_name": employee.last_name,
+            "employee_id": employee.employee_id,
+            "email": employee.email
+        }
+
+    def _is_stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return time.monotonic() - self._loaded_at > settings.employee_search_refresh_seconds
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """Construir el índice completo si no existe o venció"""
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if not self._is_stale():
+                return
+            start = time.perf_counter()
+            result = await db.execute(
+                select(
+                    Employee.id,
+                    Employee.first_name,
+                    Employee.last_name,
+                    Employee.employee_id,
+                    Employee.email
+                ).where(Employee.is_deleted == False)
+            )
+            keys, tokens, summaries = [], {}, {}
+            for row in result:
+                employee_tokens = self._tokenize(row)
+                tokens[row.id] = employee_tokens
+                summaries[row.id] = self._summary(row)
+                keys.extend((token, row.id) for token in employee_tokens)
+            keys.sort()
+
+            self._keys, self._tokens, self._summaries = keys, tokens, summaries
+            self._loaded_at = time.monotonic()
+            logger.info(
+                f"Índice de empleados construido: {len(summaries)} empleados, "
+                f"{len(keys)} tokens en {(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+
+    def remove(self, employee_id: int):
+        """Quitar un empleado del índice"""
+        for token in self._tokens.pop(employee_id, []):
+            key = (token, employee_id)
+            i = bisect.bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+        self._summaries.pop(employee_id, None)
+
+    def upsert(self, employee: Employee):
+        """Actualizar incrementalmente el índice tras crear o modificar un empleado"""
+        if self._loaded_at is None:
+            return  # Se construirá completo en la primera consulta
+        self.remove(employee.id)
+        if employee.is_deleted:
+            return
+        employee_tokens = self._tokenize(employee)
+        for token in employee_tokens:
+            bisect.insort(self._keys, (token, employee.id))
+        self._tokens[employee.id] = employee_tokens
+        self._summaries[employee.id] = self._summary(employee)
+
+    def search_prefix(self, query: str, limit: int = 10) -> List[Dict]:
+        """Empleados con algún token que comienza con el texto dado"""
+        prefix = normalize_search_text(query)
+        if not prefix:
+            return []
+
+        results, seen = [], set()
+        i = bisect.bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and len(results) < limit:
+            token, employee_id = self._keys[i]
+            if not token.startswith(prefix):
+                break
+            if employee_id not in seen:
+                seen.add(employee_id)
+                results.append(self._summaries[employee_id])
+            i += 1
+        return results
+
+    def get_stats(self) -> Dict:
+        """Obtener estadísticas del índice"""
+        return {
+            "employees": len(self._summaries),
+            "tokens": len(self._keys),
+            "age_seconds": None if self._loaded_at is None else time.monotonic() - self._loaded_at
+        }
@@ -0,0 +1,197 @@
+# S.A.M.I. - Exportación Masiva de Historial GPS
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.gps import GPSLocation
+
+logger = logging.getLogger(__name__)
+
+# Columnas exportadas, en orden
+EXPORT_COLUMNS = (
+    GPSLocation.id, GPSLocation.vehicle_id, GPSLocation.device_id, GPSLocation.project_id,
+    GPSLocation.latitude, GPSLocation.longitude, GPSLocation.altitude, GPSLocation.accuracy,
+    GPSLocation.speed, GPSLocation.heading, GPSLocation.satellite_count,
+    GPSLocation.signal_strength, GPSLocation.created_at
+)
+FIELD_NAMES = [column.key for column in EXPORT_COLUMNS]
+_TIMESTAMP_INDEX = FIELD_NAMES.index("created_at")
+
+def _isoformat_rows(rows) -> List[list]:
+    """Filas con created_at como texto ISO 8601"""
+    converted = []
+    for row in rows:
+        row = list(row)
+        if row[_TIMESTAMP_INDEX] is not None:
+            row[_TIMESTAMP_INDEX] = row[_TIMESTAMP_INDEX].isoformat()
+        converted.append(row)
+    return converted
+
+class NDJSONEncoder:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows) -> bytes:
+        lines = [json.dumps(dict(zip(FIELD_NAMES, row))) for row in _isoformat_rows(rows)]
+        return ("\n".join(lines) + "\n").encode()
+
+    def end(self) -> bytes:
+        return b""
+
+class CSVEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def begin(self) -> bytes:
+        return self._write([FIELD_NAMES])
+
+    def encode(self, rows) -> bytes:
+        return self._write(_isoformat_rows(rows))
+
+    def end(self) -> bytes:
+        return b""
+
+class _Sink:
+    """Archivo de solo escritura que entrega lo escrito en cada bloque"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+class ParquetEncoder:
+    """Un row group por bloque leído; el pie del archivo se escribe al final"""
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        # pyarrow se importa solo si se pide Parquet (arranque de workers livianos)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.int64()), ("vehicle_id", pa.int32()), ("device_id", pa.string()),
+            ("project_id", pa.int32()), ("latitude", pa.float64()), ("longitude", pa.float64()),
+            ("altitude", pa.float64()), ("accuracy", pa.float64()), ("speed", pa.float64()),
+            ("heading", pa.float64()), ("satellite_count", pa.int32()),
+            ("signal_strength", pa.float64()), ("created_at", pa.timestamp("us", tz="UTC"))
+        ])
+        self._sink = _Sink()
+        self._writer = pq.ParquetWriter(self._sink, self._schema, compression="zstd")
+
+    def begin(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows) -> bytes:
+        columns = list(zip(*rows))
+        table = self._pa.Table.from_arrays(
+            [self._pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema
+        )
+        self._writer.write_table(table)
+        return self._sink.drain()
+
+    def end(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+ENCODERS = {"ndjson": NDJSONEncoder, "csv": CSVEncoder, "parquet": ParquetEncoder}
+
+class GPSExporter:
+    """
+    Exporta gps_locations leyendo con un cursor del lado del servidor en
+    bloques de `chunk_size` filas y codificando bloque por bloque, así la
+    memoria no depende de la cantidad de filas. Registra el throughput
+    (filas/s) de cada exportación.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or settings.gps_export_chunk_size
+        self.exports = 0
+        self.rows = 0
+        self.active = 0
+        self.last_export: Optional[Dict] = None
+
+    def encoder(self, fmt: str):
+        if fmt not in ENCODERS:
+            raise ValueError(f"Formato de exportación no soportado: {fmt}")
+        return ENCODERS[fmt]()
+
+    async def stream(self, encoder, conditions: list) -> AsyncIterator[bytes]:
+        """Bytes del archivo exportado, bloque por bloque"""
+        query = (
+            select(*EXPORT_COLUMNS)
+            .where(*conditions)
+            .order_by(GPSLocation.created_at)
+            .execution_options(yield_per=self.chunk_size)
+        )
+        rows = 0
+        started = time.perf_counter()
+        self.active += 1
+        completed = False
+        try:
+            yield encoder.begin()
+            async with AsyncSessionLocal() as db:
+                result = await db.stream(query)
+                async for chunk in result.partitions():
+                    rows += len(chunk)
+                    yield encoder.encode(chunk)
+            yield encoder.end()
+            completed = True
+        finally:
+            self.active -= 1
+            elapsed = time.perf_counter() - started
+            self.exports += 1
+            self.rows += rows
+            self.last_export = {
+                "format": encoder.extension,
+                "rows": rows,
+                "seconds": round(elapsed, 2),
+                "rows_per_second": round(rows / elapsed) if elapsed > 0 else None,
+                "completed": completed,
+                "finished_at": datetime.utcnow()
+            }
+            logger.info(
+                f"Exportación GPS {encoder.extension}: {rows} filas en {elapsed:.1f} s "
+                f"({self.last_export['rows_per_second']} filas/s){'' if completed else ' (interrumpida)'}"
+            )
+
+    def get_stats(self) -> Dict:
+        return {
+            "exports": self.exports,
+            "active": self.active,
+            "rows": self.rows,
+            "chunk_size": self.chunk_size,
+            "last_export": self.last_export
+        }
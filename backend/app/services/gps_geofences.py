@@ -0,0 +1,439 @@
+# S.A.M.I. - Motor de Geofences
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, async_redis_client
+from ..models.gps import Geofence, parse_polygon
+from .gps_spatial import EARTH_RADIUS_KM, KM_PER_DEGREE
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = "sami:gps:geofence_state"  # HASH vehicle_id -> JSON {geofence_id: entrada ISO}
+
+# Guardar el estado de un vehículo solo si sigue siendo el que se leyó
+# KEYS: STATE_KEY; ARGV: vehicle_id, estado leído ('' si no había), estado nuevo
+_STATE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], ARGV[1]) or ''
+if current ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+return 1
+"""
+
+def _unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    rlat, rlng = math.radians(lat), math.radians(lng)
+    return (math.cos(rlat) * math.cos(rlng), math.cos(rlat) * math.sin(rlng), math.sin(rlat))
+
+def compile_geofence(geofence) -> Optional[Dict]:
+    """Precalcular geometría y caja envolvente de una fila Geofence; None si no tiene geometría válida"""
+    base = {
+        "id": geofence.id,
+        "name": geofence.name,
+        "geofence_type": geofence.geofence_type,
+        "alert_on_enter": bool(geofence.alert_on_enter),
+        "alert_on_exit": bool(geofence.alert_on_exit)
+    }
+    polygon = parse_polygon(geofence.polygon_coordinates)
+    if polygon:
+        lats = np.array([p[0] for p in polygon])
+        lngs = np.array([p[1] for p in polygon])
+        return {
+            **base,
+            "kind": "polygon",
+            "lats": lats,
+            "lngs": lngs,
+            "bbox": (lats.min(), lats.max(), lngs.min(), lngs.max())
+        }
+    if geofence.radius_meters:
+        radius_km = geofence.radius_meters / 1000
+        lat, lng = geofence.center_latitude, geofence.center_longitude
+        dlat = radius_km / KM_PER_DEGREE
+        dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6))
+        return {
+            **base,
+            "kind": "circle",
+            "center": _unit_vector(lat, lng),
+            "cos_radius": math.cos(radius_km / EARTH_RADIUS_KM),
+            "bbox": (lat - dlat, lat + dlat, lng - dlng, lng + dlng)
+        }
+    return None
+
+class _CompiledCell:
+    """Geofences de una celda empaquetadas en arreglos para evaluar un punto en pocas operaciones"""
+
+    __slots__ = ("circle_ids", "centers", "cos_radius", "poly_ids", "owner", "x1", "y1", "y2", "dxdy")
+
+    def __init__(self, fences: Iterable[Dict], bounds: Optional[Tuple[float, float, float]] = None):
+        circles = [f for f in fences if f["kind"] == "circle"]
+        polygons = [f for f in fences if f["kind"] == "polygon"]
+
+        self.circle_ids = np.array([f["id"] for f in circles], dtype=np.int64)
+        self.centers = np.array([f["center"] for f in circles]).reshape(-1, 3)
+        self.cos_radius = np.array([f["cos_radius"] for f in circles])
+
+        # Aristas (x = lng, y = lat) que pueden cruzar un rayo hacia +x desde la celda
+        x1, y1, x2, y2, owner = [], [], [], [], []
+        for index, fence in enumerate(polygons):
+            ax, ay = fence["lngs"], fence["lats"]
+            bx, by = np.roll(ax, -1), np.roll(ay, -1)
+            keep = ay != by  # Las horizontales nunca cruzan el rayo
+            if bounds:
+                lat0, lat1, lng0 = bounds
+                keep &= (np.maximum(ay, by) >= lat0) & (np.minimum(ay, by) <= lat1) & (np.maximum(ax, bx) >= lng0)
+            x1.append(ax[keep])
+            y1.append(ay[keep])
+            x2.append(bx[keep])
+            y2.append(by[keep])
+            owner.append(np.full(int(keep.sum()), index, dtype=np.intp))
+
+        self.poly_ids = np.array([f["id"] for f in polygons], dtype=np.int64)
+        if polygons:
+            self.x1, self.y1 = np.concatenate(x1), np.concatenate(y1)
+            self.y2 = np.concatenate(y2)
+            self.dxdy = (np.concatenate(x2) - self.x1) / (self.y2 - self.y1)
+            self.owner = np.concatenate(owner)
+
+    def contains(self, lat: float, lng: float, point: Tuple[float, float, float]) -> List[int]:
+        inside: List[int] = []
+        if len(self.circle_ids):
+            # Dentro del círculo si el ángulo al centro es menor al radio angular
+            inside.extend(self.circle_ids[self.centers @ point >= self.cos_radius].tolist())
+        if len(self.poly_ids):
+            # Ray casting vectorizado: paridad de cruces por polígono
+            crosses = (self.y1 > lat) != (self.y2 > lat)
+            crosses &= lng < self.x1 + (lat - self.y1) * self.dxdy
+            hits = self.owner[crosses]
+            if len(hits):
+                counts = np.bincount(hits, minlength=len(self.poly_ids))
+                inside.extend(self.poly_ids[(counts & 1) == 1].tolist())
+        return inside
+
+class GeofenceEngine:
+    """
+    Geofences activas en memoria con una grilla de celdas de `cell_deg` grados.
+    Cada celda se compila de forma perezosa a arreglos NumPy con los círculos
+    y las aristas de polígonos que la afectan; un alta, cambio o baja solo
+    invalida las celdas que toca. Mantiene el estado dentro/fuera por vehículo
+    para detectar entradas y salidas; con evaluate_shared ese estado vive en
+    Redis y lo comparten todos los procesos que reciben fixes.
+    """
+
+    def __init__(self, cell_deg: Optional[float] = None, max_cells: Optional[int] = None):
+        self.cell_deg = cell_deg or settings.geofence_cell_deg
+        self.max_cells = max_cells or settings.geofence_max_cells
+
+        self.fences: Dict[int, Dict] = {}
+        self.cells: Dict[Tuple[int, int], Set[int]] = {}
+        self.large: Set[int] = set()  # Geofences que cubren demasiadas celdas; se evalúan siempre
+        self._fence_cells: Dict[int, List[Tuple[int, int]]] = {}
+        self._compiled: Dict[Tuple[int, int], _CompiledCell] = {}
+        self._compiled_large: Optional[_CompiledCell] = None
+
+        self.state: Dict[str, Dict[int, datetime]] = {}  # vehículo -> {geofence_id: entrada}
+        self.loaded_at: Optional[datetime] = None
+        self.evaluations = 0
+        self.transitions = 0
+        self.state_conflicts = 0
+        self.state_errors = 0
+        self.last_error = None
+        self._save_state = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def load(self, db):
+        """Reconstruir el índice completo con las geofences activas"""
+        result = await db.execute(
+            select(Geofence).where(Geofence.is_active == True, Geofence.is_deleted == False)
+        )
+        start = time.perf_counter()
+        self.fences.clear()
+        self.cells.clear()
+        self.large.clear()
+        self._fence_cells.clear()
+        self._invalidate_all()
+        for geofence in result.scalars():
+            self._add(geofence)
+
+        # Olvidar estado de geofences que ya no existen
+        for inside in self.state.values():
+            for geofence_id in [g for g in inside if g not in self.fences]:
+                del inside[geofence_id]
+
+        self.loaded_at = datetime.utcnow()
+        logger.info(f"Geofences cargadas: {len(self.fences)} en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    async def start(self):
+        """Cargar y recargar periódicamente (cambios hechos desde otros workers)"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.load(db)
+        except Exception as e:
+            logger.warning(f"Error cargando geofences: {e}")
+        if not self._refresh_task:
+            self._refresh_task = asyncio.create_task(self._refresh_worker())
+
+    @property
+    def started(self) -> bool:
+        return self._refresh_task is not None
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_worker(self):
+        while True:
+            await asyncio.sleep(settings.geofence_refresh_seconds)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.load(db)
+            except Exception as e:
+                logger.error(f"Error recargando geofences: {e}")
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def _add(self, geofence):
+        fence = compile_geofence(geofence)
+        if fence is None:
+            logger.warning(f"Geofence {geofence.id} sin geometría válida; se ignora")
+            return
+        self.fences[fence["id"]] = fence
+
+        lat0, lat1, lng0, lng1 = fence["bbox"]
+        i0, j0 = self._cell(lat0, lng0)
+        i1, j1 = self._cell(lat1, lng1)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self.max_cells:
+            self.large.add(fence["id"])
+            self._compiled_large = None
+            return
+
+        cells = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        self._fence_cells[fence["id"]] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(fence["id"])
+            self._compiled.pop(cell, None)
+
+    def _discard(self, geofence_id: int):
+        self.fences.pop(geofence_id, None)
+        if geofence_id in self.large:
+            self.large.discard(geofence_id)
+            self._compiled_large = None
+        for cell in self._fence_cells.pop(geofence_id, []):
+            members = self.cells.get(cell)
+            if members is not None:
+                members.discard(geofence_id)
+                if not members:
+                    del self.cells[cell]
+            self._compiled.pop(cell, None)
+
+    def _invalidate_all(self):
+        self._compiled.clear()
+        self._compiled_large = None
+
+    def upsert(self, geofence):
+        """Alta o cambio de una geofence: recompila solo las celdas afectadas"""
+        self._discard(geofence.id)
+        if geofence.is_active and not geofence.is_deleted:
+            self._add(geofence)
+        if geofence.id not in self.fences:
+            self._forget(geofence.id)
+
+    def remove(self, geofence_id: int):
+        """Baja de una geofence"""
+        self._discard(geofence_id)
+        self._forget(geofence_id)
+
+    def _forget(self, geofence_id: int):
+        for inside in self.state.values():
+            inside.pop(geofence_id, None)
+
+    def _compiled_cell(self, cell: Tuple[int, int]) -> Optional[_CompiledCell]:
+        compiled = self._compiled.get(cell)
+        if compiled is None:
+            members = self.cells.get(cell)
+            if not members:
+                return None
+            # Margen para que el redondeo en el borde de la celda no descarte aristas
+            i, j = cell
+            margin = self.cell_deg * 1e-6
+            bounds = (i * self.cell_deg - margin, (i + 1) * self.cell_deg + margin, j * self.cell_deg - margin)
+            compiled = _CompiledCell([self.fences[g] for g in members], bounds)
+            self._compiled[cell] = compiled
+        return compiled
+
+    def containing(self, lat: float, lng: float) -> Set[int]:
+        """Ids de las geofences que contienen el punto"""
+        point = _unit_vector(lat, lng)
+        inside: Set[int] = set()
+        compiled = self._compiled_cell(self._cell(lat, lng))
+        if compiled:
+            inside.update(compiled.contains(lat, lng, point))
+        if self.large:
+            if self._compiled_large is None:
+                self._compiled_large = _CompiledCell([self.fences[g] for g in self.large])
+            inside.update(self._compiled_large.contains(lat, lng, point))
+        return inside
+
+    def candidates(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Máscara de los puntos que caen en una celda con geofences (sin evaluar geometría)"""
+        if self.large:
+            return np.ones(len(lats), dtype=bool)
+        if not self.cells or not len(lats):
+            return np.zeros(len(lats), dtype=bool)
+        cells = np.stack([np.floor(lats / self.cell_deg), np.floor(lngs / self.cell_deg)], axis=1).astype(np.int64)
+        unique, inverse = np.unique(cells, axis=0, return_inverse=True)
+        occupied = np.array([(i, j) in self.cells for i, j in unique.tolist()], dtype=bool)
+        return occupied[inverse.ravel()]
+
+    def near_edge(self, lat: float, lng: float, margin_m: float) -> bool:
+        """
+        True si el borde de alguna geofence pasa a menos de `margin_m` del
+        punto: se compara la pertenencia del punto con la de 8 puntos a esa
+        distancia (una geofence más angosta que el margen puede no verse).
+        """
+        if not self.fences:
+            return False
+        dlat = margin_m / 1000 / KM_PER_DEGREE
+        dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        angles = np.arange(8) * (math.pi / 4)
+        lats = lat + dlat * np.cos(angles)
+        lngs = lng + dlng * np.sin(angles)
+        if not self.candidates(np.r_[lat, lats], np.r_[lng, lngs]).any():
+            return False
+        inside = self.containing(lat, lng)
+        return any(self.containing(a, b) != inside for a, b in zip(lats.tolist(), lngs.tolist()))
+
+    def evaluate_track(self, vehicle_id: str, lats: np.ndarray, lngs: np.ndarray,
+                       timestamps: List[datetime]) -> List[Tuple[int, List[Dict]]]:
+        """
+        Evaluar en orden los fixes de un vehículo; devuelve (índice, eventos).
+        Los fixes fuera de toda celda con geofences no cambian el estado de
+        un vehículo que ya estaba afuera, así que no se evalúan.
+        """
+        candidates = self.candidates(lats, lngs)
+        results = []
+        for n in range(len(lats)):
+            if not candidates[n]:
+                inside = self.state.get(vehicle_id)
+                if inside is not None and not inside:
+                    continue
+            events = self.evaluate(vehicle_id, float(lats[n]), float(lngs[n]), timestamps[n])
+            if events:
+                results.append((n, events))
+        return results
+
+    async def evaluate_shared(self, vehicle_id: str, lats: np.ndarray, lngs: np.ndarray,
+                              timestamps: List, retries: int = 3) -> List[Tuple[int, List[Dict]]]:
+        """
+        evaluate_track con el estado del vehículo leído de Redis y guardado
+        solo si nadie lo cambió entretanto (si cambió, se vuelve a evaluar),
+        así el proceso anfitrión y los workers de la API no emiten entradas y
+        salidas distintas para el mismo vehículo. Sin Redis se usa el estado
+        del proceso.
+        """
+        for _ in range(retries):
+            try:
+                if self._save_state is None:
+                    self._save_state = async_redis_client.register_script(_STATE_SCRIPT)
+                raw = await async_redis_client.hget(STATE_KEY, vehicle_id)
+            except Exception as e:
+                self._state_error(e)
+                return self.evaluate_track(vehicle_id, lats, lngs, timestamps)
+
+            stored = {int(g): datetime.fromisoformat(t) for g, t in json.loads(raw).items()} if raw else None
+            # Ids que este proceso todavía no cargó (más nuevos que los conocidos) se
+            # conservan sin evaluar; los demás ya no existen y se olvidan
+            newest = max(self.fences, default=0)
+            pending = {g: t for g, t in (stored or {}).items() if g not in self.fences and g > newest}
+            if stored is None:
+                self.state.pop(vehicle_id, None)
+            else:
+                self.state[vehicle_id] = {g: t for g, t in stored.items() if g in self.fences}
+
+            results = self.evaluate_track(vehicle_id, lats, lngs, timestamps)
+            inside = {**pending, **self.state[vehicle_id]}
+            encoded = json.dumps({str(g): t.isoformat() for g, t in sorted(inside.items())})
+            if encoded == raw:
+                return results
+            try:
+                saved = await self._save_state(keys=[STATE_KEY], args=[vehicle_id, raw or "", encoded])
+            except Exception as e:
+                self._state_error(e)
+                return results
+            if saved:
+                return results
+            self.state_conflicts += 1
+        logger.warning(f"Estado de geofences del vehículo {vehicle_id} en conflicto; se omiten {len(lats)} fixes")
+        return []
+
+    def _state_error(self, error: Exception):
+        self.state_errors += 1
+        self.last_error = str(error)
+        logger.warning(f"Error con el estado de geofences en Redis: {error}")
+
+    def evaluate(self, vehicle_id: str, lat: float, lng: float,
+                 timestamp: Optional[datetime] = None) -> List[Dict]:
+        """
+        Actualizar el estado del vehículo y devolver las entradas y salidas.
+        El primer fix de un vehículo solo fija su estado (sin eventos), para
+        no emitir entradas falsas tras un reinicio.
+        """
+        self.evaluations += 1
+        timestamp = timestamp or datetime.utcnow()
+        current = self.containing(lat, lng)
+        previous = self.state.get(vehicle_id)
+        if previous is None:
+            self.state[vehicle_id] = {geofence_id: timestamp for geofence_id in current}
+            return []
+        if previous.keys() == current:
+            return []
+
+        events = []
+        for geofence_id in [g for g in previous if g not in current]:
+            entered_at = previous.pop(geofence_id)
+            events.append(self._event(geofence_id, "exit", int((timestamp - entered_at).total_seconds())))
+        for geofence_id in current - previous.keys():
+            previous[geofence_id] = timestamp
+            events.append(self._event(geofence_id, "enter", None))
+        self.transitions += len(events)
+        return events
+
+    def _event(self, geofence_id: int, violation_type: str, duration_seconds: Optional[int]) -> Dict:
+        fence = self.fences[geofence_id]
+        return {
+            "geofence_id": geofence_id,
+            "geofence_name": fence["name"],
+            "geofence_type": fence["geofence_type"],
+            "violation_type": violation_type,
+            "duration_seconds": duration_seconds,
+            "alert": fence["alert_on_enter"] if violation_type == "enter" else fence["alert_on_exit"]
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            "geofences": len(self.fences),
+            "large_geofences": len(self.large),
+            "cells": len(self.cells),
+            "compiled_cells": len(self._compiled),
+            "tracked_vehicles": len(self.state),
+            "evaluations": self.evaluations,
+            "transitions": self.transitions,
+            "state_conflicts": self.state_conflicts,
+            "state_errors": self.state_errors,
+            "last_error": self.last_error,
+            "loaded_at": self.loaded_at
+        }
@@ -0,0 +1,368 @@
+# S.A.M.I. - Ingesta Masiva de Fixes GPS (trackers con buffer)
+import json
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.database import async_redis_client
+from ..models.gps import GPSLocation, GPSRollup
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "sami:gps:ingest:watermark"  # HASH device_id -> timestamp (ms) del último fix aceptado
+
+# Devuelve la marca anterior de cada dispositivo y guarda el máximo, en un solo paso
+_WATERMARK_SCRIPT = """
+local previous = {}
+for i = 1, #ARGV, 2 do
+    local current = redis.call('HGET', KEYS[1], ARGV[i])
+    previous[#previous + 1] = current or ''
+    if not current or tonumber(ARGV[i + 1]) > tonumber(current) then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+return previous
+"""
+
+# Deshacer marcas de un lote que no se pudo encolar: cada dispositivo vuelve
+# a su valor anterior solo si nadie la movió después
+# ARGV: dispositivo, marca puesta, marca anterior ('' si no había), ...
+_RESTORE_SCRIPT = """
+for i = 1, #ARGV, 3 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        if ARGV[i + 2] == '' then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        else
+            redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 2])
+        end
+    end
+end
+return 1
+"""
+
+# Largo máximo de device_id: un id más largo haría fallar el COPY de todo el lote
+DEVICE_ID_MAX = min(GPSLocation.device_id.type.length, GPSRollup.device_id.type.length)
+
+OPTIONAL_FIELDS = ("altitude", "accuracy", "speed", "heading", "satellite_count")
+
+# Formato binario v1: "SGB1", u16 cantidad de dispositivos, por dispositivo
+# u8 largo + id UTF-8, u32 cantidad de fixes y luego los fixes empaquetados
+# (little-endian). Los campos opcionales ausentes llevan el valor máximo del
+# tipo (altitud: mínimo de int32).
+BINARY_MAGIC = b"SGB1"
+BINARY_MEDIA_TYPE = "application/vnd.sami.gps-batch"
+RECORD_DTYPE = np.dtype([
+    ("device", "<u2"),          # Índice en la tabla de dispositivos
+    ("timestamp_ms", "<i8"),    # Epoch UTC en milisegundos
+    ("lat_e7", "<i4"),          # Grados × 1e7
+    ("lng_e7", "<i4"),
+    ("altitude_cm", "<i4"),
+    ("accuracy_dm", "<u2"),     # Decímetros
+    ("speed_ckmh", "<u2"),      # Centésimas de km/h
+    ("heading_cdeg", "<u2"),    # Centésimas de grado
+    ("satellites", "u1"),
+])
+_MISSING_TS = np.iinfo(np.int64).min
+
+class IngestBusy(Exception):
+    """La cola de escritura no tiene lugar para el lote (el tracker debe reintentar)"""
+
+@dataclass
+class FixBatch:
+    """Lote columnar: un arreglo por campo y el código de dispositivo de cada fix"""
+    devices: List[str]
+    device: np.ndarray        # int64, índice en devices
+    timestamp_ms: np.ndarray  # int64; _MISSING_TS si no se pudo leer
+    latitude: np.ndarray      # float64; NaN si falta
+    longitude: np.ndarray
+    altitude: np.ndarray
+    accuracy: np.ndarray
+    speed: np.ndarray
+    heading: np.ndarray
+    satellite_count: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.device)
+
+    def take(self, index: np.ndarray) -> "FixBatch":
+        """Subconjunto por máscara o por índices (conserva la tabla de dispositivos)"""
+        return FixBatch(self.devices, *(getattr(self, name)[index] for name in _COLUMNS))
+
+_COLUMNS = ("device", "timestamp_ms", "latitude", "longitude", *OPTIONAL_FIELDS)
+
+def _float_column(values: list) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)  # None -> NaN
+    except (TypeError, ValueError):
+        column = np.full(len(values), np.nan)
+        for n, value in enumerate(values):
+            try:
+                column[n] = float(value) if value is not None else np.nan
+            except (TypeError, ValueError):
+                pass
+        return column
+
+def _timestamp_ms(value) -> int:
+    """Epoch en segundos, ISO 8601 o datetime (sin zona = UTC)"""
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return int(round(value * 1000))
+        parsed = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(round(parsed.timestamp() * 1000))
+    except (TypeError, ValueError, OverflowError):
+        return _MISSING_TS
+
+def parse_json(body: bytes) -> FixBatch:
+    """{"fixes": [{device_id, timestamp, latitude, longitude, ...}]} o la lista sola"""
+    payload = json.loads(body)
+    fixes = payload.get("fixes") if isinstance(payload, dict) else payload
+    if not isinstance(fixes, list) or not all(isinstance(fix, dict) for fix in fixes):
+        raise ValueError("Se esperaba una lista de fixes")
+    return from_fixes(fixes)
+
+def from_fixes(fixes: List[Dict]) -> FixBatch:
+    """Lista de fixes como los de los proveedores (device_id, timestamp, ...) -> FixBatch"""
+    codes: Dict[str, int] = {}
+    device = np.fromiter(
+        (codes.setdefault(str(fix.get("device_id") or ""), len(codes)) for fix in fixes),
+        dtype=np.int64, count=len(fixes)
+    )
+    timestamp_ms = np.fromiter((_timestamp_ms(fix.get("timestamp")) for fix in fixes),
+                               dtype=np.int64, count=len(fixes))
+    columns = {
+        name: _float_column([fix.get(name) for fix in fixes])
+        for name in ("latitude", "longitude", *OPTIONAL_FIELDS)
+    }
+    return FixBatch(list(codes), device, timestamp_ms, **columns)
+
+def parse_binary(body: bytes) -> FixBatch:
+    """Formato binario v1 (ver RECORD_DTYPE); los fixes se leen sin copiar"""
+    try:
+        if body[:4] != BINARY_MAGIC:
+            raise ValueError("Encabezado binario desconocido")
+        offset = 4
+        (count,) = struct.unpack_from("<H", body, offset)
+        offset += 2
+        devices = []
+        for _ in range(count):
+            length = body[offset]
+            devices.append(body[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+        (fixes,) = struct.unpack_from("<I", body, offset)
+        offset += 4
+    except (IndexError, struct.error, UnicodeDecodeError):
+        raise ValueError("Encabezado binario truncado")
+    if len(body) - offset != fixes * RECORD_DTYPE.itemsize:
+        raise ValueError(f"Se esperaban {fixes} fixes de {RECORD_DTYPE.itemsize} bytes")
+
+    records = np.frombuffer(body, dtype=RECORD_DTYPE, count=fixes, offset=offset)
+
+    def scaled(field: str, scale: float, missing) -> np.ndarray:
+        raw = records[field]
+        return np.where(raw == missing, np.nan, raw * scale)
+
+    device = records["device"].astype(np.int64)
+    if fixes and device.max() >= len(devices):
+        raise ValueError("Índice de dispositivo fuera de la tabla")
+    return FixBatch(
+        devices,
+        device,
+        records["timestamp_ms"].astype(np.int64),
+        records["lat_e7"] / 1e7,
+        records["lng_e7"] / 1e7,
+        altitude=scaled("altitude_cm", 0.01, np.iinfo(np.int32).min),
+        accuracy=scaled("accuracy_dm", 0.1, 0xFFFF),
+        speed=scaled("speed_ckmh", 0.01, 0xFFFF),
+        heading=scaled("heading_cdeg", 0.01, 0xFFFF),
+        satellite_count=scaled("satellites", 1.0, 0xFF)
+    )
+
+def encode_binary(batch: FixBatch) -> bytes:
+    """Inverso de parse_binary (trackers de prueba y benchmarks)"""
+    records = np.zeros(len(batch), dtype=RECORD_DTYPE)
+    records["device"] = batch.device
+    records["timestamp_ms"] = batch.timestamp_ms
+    records["lat_e7"] = np.round(np.nan_to_num(batch.latitude) * 1e7)
+    records["lng_e7"] = np.round(np.nan_to_num(batch.longitude) * 1e7)
+    for field, source, scale, missing in (
+        ("altitude_cm", batch.altitude, 100, np.iinfo(np.int32).min),
+        ("accuracy_dm", batch.accuracy, 10, 0xFFFF),
+        ("speed_ckmh", batch.speed, 100, 0xFFFF),
+        ("heading_cdeg", batch.heading, 100, 0xFFFF),
+        ("satellites", batch.satellite_count, 1, 0xFF),
+    ):
+        records[field] = np.where(np.isnan(source), missing, np.round(np.nan_to_num(source) * scale))
+    header = [BINARY_MAGIC, struct.pack("<H", len(batch.devices))]
+    for device_id in batch.devices:
+        encoded = device_id.encode()
+        header.append(struct.pack("<B", len(encoded)) + encoded)
+    header.append(struct.pack("<I", len(batch)))
+    return b"".join(header) + records.tobytes()
+
+class GPSIngest:
+    """
+    Validación y deduplicación de lotes de fixes, todo con operaciones sobre
+    arreglos. Dentro del lote se descarta el segundo fix con el mismo
+    (device_id, timestamp); entre lotes, una marca por dispositivo en Redis
+    descarta los fixes que no son posteriores al último aceptado (reintentos
+    de un tracker que no recibió la respuesta). Los trackers deben subir su
+    buffer en orden cronológico.
+    """
+
+    def __init__(self):
+        self.max_fixes = settings.gps_ingest_max_fixes
+        self.max_future_ms = int(settings.gps_ingest_max_future_seconds * 1000)
+        self.max_age_ms = int(settings.gps_ingest_max_age_days * 86400 * 1000)
+        self.max_speed_kmh = settings.gps_ingest_max_speed_kmh
+        self._watermark = None
+        self._restore = None
+
+        self.batches = 0
+        self.received = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected: Dict[str, int] = {}
+        self.watermark_errors = 0
+        self.busy = 0  # Lotes rechazados por falta de lugar después de mover las marcas
+        self.last_batch_ms = None
+        self.last_error = None
+
+    def validate(self, batch: FixBatch, now_ms: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, int]]:
+        """Máscara de fixes válidos y rechazos por motivo (el primero que falla)"""
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        lat, lng = batch.latitude, batch.longitude
+        with np.errstate(invalid="ignore"):
+            checks = (
+                ("device", np.array([bool(d) and len(d) <= DEVICE_ID_MAX for d in batch.devices], dtype=bool)[batch.device]),
+                ("timestamp", (batch.timestamp_ms >= now_ms - self.max_age_ms)
+                              & (batch.timestamp_ms <= now_ms + self.max_future_ms)),
+                # (0, 0): receptores sin fix que reportan coordenadas vacías
+                ("position", (np.abs(lat) <= 90) & (np.abs(lng) <= 180) & ((lat != 0) | (lng != 0))),
+                ("speed", np.isnan(batch.speed) | ((batch.speed >= 0) & (batch.speed <= self.max_speed_kmh))),
+                ("heading", np.isnan(batch.heading) | ((batch.heading >= 0) & (batch.heading <= 360))),
+                ("accuracy", np.isnan(batch.accuracy) | (batch.accuracy >= 0)),
+            )
+        valid = np.ones(len(batch), dtype=bool)
+        rejected = {}
+        for reason, ok in checks:
+            failed = int(np.count_nonzero(valid & ~ok))
+            if failed:
+                rejected[reason] = failed
+                valid &= ok
+        return valid, rejected
+
+    @staticmethod
+    def dedupe(batch: FixBatch) -> Tuple[FixBatch, int]:
+        """Ordenar por (dispositivo, timestamp) y quitar repetidos del lote"""
+        order = np.lexsort((batch.timestamp_ms, batch.device))
+        device, timestamp_ms = batch.device[order], batch.timestamp_ms[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (device[1:] != device[:-1]) | (timestamp_ms[1:] != timestamp_ms[:-1])
+        return batch.take(order[keep]), int(len(order) - np.count_nonzero(keep))
+
+    async def apply_watermarks(self, batch: FixBatch) -> Tuple[FixBatch, int, list]:
+        """
+        Descartar fixes ya aceptados en lotes anteriores (lote ordenado por
+        dispositivo). Devuelve además las marcas movidas, para restore_watermarks
+        """
+        if not len(batch):
+            return batch, 0, []
+        # Último fix de cada dispositivo presente (el lote viene ordenado)
+        last = np.flatnonzero(np.r_[batch.device[1:] != batch.device[:-1], True])
+        codes = batch.device[last]
+        args = []
+        for code, timestamp_ms in zip(codes.tolist(), batch.timestamp_ms[last].tolist()):
+            args.extend((batch.devices[code], timestamp_ms))
+        try:
+            if self._watermark is None:
+                self._watermark = async_redis_client.register_script(_WATERMARK_SCRIPT)
+            previous = await self._watermark(keys=[WATERMARK_KEY], args=args)
+        except Exception as e:
+            # Sin Redis solo se deduplica dentro del lote
+            self.watermark_errors += 1
+            self.last_error = str(e)
+            logger.warning(f"Error leyendo marcas de ingesta GPS: {e}")
+            return batch, 0, []
+
+        floor = np.full(len(batch.devices), _MISSING_TS, dtype=np.int64)
+        floor[codes] = [int(value) if value else _MISSING_TS for value in previous]
+        fresh = batch.timestamp_ms > floor[batch.device]
+        moved = []
+        for n, value in enumerate(previous):
+            device_id, timestamp_ms = args[2 * n], args[2 * n + 1]
+            if not value or timestamp_ms > int(value):
+                moved.extend((device_id, timestamp_ms, value or ""))
+        return batch.take(fresh), int(len(batch) - np.count_nonzero(fresh)), moved
+
+    async def restore_watermarks(self, moved: list):
+        """Devolver las marcas movidas por un lote que al final no se encoló"""
+        if not moved:
+            return
+        try:
+            if self._restore is None:
+                self._restore = async_redis_client.register_script(_RESTORE_SCRIPT)
+            await self._restore(keys=[WATERMARK_KEY], args=moved)
+        except Exception as e:
+            # El reintento del tracker se tomará como repetido hasta su próximo fix
+            self.watermark_errors += 1
+            self.last_error = str(e)
+            logger.error(f"Error restaurando marcas de ingesta GPS: {e}")
+
+    async def prepare(self, batch: FixBatch, free_slots: int) -> Tuple[FixBatch, Dict, list]:
+        """
+        Validar y deduplicar: devuelve el lote listo, el informe y las marcas
+        movidas. El lugar en la cola se verifica acá para rechazar rápido, pero
+        se reserva recién al encolar; si entonces no entra, el llamador debe
+        pasar las marcas a release()
+        """
+        start = time.perf_counter()
+        if len(batch) > self.max_fixes:
+            raise ValueError(f"El lote supera {self.max_fixes} fixes")
+        valid, rejected = self.validate(batch)
+        accepted, duplicates = self.dedupe(batch.take(valid))
+        if len(accepted) > free_slots:
+            # Antes de mover las marcas: el reintento no debe tomarse como repetido
+            raise IngestBusy(f"Cola de escritura llena ({free_slots} lugares para {len(accepted)} fixes)")
+        accepted, repeated, moved = await self.apply_watermarks(accepted)
+        duplicates += repeated
+
+        self.batches += 1
+        self.received += len(batch)
+        self.accepted += len(accepted)
+        self.duplicates += duplicates
+        for reason, count in rejected.items():
+            self.rejected[reason] = self.rejected.get(reason, 0) + count
+        self.last_batch_ms = round((time.perf_counter() - start) * 1000, 2)
+        return accepted, {
+            "received": len(batch),
+            "accepted": len(accepted),
+            "duplicates": duplicates,
+            "rejected": rejected
+        }, moved
+
+    async def release(self, batch: FixBatch, moved: list):
+        """Lote preparado que no entró en la cola: deshacer marcas y conteo"""
+        self.accepted -= len(batch)
+        self.busy += 1
+        await self.restore_watermarks(moved)
+
+    def get_stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "received": self.received,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": dict(self.rejected),
+            "watermark_errors": self.watermark_errors,
+            "busy": self.busy,
+            "last_batch_ms": self.last_batch_ms,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,240 @@
+# S.A.M.I. - Posiciones en Vivo por WebSocket (Redis pub/sub)
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from ..core.config import settings
+from ..core.database import async_redis_client
+
+logger = logging.getLogger(__name__)
+
+LIVE_CHANNEL = "sami:gps:live"  # Un mensaje por tick con los vehículos que cambiaron
+
+def compact_position(location: Dict) -> Dict:
+    """Posición reducida a lo que dibuja el mapa"""
+    timestamp = location.get("timestamp")
+    return {
+        "lat": location["latitude"],
+        "lng": location["longitude"],
+        "speed": location.get("speed"),
+        "heading": location.get("heading"),
+        "ts": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+    }
+
+class LivePublisher:
+    """
+    Callback de ubicación del servicio GPS: junta los fixes de cada tick y
+    publica un solo mensaje con la última posición de los vehículos que
+    cambiaron. Un vehículo detenido se vuelve a publicar a lo sumo cada
+    `keepalive` segundos.
+    """
+
+    def __init__(self, tick: Optional[float] = None, keepalive: Optional[float] = None):
+        self.tick = tick or settings.gps_live_tick_seconds
+        self.keepalive = keepalive or settings.gps_live_keepalive_seconds
+        self._pending: Dict[str, Dict] = {}
+        self._published: Dict[str, tuple] = {}  # vehicle_id -> (lat, lng, speed, heading, monotonic)
+        self._task: Optional[asyncio.Task] = None
+        self.fixes = 0
+        self.messages = 0
+        self.published_positions = 0
+        self.last_error = None
+
+    async def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def on_location(self, vehicle_id: str, location: Dict):
+        self.fixes += 1
+        self._pending[vehicle_id] = location
+
+    async def _worker(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.publish()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Error publicando posiciones en vivo: {e}")
+
+    async def publish(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        now = time.monotonic()
+        positions = {}
+        for vehicle_id, location in pending.items():
+            key = (location["latitude"], location["longitude"], location.get("speed"), location.get("heading"))
+            previous = self._published.get(vehicle_id)
+            if previous is not None and previous[:4] == key and now - previous[4] < self.keepalive:
+                continue
+            self._published[vehicle_id] = (*key, now)
+            positions[vehicle_id] = compact_position(location)
+        if not positions:
+            return
+        await async_redis_client.publish(LIVE_CHANNEL, json.dumps({"type": "positions", "positions": positions}))
+        self.messages += 1
+        self.published_positions += len(positions)
+
+    def get_stats(self) -> Dict:
+        return {
+            "fixes": self.fixes,
+            "messages": self.messages,
+            "published_positions": self.published_positions,
+            "last_error": self.last_error
+        }
+
+class LiveClient:
+    """
+    Un visor conectado. Los mensajes que llegan mientras el envío anterior
+    sigue en curso se fusionan por vehículo, así un cliente lento recibe
+    menos mensajes en lugar de acumular una cola.
+    """
+
+    def __init__(self, websocket, vehicles: Optional[Iterable[str]] = None):
+        self.websocket = websocket
+        self.vehicles: Optional[Set[str]] = set(vehicles) if vehicles is not None else None
+        self._snapshot: Optional[str] = None
+        self._raw: Optional[str] = None
+        self._raw_positions: Optional[Dict] = None
+        self._pending: Dict[str, Dict] = {}
+        self._ready = asyncio.Event()
+        self.sent = 0
+        self.coalesced = 0
+
+    def _matching(self, positions: Dict) -> Dict:
+        if self.vehicles is None:
+            return positions
+        if len(self.vehicles) < len(positions):
+            return {v: positions[v] for v in self.vehicles if v in positions}
+        return {v: p for v, p in positions.items() if v in self.vehicles}
+
+    def subscribe(self, vehicles: Optional[Iterable[str]], current: Dict[str, Dict]):
+        """Cambiar el filtro y reenviar el estado completo de ese conjunto"""
+        self.vehicles = set(vehicles) if vehicles is not None else None
+        self._raw = self._raw_positions = None
+        self._pending = {}
+        positions = {v: compact_position(p) for v, p in self._matching(current).items()}
+        self._snapshot = json.dumps({"type": "snapshot", "positions": positions})
+        self._ready.set()
+
+    def deliver(self, positions: Dict, raw: str):
+        """Encolar un tick; `raw` es el mensaje ya codificado con todas las posiciones"""
+        if self.vehicles is None and self._raw is None and not self._pending:
+            # Caso común: visor de toda la flota al día, se reenvía el texto tal cual
+            self._raw, self._raw_positions = raw, positions
+        else:
+            matched = self._matching(positions)
+            if not matched:
+                return
+            if self._raw is not None:
+                self._pending.update(self._raw_positions)
+                self._raw = self._raw_positions = None
+                self.coalesced += 1
+            elif self._pending:
+                self.coalesced += 1
+            self._pending.update(matched)
+        self._ready.set()
+
+    def _next_message(self) -> Optional[str]:
+        if self._snapshot is not None:
+            text, self._snapshot = self._snapshot, None
+        elif self._raw is not None:
+            text, self._raw, self._raw_positions = self._raw, None, None
+        elif self._pending:
+            text = json.dumps({"type": "positions", "positions": self._pending})
+            self._pending = {}
+        else:
+            return None
+        if self._snapshot is not None or self._raw is not None or self._pending:
+            self._ready.set()
+        return text
+
+    async def run(self):
+        """Enviar mensajes de a uno (la única tarea que escribe en el socket)"""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            text = self._next_message()
+            if text is not None:
+                await self.websocket.send_text(text)
+                self.sent += 1
+
+class LiveHub:
+    """
+    Reparto en cada worker: una sola suscripción a Redis por proceso,
+    iniciada con el primer visor, y cada tick se entrega a todos los
+    clientes conectados sin consultar nada por cliente.
+    """
+
+    def __init__(self):
+        self.clients: Set[LiveClient] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.messages = 0
+        self.last_error = None
+
+    def register(self, client: LiveClient):
+        self.clients.add(client)
+        if not self._task:
+            self._task = asyncio.create_task(self._listen())
+
+    def unregister(self, client: LiveClient):
+        self.clients.discard(client)
+
+    def dispatch(self, raw: str):
+        positions = json.loads(raw)["positions"]
+        self.messages += 1
+        for client in self.clients:
+            client.deliver(positions, raw)
+
+    async def _listen(self):
+        delay = 1.0
+        while True:
+            pubsub = async_redis_client.pubsub()
+            try:
+                await pubsub.subscribe(LIVE_CHANNEL)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Suscripción de posiciones en vivo interrumpida: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                await pubsub.close()
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "clients": len(self.clients),
+            "messages": self.messages,
+            "subscribed": self._task is not None,
+            "last_error": self.last_error
+        }
+
+# Instancia global del reparto (una por proceso)
+live_hub = LiveHub()
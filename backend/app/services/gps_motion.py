@@ -0,0 +1,121 @@
+# S.A.M.I. - Sondeo GPS Adaptativo según el Movimiento
+import math
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Dict, Optional
+
+from ..core.config import settings
+from .gps_spatial import KM_PER_DEGREE
+
+@dataclass(frozen=True)
+class MotionPolicy:
+    """Cómo se adapta el intervalo de sondeo de un tipo de vehículo"""
+    ceiling: float = 600.0  # segundos; intervalo máximo de un vehículo detenido
+    backoff: float = 2.0  # Factor por cada fix detenido
+    dwell_radius_m: float = 50.0  # Deriva del GPS tolerada alrededor del punto de detención
+    still_speed_kmh: float = 3.0  # Por debajo, detenido
+    dwell_fixes: int = 2  # Fixes detenidos seguidos antes de espaciar el sondeo
+    edge_margin_m: float = 200.0  # Cerca del borde de una geofence se sondea al piso
+    floor: Optional[float] = None  # segundos; None = intervalo del dispositivo
+
+DEFAULT_POLICIES: Dict[str, MotionPolicy] = {
+    "default": MotionPolicy(),
+    # Pasan la noche y buena parte del turno en el mismo lugar; lentas, el
+    # borde de una geofence solo importa si está cerca
+    "heavy_machinery": MotionPolicy(ceiling=1800.0, dwell_radius_m=75.0, edge_margin_m=100.0),
+    # Paradas cortas en ruta: espaciar más tarde y con techo bajo
+    "truck": MotionPolicy(ceiling=300.0, dwell_radius_m=30.0, dwell_fixes=3),
+}
+
+def load_policies(overrides: Optional[Dict[str, Dict]] = None) -> Dict[str, MotionPolicy]:
+    """DEFAULT_POLICIES con los cambios de GPS_MOTION_POLICIES ({"tipo": {"campo": valor}})"""
+    overrides = settings.gps_motion_policies if overrides is None else overrides
+    known = {f.name for f in fields(MotionPolicy)}
+    policies = dict(DEFAULT_POLICIES)
+    for vehicle_type, values in overrides.items():
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Política de sondeo '{vehicle_type}' con campos desconocidos: {sorted(unknown)}")
+        policies[vehicle_type] = replace(policies.get(vehicle_type, policies["default"]), **values)
+    return policies
+
+def _distance_m(a: tuple, b: tuple) -> float:
+    """Distancia equirectangular (suficiente para radios de decenas de metros)"""
+    dlat = (b[0] - a[0]) * KM_PER_DEGREE * 1000
+    dlng = (b[1] - a[1]) * KM_PER_DEGREE * 1000 * math.cos(math.radians(a[0]))
+    return math.hypot(dlat, dlng)
+
+class MotionPoller:
+    """
+    Intervalo de sondeo de cada vehículo según su último fix. En movimiento
+    (velocidad o desplazamiento fuera del radio de detención) o cerca del
+    borde de una geofence se sondea al piso, el intervalo de su dispositivo;
+    detenido, el intervalo se multiplica por `backoff` en cada fix hasta
+    `ceiling`. Sin fix nuevo el intervalo no cambia. Cuenta los sondeos y
+    fixes que habría generado el intervalo fijo para reportar el ahorro.
+    """
+
+    def __init__(self, policies: Optional[Dict[str, MotionPolicy]] = None):
+        self.policies = policies or load_policies()
+        self.state: Dict[str, Dict] = {}
+
+        self.polls = 0
+        self.baseline_polls = 0.0
+        self.fixes = 0
+        self.baseline_fixes = 0.0
+        self.edge_holds = 0
+
+    def policy_for(self, vehicle_type: Optional[str]) -> MotionPolicy:
+        return self.policies.get(vehicle_type) or self.policies["default"]
+
+    def observe(self, vehicle_id: str, vehicle_type: Optional[str], base_interval: float,
+                position: Optional[Dict], near_edge: Callable[[float, float, float], bool]) -> float:
+        """Registrar un sondeo y devolver el intervalo hasta el próximo"""
+        policy = self.policy_for(vehicle_type)
+        floor = policy.floor or base_interval
+        state = self.state.setdefault(vehicle_id, {
+            "interval": floor, "anchor": None, "still": 0, "timestamp": None
+        })
+        # Este sondeo reemplaza a interval / base_interval sondeos del intervalo fijo
+        saved = state["interval"] / base_interval
+        self.polls += 1
+        self.baseline_polls += saved
+        if position is None or position.get("timestamp") == state["timestamp"]:
+            return state["interval"]
+        self.fixes += 1
+        self.baseline_fixes += saved
+        state["timestamp"] = position["timestamp"]
+
+        point = (position["latitude"], position["longitude"])
+        speed = position.get("speed")
+        still = (
+            state["anchor"] is not None
+            and (speed is None or speed <= policy.still_speed_kmh)
+            and _distance_m(state["anchor"], point) <= policy.dwell_radius_m
+        )
+        if not still:
+            state.update(interval=floor, anchor=point, still=0)
+        elif near_edge(point[0], point[1], policy.edge_margin_m):
+            # Detenido junto a una geofence: una salida no debe demorarse
+            self.edge_holds += 1
+            state.update(interval=floor, still=0)
+        else:
+            state["still"] += 1
+            if state["still"] >= policy.dwell_fixes:
+                state["interval"] = min(state["interval"] * policy.backoff, max(policy.ceiling, floor))
+        return state["interval"]
+
+    def remove(self, vehicle_id: str):
+        self.state.pop(vehicle_id, None)
+
+    def get_stats(self) -> Dict:
+        return {
+            "vehicles": len(self.state),
+            "dwelling": sum(1 for s in self.state.values() if s["still"]),
+            "polls": self.polls,
+            "baseline_polls": round(self.baseline_polls),
+            "polls_avoided": round(self.baseline_polls - self.polls),
+            "fixes_written": self.fixes,
+            "baseline_fixes": round(self.baseline_fixes),
+            "reduction": round(self.baseline_polls / self.polls, 2) if self.polls else None,
+            "edge_holds": self.edge_holds
+        }
@@ -0,0 +1,313 @@
+# S.A.M.I. - Receptores GPS Serie (NMEA 0183)
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KNOTS_TO_KMH = 1.852
+UERE_METERS = 5.0  # Error típico por unidad de HDOP para estimar la precisión
+
+# Valor de cada dígito hexadecimal (ASCII) del checksum; -1 si no es dígito
+_HEX = [-1] * 256
+for _n, _c in enumerate(b"0123456789ABCDEF"):
+    _HEX[_c] = _n
+for _n, _c in enumerate(b"abcdef", 10):
+    _HEX[_c] = _n
+
+def _float(field: bytes) -> Optional[float]:
+    return float(field) if field else None
+
+def _degrees(value: bytes, hemisphere: bytes) -> Optional[float]:
+    """ddmm.mmmm / dddmm.mmmm con hemisferio a grados decimales"""
+    if not value:
+        return None
+    raw = float(value)
+    degrees = int(raw / 100)
+    result = degrees + (raw - degrees * 100) / 60
+    return -result if hemisphere in (b"S", b"W") else result
+
+def _seconds_of_day(field: bytes) -> float:
+    """hhmmss.ss a segundos desde medianoche"""
+    return int(field[0:2]) * 3600 + int(field[2:4]) * 60 + float(field[4:])
+
+class NMEAParser:
+    """
+    Parser incremental de NMEA 0183 para GGA, RMC y VTG (cualquier talker:
+    GP, GN, GL, GA, BD). Cada bloque leído del puerto se valida entero con un
+    solo XOR acumulado en NumPy (sin recorrer bytes en Python) y solo se
+    convierten los campos que se usan. Las sentencias de un mismo instante
+    del receptor se combinan en un fix con el mismo formato que
+    `_get_satellite_location`, que se emite al empezar el instante siguiente
+    (o con flush()).
+    """
+
+    def __init__(self, device_id: str):
+        self.device_id = device_id
+        self._partial = b""
+        self._epoch: Optional[bytes] = None  # hhmmss.ss del instante en curso
+        self._fix: Dict = {}
+        self._date: Optional[date] = None  # Fecha del último fix emitido
+        self._last_seconds: Optional[float] = None
+
+        self.sentences = 0
+        self.checksum_errors = 0
+        self.malformed = 0
+        self.ignored = 0
+        self.fixes = 0
+        self.no_fix = 0
+
+    def feed(self, data: bytes) -> List[Dict]:
+        """Procesar bytes leídos del puerto; devuelve los fixes completos"""
+        buffer = self._partial + data if self._partial else data
+        end = buffer.rfind(b"\n") + 1
+        self._partial = buffer[end:]
+        if len(self._partial) > 4096:
+            # Basura sin fin de línea (baudios equivocados): no acumular
+            self._partial = b""
+        if not end:
+            return []
+
+        # acc[i] = XOR de buffer[0..i]; el checksum de $...* es acc[*-1] ^ acc[$]
+        acc = np.bitwise_xor.accumulate(np.frombuffer(buffer, dtype=np.uint8, count=end)).tobytes()
+        fixes: List[Dict] = []
+        start = buffer.find(b"$", 0, end)
+        while start >= 0:
+            line_end = buffer.find(b"\n", start, end)
+            star = buffer.find(b"*", start, line_end)
+            next_start = buffer.find(b"$", start + 1, end)
+            if 0 <= next_start < line_end:
+                # Sentencia cortada por otra (byte perdido en la línea serie)
+                self.malformed += 1
+                start = next_start
+                continue
+            self.sentences += 1
+            if star < 0 or star + 2 >= line_end:
+                self.malformed += 1
+            elif acc[star - 1] ^ acc[start] != (_HEX[buffer[star + 1]] << 4 | _HEX[buffer[star + 2]]):
+                self.checksum_errors += 1
+            else:
+                self._sentence(buffer[start + 3:star], fixes)
+            start = next_start
+        return fixes
+
+    def flush(self) -> List[Dict]:
+        """Emitir el instante en curso (fin de una grabación o cierre del puerto)"""
+        fixes: List[Dict] = []
+        self._emit(fixes)
+        return fixes
+
+    def _sentence(self, body: bytes, fixes: List[Dict]):
+        """body: desde el tipo de sentencia hasta antes del '*' (sin talker)"""
+        kind = body[:3]
+        if kind not in (b"GGA", b"RMC", b"VTG"):
+            self.ignored += 1
+            return
+        fields = body.split(b",")
+        try:
+            if kind == b"GGA":
+                self._gga(fields, fixes)
+            elif kind == b"RMC":
+                self._rmc(fields, fixes)
+            else:
+                self._vtg(fields)
+        except (IndexError, ValueError):
+            self.malformed += 1
+
+    def _start_epoch(self, utc: bytes, fixes: List[Dict]):
+        if len(utc) < 6:
+            raise ValueError("Sentencia sin hora UTC")
+        if utc != self._epoch:
+            self._emit(fixes)
+            self._epoch = utc
+
+    def _gga(self, f: List[bytes], fixes: List[Dict]):
+        # GGA,hhmmss.ss,lat,N,lng,W,calidad,satélites,hdop,altitud,M,...
+        self._start_epoch(f[1], fixes)
+        fix = self._fix
+        if f[6] in (b"", b"0"):
+            fix["invalid"] = True
+            return
+        fix["latitude"] = _degrees(f[2], f[3])
+        fix["longitude"] = _degrees(f[4], f[5])
+        fix["satellite_count"] = int(f[7]) if f[7] else None
+        hdop = _float(f[8])
+        fix["accuracy"] = round(hdop * UERE_METERS, 1) if hdop is not None else None
+        fix["altitude"] = _float(f[9])
+
+    def _rmc(self, f: List[bytes], fixes: List[Dict]):
+        # RMC,hhmmss.ss,A/V,lat,N,lng,W,nudos,rumbo,ddmmyy,...
+        self._start_epoch(f[1], fixes)
+        fix = self._fix
+        if f[9]:
+            fix["date"] = date(2000 + int(f[9][4:6]), int(f[9][2:4]), int(f[9][0:2]))
+        if f[2] != b"A":
+            fix["invalid"] = True
+            return
+        if "latitude" not in fix:
+            fix["latitude"] = _degrees(f[3], f[4])
+            fix["longitude"] = _degrees(f[5], f[6])
+        if "speed" not in fix and f[7]:
+            fix["speed"] = float(f[7]) * KNOTS_TO_KMH
+        if "heading" not in fix and f[8]:
+            fix["heading"] = float(f[8])
+
+    def _vtg(self, f: List[bytes]):
+        # VTG,rumbo,T,rumbo_mag,M,nudos,N,kmh,K[,modo]; sigue a la GGA/RMC de su instante
+        if self._epoch is None:
+            return
+        fix = self._fix
+        if f[1]:
+            fix["heading"] = float(f[1])
+        if f[7]:
+            fix["speed"] = float(f[7])
+        elif f[5]:
+            fix["speed"] = float(f[5]) * KNOTS_TO_KMH
+
+    def _timestamp(self, utc: bytes, fix_date: Optional[date]) -> datetime:
+        """Fecha de la RMC del instante; si no hubo, la del fix anterior (o la del sistema)"""
+        seconds = _seconds_of_day(utc)
+        if fix_date is not None:
+            day = fix_date
+        elif self._date is None:
+            day = datetime.utcnow().date()
+        else:
+            day = self._date
+            if self._last_seconds is not None and seconds < self._last_seconds - 43200:
+                day += timedelta(days=1)  # Pasó la medianoche
+        self._date, self._last_seconds = day, seconds
+        return datetime(day.year, day.month, day.day) + timedelta(seconds=seconds)
+
+    def _emit(self, fixes: List[Dict]):
+        fix, self._fix = self._fix, {}
+        if self._epoch is None or not fix:
+            return
+        if fix.get("invalid") or fix.get("latitude") is None or fix.get("longitude") is None:
+            self.no_fix += 1
+            return
+        self.fixes += 1
+        fixes.append({
+            "latitude": fix["latitude"],
+            "longitude": fix["longitude"],
+            "altitude": fix.get("altitude"),
+            "accuracy": fix.get("accuracy"),
+            "speed": fix.get("speed"),
+            "heading": fix.get("heading"),
+            "timestamp": self._timestamp(self._epoch, fix.get("date")),
+            "device_id": self.device_id,
+            "signal_strength": None,
+            "satellite_count": fix.get("satellite_count")
+        })
+
+    def get_stats(self) -> Dict:
+        return {
+            "sentences": self.sentences,
+            "fixes": self.fixes,
+            "no_fix": self.no_fix,
+            "checksum_errors": self.checksum_errors,
+            "malformed": self.malformed,
+            "ignored": self.ignored
+        }
+
+class SerialNMEAReader:
+    """
+    Lector asíncrono de un receptor NMEA por puerto serie: el descriptor se
+    registra en el loop (sin hilos) y cada lectura pasa al parser. Guarda el
+    último fix para el sondeo del servicio y reconecta con backoff si el
+    puerto desaparece.
+    """
+
+    def __init__(self, device_id: str, port: str, baudrate: Optional[int] = None,
+                 on_fix: Optional[Callable[[Dict], None]] = None):
+        self.device_id = device_id
+        self.port = port
+        self.baudrate = baudrate or settings.gps_serial_baudrate
+        self.on_fix = on_fix
+        self.parser = NMEAParser(device_id)
+        self.latest: Optional[Dict] = None
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+
+        self.reconnects = 0
+        self.last_data_at: Optional[datetime] = None
+        self.last_error = None
+
+    async def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            sentences = self.parser.sentences
+            try:
+                await self._read_port()
+            except asyncio.CancelledError:
+                raise
+            except ImportError as e:
+                self.last_error = str(e)
+                logger.error(f"Receptor GPS serie {self.device_id} deshabilitado (falta pyserial): {e}")
+                return
+            except Exception as e:
+                self.last_error = str(e)
+                logger.warning(f"Receptor GPS serie {self.device_id} ({self.port}) sin conexión: {e}")
+            if self.parser.sentences > sentences:
+                delay = 1.0  # Estuvo funcionando: reintentar enseguida
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def _read_port(self):
+        import serial  # pyserial solo en equipos con receptores serie
+
+        port = serial.Serial(self.port, self.baudrate, timeout=0)
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(port.fileno(), readable.set)
+        self.connected = True
+        try:
+            while True:
+                await asyncio.wait_for(readable.wait(), timeout=settings.gps_serial_silence_seconds)
+                readable.clear()
+                data = port.read(port.in_waiting or 1)
+                if data:
+                    self.last_data_at = datetime.utcnow()
+                    self._deliver(self.parser.feed(data))
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Sin datos en {settings.gps_serial_silence_seconds} s")
+        finally:
+            loop.remove_reader(port.fileno())
+            port.close()
+            self.connected = False
+            self._deliver(self.parser.flush())
+
+    def _deliver(self, fixes: List[Dict]):
+        for fix in fixes:
+            self.latest = fix
+            if self.on_fix:
+                self.on_fix(fix)
+
+    def get_stats(self) -> Dict:
+        return {
+            "port": self.port,
+            "baudrate": self.baudrate,
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+            "last_data_at": self.last_data_at,
+            "last_error": self.last_error,
+            **self.parser.get_stats()
+        }
@@ -0,0 +1,188 @@
+# S.A.M.I. - Mantenimiento de Particiones de gps_locations
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..core.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock: un solo proceso mantiene las particiones a la vez
+PARTITION_LOCK_KEY = 5_301_001
+PARENT_TABLE = "gps_locations"
+ARCHIVE_SCHEMA = "gps_archive"
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+def month_start(day: datetime) -> datetime:
+    return day.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(day: datetime, months: int) -> datetime:
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y_%m}"
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    """Cota de pg_get_expr: 'MINVALUE'/'MAXVALUE' o un timestamptz entre comillas"""
+    value = value.strip()
+    if not value.startswith("'"):
+        return None
+    bound = value.strip("'")
+    if re.search(r"[+-]\d{2}$", bound):
+        bound += ":00"
+    return datetime.fromisoformat(bound).astimezone(timezone.utc)
+
+class GPSPartitionManager:
+    """
+    Crea por adelantado las particiones mensuales de gps_locations y aplica
+    la retención: las particiones que quedaron enteras fuera del período se
+    desacoplan y se eliminan o se mueven al esquema de archivo.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.last_run_at: Optional[datetime] = None
+        self.created: List[str] = []
+        self.retired: List[str] = []
+        self.last_error: Optional[str] = None
+
+    async def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _worker(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Error manteniendo particiones GPS: {e}")
+            await asyncio.sleep(settings.gps_partition_check_hours * 3600)
+
+    async def run_once(self, retention: bool = True) -> Dict:
+        """Crear particiones futuras y aplicar retención si este proceso obtiene el lock"""
+        async with async_engine.connect() as conn:
+            locked = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+            await conn.commit()
+            if not locked:
+                return {"skipped": True}
+            try:
+                created = await self.ensure_partitions(conn)
+                retired = await self.apply_retention(conn) if retention else []
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PARTITION_LOCK_KEY})
+                await conn.commit()
+
+        self.created.extend(created)
+        self.retired.extend(retired)
+        self.last_run_at = datetime.utcnow()
+        self.last_error = None
+        return {"created": created, "retired": retired}
+
+    async def list_partitions(self, conn) -> List[Dict]:
+        """Particiones con sus cotas (None = MINVALUE/MAXVALUE) ordenadas por inicio"""
+        result = await conn.execute(text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            """
+        ), {"parent": PARENT_TABLE})
+
+        partitions = []
+        for name, bound in result:
+            match = _BOUND_RE.search(bound)
+            if match is None:
+                partitions.append({"name": name, "default": True, "start": None, "end": None})
+                continue
+            partitions.append({
+                "name": name,
+                "default": False,
+                "start": _parse_bound(match.group(1)),
+                "end": _parse_bound(match.group(2))
+            })
+        partitions.sort(key=lambda p: (p["default"], p["start"] or datetime.min.replace(tzinfo=timezone.utc)))
+        return partitions
+
+    async def ensure_partitions(self, conn, months_ahead: Optional[int] = None) -> List[str]:
+        """Crear las particiones del mes actual y los siguientes que falten"""
+        months_ahead = settings.gps_partition_premake_months if months_ahead is None else months_ahead
+        existing = await self.list_partitions(conn)
+        current = month_start(datetime.now(timezone.utc))
+
+        created = []
+        for offset in range(months_ahead + 1):
+            start = add_months(current, offset)
+            end = add_months(start, 1)
+            # Un mes ya cubierto (p. ej. por gps_locations_legacy) no se vuelve a crear
+            if any(
+                not p["default"]
+                and (p["start"] is None or p["start"] < end)
+                and (p["end"] is None or p["end"] > start)
+                for p in existing
+            ):
+                continue
+            name = partition_name(start)
+            try:
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+                await conn.commit()
+                created.append(name)
+                logger.info(f"Partición GPS creada: {name}")
+            except Exception as e:
+                # Falla si la partición por defecto ya tiene filas de ese mes
+                await conn.rollback()
+                self.last_error = str(e)
+                logger.error(f"Error creando partición {name}: {e}")
+        return created
+
+    async def apply_retention(self, conn, months: Optional[int] = None) -> List[str]:
+        """Desacoplar particiones que terminan antes del inicio del período de retención"""
+        months = settings.gps_retention_months if months is None else months
+        cutoff = add_months(month_start(datetime.now(timezone.utc)), -months)
+        action = settings.gps_retention_action
+
+        retired = []
+        for partition in await self.list_partitions(conn):
+            if partition["default"] or partition["end"] is None or partition["end"] > cutoff:
+                continue
+            name = partition["name"]
+            await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            if action == "archive":
+                await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+                await conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            else:
+                await conn.execute(text(f"DROP TABLE {name}"))
+            await conn.commit()
+            retired.append(name)
+            logger.info(f"Partición GPS retirada ({action}): {name}")
+        return retired
+
+    def get_stats(self) -> Dict:
+        return {
+            "last_run_at": self.last_run_at,
+            "created": self.created[-10:],
+            "retired": self.retired[-10:],
+            "retention_months": settings.gps_retention_months,
+            "retention_action": settings.gps_retention_action,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,186 @@
+# S.A.M.I. - Almacén de Última Posición Conocida por Vehículo
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.database import async_redis_client
+from .gps_spatial import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+POSITIONS_KEY = "sami:gps:positions"  # HASH vehicle_id -> JSON de la última posición
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _decode(raw: str) -> Dict:
+    position = json.loads(raw)
+    for field in ("timestamp", "received_at"):
+        if position.get(field):
+            position[field] = datetime.fromisoformat(position[field])
+    return position
+
+class PositionStore:
+    """
+    Última posición de cada vehículo, escrita solo por el pipeline de ingesta.
+    El proceso que ingiere mantiene el diccionario en memoria y lo publica en
+    un HASH de Redis; los demás workers leen ese HASH, a lo sumo una vez por
+    intervalo de sincronización. Las lecturas nunca consultan dispositivos.
+    """
+
+    def __init__(self, sync_interval: Optional[float] = None):
+        self.sync_interval = sync_interval or settings.gps_position_sync_interval
+        self.positions: Dict[str, Dict] = {}
+        self.index = SpatialIndex()  # Se mantiene a la par de positions
+        self.owner = False  # True en el proceso que ingiere fixes
+
+        self._dirty: Dict[str, Dict] = {}  # Pendientes de publicar en Redis
+        self._sync_task: Optional[asyncio.Task] = None
+        self._pull_lock = asyncio.Lock()
+        self._last_pull = 0.0
+
+        self.updates = 0
+        self.out_of_order = 0
+        self.published = 0
+        self.pulls = 0
+        self.sync_errors = 0
+        self.last_error = None
+
+    async def start(self):
+        """Tomar el rol de ingesta y publicar periódicamente en Redis"""
+        self.owner = True
+        if not self._sync_task:
+            self._sync_task = asyncio.create_task(self._publish_worker())
+
+    async def stop(self):
+        """Publicar lo pendiente y dejar el rol de ingesta"""
+        self.owner = False
+        if self._sync_task:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.publish()
+
+    def update(self, vehicle_id: str, location: Dict) -> bool:
+        """Registrar un fix; False si es más viejo que la posición vigente"""
+        timestamp = _naive_utc(location.get("timestamp") or datetime.utcnow())
+        current = self.positions.get(vehicle_id)
+        if current and current["timestamp"] > timestamp:
+            self.out_of_order += 1
+            return False
+
+        position = {
+            **location,
+            "vehicle_id": vehicle_id,
+            "timestamp": timestamp,
+            "received_at": datetime.utcnow()
+        }
+        self.positions[vehicle_id] = position
+        self._dirty[vehicle_id] = position
+        self.index.update(vehicle_id, position["latitude"], position["longitude"])
+        self.updates += 1
+        return True
+
+    def set_poll_interval(self, vehicle_id: str, interval: float):
+        """Intervalo de sondeo vigente del vehículo (sondeo adaptativo), para calcular `stale` en todos los workers"""
+        position = self.positions.get(vehicle_id)
+        if position is not None and position.get("poll_interval") != interval:
+            position["poll_interval"] = interval
+            self._dirty[vehicle_id] = position
+
+    async def publish(self):
+        """Escribir en Redis las posiciones cambiadas desde la última publicación"""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        try:
+            await async_redis_client.hset(POSITIONS_KEY, mapping={
+                vehicle_id: json.dumps(position, default=_encode)
+                for vehicle_id, position in dirty.items()
+            })
+            self.published += len(dirty)
+        except Exception as e:
+            # Se reintenta en la próxima publicación sin pisar fixes más nuevos
+            for vehicle_id, position in dirty.items():
+                self._dirty.setdefault(vehicle_id, position)
+            self.sync_errors += 1
+            self.last_error = str(e)
+            logger.warning(f"Error publicando posiciones GPS en Redis: {e}")
+
+    async def _publish_worker(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.publish()
+
+    async def _pull(self):
+        """Refrescar desde Redis en procesos que no ingieren"""
+        if self.owner or time.monotonic() - self._last_pull < self.sync_interval:
+            return
+        async with self._pull_lock:
+            if time.monotonic() - self._last_pull < self.sync_interval:
+                return
+            try:
+                data = await async_redis_client.hgetall(POSITIONS_KEY)
+                self.positions = {vehicle_id: _decode(raw) for vehicle_id, raw in data.items()}
+                self.index.rebuild(self.positions)
+                self.pulls += 1
+            except Exception as e:
+                # Se sigue respondiendo con la última copia obtenida
+                self.sync_errors += 1
+                self.last_error = str(e)
+                logger.warning(f"Error leyendo posiciones GPS de Redis: {e}")
+            self._last_pull = time.monotonic()
+
+    async def get(self, vehicle_id: str) -> Optional[Dict]:
+        await self._pull()
+        return self.positions.get(vehicle_id)
+
+    async def get_all(self) -> Dict[str, Dict]:
+        await self._pull()
+        return dict(self.positions)
+
+    async def within(self, latitude: float, longitude: float, radius_km: float,
+                     limit: Optional[int] = None) -> List[Tuple[Dict, float]]:
+        """Posiciones dentro del radio con su distancia, de la más cercana a la más lejana"""
+        await self._pull()
+        return [(self.positions[vehicle_id], distance)
+                for vehicle_id, distance in self.index.within(latitude, longitude, radius_km, limit)]
+
+    async def nearest(self, latitude: float, longitude: float, k: int) -> List[Tuple[Dict, float]]:
+        """Las k posiciones más cercanas con su distancia"""
+        await self._pull()
+        return [(self.positions[vehicle_id], distance)
+                for vehicle_id, distance in self.index.nearest(latitude, longitude, k)]
+
+    @staticmethod
+    def age_seconds(position: Dict, now: Optional[datetime] = None) -> float:
+        """Segundos desde el fix"""
+        return ((now or datetime.utcnow()) - position["timestamp"]).total_seconds()
+
+    def get_stats(self) -> Dict:
+        return {
+            "owner": self.owner,
+            "vehicles": len(self.positions),
+            "index": self.index.get_stats(),
+            "pending_publish": len(self._dirty),
+            "updates": self.updates,
+            "out_of_order": self.out_of_order,
+            "published": self.published,
+            "pulls": self.pulls,
+            "sync_errors": self.sync_errors,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,213 @@
+# S.A.M.I. - Clientes HTTP de Proveedores GPS (satelital y celular)
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ProviderUnavailable(Exception):
+    """El proveedor no respondió o su circuito está abierto"""
+
+class CircuitBreaker:
+    """Circuito por proveedor: se abre tras fallas consecutivas y prueba de nuevo pasado un tiempo"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Cerrado: siempre; semiabierto: un único intento de prueba a la vez"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release(self):
+        """Fin de un intento sin resultado registrado (p. ej. cancelado): permitir otra prueba"""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        self._probing = False
+
+class ProviderClient:
+    """Cliente HTTP asíncrono compartido para un endpoint de proveedor"""
+
+    RETRY_STATUS = {429, 502, 503, 504}
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None):
+        self.base_url = base_url
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(settings.gps_provider_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.gps_provider_max_connections,
+                max_keepalive_connections=settings.gps_provider_max_connections
+            )
+        )
+        self.breaker = CircuitBreaker(
+            settings.gps_provider_breaker_threshold,
+            settings.gps_provider_breaker_reset
+        )
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    async def get_location(self, device_id: str, accept: Optional[str] = None) -> Optional[Union[Dict, bytes]]:
+        """
+        Consultar la ubicación de un dispositivo con reintentos y backoff exponencial.
+        Retorna None si el proveedor no tiene ubicación (4xx); lanza
+        ProviderUnavailable si el circuito está abierto o se agotaron los reintentos.
+        Con `accept` se pide ese formato (JSON como alternativa); si el
+        proveedor lo respeta se devuelve el cuerpo sin decodificar.
+        """
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"Circuito abierto para {self.base_url}")
+        try:
+            return await self._request(device_id, accept)
+        except ProviderUnavailable:
+            raise
+        except Exception as e:
+            # Fallas que no son de red (cliente cerrado, URL inválida, ...) también cuentan
+            self.errors += 1
+            self.breaker.record_failure()
+            raise ProviderUnavailable(f"{self.base_url}: {type(e).__name__}: {e}")
+        finally:
+            if probe:
+                # Cancelación a mitad del intento de prueba: liberar el turno de prueba
+                self.breaker.release()
+
+    async def _request(self, device_id: str, accept: Optional[str]) -> Optional[Union[Dict, bytes]]:
+        headers = {"Accept": f"{accept}, application/json;q=0.5"} if accept else None
+        last_error = None
+        for attempt in range(settings.gps_provider_retries + 1):
+            if attempt:
+                self.retries += 1
+                delay = settings.gps_provider_backoff * (2 ** (attempt - 1))
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+            self.requests += 1
+            try:
+                response = await self.client.get(f"/devices/{device_id}/location", headers=headers)
+            except httpx.HTTPError as e:
+                last_error = f"{type(e).__name__}: {e}"
+                continue
+
+            if response.status_code == 200:
+                if accept and response.headers.get("content-type", "").startswith(accept):
+                    self.breaker.record_success()
+                    return response.content
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    last_error = f"Respuesta inválida: {e}"
+                    continue
+                self.breaker.record_success()
+                return data
+            if response.status_code in self.RETRY_STATUS or response.status_code >= 500:
+                last_error = f"HTTP {response.status_code}"
+                continue
+
+            # Error del cliente: el proveedor funciona, no tiene sentido reintentar
+            self.breaker.record_success()
+            logger.warning(f"Proveedor {self.base_url} respondió {response.status_code} para {device_id}")
+            return None
+
+        self.errors += 1
+        self.breaker.record_failure()
+        raise ProviderUnavailable(f"{self.base_url}: {last_error}")
+
+    async def close(self):
+        await self.client.aclose()
+
+    def get_stats(self) -> Dict:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "times_opened": self.breaker.times_opened,
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors
+        }
+
+class ProviderPool:
+    """
+    Un cliente (pool de conexiones keep-alive) por endpoint y credencial de
+    proveedor: equipos del mismo endpoint con distinta api_key no comparten
+    cliente, porque la clave va en los encabezados del cliente.
+    """
+
+    def __init__(self):
+        self.clients: Dict[Tuple[str, Optional[str]], ProviderClient] = {}
+
+    def client_for(self, device_config: Dict) -> ProviderClient:
+        key = (device_config["api_endpoint"], device_config.get("api_key"))
+        client = self.clients.get(key)
+        if client is None:
+            client = ProviderClient(*key)
+            self.clients[key] = client
+        return client
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.close()
+        self.clients.clear()
+
+    def get_stats(self) -> Dict:
+        # Las claves no se exponen: se identifican por un prefijo de su hash
+        return {
+            f"{url} (clave {hashlib.sha256(api_key.encode()).hexdigest()[:8]})" if api_key else url: client.get_stats()
+            for (url, api_key), client in self.clients.items()
+        }
+
+def parse_provider_location(device_id: str, data: Dict) -> Dict:
+    """Normalizar la respuesta de un proveedor al formato interno"""
+    return {
+        "latitude": data.get("latitude"),
+        "longitude": data.get("longitude"),
+        "altitude": data.get("altitude"),
+        "accuracy": data.get("accuracy"),
+        "speed": data.get("speed"),
+        "heading": data.get("heading"),
+        "timestamp": datetime.utcnow(),
+        "device_id": device_id,
+        "signal_strength": data.get("signal_strength"),
+        "satellite_count": data.get("satellite_count")
+    }
@@ -0,0 +1,354 @@
+# S.A.M.I. - Resúmenes Horarios y Diarios de GPS
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..core.config import settings
+from ..core.database import async_engine, async_redis_client
+from ..models.gps import GPSRollup
+from .gps_spatial import EARTH_RADIUS_KM, haversine_km
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+LAST_FIX_KEY = "sami:gps:rollups:last"  # HASH device_id -> "lat,lng,epoch_ms" del último fix sumado
+
+# Reemplazar el último fix de un dispositivo solo si el nuevo es posterior y
+# devolver el anterior ('' si no había), en un solo paso: lotes consecutivos
+# de un dispositivo que llegan a workers distintos suman cada tramo una vez.
+# KEYS: LAST_FIX_KEY; ARGV: device_id, epoch ms del fix nuevo, "lat,lng,epoch_ms"
+_LAST_FIX_SCRIPT = """
+local previous = redis.call('HGET', KEYS[1], ARGV[1]) or ''
+local ms = tonumber(string.match(previous, '([^,]+)$'))
+if not ms or tonumber(ARGV[2]) > ms then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+end
+return previous
+"""
+
+def bucket_start(value: datetime, bucket: str) -> datetime:
+    """Inicio (UTC) del período que contiene a `value`, igual que date_trunc(bucket, value, 'UTC')"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if bucket == "day" else value
+
+# Mismas reglas que GPSRollupWriter.add, para recalcular desde gps_locations.
+# {bucket} sale de BUCKETS (nunca de la entrada del usuario).
+_BACKFILL_SQL = """
+WITH fixes AS (
+    SELECT device_id, vehicle_id, latitude, longitude, speed, created_at,
+           LAG(latitude) OVER w AS prev_lat,
+           LAG(longitude) OVER w AS prev_lng,
+           EXTRACT(EPOCH FROM created_at - LAG(created_at) OVER w) AS gap
+    FROM gps_locations
+    WHERE created_at >= :lookback AND created_at < :end
+      AND device_id IS NOT NULL {device_filter}
+    WINDOW w AS (PARTITION BY device_id ORDER BY created_at)
+), segments AS (
+    SELECT device_id, vehicle_id, created_at, speed,
+           CASE WHEN gap > 0 AND gap <= :max_gap THEN gap END AS dt,
+           2 * {radius} * asin(sqrt(least(1.0,
+               power(sin(radians(latitude - prev_lat) / 2), 2) +
+               cos(radians(prev_lat)) * cos(radians(latitude)) *
+               power(sin(radians(longitude - prev_lng) / 2), 2)))) AS step_km
+    FROM fixes
+    WHERE created_at >= :start
+), classified AS (
+    SELECT device_id, vehicle_id, created_at, dt, step_km,
+           COALESCE(speed, CASE WHEN dt IS NOT NULL THEN step_km / dt * 3600 END) AS fix_speed
+    FROM segments
+)
+INSERT INTO gps_rollups (
+    device_id, vehicle_id, bucket, bucket_start, distance_km, moving_seconds,
+    idle_seconds, max_speed_kmh, fix_count, last_fix_at, is_active
+)
+SELECT device_id, max(vehicle_id), '{bucket}', date_trunc('{bucket}', created_at, 'UTC'),
+       COALESCE(sum(step_km) FILTER (WHERE dt IS NOT NULL AND fix_speed >= :moving), 0),
+       COALESCE(sum(dt) FILTER (WHERE fix_speed >= :moving), 0),
+       COALESCE(sum(dt) FILTER (WHERE fix_speed < :moving), 0),
+       COALESCE(max(fix_speed), 0),
+       count(*),
+       max(created_at),
+       true
+FROM classified
+GROUP BY device_id, date_trunc('{bucket}', created_at, 'UTC')
+"""
+
+class GPSRollupWriter:
+    """
+    Acumula por dispositivo, hora y día la distancia, el tiempo en movimiento
+    y detenido, la velocidad máxima y la cantidad de fixes. Cada fix aporta
+    el tramo desde el fix anterior del mismo dispositivo (al período del fix
+    actual); tramos más largos que `max_gap` se consideran sin datos. El fix
+    anterior de cada dispositivo se guarda en Redis (con copia local si Redis
+    no responde), así que da igual qué proceso recibe cada lote. Los deltas se
+    escriben cada `flush_interval` con un UPSERT que los suma.
+    """
+
+    def __init__(self, flush_interval: Optional[float] = None,
+                 moving_speed_kmh: Optional[float] = None,
+                 max_gap_seconds: Optional[float] = None):
+        self.flush_interval = flush_interval or settings.gps_rollup_flush_interval
+        self.moving_speed_kmh = settings.gps_rollup_moving_speed_kmh if moving_speed_kmh is None else moving_speed_kmh
+        self.max_gap_seconds = max_gap_seconds or settings.gps_rollup_max_gap_seconds
+
+        self._last: Dict[str, Tuple[float, float, datetime]] = {}
+        self._pending: Dict[Tuple[str, str, datetime], list] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_fix = None
+
+        self.fixes = 0
+        self.sync_errors = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_flush_at = None
+
+    async def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _worker(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _swap_last(self, device_id: str, lat: float, lng: float,
+                         timestamp: datetime) -> Optional[Tuple[float, float, datetime]]:
+        """Registrar el último fix del dispositivo (si es posterior) y devolver el anterior"""
+        local = self._last.get(device_id)
+        if local is None or timestamp > local[2]:
+            self._last[device_id] = (lat, lng, timestamp)
+        ms = int(round(timestamp.timestamp() * 1000))
+        try:
+            if self._last_fix is None:
+                self._last_fix = async_redis_client.register_script(_LAST_FIX_SCRIPT)
+            raw = await self._last_fix(keys=[LAST_FIX_KEY], args=[device_id, ms, f"{lat!r},{lng!r},{ms}"])
+        except Exception as e:
+            # Sin Redis se enlaza con el último fix visto por este proceso
+            self.sync_errors += 1
+            self.last_error = str(e)
+            logger.warning(f"Error leyendo el último fix de {device_id} para resúmenes: {e}")
+            return local
+        if not raw:
+            return None
+        prev_lat, prev_lng, prev_ms = raw.split(",")
+        return float(prev_lat), float(prev_lng), datetime.fromtimestamp(int(prev_ms) / 1000, timezone.utc)
+
+    async def add(self, device_id: str, vehicle_id: Optional[int], location: Dict):
+        """Sumar un fix (en orden de tiempo por dispositivo) a sus períodos"""
+        timestamp = location.get("timestamp") or datetime.utcnow()
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        lat, lng = location["latitude"], location["longitude"]
+        speed = location.get("speed")
+
+        distance = moving = idle = 0.0
+        previous = await self._swap_last(device_id, lat, lng, timestamp)
+        if previous is not None:
+            gap = (timestamp - previous[2]).total_seconds()
+            if 0 < gap <= self.max_gap_seconds:
+                step_km = float(haversine_km(previous[0], previous[1], lat, lng))
+                if speed is None:
+                    speed = step_km / gap * 3600
+                if speed >= self.moving_speed_kmh:
+                    distance, moving = step_km, gap
+                else:
+                    idle = gap
+
+        self.fixes += 1
+        for bucket in BUCKETS:
+            key = (device_id, bucket, bucket_start(timestamp, bucket))
+            entry = self._pending.get(key)
+            if entry is None:
+                # vehicle_id, distance_km, moving_seconds, idle_seconds, max_speed_kmh, fix_count, last_fix_at
+                entry = self._pending[key] = [vehicle_id, 0.0, 0.0, 0.0, 0.0, 0, timestamp]
+            entry[0] = vehicle_id if vehicle_id is not None else entry[0]
+            entry[1] += distance
+            entry[2] += moving
+            entry[3] += idle
+            entry[4] = max(entry[4], speed or 0.0)
+            entry[5] += 1
+            entry[6] = max(entry[6], timestamp)
+
+    async def add_track(self, device_id: str, vehicle_id: Optional[int], lats: np.ndarray, lngs: np.ndarray,
+                  speeds: np.ndarray, timestamps_ms: np.ndarray):
+        """add() con arreglos: fixes de un dispositivo en orden de tiempo (NaN = sin velocidad)"""
+        if not len(lats):
+            return
+        seconds = timestamps_ms / 1000.0
+        previous = await self._swap_last(device_id, float(lats[-1]), float(lngs[-1]),
+                                         datetime.fromtimestamp(seconds[-1], timezone.utc))
+        if previous is None:
+            previous = (lats[0], lngs[0], None)
+        prev_seconds = np.r_[previous[2].timestamp() if previous[2] else np.nan, seconds[:-1]]
+        gap = seconds - prev_seconds
+        with np.errstate(invalid="ignore"):
+            linked = (gap > 0) & (gap <= self.max_gap_seconds)
+            step_km = haversine_km(np.r_[previous[0], lats[:-1]], np.r_[previous[1], lngs[:-1]], lats, lngs)
+            speed = np.where(np.isnan(speeds) & linked, step_km / np.where(linked, gap, 1.0) * 3600, speeds)
+            moving = linked & (speed >= self.moving_speed_kmh)
+        idle = linked & ~moving
+        values = np.stack([
+            np.where(moving, step_km, 0.0), np.where(moving, gap, 0.0), np.where(idle, gap, 0.0)
+        ], axis=1)
+        speed = np.nan_to_num(speed)
+        self.fixes += len(lats)
+
+        for bucket, size in BUCKETS.items():
+            starts = timestamps_ms // int(size.total_seconds() * 1000)
+            bounds = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+            sums = np.add.reduceat(values, bounds).tolist()
+            peaks = np.maximum.reduceat(speed, bounds).tolist()
+            counts = np.diff(np.r_[bounds, len(starts)]).tolist()
+            lasts = seconds[np.r_[bounds[1:], len(starts)] - 1].tolist()
+            for n, first in enumerate(bounds.tolist()):
+                key = (device_id, bucket, bucket_start(datetime.fromtimestamp(seconds[first], timezone.utc), bucket))
+                last_fix_at = datetime.fromtimestamp(lasts[n], timezone.utc)
+                entry = self._pending.get(key)
+                if entry is None:
+                    entry = self._pending[key] = [vehicle_id, 0.0, 0.0, 0.0, 0.0, 0, last_fix_at]
+                entry[0] = vehicle_id if vehicle_id is not None else entry[0]
+                entry[1] += sums[n][0]
+                entry[2] += sums[n][1]
+                entry[3] += sums[n][2]
+                entry[4] = max(entry[4], peaks[n])
+                entry[5] += counts[n]
+                entry[6] = max(entry[6], last_fix_at)
+
+    async def flush(self) -> bool:
+        """Escribir los deltas acumulados; si falla quedan para el próximo intento"""
+        if not self._pending:
+            return True
+        pending, self._pending = self._pending, {}
+        rows = [
+            {
+                "device_id": device_id, "bucket": bucket, "bucket_start": start,
+                "vehicle_id": entry[0], "distance_km": entry[1], "moving_seconds": entry[2],
+                "idle_seconds": entry[3], "max_speed_kmh": entry[4], "fix_count": entry[5],
+                "last_fix_at": entry[6], "is_active": True
+            }
+            for (device_id, bucket, start), entry in pending.items()
+        ]
+        table = GPSRollup.__table__
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_gps_rollups_device_bucket",
+            set_={
+                "vehicle_id": func.coalesce(stmt.excluded.vehicle_id, table.c.vehicle_id),
+                "distance_km": table.c.distance_km + stmt.excluded.distance_km,
+                "moving_seconds": table.c.moving_seconds + stmt.excluded.moving_seconds,
+                "idle_seconds": table.c.idle_seconds + stmt.excluded.idle_seconds,
+                "max_speed_kmh": func.greatest(table.c.max_speed_kmh, stmt.excluded.max_speed_kmh),
+                "fix_count": table.c.fix_count + stmt.excluded.fix_count,
+                "last_fix_at": func.greatest(table.c.last_fix_at, stmt.excluded.last_fix_at),
+                "updated_at": func.now()
+            }
+        )
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(stmt, rows)
+        except Exception as e:
+            self._merge_back(pending)
+            self.failures += 1
+            self.last_error = str(e)
+            logger.warning(f"Error escribiendo resúmenes GPS ({len(rows)} períodos): {e}")
+            return False
+
+        self.flushes += 1
+        self.last_flush_at = datetime.utcnow()
+        return True
+
+    def _merge_back(self, pending: Dict):
+        for key, entry in pending.items():
+            current = self._pending.get(key)
+            if current is None:
+                self._pending[key] = entry
+                continue
+            current[0] = current[0] if current[0] is not None else entry[0]
+            for i in (1, 2, 3, 5):
+                current[i] += entry[i]
+            current[4] = max(current[4], entry[4])
+            current[6] = max(current[6], entry[6])
+
+    def get_stats(self) -> Dict:
+        return {
+            "fixes": self.fixes,
+            "pending_buckets": len(self._pending),
+            "devices": len(self._last),
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "sync_errors": self.sync_errors,
+            "last_flush_at": self.last_flush_at,
+            "last_error": self.last_error
+        }
+
+async def backfill(conn, start: datetime, end: datetime, device_id: Optional[str] = None) -> int:
+    """
+    Recalcular desde gps_locations los resúmenes de [start, end), que deben
+    caer en límites de día UTC. Reemplaza las filas existentes del rango.
+    """
+    params = {
+        "start": start, "end": end,
+        "lookback": start - timedelta(seconds=settings.gps_rollup_max_gap_seconds),
+        "max_gap": settings.gps_rollup_max_gap_seconds,
+        "moving": settings.gps_rollup_moving_speed_kmh
+    }
+    conditions = [GPSRollup.bucket_start >= start, GPSRollup.bucket_start < end]
+    device_filter = ""
+    if device_id is not None:
+        params["device_id"] = device_id
+        conditions.append(GPSRollup.device_id == device_id)
+        device_filter = "AND device_id = :device_id"
+
+    await conn.execute(delete(GPSRollup).where(and_(*conditions)))
+    inserted = 0
+    for bucket in BUCKETS:
+        sql = _BACKFILL_SQL.format(bucket=bucket, device_filter=device_filter, radius=EARTH_RADIUS_KM)
+        result = await conn.execute(text(sql), params)
+        inserted += result.rowcount or 0
+    return inserted
+
+async def summarize(db, bucket: str, start: datetime, end: datetime,
+                    device_id: Optional[str] = None) -> Dict:
+    """Sumar los resúmenes de un rango (a lo sumo unos cientos de filas por dispositivo)"""
+    conditions = [GPSRollup.bucket == bucket, GPSRollup.bucket_start >= start, GPSRollup.bucket_start < end]
+    if device_id is not None:
+        conditions.append(GPSRollup.device_id == device_id)
+    result = await db.execute(
+        select(
+            func.count(func.distinct(GPSRollup.device_id)).label("devices"),
+            func.coalesce(func.sum(GPSRollup.fix_count), 0).label("fixes"),
+            func.coalesce(func.sum(GPSRollup.distance_km), 0.0).label("distance_km"),
+            func.coalesce(func.sum(GPSRollup.moving_seconds), 0.0).label("moving_seconds"),
+            func.coalesce(func.sum(GPSRollup.idle_seconds), 0.0).label("idle_seconds"),
+            func.coalesce(func.max(GPSRollup.max_speed_kmh), 0.0).label("max_speed_kmh")
+        ).where(and_(*conditions))
+    )
+    row = result.one()
+    moving_hours = row.moving_seconds / 3600
+    return {
+        "active_vehicles": row.devices,
+        "total_locations": int(row.fixes),
+        "total_distance_km": round(row.distance_km, 3),
+        "average_speed_kmh": round(row.distance_km / moving_hours, 2) if moving_hours else 0.0,
+        "max_speed_kmh": round(row.max_speed_kmh, 2),
+        "moving_hours": round(moving_hours, 2),
+        "idle_hours": round(row.idle_seconds / 3600, 2)
+    }
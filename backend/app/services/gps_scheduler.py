@@ -0,0 +1,187 @@
+# S.A.M.I. - Planificador de Sondeo GPS
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class GPSPollScheduler:
+    """
+    Planificador de sondeos dentro del event loop. Mantiene un min-heap con el
+    próximo vencimiento de cada dispositivo, reparte los sondeos con jitter y
+    limita cuántos hay en vuelo a la vez. Un dispositivo nunca tiene dos
+    sondeos en vuelo: si vence mientras el anterior sigue en curso (proveedor
+    lento, reintentos), se posterga hasta que termine y la espera cuenta como
+    atraso.
+    """
+
+    def __init__(
+        self,
+        poll: Callable[[str], Awaitable],
+        max_concurrency: Optional[int] = None,
+        jitter: Optional[float] = None
+    ):
+        self.poll = poll
+        self.max_concurrency = max_concurrency or settings.gps_poll_max_concurrency
+        self.jitter = settings.gps_poll_jitter if jitter is None else jitter
+
+        self._heap: List[tuple] = []  # (vencimiento, secuencia, clave)
+        self._intervals: Dict[str, float] = {}
+        self._deadlines: Dict[str, float] = {}  # Vencimiento vigente por clave
+        self._last_deadlines: Dict[str, float] = {}  # Vencimiento del último sondeo lanzado
+        self._seq = itertools.count()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = set()
+        self._polling: Set[str] = set()  # Claves con un sondeo en curso
+        self._deferred: Dict[str, float] = {}  # Vencimientos postergados por un sondeo en curso
+        self.running = False
+
+        self.stats: Dict[str, Dict] = {}
+
+    def schedule(self, key: str, interval: float):
+        """Agregar o reprogramar un dispositivo; el primer sondeo cae en un punto aleatorio del intervalo"""
+        self._intervals[key] = interval
+        self.stats.setdefault(key, {
+            "interval": interval, "polls": 0, "failures": 0, "deferred": 0,
+            "last_latency_ms": None, "last_lag_ms": None, "max_lag_ms": 0.0
+        })["interval"] = interval
+        self._push(key, time.monotonic() + random.uniform(0, interval))
+
+    def set_interval(self, key: str, interval: float):
+        """Cambiar el intervalo de un dispositivo programado; el vencimiento pendiente se recalcula desde el último sondeo"""
+        if key not in self._intervals or self._intervals[key] == interval:
+            return
+        self._intervals[key] = interval
+        self.stats[key]["interval"] = interval
+        last = self._last_deadlines.get(key)
+        if last is not None:
+            self._push(key, self._next_deadline(key, last, time.monotonic()))
+
+    def remove(self, key: str):
+        """Quitar un dispositivo (su entrada en el heap se descarta al salir)"""
+        self._intervals.pop(key, None)
+        self._deadlines.pop(key, None)
+        self._last_deadlines.pop(key, None)
+        self._deferred.pop(key, None)
+        self.stats.pop(key, None)
+
+    def _push(self, key: str, deadline: float):
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._seq), key))
+        self._wakeup.set()
+
+    def _next_deadline(self, key: str, deadline: float, now: float) -> float:
+        """Próximo vencimiento anclado al anterior (sin deriva) con jitter"""
+        interval = self._intervals[key]
+        jitter = random.uniform(-self.jitter, self.jitter) * interval
+        next_deadline = deadline + interval + jitter
+        # Si el sondeo se atrasó más de un intervalo, no se acumulan sondeos pendientes
+        return max(next_deadline, now)
+
+    async def start(self):
+        if self._task:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detener el planificador y esperar los sondeos en vuelo"""
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _run(self):
+        while self.running:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) != deadline:
+                heapq.heappop(self._heap)  # Entrada obsoleta (reprogramada o eliminada)
+                continue
+
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if key in self._polling:
+                # Se relanza al terminar el sondeo en curso, con este vencimiento
+                self._deferred[key] = deadline
+                self.stats[key]["deferred"] += 1
+                continue
+            await self._semaphore.acquire()
+            start = time.monotonic()
+            self._last_deadlines[key] = deadline
+            self._push(key, self._next_deadline(key, deadline, start))
+
+            self._polling.add(key)
+            task = asyncio.create_task(self._poll(key, deadline, start))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _poll(self, key: str, deadline: float, start: float):
+        try:
+            await self.poll(key)
+            failed = False
+        except Exception as e:
+            failed = True
+            logger.error(f"Error sondeando {key}: {e}")
+        finally:
+            self._semaphore.release()
+            self._polling.discard(key)
+            deferred = self._deferred.pop(key, None)
+            if deferred is not None and key in self._intervals:
+                self._push(key, deferred)
+
+        stats = self.stats.get(key)
+        if stats is None:
+            return
+        lag_ms = (start - deadline) * 1000
+        stats["polls"] += 1
+        stats["failures"] += failed
+        stats["last_latency_ms"] = round((time.monotonic() - start) * 1000, 2)
+        stats["last_lag_ms"] = round(lag_ms, 2)
+        stats["max_lag_ms"] = round(max(stats["max_lag_ms"], lag_ms), 2)
+
+    def get_stats(self) -> Dict:
+        """Resumen del planificador"""
+        lags = [s["last_lag_ms"] for s in self.stats.values() if s["last_lag_ms"] is not None]
+        latencies = [s["last_latency_ms"] for s in self.stats.values() if s["last_latency_ms"] is not None]
+        return {
+            "running": self.running,
+            "devices": len(self._intervals),
+            "in_flight": len(self._in_flight),
+            "max_concurrency": self.max_concurrency,
+            "heap_size": len(self._heap),
+            "deferred": sum(s["deferred"] for s in self.stats.values()),
+            "max_lag_ms": max(lags, default=None),
+            "avg_lag_ms": round(sum(lags) / len(lags), 2) if lags else None,
+            "avg_latency_ms": round(sum(latencies) / len(latencies), 2) if latencies else None
+        }
+
+    def get_device_stats(self) -> Dict[str, Dict]:
+        """Latencia y atraso del último sondeo por dispositivo"""
+        return self.stats
@@ -1,18 +1,41 @@
 # S.A.M.I. - Servicio GPS y Comunicación Satelital
 import asyncio
 import logging
-import requests
 import json
 from typing import Dict, List, Optional, Callable
-from datetime import datetime, timedelta
-import threading
-import time
+from datetime import datetime, timedelta, timezone
 import math
 
+import numpy as np
+from sqlalchemy import select
+
 from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.gps import GeofenceViolation, GPSLocation
+from .gps_writer import COLUMNS, GPSLocationWriter
+from .gps_scheduler import GPSPollScheduler
+from .gps_providers import ProviderPool, ProviderUnavailable, parse_provider_location
+from .gps_positions import PositionStore
+from .gps_geofences import GeofenceEngine
+from .gps_partitions import GPSPartitionManager
+from .gps_export import GPSExporter
+from .gps_ingest import FixBatch, GPSIngest, IngestBusy, from_fixes
+from .gps_live import LivePublisher, live_hub
+from .gps_motion import MotionPoller
+from .gps_nmea import SerialNMEAReader
+from .gps_rollups import GPSRollupWriter, bucket_start, summarize
+from .gps_tracks import TrackCache, day_start, select_points, to_epoch, zoom_tolerance_m
+from .gps_wire import COMPACT_MEDIA_TYPE, decode_frame, encode_frame
 
 logger = logging.getLogger(__name__)
 
+def _nullable(values: np.ndarray, integer: bool = False) -> list:
+    """Arreglo con NaN -> lista de Python con None"""
+    missing = np.isnan(values)
+    column = (np.nan_to_num(values).round().astype(np.int64) if integer else values).astype(object)
+    column[missing] = None
+    return column.tolist()
+
 class GPSService:
     """Servicio para tracking GPS y comunicación satelital"""
     
@@ -23,6 +46,21 @@ class GPSService:
         self.location_callbacks = []
         self.alert_callbacks = []
         self.satellite_enabled = settings.satellite_communication_enabled
+        self.writer = GPSLocationWriter()
+        self.scheduler = GPSPollScheduler(self._poll_vehicle)
+        self.motion = MotionPoller()
+        self.providers = ProviderPool()
+        self.positions = PositionStore()
+        self.geofences = GeofenceEngine()
+        self.partitions = GPSPartitionManager()
+        self.tracks = TrackCache()
+        self.rollups = GPSRollupWriter()
+        self.exporter = GPSExporter()
+        self.ingest = GPSIngest()
+        self.live = LivePublisher()
+        self.serial_readers: Dict[str, SerialNMEAReader] = {}  # Receptores NMEA por puerto serie
+        self.last_known_locations: Dict[str, Dict] = {}  # Por dispositivo, para fallback
+        self.wire_stats = {"frames": 0, "bytes": 0, "fixes": 0, "errors": 0}  # Tramas compactas recibidas
         
     async def initialize(self):
         """Inicializar el servicio GPS"""
@@ -31,9 +69,16 @@ class GPSService:
             await self.load_vehicle_configs()
             await self.load_gps_device_configs()
             
-            # Iniciar monitoreo GPS
-            if settings.gps_update_interval > 0:
-                await self.start_gps_monitoring()
+            # Escritura diferida de ubicaciones en lotes
+            await self.writer.start()
+            await self.rollups.start()
+            
+            # Cada fix procesado en este proceso se publica para /gps/ws
+            self.add_location_callback(self.live.on_location)
+            await self.live.start()
+            
+            # El monitoreo lo arranca el registro solo en el proceso anfitrión
+            # (start_gps_monitoring); el resto lee posiciones desde Redis
             
             logger.info("Servicio GPS inicializado correctamente")
             
@@ -49,6 +94,7 @@ class GPSService:
                 "vehicle_id": "vehicle_1",
                 "name": "Excavadora CAT 320",
                 "license_plate": "ABC-123",
+                "vehicle_type": "heavy_machinery",
                 "gps_device_id": "gps_1",
                 "project_id": None,
                 "operator_id": None,
@@ -58,6 +104,7 @@ class GPSService:
                 "vehicle_id": "vehicle_2",
                 "name": "Bulldozer D6T",
                 "license_plate": "DEF-456", 
+                "vehicle_type": "heavy_machinery",
                 "gps_device_id": "gps_2",
                 "project_id": None,
                 "operator_id": None,
@@ -67,6 +114,7 @@ class GPSService:
                 "vehicle_id": "vehicle_3",
                 "name": "Camión Volvo FH16",
                 "license_plate": "GHI-789",
+                "vehicle_type": "truck",
                 "gps_device_id": "gps_3",
                 "project_id": None,
                 "operator_id": None,
@@ -107,14 +155,27 @@ class GPSService:
     async def start_gps_monitoring(self):
         """Iniciar monitoreo GPS"""
         try:
+            if settings.gps_update_interval <= 0:
+                return
+            
             self.running = True
+            await self.positions.start()
+            await self.geofences.start()
+            await self.partitions.start()
             
-            # Crear thread para monitoreo
-            thread = threading.Thread(
-                target=self._gps_monitoring_worker,
-                daemon=True
-            )
-            thread.start()
+            # Receptores serie: leen continuamente y el sondeo toma el último fix
+            for device_id, device_config in self.gps_devices.items():
+                if device_config["device_type"] == "serial" and device_config["enabled"]:
+                    reader = SerialNMEAReader(device_id, device_config["port"], device_config.get("baudrate"))
+                    self.serial_readers[device_id] = reader
+                    await reader.start()
+            
+            # Programar cada vehículo con el intervalo de su dispositivo
+            for vehicle_id, vehicle_config in self.vehicles.items():
+                if vehicle_config["enabled"]:
+                    self.scheduler.schedule(vehicle_id, self._poll_interval(vehicle_config))
+            
+            await self.scheduler.start()
             
             logger.info("Monitoreo GPS iniciado")
             
@@ -125,25 +186,39 @@ class GPSService:
     async def stop_gps_monitoring(self):
         """Detener monitoreo GPS"""
         self.running = False
+        await self.scheduler.stop()
+        for reader in self.serial_readers.values():
+            await reader.stop()
+        await self.partitions.stop()
+        await self.geofences.stop()
+        await self.positions.stop()
+        await self.live.stop()
+        await self.rollups.stop()
+        await self.writer.stop()
+        await self.providers.close()
         logger.info("Monitoreo GPS detenido")
     
-    def _gps_monitoring_worker(self):
-        """Worker thread para monitoreo GPS"""
-        while self.running:
-            try:
-                # Procesar cada vehículo
-                for vehicle_id, vehicle_config in self.vehicles.items():
-                    if vehicle_config["enabled"]:
-                        asyncio.create_task(
-                            self._update_vehicle_location(vehicle_id, vehicle_config)
-                        )
-                
-                # Esperar intervalo de actualización
-                time.sleep(settings.gps_update_interval)
-                
-            except Exception as e:
-                logger.error(f"Error en worker de monitoreo GPS: {e}")
-                time.sleep(10)  # Esperar antes de reintentar
+    def _poll_interval(self, vehicle_config: Dict) -> float:
+        """Intervalo de sondeo del dispositivo asignado al vehículo"""
+        device_config = self.gps_devices.get(vehicle_config.get("gps_device_id"), {})
+        return device_config.get("update_interval") or settings.gps_update_interval
+    
+    async def _poll_vehicle(self, vehicle_id: str):
+        """Sondeo programado de un vehículo"""
+        vehicle_config = self.vehicles.get(vehicle_id)
+        if vehicle_config and vehicle_config["enabled"]:
+            await self._update_vehicle_location(vehicle_id, vehicle_config)
+            if settings.gps_adaptive_polling:
+                self._adapt_poll_interval(vehicle_id, vehicle_config)
+    
+    def _adapt_poll_interval(self, vehicle_id: str, vehicle_config: Dict):
+        """Reprogramar el vehículo según su último fix (ver MotionPoller)"""
+        interval = self.motion.observe(
+            vehicle_id, vehicle_config.get("vehicle_type"), self._poll_interval(vehicle_config),
+            self.positions.positions.get(vehicle_id), self.geofences.near_edge
+        )
+        self.scheduler.set_interval(vehicle_id, interval)
+        self.positions.set_poll_interval(vehicle_id, interval)
     
     async def _update_vehicle_location(self, vehicle_id: str, vehicle_config: Dict):
         """Actualizar ubicación de un vehículo"""
@@ -157,7 +232,8 @@ class GPSService:
             # Obtener ubicación del dispositivo GPS
             location = await self._get_device_location(gps_device_id, device_config)
             
-            if location:
+            # Las posiciones de respaldo (proveedor caído) no se vuelven a persistir
+            if location and not location.get("stale"):
                 # Procesar ubicación
                 await self._process_location_update(vehicle_id, location, vehicle_config)
             
@@ -171,6 +247,8 @@ class GPSService:
                 return await self._get_satellite_location(device_id, device_config)
             elif device_config["device_type"] == "cellular":
                 return await self._get_cellular_location(device_id, device_config)
+            elif device_config["device_type"] == "serial":
+                return await self._get_serial_location(device_id, device_config)
             else:
                 # Simular ubicación para desarrollo
                 return await self._simulate_location(device_id)
@@ -186,34 +264,7 @@ class GPSService:
                 return await self._simulate_location(device_id)
             
             # Llamada a API satelital
-            headers = {
-                "Authorization": f"Bearer {device_config['api_key']}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.get(
-                f"{device_config['api_endpoint']}/devices/{device_id}/location",
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "latitude": data.get("latitude"),
-                    "longitude": data.get("longitude"),
-                    "altitude": data.get("altitude"),
-                    "accuracy": data.get("accuracy"),
-                    "speed": data.get("speed"),
-                    "heading": data.get("heading"),
-                    "timestamp": datetime.utcnow(),
-                    "device_id": device_id,
-                    "signal_strength": data.get("signal_strength"),
-                    "satellite_count": data.get("satellite_count")
-                }
-            else:
-                logger.warning(f"Error en API satelital: {response.status_code}")
-                return None
+            return await self._get_provider_location(device_id, device_config)
                 
         except Exception as e:
             logger.error(f"Error en comunicación satelital: {e}")
@@ -222,13 +273,93 @@ class GPSService:
     async def _get_cellular_location(self, device_id: str, device_config: Dict) -> Optional[Dict]:
         """Obtener ubicación vía celular"""
         try:
-            # Simular ubicación celular
-            return await self._simulate_location(device_id)
+            if not settings.cellular_provider_enabled:
+                # Simular ubicación celular
+                return await self._simulate_location(device_id)
+            
+            return await self._get_provider_location(device_id, device_config)
             
         except Exception as e:
             logger.error(f"Error en comunicación celular: {e}")
             return None
     
+    async def _get_serial_location(self, device_id: str, device_config: Dict) -> Optional[Dict]:
+        """Último fix del receptor serie; None si no llegó uno nuevo desde el sondeo anterior"""
+        reader = self.serial_readers.get(device_id)
+        if reader is None or reader.latest is None:
+            return None
+        location = reader.latest
+        if location is self.last_known_locations.get(device_id):
+            return None
+        self.last_known_locations[device_id] = location
+        return location
+    
+    async def _get_provider_location(self, device_id: str, device_config: Dict) -> Optional[Dict]:
+        """Consultar al proveedor; si no responde, usar la última posición conocida"""
+        client = self.providers.client_for(device_config)
+        compact = (device_config["device_type"] == "satellite"
+                   and settings.gps_satellite_wire_format == "compact")
+        try:
+            data = await client.get_location(device_id, accept=COMPACT_MEDIA_TYPE if compact else None)
+        except ProviderUnavailable as e:
+            last_known = self.last_known_locations.get(device_id)
+            logger.warning(f"Proveedor no disponible para {device_id} ({e}); "
+                           f"{'usando última posición conocida' if last_known else 'sin posición previa'}")
+            if last_known:
+                return {**last_known, "stale": True}
+            return None
+        
+        if data is None:
+            return None
+        if isinstance(data, bytes):
+            return await self._ingest_compact(device_id, data)
+        
+        location = parse_provider_location(device_id, data)
+        self.last_known_locations[device_id] = location
+        return location
+    
+    def encode_compact(self, locations: List[Dict]) -> bytes:
+        """Fixes (formato de _get_device_location) -> trama compacta (ver gps_wire)"""
+        return encode_frame(from_fixes(locations))
+    
+    def decode_compact(self, data: bytes) -> FixBatch:
+        """Trama compacta -> lote para ingest_fixes"""
+        return decode_frame(data)
+    
+    async def _ingest_compact(self, device_id: str, data: bytes) -> None:
+        """
+        Trama compacta del proveedor satelital: puede traer varios fixes que el
+        equipo acumuló entre contactos. Entran por ingest_fixes (validación,
+        watermark, persistencia, geofences y alertas), así que el sondeo no
+        devuelve una ubicación para procesar de nuevo.
+        """
+        try:
+            batch = self.decode_compact(data)
+        except ValueError as e:
+            self.wire_stats["errors"] += 1
+            logger.warning(f"Trama compacta inválida de {device_id}: {e}")
+            return None
+        self.wire_stats["frames"] += 1
+        self.wire_stats["bytes"] += len(data)
+        self.wire_stats["fixes"] += len(batch)
+        
+        if device_id in batch.devices:
+            # Último fix del dispositivo (el lote viene ordenado), para el fallback
+            n = int(np.flatnonzero(batch.device == batch.devices.index(device_id))[-1])
+            location = {
+                name: (None if np.isnan(getattr(batch, name)[n]) else float(getattr(batch, name)[n]))
+                for name in ("latitude", "longitude", "altitude", "accuracy", "speed", "heading", "satellite_count")
+            }
+            location.update(
+                timestamp=batch.timestamp_ms[n:n + 1].astype("datetime64[ms]").astype(object)[0],
+                device_id=device_id,
+                signal_strength=None
+            )
+            self.last_known_locations[device_id] = location
+        
+        await self.ingest_fixes(batch)
+        return None
+    
     async def _simulate_location(self, device_id: str) -> Dict:
         """Simular ubicación para desarrollo"""
         import random
@@ -258,9 +389,19 @@ class GPSService:
     async def _process_location_update(self, vehicle_id: str, location: Dict, vehicle_config: Dict):
         """Procesar actualización de ubicación"""
         try:
+            # Última posición conocida (fuente de las lecturas de la API)
+            if not self.positions.update(vehicle_id, location):
+                return
+            
             # Guardar en base de datos
             await self._save_location_to_db(vehicle_id, location)
             
+            # Resúmenes por hora y día (estadísticas sin recorrer el historial)
+            await self.rollups.add(
+                location.get("device_id") or vehicle_config.get("gps_device_id") or vehicle_id,
+                vehicle_config.get("db_id"), location
+            )
+            
             # Verificar geofences
             await self._check_geofences(vehicle_id, location)
             
@@ -278,27 +419,74 @@ class GPSService:
             logger.error(f"Error procesando actualización de ubicación: {e}")
     
     async def _save_location_to_db(self, vehicle_id: str, location: Dict):
-        """Guardar ubicación en base de datos"""
-        # Esta función debería guardar en la base de datos
-        logger.debug(f"Ubicación guardada: {vehicle_id} - {location}")
+        """Encolar la ubicación para su escritura en lote"""
+        vehicle_config = self.vehicles.get(vehicle_id, {})
+        # db_id: id en la tabla vehicles si el vehículo está registrado; el
+        # proyecto asignado queda en cada fix para exportar por proyecto
+        self.writer.enqueue(vehicle_config.get("db_id"), location, vehicle_config.get("project_id"))
     
     async def _check_geofences(self, vehicle_id: str, location: Dict):
-        """Verificar geofences"""
+        """Detectar entradas y salidas de geofences"""
         try:
-            # Esta función debería verificar geofences en la base de datos
-            # Por ahora solo logueamos
-            logger.debug(f"Verificando geofences para vehículo {vehicle_id}")
-            
+            for _, events in await self.geofences.evaluate_shared(
+                vehicle_id, np.array([location["latitude"]]), np.array([location["longitude"]]),
+                [location.get("timestamp")]
+            ):
+                await self._handle_geofence_events(vehicle_id, location, events)
         except Exception as e:
             logger.error(f"Error verificando geofences: {e}")
     
+    async def _handle_geofence_events(self, vehicle_id: str, location: Dict, events: List[Dict]):
+        """Registrar y notificar las entradas y salidas con alerta"""
+        try:
+            alerts = [event for event in events if event["alert"]]
+            if not alerts:
+                return
+            
+            await self._save_geofence_violations(vehicle_id, location, alerts)
+            
+            for event in alerts:
+                entering = event["violation_type"] == "enter"
+                alert = {
+                    "type": f"geofence_{event['violation_type']}",
+                    "severity": "high" if entering and event["geofence_type"] == "restricted" else "medium",
+                    "message": f"Vehículo {vehicle_id} {'entró a' if entering else 'salió de'} "
+                               f"la geofence {event['geofence_name']}",
+                    "data": event
+                }
+                for callback in self.alert_callbacks:
+                    try:
+                        await callback(vehicle_id, alert)
+                    except Exception as e:
+                        logger.error(f"Error en callback de alerta: {e}")
+            
+        except Exception as e:
+            logger.error(f"Error registrando eventos de geofence: {e}")
+    
+    async def _save_geofence_violations(self, vehicle_id: str, location: Dict, events: List[Dict]):
+        """Registrar entradas y salidas con alerta configurada"""
+        vehicle_config = self.vehicles.get(vehicle_id, {})
+        async with AsyncSessionLocal() as db:
+            for event in events:
+                db.add(GeofenceViolation(
+                    geofence_id=event["geofence_id"],
+                    vehicle_id=vehicle_config.get("db_id"),
+                    violation_type=event["violation_type"],
+                    latitude=location["latitude"],
+                    longitude=location["longitude"],
+                    timestamp=location.get("timestamp") or datetime.utcnow(),
+                    speed=location.get("speed"),
+                    duration_seconds=event["duration_seconds"]
+                ))
+            await db.commit()
+    
     async def _check_location_alerts(self, vehicle_id: str, location: Dict):
         """Verificar alertas de ubicación"""
         try:
             alerts = []
             
             # Verificar velocidad excesiva
-            if location.get("speed", 0) > 80:  # km/h
+            if (location.get("speed") or 0) > 80:  # km/h
                 alerts.append({
                     "type": "excessive_speed",
                     "severity": "medium",
@@ -306,8 +494,9 @@ class GPSService:
                     "data": {"speed": location["speed"]}
                 })
             
-            # Verificar señal GPS débil
-            if location.get("signal_strength", 1.0) < 0.5:
+            # Verificar señal GPS débil (los receptores serie no la informan)
+            signal_strength = location.get("signal_strength")
+            if signal_strength is not None and signal_strength < 0.5:
                 alerts.append({
                     "type": "weak_gps_signal",
                     "severity": "low",
@@ -326,6 +515,93 @@ class GPSService:
         except Exception as e:
             logger.error(f"Error verificando alertas de ubicación: {e}")
     
+    async def ingest_fixes(self, batch: FixBatch) -> Dict:
+        """
+        Lote de fixes subido por trackers (POST /gps/ingest). Se valida y
+        deduplica en bloque; cada fix se persiste y pasa por resúmenes y
+        geofences en orden de tiempo, y la última posición, los callbacks y
+        las alertas reciben solo el fix más reciente de cada vehículo.
+        Los dispositivos sin vehículo asignado se persisten igual.
+        """
+        batch, report, moved = await self.ingest.prepare(batch, self.writer.free_slots())
+        report.update({"vehicles": 0, "unregistered": 0, "geofence_events": 0})
+        if not len(batch):
+            return report
+        
+        by_device = {
+            config["gps_device_id"]: vehicle_id
+            for vehicle_id, config in self.vehicles.items() if config.get("gps_device_id")
+        }
+        vehicle_ids = [by_device.get(device_id) for device_id in batch.devices]
+        configs = [self.vehicles[v] if v else {} for v in vehicle_ids]
+        
+        timestamps = batch.timestamp_ms.astype("datetime64[ms]").astype(object).tolist()  # UTC sin zona
+        columns = {
+            "vehicle_id": np.array([c.get("db_id") for c in configs], dtype=object)[batch.device].tolist(),
+            "device_id": np.array(batch.devices, dtype=object)[batch.device].tolist(),
+            "latitude": batch.latitude.tolist(),
+            "longitude": batch.longitude.tolist(),
+            **{name: _nullable(getattr(batch, name)) for name in ("altitude", "accuracy", "speed", "heading")},
+            "gps_status": ["ONLINE"] * len(batch),
+            "satellite_count": _nullable(batch.satellite_count, integer=True),
+            "signal_strength": [None] * len(batch),
+            "is_active": [True] * len(batch),
+            "created_at": [t.replace(tzinfo=timezone.utc) for t in timestamps],
+            "project_id": np.array([c.get("project_id") for c in configs], dtype=object)[batch.device].tolist()
+        }
+        # Sin await desde prepare: otro lote pudo ocupar la cola mientras se movían las marcas
+        if not self.writer.enqueue_batch(list(zip(*(columns[name] for name in COLUMNS)))):
+            await self.ingest.release(batch, moved)
+            raise IngestBusy(f"Cola de escritura llena ({self.writer.free_slots()} lugares para {len(batch)} fixes)")
+        if not self.geofences.started:
+            # Workers que no alojan el servicio: cargar las geofences (el estado está en Redis)
+            await self.geofences.start()
+        
+        def location_at(n: int) -> Dict:
+            location = {
+                name: columns[name][n]
+                for name in ("latitude", "longitude", "altitude", "accuracy", "speed", "heading", "satellite_count")
+                if columns[name][n] is not None
+            }
+            location.update(timestamp=timestamps[n], device_id=columns["device_id"][n])
+            return location
+        
+        # Tramos contiguos de cada dispositivo (el lote viene ordenado)
+        bounds = np.flatnonzero(np.r_[True, batch.device[1:] != batch.device[:-1], True]).tolist()
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            code = int(batch.device[start])
+            device_id, vehicle_id = batch.devices[code], vehicle_ids[code]
+            db_id = configs[code].get("db_id")
+            await self.rollups.add_track(
+                device_id, db_id, batch.latitude[start:end], batch.longitude[start:end],
+                batch.speed[start:end], batch.timestamp_ms[start:end]
+            )
+            if vehicle_id is None:
+                report["unregistered"] += end - start
+                continue
+            
+            report["vehicles"] += 1
+            for n, events in await self.geofences.evaluate_shared(
+                vehicle_id, batch.latitude[start:end], batch.longitude[start:end], timestamps[start:end]
+            ):
+                report["geofence_events"] += len(events)
+                await self._handle_geofence_events(vehicle_id, location_at(start + n), events)
+            
+            location = location_at(end - 1)
+            if not self.positions.update(vehicle_id, location):
+                continue
+            for callback in self.location_callbacks:
+                try:
+                    await callback(vehicle_id, location)
+                except Exception as e:
+                    logger.error(f"Error en callback de ubicación: {e}")
+            await self._check_location_alerts(vehicle_id, location)
+        
+        if not self.positions.owner:
+            # Fuera del proceso anfitrión no corre la publicación periódica
+            await self.positions.publish()
+        return report
+    
     def add_location_callback(self, callback: Callable):
         """Agregar callback para actualizaciones de ubicación"""
         self.location_callbacks.append(callback)
@@ -334,42 +610,45 @@ class GPSService:
         """Agregar callback para alertas GPS"""
         self.alert_callbacks.append(callback)
     
+    def _with_vehicle_info(self, vehicle_id: str, position: Dict, now: datetime) -> Dict:
+        """Agregar datos del vehículo y antigüedad a una posición del almacén"""
+        vehicle_config = self.vehicles.get(vehicle_id, {})
+        age = self.positions.age_seconds(position, now)
+        interval = position.get("poll_interval") or self._poll_interval(vehicle_config)
+        stale_after = interval * settings.gps_position_stale_factor
+        return {
+            **position,
+            "vehicle_name": vehicle_config.get("name", vehicle_id),
+            "license_plate": vehicle_config.get("license_plate", ""),
+            "age_seconds": round(age, 1),
+            "stale": age > stale_after
+        }
+    
     async def get_vehicle_location(self, vehicle_id: str) -> Optional[Dict]:
-        """Obtener ubicación actual de un vehículo"""
+        """Última posición conocida de un vehículo (sin consultar el dispositivo)"""
         try:
             if vehicle_id not in self.vehicles:
                 return None
             
-            vehicle_config = self.vehicles[vehicle_id]
-            gps_device_id = vehicle_config.get("gps_device_id")
-            
-            if not gps_device_id or gps_device_id not in self.gps_devices:
+            position = await self.positions.get(vehicle_id)
+            if not position:
                 return None
             
-            device_config = self.gps_devices[gps_device_id]
-            location = await self._get_device_location(gps_device_id, device_config)
-            
-            if location:
-                location["vehicle_id"] = vehicle_id
-                location["vehicle_name"] = vehicle_config["name"]
-                location["license_plate"] = vehicle_config["license_plate"]
-            
-            return location
+            return self._with_vehicle_info(vehicle_id, position, datetime.utcnow())
             
         except Exception as e:
             logger.error(f"Error obteniendo ubicación del vehículo {vehicle_id}: {e}")
             return None
     
     async def get_all_vehicles_locations(self) -> Dict:
-        """Obtener ubicaciones de todos los vehículos"""
-        locations = {}
-        
-        for vehicle_id in self.vehicles:
-            location = await self.get_vehicle_location(vehicle_id)
-            if location:
-                locations[vehicle_id] = location
-        
-        return locations
+        """Últimas posiciones conocidas de todos los vehículos"""
+        now = datetime.utcnow()
+        positions = await self.positions.get_all()
+        return {
+            vehicle_id: self._with_vehicle_info(vehicle_id, position, now)
+            for vehicle_id, position in positions.items()
+            if vehicle_id in self.vehicles
+        }
     
     async def calculate_distance(self, lat1: float, lng1: float, 
                                lat2: float, lng2: float) -> float:
@@ -395,46 +674,214 @@ class GPSService:
             return 0.0
     
     async def get_vehicles_near_location(self, latitude: float, longitude: float, 
-                                       radius_km: float = 5.0) -> List[Dict]:
-        """Obtener vehículos cerca de una ubicación"""
+                                       radius_km: float = 5.0,
+                                       limit: Optional[int] = None) -> List[Dict]:
+        """Vehículos dentro del radio, ordenados por distancia (índice espacial)"""
         try:
-            nearby_vehicles = []
-            
-            for vehicle_id in self.vehicles:
-                location = await self.get_vehicle_location(vehicle_id)
-                
-                if location:
-                    distance = await self.calculate_distance(
-                        latitude, longitude,
-                        location["latitude"], location["longitude"]
-                    )
-                    
-                    if distance <= radius_km:
-                        location["distance_km"] = distance
-                        nearby_vehicles.append(location)
-            
-            # Ordenar por distancia
-            nearby_vehicles.sort(key=lambda x: x["distance_km"])
-            
-            return nearby_vehicles
+            now = datetime.utcnow()
+            nearby = await self.positions.within(latitude, longitude, radius_km, limit)
+            return [
+                {**self._with_vehicle_info(position["vehicle_id"], position, now), "distance_km": distance}
+                for position, distance in nearby
+                if position["vehicle_id"] in self.vehicles
+            ]
             
         except Exception as e:
             logger.error(f"Error obteniendo vehículos cercanos: {e}")
             return []
     
+    async def get_nearest_vehicles(self, latitude: float, longitude: float, k: int = 5) -> List[Dict]:
+        """Los k vehículos más cercanos a una ubicación"""
+        try:
+            now = datetime.utcnow()
+            nearest = await self.positions.nearest(latitude, longitude, k)
+            return [
+                {**self._with_vehicle_info(position["vehicle_id"], position, now), "distance_km": distance}
+                for position, distance in nearest
+                if position["vehicle_id"] in self.vehicles
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error obteniendo vehículos más cercanos: {e}")
+            return []
+    
+    def _history_filter(self, vehicle_id: str):
+        """Condición por vehículo: id en la tabla vehicles o, si no está registrado, su dispositivo"""
+        vehicle_config = self.vehicles.get(vehicle_id, {})
+        if vehicle_config.get("db_id") is not None:
+            return GPSLocation.vehicle_id == vehicle_config["db_id"]
+        if vehicle_config.get("gps_device_id"):
+            return GPSLocation.device_id == vehicle_config["gps_device_id"]
+        return None
+    
     async def get_vehicle_history(self, vehicle_id: str, 
                                 start_time: datetime, 
-                                end_time: datetime) -> List[Dict]:
-        """Obtener historial de ubicaciones de un vehículo"""
+                                end_time: datetime,
+                                limit: Optional[int] = None) -> List[Dict]:
+        """Historial de ubicaciones de un vehículo (el rango sobre created_at poda particiones)"""
         try:
-            # Esta función debería consultar la base de datos
-            # Por ahora retornamos un ejemplo
-            return []
+            condition = self._history_filter(vehicle_id)
+            if condition is None:
+                return []
+            
+            query = (
+                select(
+                    GPSLocation.latitude, GPSLocation.longitude, GPSLocation.altitude,
+                    GPSLocation.speed, GPSLocation.heading, GPSLocation.created_at
+                )
+                .where(condition, GPSLocation.created_at >= start_time, GPSLocation.created_at < end_time)
+                .order_by(GPSLocation.created_at)
+                .limit(limit)
+            )
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(query)
+                return [
+                    {
+                        "latitude": row.latitude,
+                        "longitude": row.longitude,
+                        "altitude": row.altitude,
+                        "speed": row.speed,
+                        "heading": row.heading,
+                        "timestamp": row.created_at
+                    }
+                    for row in result
+                ]
             
         except Exception as e:
             logger.error(f"Error obteniendo historial del vehículo {vehicle_id}: {e}")
             return []
     
+    async def _load_day_columns(self, vehicle_id: str, start: datetime, end: datetime) -> Dict[str, list]:
+        """Leer un día de fixes con cursor del lado del servidor, por bloques, a columnas"""
+        columns = {name: [] for name in ("epoch", "latitude", "longitude", "altitude", "speed", "heading")}
+        condition = self._history_filter(vehicle_id)
+        if condition is None:
+            return columns
+        
+        query = (
+            select(
+                GPSLocation.created_at, GPSLocation.latitude, GPSLocation.longitude,
+                GPSLocation.altitude, GPSLocation.speed, GPSLocation.heading
+            )
+            .where(condition, GPSLocation.created_at >= start, GPSLocation.created_at < end)
+            .order_by(GPSLocation.created_at)
+            .execution_options(yield_per=settings.gps_track_fetch_size)
+        )
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                for created_at, lat, lng, altitude, speed, heading in rows:
+                    columns["epoch"].append(to_epoch(created_at))
+                    columns["latitude"].append(lat)
+                    columns["longitude"].append(lng)
+                    columns["altitude"].append(altitude)
+                    columns["speed"].append(speed)
+                    columns["heading"].append(heading)
+        return columns
+    
+    async def get_vehicle_track(self, vehicle_id: str,
+                                start_time: datetime,
+                                end_time: datetime,
+                                tolerance_m: Optional[float] = None,
+                                zoom: Optional[float] = None,
+                                max_points: Optional[int] = None) -> Dict:
+        """
+        Recorrido simplificado (Douglas-Peucker) para mostrar en el mapa.
+        La importancia de cada punto se calcula una vez por vehículo y día y
+        queda en caché; la tolerancia (en metros o derivada del zoom) y
+        `max_points` solo filtran ese arreglo.
+        """
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        if end <= start:
+            raise ValueError("end_time debe ser posterior a start_time")
+        days = []
+        day = day_start(start_time)
+        while day.timestamp() < end:
+            days.append(day)
+            day += timedelta(days=1)
+        if len(days) > settings.gps_track_max_days:
+            raise ValueError(f"El rango no puede superar {settings.gps_track_max_days} días")
+        
+        windows = []
+        for day in days:
+            track = await self.tracks.get(vehicle_id, day, self._load_day_columns)
+            i, j = track.window(start, end)
+            if j > i:
+                windows.append((track, i, j))
+        
+        original = sum(j - i for _, i, j in windows)
+        if not windows:
+            return {"locations": [], "original_points": 0, "tolerance_m": tolerance_m}
+        
+        if tolerance_m is None and zoom is not None:
+            latitude = float(np.mean(np.concatenate([t.lats[i:j] for t, i, j in windows])))
+            tolerance_m = zoom_tolerance_m(zoom, latitude)
+        
+        importance = np.concatenate([t.importance[i:j] for t, i, j in windows])
+        selected = select_points(importance, tolerance_m, max_points)
+        
+        # Índices globales -> puntos de cada día
+        locations = []
+        offset = 0
+        for track, i, j in windows:
+            count = j - i
+            local = selected[(selected >= offset) & (selected < offset + count)] - offset + i
+            locations.extend(track.points(local))
+            offset += count
+        
+        return {
+            "locations": locations,
+            "original_points": original,
+            "tolerance_m": tolerance_m
+        }
+    
+    def export_locations(self, fmt: str, start_time: datetime, end_time: datetime,
+                         vehicle_id: Optional[str] = None, project_id: Optional[int] = None):
+        """Codificador y flujo de bytes de una exportación (filtros validados antes de transmitir)"""
+        encoder = self.exporter.encoder(fmt)
+        conditions = [GPSLocation.created_at >= start_time, GPSLocation.created_at < end_time]
+        if vehicle_id is not None:
+            condition = self._history_filter(vehicle_id)
+            if condition is None:
+                raise ValueError(f"Vehículo {vehicle_id} no encontrado")
+            conditions.append(condition)
+        if project_id is not None:
+            conditions.append(GPSLocation.project_id == project_id)
+        return encoder, self.exporter.stream(encoder, conditions)
+    
+    async def get_statistics(self, period: str, vehicle_id: Optional[str] = None) -> Dict:
+        """
+        Estadísticas del período a partir de gps_rollups: horas para
+        today/week, días para month/year (a lo sumo 365 filas por vehículo)
+        """
+        bucket, span = {
+            "today": ("hour", timedelta(days=1)),
+            "week": ("hour", timedelta(weeks=1)),
+            "month": ("day", timedelta(days=30)),
+            "year": ("day", timedelta(days=365))
+        }[period]
+        end_time = datetime.utcnow()
+        # "today" es el día UTC en curso; el resto, ventanas móviles
+        start_time = day_start(end_time) if period == "today" else bucket_start(end_time - span, bucket)
+        
+        device_id = None
+        if vehicle_id is not None:
+            vehicle_config = self.vehicles.get(vehicle_id)
+            if vehicle_config is None:
+                raise ValueError(f"Vehículo {vehicle_id} no encontrado")
+            device_id = vehicle_config.get("gps_device_id") or vehicle_id
+        
+        async with AsyncSessionLocal() as db:
+            totals = await summarize(db, bucket, start_time, end_time, device_id)
+        
+        return {
+            "period": period,
+            "vehicle_id": vehicle_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            **totals
+        }
+    
     async def get_system_status(self) -> Dict:
         """Obtener estado del servicio GPS"""
         return {
@@ -447,5 +894,19 @@ class GPSService:
             "update_interval": settings.gps_update_interval,
             "location_callbacks": len(self.location_callbacks),
             "alert_callbacks": len(self.alert_callbacks),
+            "writer": self.writer.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "adaptive_polling": {"enabled": settings.gps_adaptive_polling, **self.motion.get_stats()},
+            "providers": self.providers.get_stats(),
+            "positions": self.positions.get_stats(),
+            "geofences": self.geofences.get_stats(),
+            "partitions": self.partitions.get_stats(),
+            "tracks": self.tracks.get_stats(),
+            "rollups": self.rollups.get_stats(),
+            "exports": self.exporter.get_stats(),
+            "ingest": self.ingest.get_stats(),
+            "wire": {"format": settings.gps_satellite_wire_format, **self.wire_stats},
+            "live": {**self.live.get_stats(), "hub": live_hub.get_stats()},
+            "serial": {device_id: reader.get_stats() for device_id, reader in self.serial_readers.items()},
             "last_updated": datetime.utcnow()
         }
@@ -0,0 +1,219 @@
+# S.A.M.I. - Índice Espacial de Posiciones de Vehículos
+import itertools
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Distancia en km entre puntos; escalares o arreglos (elemento a elemento, con broadcasting)"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class SpatialIndex:
+    """
+    Grilla de celdas de `cell_deg` grados sobre las últimas posiciones.
+    Las coordenadas viven en arreglos NumPy contiguos (un slot por vehículo) y
+    cada celda guarda los slots que contiene; una consulta junta los slots de
+    las celdas que cubren el radio y calcula haversine sobre esos candidatos.
+    Cada fix actualiza su slot en O(1).
+    """
+
+    def __init__(self, cell_deg: Optional[float] = None, capacity: int = 1024):
+        self.cell_deg = cell_deg or settings.gps_spatial_cell_deg
+        self._reset(capacity)
+
+    def _reset(self, capacity: int):
+        self.lats = np.zeros(capacity)
+        self.lngs = np.zeros(capacity)
+        # Radianes y coseno de la latitud precalculados para haversine
+        self._rad = np.zeros((3, capacity))
+        self.keys: List[str] = []  # Vehículo de cada slot
+        self.slots: Dict[str, int] = {}
+        self.cells: Dict[Tuple[int, int], set] = {}
+        self._cell_of: List[Tuple[int, int]] = []  # Celda de cada slot
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def update(self, key: str, lat: float, lng: float):
+        """Insertar o mover un vehículo"""
+        cell = self._cell(lat, lng)
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = len(self.keys)
+            if slot == len(self.lats):
+                self.lats = np.resize(self.lats, slot * 2)
+                self.lngs = np.resize(self.lngs, slot * 2)
+                self._rad = np.concatenate([self._rad, np.zeros_like(self._rad)], axis=1)
+            self.keys.append(key)
+            self._cell_of.append(cell)
+            self.slots[key] = slot
+            self.cells.setdefault(cell, set()).add(slot)
+        elif self._cell_of[slot] != cell:
+            self._discard_from_cell(slot)
+            self._cell_of[slot] = cell
+            self.cells.setdefault(cell, set()).add(slot)
+
+        self.lats[slot] = lat
+        self.lngs[slot] = lng
+        rlat = math.radians(lat)
+        self._rad[:, slot] = (rlat, math.radians(lng), math.cos(rlat))
+
+    def remove(self, key: str):
+        """Quitar un vehículo moviendo el último slot a su lugar"""
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return
+        self._discard_from_cell(slot)
+        last = len(self.keys) - 1
+        if slot != last:
+            moved = self.keys[last]
+            self.keys[slot] = moved
+            self.slots[moved] = slot
+            self.lats[slot] = self.lats[last]
+            self.lngs[slot] = self.lngs[last]
+            self._rad[:, slot] = self._rad[:, last]
+            self.cells[self._cell_of[last]].discard(last)
+            self.cells[self._cell_of[last]].add(slot)
+            self._cell_of[slot] = self._cell_of[last]
+        self.keys.pop()
+        self._cell_of.pop()
+
+    def _discard_from_cell(self, slot: int):
+        cell = self._cell_of[slot]
+        members = self.cells[cell]
+        members.discard(slot)
+        if not members:
+            del self.cells[cell]
+
+    def rebuild(self, positions: Dict[str, Dict]):
+        """Reconstruir desde cero (p. ej. tras leer las posiciones de Redis)"""
+        self._reset(max(1024, len(positions)))
+        for key, position in positions.items():
+            self.update(key, position["latitude"], position["longitude"])
+
+    @staticmethod
+    def _max_lookups(size: int) -> int:
+        """Celdas a consultar en el dict antes de que convenga recorrer los arreglos completos"""
+        return max(64, size // 32)
+
+    def _cell_range(self, lat: float, lng: float, radius_km: float) -> Optional[Tuple[int, int, int, int]]:
+        """Celdas que cubren el radio; None si conviene recorrer todo (antimeridiano o polos)"""
+        dlat = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(abs(lat) + dlat, 90.0)))
+        if cos_lat < 1e-6:
+            return None
+        dlng = radius_km / (KM_PER_DEGREE * cos_lat)
+        if lng - dlng < -180 or lng + dlng > 180:
+            return None
+        i0, j0 = self._cell(lat - dlat, lng - dlng)
+        i1, j1 = self._cell(lat + dlat, lng + dlng)
+        return i0, i1, j0, j1
+
+    def _candidates(self, lat: float, lng: float, radius_km: float):
+        """Slots a evaluar: arreglo de candidatos o slice con todos"""
+        size = len(self.keys)
+        cell_range = self._cell_range(lat, lng, radius_km)
+        if cell_range is None:
+            return slice(0, size)
+        i0, i1, j0, j1 = cell_range
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > self._max_lookups(size):
+            # Muchas celdas en el rango: un filtro por caja sobre los arreglos es más barato
+            lats, lngs = self.lats[:size], self.lngs[:size]
+            lat0, lat1 = i0 * self.cell_deg, (i1 + 1) * self.cell_deg
+            lng0, lng1 = j0 * self.cell_deg, (j1 + 1) * self.cell_deg
+            return np.flatnonzero((lats >= lat0) & (lats <= lat1) & (lngs >= lng0) & (lngs <= lng1))
+        members = [
+            slots for slots in (
+                self.cells.get((i, j))
+                for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)
+            ) if slots
+        ]
+        count = sum(len(slots) for slots in members)
+        if count > size // 2:
+            # La mayoría de la flota es candidata: el filtro vectorizado completo es más barato
+            return slice(0, size)
+        return np.fromiter(itertools.chain.from_iterable(members), dtype=np.intp, count=count)
+
+    def _distances(self, lat: float, lng: float, slots) -> np.ndarray:
+        """Haversine desde el punto a los slots dados (o a todos con slice)"""
+        rlats, rlngs, coslats = self._rad[:, slots]
+        rlat = math.radians(lat)
+        a = (np.sin((rlats - rlat) / 2) ** 2
+             + math.cos(rlat) * coslats * np.sin((rlngs - math.radians(lng)) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def within(self, lat: float, lng: float, radius_km: float,
+               limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Vehículos dentro del radio, ordenados por distancia"""
+        if not self.keys:
+            return []
+        slots = self._candidates(lat, lng, radius_km)
+        distances = self._distances(lat, lng, slots)
+        inside = np.flatnonzero(distances <= radius_km)
+        # Con un slice (todos los slots) la posición en distances es el slot
+        slots = inside if isinstance(slots, slice) else slots[inside]
+        distances = distances[inside]
+
+        order = np.argsort(distances)
+        if limit is not None:
+            order = order[:limit]
+        keys = self.keys
+        return [(keys[slot], distance)
+                for slot, distance in zip(slots[order].tolist(), distances[order].tolist())]
+
+    def nearest(self, lat: float, lng: float, k: int) -> List[Tuple[str, float]]:
+        """Los k vehículos más cercanos"""
+        size = len(self.keys)
+        if not size or k <= 0:
+            return []
+        if k >= size:
+            return self.within(lat, lng, math.inf, limit=k)
+
+        # Ampliar anillos de celdas hasta juntar k candidatos; la k-ésima
+        # distancia entre ellos acota el radio de una consulta exacta. Si hay
+        # que mirar demasiadas celdas vacías, recorrer todo es más barato.
+        ci, cj = self._cell(lat, lng)
+        found: List[int] = []
+        max_lookups = self._max_lookups(size)
+        lookups = 0
+        ring = 0
+        while len(found) < k and lookups <= max_lookups:
+            for i in range(ci - ring, ci + ring + 1):
+                step = 1 if abs(i - ci) == ring else 2 * ring
+                for j in range(cj - ring, cj + ring + 1, step or 1):
+                    slots = self.cells.get((i, j))
+                    if slots:
+                        found.extend(slots)
+            lookups += max(1, 8 * ring)
+            ring += 1
+
+        if len(found) < k:
+            distances = self._distances(lat, lng, slice(0, size))
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest])]
+            keys = self.keys
+            return [(keys[slot], distance)
+                    for slot, distance in zip(nearest.tolist(), distances[nearest].tolist())]
+
+        slots = np.fromiter(found, dtype=np.intp, count=len(found))
+        distances = self._distances(lat, lng, slots)
+        bound = float(np.partition(distances, k - 1)[k - 1])
+        return self.within(lat, lng, bound, limit=k)
+
+    def get_stats(self) -> Dict:
+        return {
+            "vehicles": len(self.keys),
+            "cells": len(self.cells),
+            "cell_deg": self.cell_deg
+        }
@@ -0,0 +1,250 @@
+# S.A.M.I. - Simplificación de Recorridos GPS
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .gps_spatial import KM_PER_DEGREE
+
+M_PER_DEGREE = KM_PER_DEGREE * 1000
+# Metros por píxel en zoom 0 en el ecuador (tiles Web Mercator de 256 px)
+M_PER_PIXEL_ZOOM0 = 156543.03
+# Un día se considera cerrado cuando terminó hace más que esto (escrituras en lote demoradas)
+DAY_SETTLE_SECONDS = 300
+
+def to_epoch(value: datetime) -> float:
+    """Segundos desde epoch; las fechas sin zona se toman como UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def day_start(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def zoom_tolerance_m(zoom: float, latitude: float, pixels: Optional[float] = None) -> float:
+    """Tolerancia en metros equivalente a `pixels` píxeles de pantalla en ese zoom"""
+    pixels = settings.gps_track_pixel_tolerance if pixels is None else pixels
+    return pixels * M_PER_PIXEL_ZOOM0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+def _segment_distance(px, py, ax, ay, bx, by) -> np.ndarray:
+    """Distancia de cada punto a su segmento (a, b), en las unidades de la proyección"""
+    dx = bx - ax
+    dy = by - ay
+    length2 = dx * dx + dy * dy
+    t = ((px - ax) * dx + (py - ay) * dy) / np.where(length2 > 0, length2, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+def dp_importance(lats: np.ndarray, lngs: np.ndarray, max_levels: int = 256) -> np.ndarray:
+    """
+    Rango de Douglas-Peucker de cada punto, en metros: el recorrido
+    simplificado con tolerancia `tol` son los puntos con importancia > tol.
+    Se calcula una sola vez por recorrido; luego cualquier tolerancia o
+    máximo de puntos es un filtro sobre este arreglo.
+
+    En lugar de recursión por segmento, cada iteración divide a la vez todos
+    los segmentos vigentes (un nivel del árbol de DP) con operaciones
+    vectorizadas sobre los puntos pendientes. La importancia de un punto se
+    acota por la del punto que creó su segmento para que el resultado sea
+    monótono. Pasados `max_levels` niveles, los puntos restantes toman su
+    distancia al segmento vigente (aproximación que solo afecta a recorridos
+    degenerados muy profundos).
+    """
+    n = len(lats)
+    importance = np.zeros(n)
+    if n == 0:
+        return importance
+    importance[[0, -1]] = np.inf
+    if n <= 2:
+        return importance
+
+    # Proyección equirectangular local, suficiente para un recorrido de un día
+    y = np.asarray(lats, dtype=float) * M_PER_DEGREE
+    x = np.asarray(lngs, dtype=float) * M_PER_DEGREE * math.cos(math.radians(float(np.mean(lats))))
+
+    kept = np.zeros(n, dtype=bool)
+    kept[[0, -1]] = True
+    pending = np.arange(1, n - 1)
+
+    for level in range(max_levels + 1):
+        if pending.size == 0:
+            break
+        anchors = np.flatnonzero(kept)
+        segment = np.searchsorted(anchors, pending) - 1
+        a = anchors[segment]
+        b = anchors[segment + 1]
+        distance = _segment_distance(x[pending], y[pending], x[a], y[a], x[b], y[b])
+        cap = np.minimum(importance[a], importance[b])
+
+        if level == max_levels:
+            importance[pending] = np.minimum(distance, cap)
+            break
+
+        # pending está ordenado, así que cada segmento es un tramo contiguo
+        starts = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        group = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, segment.size]))
+        group_max = np.maximum.reduceat(distance, starts)[group]
+
+        # Primer máximo de cada segmento con distancia positiva
+        candidates = np.flatnonzero((distance == group_max) & (group_max > 0))
+        split = candidates[np.r_[True, group[candidates[1:]] != group[candidates[:-1]]]] \
+            if candidates.size else candidates
+        # El corte va en el máximo real; la importancia se acota por la del segmento
+        importance[pending[split]] = np.minimum(distance[split], cap[split])
+        kept[pending[split]] = True
+
+        # Los segmentos sin desvío quedan resueltos: sus puntos valen 0
+        done = group_max <= 0
+        done[split] = True
+        pending = pending[~done]
+
+    return importance
+
+def select_points(importance: np.ndarray, tolerance_m: Optional[float] = None,
+                  max_points: Optional[int] = None) -> np.ndarray:
+    """Índices (ordenados) del recorrido simplificado; siempre incluye los extremos"""
+    n = importance.size
+    if n <= 2:
+        return np.arange(n)
+    keep = importance > tolerance_m if tolerance_m is not None else np.ones(n, dtype=bool)
+    keep[[0, -1]] = True
+    indices = np.flatnonzero(keep)
+    if max_points is not None and indices.size > max_points:
+        ranked = importance[indices].copy()
+        ranked[[0, -1]] = np.inf
+        top = np.argpartition(-ranked, max_points - 1)[:max_points]
+        indices = np.sort(indices[top])
+    return indices
+
+@dataclass
+class DayTrack:
+    """Recorrido de un vehículo en un día UTC, con la importancia DP precalculada"""
+    epochs: np.ndarray
+    lats: np.ndarray
+    lngs: np.ndarray
+    altitudes: np.ndarray
+    speeds: np.ndarray
+    headings: np.ndarray
+    importance: np.ndarray
+    loaded_at: float
+    complete: bool
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, list], complete: bool) -> "DayTrack":
+        lats = np.array(columns["latitude"], dtype=float)
+        lngs = np.array(columns["longitude"], dtype=float)
+        return cls(
+            epochs=np.array(columns["epoch"], dtype=float),
+            lats=lats,
+            lngs=lngs,
+            # None -> NaN; se vuelve a None al serializar
+            altitudes=np.array(columns["altitude"], dtype=float),
+            speeds=np.array(columns["speed"], dtype=float),
+            headings=np.array(columns["heading"], dtype=float),
+            importance=dp_importance(lats, lngs),
+            loaded_at=time.monotonic(),
+            complete=complete
+        )
+
+    def __len__(self) -> int:
+        return self.epochs.size
+
+    def window(self, start: float, end: float) -> Tuple[int, int]:
+        """Rango [i, j) de puntos con start <= epoch < end"""
+        return (int(np.searchsorted(self.epochs, start, side="left")),
+                int(np.searchsorted(self.epochs, end, side="left")))
+
+    def points(self, indices: np.ndarray) -> List[Dict]:
+        columns = zip(
+            self.lats[indices].tolist(), self.lngs[indices].tolist(),
+            self.altitudes[indices].tolist(), self.speeds[indices].tolist(),
+            self.headings[indices].tolist(), self.epochs[indices].tolist()
+        )
+        return [
+            {
+                "latitude": lat,
+                "longitude": lng,
+                "altitude": None if altitude != altitude else altitude,
+                "speed": None if speed != speed else speed,
+                "heading": None if heading != heading else heading,
+                "timestamp": datetime.fromtimestamp(epoch, timezone.utc)
+            }
+            for lat, lng, altitude, speed, heading, epoch in columns
+        ]
+
+DayLoader = Callable[[str, datetime, datetime], Awaitable[Dict[str, list]]]
+
+class TrackCache:
+    """
+    LRU en proceso de recorridos por (vehículo, día). Los días cerrados no
+    cambian y quedan hasta que el LRU los desaloja; el día en curso se recarga
+    pasados `today_ttl` segundos. Cargas simultáneas de la misma clave se
+    comparten.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, today_ttl: Optional[float] = None):
+        self.max_entries = max_entries or settings.gps_track_cache_max_entries
+        self.today_ttl = settings.gps_track_cache_today_seconds if today_ttl is None else today_ttl
+        self._entries: "OrderedDict[Tuple[str, datetime], DayTrack]" = OrderedDict()
+        self._loading: Dict[Tuple[str, datetime], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, track: DayTrack) -> bool:
+        return track.complete or time.monotonic() - track.loaded_at < self.today_ttl
+
+    async def get(self, vehicle_id: str, day: datetime, loader: DayLoader) -> DayTrack:
+        key = (vehicle_id, day)
+        track = self._entries.get(key)
+        if track is not None and self._fresh(track):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return track
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            end = day + timedelta(days=1)
+            complete = time.time() > end.timestamp() + DAY_SETTLE_SECONDS
+            track = DayTrack.from_columns(await loader(vehicle_id, day, end), complete)
+            self._entries[key] = track
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            future.set_result(track)
+            return track
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evitar "exception was never retrieved" si nadie más esperaba
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+
+    def invalidate(self, vehicle_id: str):
+        for key in [k for k in self._entries if k[0] == vehicle_id]:
+            del self._entries[key]
+
+    def get_stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "points": sum(len(t) for t in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,175 @@
+# S.A.M.I. - Formato Compacto de Posiciones para Enlaces Satelitales
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .gps_ingest import FixBatch
+
+# Trama: 0xA7, versión, decimales de lat/lng, varint cantidad de
+# dispositivos y por cada uno varint largo + id UTF-8. Sigue un único flujo de
+# varints: la cantidad de fixes de cada dispositivo y luego las columnas de
+# todos los fixes (agrupados por dispositivo, en orden de tiempo), una columna
+# entera detrás de otra. Cada columna va en deltas zigzag respecto del fix
+# anterior del mismo dispositivo (el primero, absoluto). En las columnas
+# opcionales el código 0 indica "sin dato" y el resto es delta + 1.
+# El tiempo viaja en segundos enteros: dos fixes del mismo equipo en el mismo
+# segundo llegan con igual timestamp y la ingesta conserva solo el primero.
+# Los equipos satelitales reportan cada varios segundos; los que necesiten
+# resolución menor al segundo deben usar el formato binario v1.
+COMPACT_MAGIC = 0xA7
+COMPACT_VERSION = 1
+COMPACT_MEDIA_TYPE = "application/vnd.sami.gps-compact"
+
+# Columnas opcionales (de FixBatch) y su escala; timestamp en segundos
+_FIELDS = (
+    ("altitude", 1),          # metros
+    ("speed", 1),             # km/h
+    ("heading", 1),           # grados, delta en (-180, 180]
+    ("accuracy", 1),          # metros
+    ("satellite_count", 1),
+)
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+def _write_varints(values: np.ndarray) -> bytes:
+    """Varints LEB128 de un arreglo de enteros sin signo, sin recorrerlo en Python"""
+    values = values.astype(np.uint64)
+    if not len(values):
+        return b""
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    starts = np.cumsum(sizes) - sizes
+    for k in range(int(sizes.max())):
+        has = sizes > k
+        chunk = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (sizes[has] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + k] = chunk | more
+    return out.tobytes()
+
+def _read_varints(data: np.ndarray) -> np.ndarray:
+    """Inverso de _write_varints sobre un arreglo de bytes completo"""
+    if not len(data):
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(data < 0x80)
+    if not len(ends) or ends[-1] != len(data) - 1:
+        raise ValueError("Trama compacta truncada")
+    starts = np.r_[0, ends[:-1] + 1]
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    if position.max() > 9:
+        raise ValueError("Varint demasiado largo")
+    shifted = (data & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    return np.add.reduceat(shifted, starts)
+
+def _header_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def _deltas(values: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Diferencia con el valor anterior del mismo dispositivo (el primero queda absoluto)"""
+    deltas = np.diff(values, prepend=0)
+    deltas[first] = values[first]
+    return deltas
+
+def _undeltas(deltas: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Suma acumulada que se reinicia en cada dispositivo"""
+    total = np.cumsum(deltas)
+    before = np.r_[0, total[np.cumsum(counts)[:-1] - 1]] if len(counts) else total[:0]
+    return total - np.repeat(before, counts)
+
+def encode_frame(batch: FixBatch, decimals: Optional[int] = None) -> bytes:
+    """Codificar un lote (un tracker o varios) en una trama compacta (tiempo redondeado al segundo)"""
+    decimals = decimals if decimals is not None else settings.gps_compact_decimals
+    if not 0 <= decimals <= 7:
+        raise ValueError("decimals debe estar entre 0 y 7")
+    if np.isnan(batch.latitude).any() or np.isnan(batch.longitude).any():
+        raise ValueError("Todos los fixes necesitan latitud y longitud")
+
+    order = np.lexsort((batch.timestamp_ms, batch.device))
+    device = batch.device[order]
+    used, counts = np.unique(device, return_counts=True)
+    first = np.cumsum(counts) - counts
+
+    columns = [
+        counts.astype(np.uint64),  # Con int64 concatenate promovería todo a float64
+        _zigzag(_deltas(np.round(batch.timestamp_ms[order] / 1000).astype(np.int64), first)),
+        _zigzag(_deltas(np.round(batch.latitude[order] * 10 ** decimals).astype(np.int64), first)),
+        _zigzag(_deltas(np.round(batch.longitude[order] * 10 ** decimals).astype(np.int64), first)),
+    ]
+    for name, scale in _FIELDS:
+        values = getattr(batch, name)[order]
+        present = ~np.isnan(values)
+        quantized = np.round(np.nan_to_num(values) * scale).astype(np.int64)
+        # Delta respecto del último valor presente del mismo dispositivo
+        codes = np.zeros(len(values), dtype=np.uint64)
+        if present.any():
+            kept = quantized[present]
+            kept_first = np.r_[True, device[present][1:] != device[present][:-1]]
+            deltas = _deltas(kept, np.flatnonzero(kept_first))
+            if name == "heading":
+                deltas = np.where(kept_first, kept, (deltas + 179) % 360 - 179)
+            codes[present] = _zigzag(deltas) + np.uint64(1)
+        columns.append(codes)
+
+    header = bytearray((COMPACT_MAGIC, COMPACT_VERSION, decimals))
+    header += _write_varints(np.array([len(used)]))
+    for code in used.tolist():
+        encoded = batch.devices[code].encode()
+        header += _write_varints(np.array([len(encoded)])) + encoded
+    return bytes(header) + _write_varints(np.concatenate(columns))
+
+def decode_frame(data: bytes) -> FixBatch:
+    """Trama compacta -> FixBatch (ordenado por dispositivo y tiempo)"""
+    try:
+        if data[0] != COMPACT_MAGIC or data[1] != COMPACT_VERSION:
+            raise ValueError("Trama compacta desconocida")
+        decimals = data[2]
+        count, offset = _header_varint(data, 3)
+        devices: List[str] = []
+        for _ in range(count):
+            length, offset = _header_varint(data, offset)
+            devices.append(data[offset:offset + length].decode())
+            offset += length
+    except (IndexError, UnicodeDecodeError):
+        raise ValueError("Encabezado de trama compacta truncado")
+
+    values = _read_varints(np.frombuffer(data, dtype=np.uint8, offset=offset))
+    counts = values[:count].astype(np.int64)
+    total = int(counts.sum())
+    if len(values) != count + total * (3 + len(_FIELDS)):
+        raise ValueError(f"La trama declara {total} fixes y trae {len(values) - count} valores")
+    columns = values[count:].reshape(3 + len(_FIELDS), total)
+
+    optional = {}
+    for (name, scale), codes in zip(_FIELDS, columns[3:]):
+        present = codes != 0
+        deltas = np.zeros(total, dtype=np.int64)
+        deltas[present] = _unzigzag(codes[present] - np.uint64(1))
+        restored = _undeltas(deltas, counts).astype(np.float64)
+        if name == "heading":
+            restored %= 360
+        optional[name] = np.where(present, restored / scale, np.nan)
+
+    scale = 10.0 ** decimals
+    return FixBatch(
+        devices,
+        np.repeat(np.arange(count, dtype=np.int64), counts),
+        _undeltas(_unzigzag(columns[0]), counts) * 1000,
+        _undeltas(_unzigzag(columns[1]), counts) / scale,
+        _undeltas(_unzigzag(columns[2]), counts) / scale,
+        **optional
+    )
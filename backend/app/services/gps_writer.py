@@ -0,0 +1,254 @@
+# S.A.M.I. - Escritura Diferida (write-behind) de Ubicaciones GPS
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from asyncpg.exceptions import DataError as PGDataError, IntegrityConstraintViolationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+from ..core.config import settings
+from ..core.database import async_engine
+from ..models.gps import GPSLocation
+
+logger = logging.getLogger(__name__)
+
+# Columnas que se escriben por cada fix (orden usado por COPY)
+COLUMNS = (
+    "vehicle_id", "device_id", "latitude", "longitude", "altitude", "accuracy",
+    "speed", "heading", "gps_status", "satellite_count", "signal_strength",
+    "is_active", "created_at", "project_id"
+)
+
+# Errores de datos (valor fuera de rango, restricción violada): reintentar el
+# lote no sirve, hay que aislar las filas culpables. COPY usa asyncpg directo
+_BAD_DATA_ERRORS = (DataError, IntegrityError, PGDataError, IntegrityConstraintViolationError)
+
+class GPSLocationWriter:
+    """
+    Cola acotada de fixes GPS que se persisten en lotes (COPY o INSERT
+    multi-fila), disparados por tamaño o por tiempo. Si la base de datos no
+    responde, la cola descarta los fixes más antiguos en lugar de bloquear;
+    si rechaza los datos de un lote, se descartan solo las filas inválidas.
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        method: Optional[str] = None
+    ):
+        self.max_queue = max_queue or settings.gps_write_queue_size
+        self.batch_size = batch_size or settings.gps_write_batch_size
+        self.flush_interval = flush_interval or settings.gps_write_flush_interval
+        self.method = method or settings.gps_write_method
+
+        self._queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._retry_delay = 0.0
+        self.running = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0  # Filas que la base rechazó por sus datos
+        self.batches = 0
+        self.failures = 0
+        self.high_watermark = 0
+        self.last_batch_ms = None
+        self.last_error = None
+        self.last_flush_at = None
+
+    async def start(self):
+        """Iniciar la tarea de escritura"""
+        if self._flush_task:
+            return
+        self.running = True
+        self._flush_task = asyncio.create_task(self._flush_worker())
+
+    async def stop(self):
+        """Detener la tarea y persistir lo pendiente"""
+        self.running = False
+        self._wakeup.set()
+        if self._flush_task:
+            await self._flush_task
+            self._flush_task = None
+
+    @staticmethod
+    def build_row(vehicle_id: Optional[int], location: Dict, project_id: Optional[int] = None) -> tuple:
+        """Convertir un fix en una fila con el orden de COLUMNS"""
+        timestamp = location.get("timestamp") or datetime.utcnow()
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return (
+            vehicle_id,
+            location.get("device_id"),
+            location["latitude"],
+            location["longitude"],
+            location.get("altitude"),
+            location.get("accuracy"),
+            location.get("speed"),
+            location.get("heading"),
+            "ONLINE",
+            location.get("satellite_count"),
+            location.get("signal_strength"),
+            True,
+            timestamp,
+            project_id
+        )
+
+    def enqueue(self, vehicle_id: Optional[int], location: Dict, project_id: Optional[int] = None):
+        """Encolar un fix sin bloquear; descarta el más antiguo si la cola está llena"""
+        self._enqueue_rows([self.build_row(vehicle_id, location, project_id)])
+
+    def free_slots(self) -> int:
+        """Fixes que entran sin descartar los más antiguos"""
+        return max(0, self.max_queue - len(self._queue))
+
+    def enqueue_batch(self, rows: List[tuple]) -> bool:
+        """
+        Encolar un lote entero sin descartar fixes ya encolados. El lugar se
+        verifica y ocupa en el mismo paso (sin await de por medio); si no
+        entra completo no se encola nada y devuelve False.
+        """
+        if len(rows) > self.free_slots():
+            return False
+        self._enqueue_rows(rows)
+        return True
+
+    def _enqueue_rows(self, rows: List[tuple]):
+        self._queue.extend(rows)
+        self.enqueued += len(rows)
+        self._trim()
+        if len(self._queue) >= self.batch_size and not self._retry_delay:
+            self._wakeup.set()
+
+    def _trim(self):
+        """Aplicar la política drop-oldest"""
+        overflow = len(self._queue) - self.max_queue
+        for _ in range(max(0, overflow)):
+            self._queue.popleft()
+        if overflow > 0:
+            self.dropped += overflow
+        self.high_watermark = max(self.high_watermark, len(self._queue))
+
+    async def _flush_worker(self):
+        """Escribir lotes cuando se llena un lote o vence el intervalo"""
+        while self.running or self._queue:
+            # Con la base caída se espera el backoff aunque la cola esté llena
+            if self.running and (self._retry_delay or len(self._queue) < self.batch_size):
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=self._retry_delay or self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+
+            if await self.flush():
+                self._retry_delay = 0.0
+            elif not self.running:
+                # Al cerrar no se reintenta indefinidamente
+                logger.error(f"Se descartan {len(self._queue)} fixes GPS pendientes al cerrar")
+                self.dropped += len(self._queue)
+                self._queue.clear()
+            else:
+                self._retry_delay = min(max(self._retry_delay * 2, self.flush_interval), 30.0)
+
+    async def flush(self) -> bool:
+        """Escribir todo lo encolado en lotes; False si falló la base de datos"""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            start = time.perf_counter()
+            try:
+                await self._write(batch)
+                written = len(batch)
+            except _BAD_DATA_ERRORS as e:
+                logger.warning(f"Lote de {len(batch)} fixes GPS rechazado por datos inválidos: {e}")
+                written, remaining, error = await self._write_isolating(batch)
+                if remaining:
+                    self._requeue(remaining, error)
+                    return False
+            except Exception as e:
+                self._requeue(batch, e)
+                return False
+
+            self.written += written
+            self.batches += 1
+            self.last_batch_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.last_flush_at = datetime.utcnow()
+        return True
+
+    def _requeue(self, rows: List[tuple], error: Exception):
+        """Devolver filas al frente de la cola respetando el límite"""
+        self._queue.extendleft(reversed(rows))
+        self._trim()
+        self.failures += 1
+        self.last_error = str(error)
+        logger.warning(f"Error escribiendo {len(rows)} fixes GPS: {error}")
+
+    async def _write_isolating(self, rows: List[tuple]) -> Tuple[int, List[tuple], Optional[Exception]]:
+        """
+        Escribir un lote con datos inválidos partiéndolo a la mitad hasta aislar
+        las filas rechazadas, que se descartan. Devuelve las filas escritas y,
+        si la base falla por otro motivo, las que quedan sin escribir y el error.
+        """
+        written = 0
+        pending = [rows]
+        while pending:
+            chunk = pending.pop()
+            try:
+                await self._write(chunk)
+                written += len(chunk)
+            except _BAD_DATA_ERRORS as e:
+                if len(chunk) == 1:
+                    self.rejected += 1
+                    self.last_error = str(e)
+                    logger.error(f"Se descarta un fix GPS rechazado por la base (device_id={chunk[0][1]!r}): {e}")
+                else:
+                    middle = len(chunk) // 2
+                    pending.extend((chunk[middle:], chunk[:middle]))
+            except Exception as e:
+                remaining = list(chunk)
+                for rest in reversed(pending):
+                    remaining.extend(rest)
+                return written, remaining, e
+        return written, [], None
+
+    async def _write(self, rows: List[tuple]):
+        async with async_engine.begin() as conn:
+            if self.method == "copy":
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    GPSLocation.__tablename__, records=rows, columns=COLUMNS
+                )
+            else:
+                await conn.execute(
+                    insert(GPSLocation.__table__),
+                    [dict(zip(COLUMNS, row)) for row in rows]
+                )
+
+    def get_stats(self) -> Dict:
+        """Métricas de contrapresión de la cola"""
+        return {
+            "method": self.method,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "high_watermark": self.high_watermark,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "failures": self.failures,
+            "retry_delay": self._retry_delay,
+            "last_batch_ms": self.last_batch_ms,
+            "last_flush_at": self.last_flush_at,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,231 @@
+# S.A.M.I. - Servicio de Presencia de Empleados
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import select
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, async_redis_client
+from ..models.employee import Employee
+
+logger = logging.getLogger(__name__)
+
+PRESENT_KEY = "sami:presence:present"  # SET con los ids de empleados presentes
+TOTAL_KEY = "sami:presence:total"  # Cantidad de empleados no eliminados
+RECONCILING_KEY = "sami:presence:reconciling"  # Token de la reconciliación en curso (con TTL)
+JOURNAL_KEY = "sami:presence:journal"  # HASH de cambios durante la reconciliación
+STAGING_KEY = f"{PRESENT_KEY}:staging"
+ALL_STAGING_KEY = "sami:presence:all:staging"
+RECONCILE_TIMEOUT_MS = 60000  # Una reconciliación más lenta se descarta
+
+# Cambio atómico de presencia. El total solo se ajusta si ya existe: si Redis
+# perdió los datos, un INCRBY crearía un total falso en vez de forzar la
+# reconciliación. Mientras hay una reconciliación en curso el cambio también
+# se anota en el journal (e:<id> -> add/remove, t:<id> -> alta o baja) para
+# aplicarlo sobre la lectura de Postgres al reemplazar el SET; se guarda el
+# último cambio por empleado, así que aplicarlo dos veces no cuenta doble.
+# KEYS: PRESENT_KEY, TOTAL_KEY, RECONCILING_KEY, JOURNAL_KEY
+# ARGV: operación (add/remove), id de empleado, delta del total
+_PRESENCE_SCRIPT = """
+if ARGV[1] == 'add' then
+    redis.call('SADD', KEYS[1], ARGV[2])
+else
+    redis.call('SREM', KEYS[1], ARGV[2])
+end
+local delta = tonumber(ARGV[3])
+if delta ~= 0 and redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('INCRBY', KEYS[2], delta)
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    redis.call('HSET', KEYS[4], 'e:' .. ARGV[2], ARGV[1])
+    if delta ~= 0 then
+        redis.call('HSET', KEYS[4], 't:' .. ARGV[2], delta)
+    end
+end
+return 1
+"""
+
+# Reemplazo del estado con la lectura de Postgres más los cambios anotados
+# desde que empezó la reconciliación. Si el token ya no es el vigente (venció
+# o empezó otra reconciliación) no se toca nada.
+# KEYS: PRESENT_KEY, TOTAL_KEY, RECONCILING_KEY, JOURNAL_KEY, STAGING_KEY, ALL_STAGING_KEY
+# ARGV: token, cantidad de presentes, ids presentes..., ids no eliminados...
+# Retorna {presentes, total} o nil si se descartó
+_SWAP_SCRIPT = """
+if redis.call('GET', KEYS[3]) ~= ARGV[1] then
+    return nil
+end
+redis.call('DEL', KEYS[5], KEYS[6])
+local split = 2 + tonumber(ARGV[2])
+for i = 3, split, 5000 do
+    redis.call('SADD', KEYS[5], unpack(ARGV, i, math.min(i + 4999, split)))
+end
+for i = split + 1, #ARGV, 5000 do
+    redis.call('SADD', KEYS[6], unpack(ARGV, i, math.min(i + 4999, #ARGV)))
+end
+local journal = redis.call('HGETALL', KEYS[4])
+for i = 1, #journal, 2 do
+    local kind, id, value = string.sub(journal[i], 1, 1), string.sub(journal[i], 3), journal[i + 1]
+    if kind == 't' then
+        redis.call(tonumber(value) > 0 and 'SADD' or 'SREM', KEYS[6], id)
+    elseif value == 'add' then
+        redis.call('SADD', KEYS[5], id)
+    else
+        redis.call('SREM', KEYS[5], id)
+    end
+end
+local present = redis.call('SCARD', KEYS[5])
+local total = redis.call('SCARD', KEYS[6])
+if present > 0 then
+    redis.call('RENAME', KEYS[5], KEYS[1])
+else
+    redis.call('DEL', KEYS[1])
+end
+redis.call('SET', KEYS[2], total)
+redis.call('DEL', KEYS[3], KEYS[4], KEYS[6])
+return {present, total}
+"""
+
+class PresenceService:
+    """
+    Estado de presencia mantenido de forma incremental en Redis.
+    Check-in/check-out actualizan un SET de ids (idempotente ante reintentos) y
+    el conteo se responde con SCARD sin tocar Postgres. Una tarea periódica
+    reconcilia contra la base de datos.
+    """
+
+    def __init__(self):
+        self.running = False
+        self.last_reconciled_at = None
+        self.last_drift: Optional[Dict] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._script = async_redis_client.register_script(_PRESENCE_SCRIPT)
+        self._swap = async_redis_client.register_script(_SWAP_SCRIPT)
+
+    async def initialize(self):
+        """Reconciliar una vez e iniciar la reconciliación periódica"""
+        try:
+            await self.reconcile()
+        except Exception as e:
+            logger.warning(f"Error en reconciliación inicial de presencia: {e}")
+
+        self.running = True
+        self._reconcile_task = asyncio.create_task(self._reconcile_worker())
+
+    async def shutdown(self):
+        """Detener la reconciliación periódica"""
+        self.running = False
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    async def _reconcile_worker(self):
+        """Tarea de reconciliación periódica"""
+        while self.running:
+            await asyncio.sleep(settings.presence_reconcile_seconds)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Error reconciliando presencia: {e}")
+
+    async def reconcile(self):
+        """
+        Reconstruir el estado de Redis a partir de Postgres. Los check-in/out
+        que ocurren entre la lectura y el reemplazo se anotan en el journal y
+        se vuelven a aplicar, así que no se pierden.
+        """
+        token = uuid.uuid4().hex
+        async with async_redis_client.pipeline(transaction=True) as pipe:
+            pipe.set(RECONCILING_KEY, token, px=RECONCILE_TIMEOUT_MS)
+            pipe.delete(JOURNAL_KEY)
+            await pipe.execute()
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Employee.id, Employee.is_present).where(Employee.is_deleted == False)
+            )
+            rows = result.all()
+        all_ids = [row[0] for row in rows]
+        present_ids = [row[0] for row in rows if row[1]]
+
+        previous = await self._read_counts()
+
+        # Se arma el SET en una clave temporal y se reemplaza con RENAME, todo en el script
+        result = await self._swap(
+            keys=[PRESENT_KEY, TOTAL_KEY, RECONCILING_KEY, JOURNAL_KEY, STAGING_KEY, ALL_STAGING_KEY],
+            args=[token, len(present_ids), *present_ids, *all_ids]
+        )
+        if result is None:
+            logger.warning("Reconciliación de presencia descartada (venció o la reemplazó otra)")
+            return
+        present, total = int(result[0]), int(result[1])
+
+        if previous and (previous["present"], previous["total"]) != (present, total):
+            self.last_drift = {
+                "present": present - previous["present"],
+                "total": total - previous["total"]
+            }
+            logger.warning(f"Presencia desfasada respecto de la base de datos: {self.last_drift}")
+        self.last_reconciled_at = datetime.utcnow()
+
+    async def _read_counts(self) -> Optional[Dict]:
+        """Leer los contadores de Redis (None si aún no se inicializaron)"""
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            pipe.scard(PRESENT_KEY)
+            pipe.get(TOTAL_KEY)
+            present, total = await pipe.execute()
+        if total is None:
+            return None
+        return {"present": int(present), "total": int(total)}
+
+    async def get_counts(self) -> Dict:
+        """Conteo de presentes/ausentes en O(1); reconcilia si no hay datos"""
+        counts = await self._read_counts()
+        if counts is None:
+            await self.reconcile()
+            counts = await self._read_counts()
+            if counts is None:
+                raise RuntimeError("Presencia aún no disponible: hay otra reconciliación en curso")
+        counts["absent"] = counts["total"] - counts["present"]
+        return counts
+
+    async def _apply(self, operation: str, employee_id: int, total_delta: int = 0):
+        """Aplicar un cambio; si Redis falla lo corrige la próxima reconciliación"""
+        try:
+            await self._script(
+                keys=[PRESENT_KEY, TOTAL_KEY, RECONCILING_KEY, JOURNAL_KEY],
+                args=[operation, employee_id, total_delta]
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo actualizar presencia del empleado {employee_id}: {e}")
+
+    async def mark_present(self, employee_id: int):
+        await self._apply("add", employee_id)
+
+    async def mark_absent(self, employee_id: int):
+        await self._apply("remove", employee_id)
+
+    async def employee_created(self, employee: Employee):
+        await self._apply("add" if employee.is_present else "remove", employee.id, total_delta=1)
+
+    async def employee_deleted(self, employee_id: int):
+        await self._apply("remove", employee_id, total_delta=-1)
+
+    def get_stats(self) -> Dict:
+        """Estado de la reconciliación"""
+        return {
+            "running": self.running,
+            "reconcile_interval": settings.presence_reconcile_seconds,
+            "last_reconciled_at": self.last_reconciled_at,
+            "last_drift": self.last_drift
+        }
+
+# Instancia global del servicio de presencia
+presence_service = PresenceService()
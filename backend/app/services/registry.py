@@ -0,0 +1,155 @@
+# S.A.M.I. - Registro Perezoso de Servicios
+import asyncio
+import importlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    """Cómo construir un servicio sin importar su módulo"""
+    name: str
+    target: str  # "modulo:Clase" dentro de app.services
+    depends: Tuple[str, ...] = ()  # Servicios que recibe initialize()
+    start: Optional[str] = None  # Método que arranca el hardware en procesos anfitriones
+    stop: Optional[str] = None  # Método que lo detiene al cerrar la aplicación
+
+class ServiceRegistry:
+    """
+    Contenedor único de servicios del proceso: cada servicio se importa e
+    inicializa una sola vez, bajo demanda o al arrancar si el proceso lo aloja.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, ServiceSpec] = {}
+        self._instances: Dict[str, object] = {}
+        self._ready: Dict[str, object] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._listeners: List[Callable] = []
+        self._timings: Dict[str, Dict] = {}
+
+    def register(
+        self,
+        name: str,
+        target: str,
+        depends: Tuple[str, ...] = (),
+        start: Optional[str] = None,
+        stop: Optional[str] = None
+    ):
+        """Registrar un servicio por ruta "modulo:Clase" sin importarlo"""
+        self._specs[name] = ServiceSpec(name, target, tuple(depends), start, stop)
+
+    def add_listener(self, callback: Callable):
+        """Registrar callback(name, service) que se invoca al quedar listo un servicio"""
+        self._listeners.append(callback)
+
+    def is_hosted(self, name: str) -> bool:
+        """Indica si este proceso inicializa el servicio al arrancar"""
+        return name in settings.hosted_services
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._ready
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def instance(self, name: str):
+        """Importar el módulo y construir la instancia (sin inicializarla)"""
+        service = self._instances.get(name)
+        if service is None:
+            module_name, class_name = self._specs[name].target.split(":")
+            module = importlib.import_module(f"{__package__}.{module_name}")
+            service = getattr(module, class_name)()
+            self._instances[name] = service
+        return service
+
+    async def get(self, name: str):
+        """Obtener el servicio inicializado, inicializándolo una sola vez"""
+        service = self._ready.get(name)
+        if service is not None:
+            return service
+
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if name in self._ready:
+                return self._ready[name]
+
+            spec = self._specs[name]
+            dependencies = [await self.get(dependency) for dependency in spec.depends]
+
+            start = time.perf_counter()
+            service = self.instance(name)
+            imported = time.perf_counter()
+            await service.initialize(*dependencies)
+            initialized = time.perf_counter()
+
+            self._timings[name] = {
+                "import_ms": round((imported - start) * 1000, 2),
+                "init_ms": round((initialized - imported) * 1000, 2),
+                "loaded_at": datetime.utcnow()
+            }
+            self._ready[name] = service
+            for callback in self._listeners:
+                callback(name, service)
+            logger.info(
+                f"Servicio '{name}' cargado en {(initialized - start) * 1000:.0f} ms "
+                f"(importación {self._timings[name]['import_ms']:.0f} ms)"
+            )
+            return service
+
+    def dependency(self, name: str) -> Callable:
+        """Dependencia de FastAPI que garantiza el servicio inicializado"""
+        async def provider():
+            try:
+                return await self.get(name)
+            except Exception as e:
+                logger.error(f"Error inicializando servicio '{name}': {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Service '{name}' unavailable"
+                )
+        return provider
+
+    async def start_hosted(self):
+        """Inicializar y arrancar los servicios que aloja este proceso"""
+        for name, spec in self._specs.items():
+            if not self.is_hosted(name):
+                continue
+            try:
+                service = await self.get(name)
+                if spec.start:
+                    await getattr(service, spec.start)()
+            except Exception as e:
+                logger.warning(f"Error iniciando servicio '{name}': {e}")
+
+    async def shutdown(self):
+        """Detener los servicios inicializados en orden inverso al de carga"""
+        for name in reversed(list(self._ready)):
+            spec = self._specs[name]
+            if not spec.stop:
+                continue
+            try:
+                await getattr(self._ready[name], spec.stop)()
+            except Exception as e:
+                logger.error(f"Error deteniendo servicio '{name}': {e}")
+        self._ready.clear()
+        self._instances.clear()
+
+    def get_stats(self) -> Dict:
+        """Estado de carga y tiempos de inicialización por servicio"""
+        return {
+            name: {
+                "hosted": self.is_hosted(name),
+                "loaded": self.is_ready(name),
+                **self._timings.get(name, {})
+            }
+            for name in self._specs
+        }
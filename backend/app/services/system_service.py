@@ -0,0 +1,139 @@
+# S.A.M.I. - Servicio de Estado del Sistema
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..core.database import async_engine, async_redis_client
+
+logger = logging.getLogger(__name__)
+
+class SystemService:
+    """Servicio que sondea periódicamente la infraestructura y los servicios"""
+
+    def __init__(self):
+        self.services = {}
+        self.snapshot = {}
+        self.running = False
+        self.started_at = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    async def initialize(self):
+        """Ejecutar un primer sondeo e iniciar el sondeo en segundo plano"""
+        try:
+            self.started_at = datetime.utcnow()
+            await self.probe_all()
+
+            self.running = True
+            self._probe_task = asyncio.create_task(self._probe_worker())
+
+            logger.info("Servicio de sistema inicializado correctamente")
+
+        except Exception as e:
+            logger.error(f"Error inicializando servicio de sistema: {e}")
+            raise
+
+    async def shutdown(self):
+        """Detener el sondeo en segundo plano"""
+        self.running = False
+        if self._probe_task:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def register_service(self, name: str, service):
+        """Registrar un servicio con método get_system_status()"""
+        self.services[name] = service
+
+    async def _probe_worker(self):
+        """Tarea de sondeo periódico"""
+        while self.running:
+            await asyncio.sleep(settings.health_probe_interval)
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Error en sondeo del sistema: {e}")
+
+    async def probe_all(self):
+        """Sondear base de datos, Redis y servicios en paralelo"""
+        probes = {
+            "database": self._probe_database(),
+            "redis": self._probe_redis(),
+        }
+        for name, service in self.services.items():
+            probes[name] = self._probe_service(service)
+
+        results = await asyncio.gather(
+            *[self._timed(name, probe) for name, probe in probes.items()]
+        )
+        # Se reemplaza el snapshot completo: los lectores nunca ven uno a medias
+        self.snapshot = dict(results)
+
+    async def _timed(self, name: str, probe) -> tuple:
+        """Ejecutar un sondeo con timeout y medir su latencia"""
+        start = time.perf_counter()
+        result = {"status": "up"}
+        try:
+            details = await asyncio.wait_for(probe, timeout=settings.health_probe_timeout)
+            if details:
+                result["details"] = details
+        except asyncio.TimeoutError:
+            result = {"status": "down", "error": "timeout"}
+        except Exception as e:
+            result = {"status": "down", "error": str(e)}
+
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        result["checked_at"] = datetime.utcnow()
+        return name, result
+
+    async def _probe_database(self):
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _probe_redis(self):
+        await async_redis_client.ping()
+
+    async def _probe_service(self, service) -> Dict:
+        return await service.get_system_status()
+
+    def is_up(self, name: str) -> bool:
+        """Indica si el último sondeo del componente fue exitoso"""
+        return self.snapshot.get(name, {}).get("status") == "up"
+
+    def is_stale(self) -> bool:
+        """Indica si el snapshot es demasiado antiguo (el sondeo se detuvo)"""
+        checked = [r["checked_at"] for r in self.snapshot.values()]
+        if not checked:
+            return True
+        age = (datetime.utcnow() - min(checked)).total_seconds()
+        return age > settings.health_probe_interval * 3
+
+    def get_health(self) -> Dict:
+        """Estado de salud resumido a partir del último snapshot"""
+        database = self.snapshot.get("database", {})
+        healthy = self.is_up("database") and self.is_up("redis") and not self.is_stale()
+
+        return {
+            "healthy": healthy,
+            "database": "connected" if self.is_up("database") else "disconnected",
+            "redis": "connected" if self.is_up("redis") else "disconnected",
+            "checked_at": database.get("checked_at")
+        }
+
+    async def get_system_status(self) -> Dict:
+        """Estado detallado del sistema a partir del último snapshot"""
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "stale": self.is_stale(),
+            "probe_interval": settings.health_probe_interval,
+            "components": self.snapshot,
+            "last_updated": datetime.utcnow()
+        }
@@ -1,5 +1,5 @@
 import { useQuery } from 'react-query'
-import { getEmployees, getAssets, getProjects, getEvents } from '../../services/api'
+import { getPresentEmployeesCount, getAssets, getProjects, getEvents } from '../../services/api'
 import StatCard from '../ui/StatCard'
 import LoadingSpinner from '../ui/LoadingSpinner'
 
@@ -9,11 +9,11 @@ interface DashboardStatsProps {
 }
 
 export default function DashboardStats({ systemStatus, loading }: DashboardStatsProps) {
-  const { data: employees, isLoading: employeesLoading } = useQuery(
-    'employees-stats',
-    () => getEmployees({ limit: 1 }),
+  const { data: presence, isLoading: employeesLoading } = useQuery(
+    'employees-presence',
+    getPresentEmployeesCount,
     {
-      select: (data) => data.length,
+      refetchInterval: 30000, // Contadores en Redis: consulta O(1)
     }
   )
 
@@ -64,12 +64,12 @@ export default function DashboardStats({ systemStatus, loading }: DashboardStats
 
   const stats = [
     {
-      name: 'Empleados',
-      value: employees || 0,
+      name: 'Empleados Presentes',
+      value: presence?.present || 0,
       icon: '👥',
       color: 'blue',
-      change: '+12%',
-      changeType: 'positive',
+      change: `de ${presence?.total || 0}`,
+      changeType: 'neutral',
     },
     {
       name: 'Activos',
@@ -71,12 +71,54 @@ export const getHealthCheck = async () => {
   return response.data
 }
 
+// Pagination
+// Listados paginados por cursor: pasar `next_cursor` como `cursor` para la
+// siguiente página; cada página cuesta lo mismo sin importar la profundidad.
+export interface Page<T> {
+  items: T[]
+  next_cursor: string | null
+  has_more: boolean
+}
+
+export async function* iteratePages<T>(
+  fetchPage: (params: any) => Promise<Page<T>>,
+  params: any = {}
+): AsyncGenerator<T[]> {
+  let cursor: string | null = null
+  do {
+    const page: Page<T> = await fetchPage(cursor ? { ...params, cursor } : params)
+    yield page.items
+    cursor = page.has_more ? page.next_cursor : null
+  } while (cursor)
+}
+
 // Employees API
-export const getEmployees = async (params?: any) => {
+export const getEmployees = async (params?: any): Promise<Page<any>> => {
   const response = await api.get('/employees', { params })
   return response.data
 }
 
+export interface PresenceCounts {
+  present: number
+  total: number
+  absent: number
+}
+
+export const getPresentEmployeesCount = async (): Promise<PresenceCounts> => {
+  const response = await api.get('/employees/present/count')
+  return response.data
+}
+
+export const getEmployeeCheckIns = async (id: number, params?: any): Promise<Page<any>> => {
+  const response = await api.get(`/employees/${id}/check-ins`, { params })
+  return response.data
+}
+
+export const autocompleteEmployees = async (q: string, limit = 10) => {
+  const response = await api.get('/employees/autocomplete', { params: { q, limit } })
+  return response.data
+}
+
 export const getEmployee = async (id: number) => {
   const response = await api.get(`/employees/${id}`)
   return response.data
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de throughput de check-in/check-out concurrentes
+#
+# Uso (ejecutar contra la versión anterior y la actual para comparar):
+#   python scripts/benchmarks/checkin_throughput.py \
+#       --url http://localhost:8000/api/v1 --email admin@empresa.com --password secret \
+#       --concurrency 50 --rounds 20
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Obtener token de acceso"""
+    response = await client.post("/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def checkin_cycle(client: httpx.AsyncClient, employee_id: int, rounds: int, latencies: list) -> int:
+    """Ejecutar ciclos de entrada/salida para un empleado"""
+    ok = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = await client.post("/employees/check-in", json={"employee_id": employee_id})
+        latencies.append(time.perf_counter() - start)
+        ok += response.status_code == 200
+
+        start = time.perf_counter()
+        response = await client.post("/employees/check-out", params={"employee_id": employee_id})
+        latencies.append(time.perf_counter() - start)
+        ok += response.status_code == 200
+    return ok
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        response = await client.get("/employees/", params={"limit": args.concurrency, "is_present": False})
+        response.raise_for_status()
+        employees = response.json()["items"]
+        if not employees:
+            raise SystemExit("No hay empleados ausentes para el benchmark")
+
+        latencies = []
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            checkin_cycle(client, employee["id"], args.rounds, latencies)
+            for employee in employees
+        ])
+        elapsed = time.perf_counter() - start
+
+    total = len(latencies)
+    latencies.sort()
+    print(f"empleados concurrentes: {len(employees)}")
+    print(f"requests: {total} ({sum(results)} OK) en {elapsed:.2f}s")
+    print(f"throughput: {total / elapsed:.1f} req/s")
+    print(f"latencia p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latencia p99: {latencies[int(total * 0.99) - 1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de check-in concurrente")
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de arranque en frío de un worker solo API
+#
+# Importa la aplicación en un proceso nuevo (sin servicios alojados) y reporta
+# el tiempo de importación, el RSS máximo y qué librerías pesadas quedaron
+# cargadas. Con --eager se importan además todos los módulos de servicios,
+# como hacía services/__init__.py antes de la carga perezosa.
+#   python scripts/benchmarks/cold_start.py --runs 5
+#   python scripts/benchmarks/cold_start.py --runs 5 --eager
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend")
+
+HEAVY_MODULES = ["cv2", "face_recognition", "dlib", "torch", "whisper", "pyttsx3",
+                 "sounddevice", "pandas", "reportlab", "openpyxl"]
+
+EAGER_SERVICES = ["ai_service", "voice_service", "camera_service", "rfid_service",
+                  "gps_service", "report_service"]
+
+# Se ejecuta en el proceso hijo: mide solo la importación, no el intérprete
+CHILD = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+for name in {eager!r}:
+    try:
+        importlib.import_module("app.services." + name)
+    except ImportError:
+        pass
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(module: str, eager: bool) -> dict:
+    """Importar el módulo en un intérprete nuevo y devolver sus métricas"""
+    env = dict(os.environ, HOSTED_SERVICES="[]")
+    code = CHILD.format(module=module, eager=EAGER_SERVICES if eager else [], heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Error importando {module}:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    runs = [run_once(args.module, args.eager) for _ in range(args.runs)]
+    times = [r["import_seconds"] * 1000 for r in runs]
+    rss = [r["max_rss_mb"] for r in runs]
+
+    print(f"Módulo: {args.module}{' (+ servicios, eager)' if args.eager else ''}")
+    print(f"Corridas: {args.runs}")
+    print(f"Importación: mediana {statistics.median(times):.0f} ms, "
+          f"mín {min(times):.0f} ms, máx {max(times):.0f} ms")
+    print(f"RSS máximo: mediana {statistics.median(rss):.1f} MB")
+    print(f"Librerías pesadas cargadas: {', '.join(runs[-1]['heavy_loaded']) or 'ninguna'}")
+
+    if args.max_import_ms and statistics.median(times) > args.max_import_ms:
+        print(f"FALLA: la importación supera {args.max_import_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de importación y RSS de un worker solo API")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="Importar también todos los servicios")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="Umbral para usar en CI")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark del motor de geofences
+#
+# Genera geofences sintéticas (círculos y polígonos irregulares) y mide el
+# costo por fix de GeofenceEngine.evaluate, la compilación de celdas y el
+# costo de un alta/cambio incremental. Verifica contra una evaluación exacta
+# de fuerza bruta. No requiere base de datos.
+#   python scripts/benchmarks/geofence_engine.py --geofences 5000
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_geofences import GeofenceEngine  # noqa: E402
+
+CENTER = (-34.6037, -58.3816)
+
+
+def make_geofence(geofence_id: int, spread: float):
+    lat = CENTER[0] + random.uniform(-spread, spread)
+    lng = CENTER[1] + random.uniform(-spread, spread)
+    fields = dict(
+        id=geofence_id, name=f"geofence_{geofence_id}", geofence_type="worksite",
+        center_latitude=lat, center_longitude=lng, radius_meters=None, polygon_coordinates=None,
+        is_active=True, is_deleted=False, alert_on_enter=True, alert_on_exit=True
+    )
+    if random.random() < 0.6:
+        fields["radius_meters"] = random.uniform(50, 1500)
+    else:
+        # Polígono estrellado alrededor del centro
+        vertices = random.randint(5, 24)
+        radius_deg = random.uniform(100, 2000) / 111320
+        fields["polygon_coordinates"] = [
+            [lat + math.sin(a) * radius_deg * random.uniform(0.4, 1.0),
+             lng + math.cos(a) * radius_deg * random.uniform(0.4, 1.0) / math.cos(math.radians(lat))]
+            for a in sorted(random.uniform(0, 2 * math.pi) for _ in range(vertices))
+        ]
+    return SimpleNamespace(**fields)
+
+
+def brute_force(geofences, lat: float, lng: float) -> set:
+    """Evaluación exacta escalar sobre todas las geofences"""
+    inside = set()
+    for g in geofences:
+        if g.polygon_coordinates:
+            points = g.polygon_coordinates
+            crossings = False
+            for (ay, ax), (by, bx) in zip(points, points[1:] + points[:1]):
+                if (ay > lat) != (by > lat) and lng < ax + (lat - ay) * (bx - ax) / (by - ay):
+                    crossings = not crossings
+            if crossings:
+                inside.add(g.id)
+        else:
+            dlat = math.radians(g.center_latitude - lat)
+            dlng = math.radians(g.center_longitude - lng)
+            a = (math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat)) *
+                 math.cos(math.radians(g.center_latitude)) * math.sin(dlng / 2) ** 2)
+            if 2 * 6371000 * math.asin(math.sqrt(a)) <= g.radius_meters:
+                inside.add(g.id)
+    return inside
+
+
+def percentile(samples, fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main(args) -> int:
+    random.seed(args.seed)
+    geofences = [make_geofence(n + 1, args.spread) for n in range(args.geofences)]
+
+    engine = GeofenceEngine(cell_deg=args.cell_deg)
+    start = time.perf_counter()
+    for geofence in geofences:
+        engine.upsert(geofence)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Vehículos que se mueven de a pasos cortos
+    vehicles = {f"vehicle_{n}": [CENTER[0] + random.uniform(-args.spread, args.spread),
+                                 CENTER[1] + random.uniform(-args.spread, args.spread)]
+                for n in range(args.vehicles)}
+
+    def step():
+        for position in vehicles.values():
+            position[0] += random.uniform(-0.002, 0.002)
+            position[1] += random.uniform(-0.002, 0.002)
+            yield position
+
+    # Primera pasada: compila celdas de forma perezosa
+    start = time.perf_counter()
+    for vehicle_id, position in zip(vehicles, step()):
+        engine.evaluate(vehicle_id, *position)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    samples, events = [], 0
+    for _ in range(args.rounds):
+        for vehicle_id, position in zip(vehicles, step()):
+            t0 = time.perf_counter_ns()
+            events += len(engine.evaluate(vehicle_id, *position))
+            samples.append((time.perf_counter_ns() - t0) / 1000)
+
+    # Costo de un cambio incremental (mover una geofence)
+    upsert_us = []
+    for geofence in random.sample(geofences, min(200, len(geofences))):
+        moved = make_geofence(geofence.id, args.spread)
+        t0 = time.perf_counter_ns()
+        engine.upsert(moved)
+        upsert_us.append((time.perf_counter_ns() - t0) / 1000)
+        geofences[geofence.id - 1] = moved
+
+    mismatches = 0
+    for _ in range(args.checks):
+        lat = CENTER[0] + random.uniform(-args.spread, args.spread)
+        lng = CENTER[1] + random.uniform(-args.spread, args.spread)
+        mismatches += engine.containing(lat, lng) != brute_force(geofences, lat, lng)
+
+    stats = engine.get_stats()
+    print(f"Geofences: {args.geofences} ({stats['cells']} celdas, {stats['large_geofences']} grandes), "
+          f"índice en {build_ms:.0f} ms")
+    print(f"Primera pasada ({args.vehicles} fixes, compila celdas): {cold_ms:.0f} ms")
+    print(f"Por fix: media {statistics.mean(samples):.1f} µs, p50 {percentile(samples, 0.5):.1f} µs, "
+          f"p99 {percentile(samples, 0.99):.1f} µs ({len(samples)} fixes, {events} entradas/salidas)")
+    print(f"Cambio incremental de geofence: media {statistics.mean(upsert_us):.1f} µs")
+    print(f"Diferencias contra fuerza bruta: {mismatches}/{args.checks}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Costo por fix del motor de geofences")
+    parser.add_argument("--geofences", type=int, default=5000)
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--spread", type=float, default=0.5, help="Grados alrededor del centro")
+    parser.add_argument("--cell-deg", type=float, default=0.01)
+    parser.add_argument("--checks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
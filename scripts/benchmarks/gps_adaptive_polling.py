@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Simulación del sondeo GPS adaptativo
+#
+# Simula en tiempo virtual una flota de maquinaria pesada (estacionada de
+# noche en el obrador y con tramos de trabajo y espera durante el turno) y
+# camiones (en ruta con paradas), con el obrador como geofence y parte de la
+# maquinaria estacionada junto a su borde. Cada sondeo pasa por MotionPoller
+# con las políticas de gps_motion y GeofenceEngine.near_edge, igual que
+# GPSService._adapt_poll_interval. Compara sondeos (y fixes escritos) contra
+# el intervalo fijo y mide cuánto tarda en verse cada arranque. Falla si la
+# reducción para la maquinaria pesada es menor que --min-reduction.
+#   python scripts/benchmarks/gps_adaptive_polling.py --machines 80 --trucks 20 --hours 24
+import argparse
+import heapq
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from app.services.gps_geofences import GeofenceEngine  # noqa: E402
+from app.services.gps_motion import MotionPoller, load_policies  # noqa: E402
+
+CENTER = (-34.6037, -58.3816)
+DEPOT_RADIUS_M = 800.0
+STEP = 10  # segundos por paso del recorrido simulado
+M_PER_DEG = 111320
+
+
+def offset(lat: float, lng: float, north_m: float, east_m: float):
+    return lat + north_m / M_PER_DEG, lng + east_m / (M_PER_DEG * math.cos(math.radians(lat)))
+
+
+def make_route(kind: str, hours: float, edge_parked: float):
+    """(lats, lngs, speeds) cada STEP segundos y los instantes en que arranca"""
+    steps = int(hours * 3600 / STEP)
+    lats, lngs, speeds = np.empty(steps), np.empty(steps), np.zeros(steps)
+    # Estacionan dentro del obrador; una fracción junto al borde
+    near_edge = random.random() < edge_parked
+    distance = DEPOT_RADIUS_M - random.uniform(20, 80) if near_edge else random.uniform(0, 400)
+    angle = random.uniform(0, 2 * math.pi)
+    home = offset(*CENTER, distance * math.cos(angle), distance * math.sin(angle))
+    lat, lng = home
+    heading = random.uniform(0, 360)
+    moving = False
+    starts = []
+    n = 0
+    while n < steps:
+        hour = (n * STEP / 3600) % 24
+        shift = (7, 17) if kind == "heavy_machinery" else (5, 21)
+        working = shift[0] <= hour < shift[1]
+        speed = random.uniform(4, 12) if kind == "heavy_machinery" else random.uniform(40, 80)
+        away = math.hypot((lat - home[0]) * M_PER_DEG, (lng - home[1]) * M_PER_DEG)
+        if not working and away > 1:
+            # Fin del turno: vuelve a su lugar en el obrador
+            moving, returning = True, True
+            length = away / (speed / 3.6)
+        elif kind == "heavy_machinery":
+            moving, returning = working and not moving and random.random() < 0.5, False
+            length = random.uniform(5, 20) * 60 if moving else (random.uniform(20, 90) * 60 if working else 3600)
+        else:
+            moving, returning = working and not moving, False
+            length = random.uniform(40, 120) * 60 if moving else (random.uniform(10, 40) * 60 if working else 3600)
+        if moving:
+            starts.append(n * STEP)
+        end = min(steps, n + max(1, math.ceil(length / STEP)))
+        for k in range(n, end):
+            if returning:
+                left = math.hypot((lat - home[0]) * M_PER_DEG, (lng - home[1]) * M_PER_DEG)
+                share = min(1.0, speed / 3.6 * STEP / max(left, 1e-9))
+                lat, lng = lat + (home[0] - lat) * share, lng + (home[1] - lng) * share
+            elif moving:
+                heading = (heading + random.gauss(0, 8)) % 360
+                step_m = speed / 3.6 * STEP
+                lat, lng = offset(lat, lng, step_m * math.cos(math.radians(heading)),
+                                  step_m * math.sin(math.radians(heading)))
+                if kind == "heavy_machinery" and math.hypot((lat - CENTER[0]) * M_PER_DEG,
+                                                            (lng - CENTER[1]) * M_PER_DEG) > 3000:
+                    heading = (heading + 180) % 360  # No se aleja de la obra
+            lats[k], lngs[k], speeds[k] = lat, lng, speed if moving else 0.0
+        if returning:
+            lat, lng = home
+        n = end
+    return lats, lngs, speeds, starts
+
+
+def simulate(args, vehicles, adaptive: bool):
+    engine = GeofenceEngine()
+    engine._add(SimpleNamespace(
+        id=1, name="Obrador", geofence_type="worksite", center_latitude=CENTER[0],
+        center_longitude=CENTER[1], radius_meters=DEPOT_RADIUS_M, polygon_coordinates=None,
+        is_active=True, is_deleted=False, alert_on_enter=True, alert_on_exit=True
+    ))
+    motion = MotionPoller(load_policies({}))
+    origin = datetime(2026, 1, 5)
+    end = args.hours * 3600
+    heap = [(random.uniform(0, args.interval), vehicle_id) for vehicle_id in vehicles]
+    heapq.heapify(heap)
+    polls = {vehicle_id: [] for vehicle_id in vehicles}
+    while heap:
+        now, vehicle_id = heapq.heappop(heap)
+        if now >= end:
+            continue
+        kind, (lats, lngs, speeds, _) = vehicles[vehicle_id]
+        k = min(int(now / STEP), len(lats) - 1)
+        lat, lng = offset(lats[k], lngs[k], random.gauss(0, args.noise), random.gauss(0, args.noise))
+        polls[vehicle_id].append((now, speeds[k] > 0))
+        interval = args.interval
+        if adaptive:
+            position = {
+                "latitude": lat, "longitude": lng,
+                "speed": max(0.0, speeds[k] + random.gauss(0, 0.3)),
+                "timestamp": origin + timedelta(seconds=now)
+            }
+            interval = motion.observe(vehicle_id, kind, args.interval, position, engine.near_edge)
+        heapq.heappush(heap, (now + interval, vehicle_id))
+    return polls, motion
+
+
+def start_latencies(vehicles, polls):
+    """
+    Segundos entre cada arranque y el primer sondeo posterior, y arranques
+    cuyo tramo en movimiento terminó antes de ese sondeo (solo se ve el
+    desplazamiento)
+    """
+    result, missed = {}, {}
+    for vehicle_id, (kind, route) in vehicles.items():
+        times = np.array([t for t, _ in polls[vehicle_id]])
+        moving = np.array([m for _, m in polls[vehicle_id]], dtype=bool)
+        for start in route[3]:
+            after = np.searchsorted(times, start)
+            if after < len(times):
+                result.setdefault(kind, []).append(times[after] - start)
+                missed[kind] = missed.get(kind, 0) + (not moving[after])
+    return result, missed
+
+
+def main(args) -> int:
+    random.seed(args.seed)
+    vehicles = {}
+    for n in range(args.machines):
+        vehicles[f"machine_{n}"] = ("heavy_machinery", make_route("heavy_machinery", args.hours, args.edge_parked))
+    for n in range(args.trucks):
+        vehicles[f"truck_{n}"] = ("truck", make_route("truck", args.hours, args.edge_parked))
+
+    fixed, _ = simulate(args, vehicles, adaptive=False)
+    started = time.perf_counter()
+    adaptive, motion = simulate(args, vehicles, adaptive=True)
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.machines} máquinas + {args.trucks} camiones, {args.hours:.0f} h, "
+          f"intervalo fijo {args.interval:.0f} s")
+    print(f"{'tipo':<16} {'fijo':>9} {'adaptativo':>11} {'reducción':>10} "
+          f"{'arranque p50':>13} {'p95':>7} {'máx':>7} {'no vistos':>10}")
+    latencies, missed = start_latencies(vehicles, adaptive)
+    baseline_latencies, baseline_missed = start_latencies(vehicles, fixed)
+    reductions = {}
+    for kind in ("heavy_machinery", "truck"):
+        ids = [v for v, (k, _) in vehicles.items() if k == kind]
+        if not ids:
+            continue
+        before = sum(len(fixed[v]) for v in ids)
+        after = sum(len(adaptive[v]) for v in ids)
+        reductions[kind] = before / after
+        lat = sorted(latencies.get(kind, [0]))
+        print(f"{kind:<16} {before:>9,} {after:>11,} {before / after:>9.1f}x "
+              f"{statistics.median(lat):>12.0f}s {lat[int(0.95 * (len(lat) - 1))]:>6.0f}s {lat[-1]:>6.0f}s "
+              f"{missed.get(kind, 0):>4}/{len(lat):<5}")
+        fixed_lat = sorted(baseline_latencies.get(kind, [0]))
+        print(f"{'  (fijo)':<16} {'':>9} {'':>11} {'':>10} {statistics.median(fixed_lat):>12.0f}s "
+              f"{fixed_lat[int(0.95 * (len(fixed_lat) - 1))]:>6.0f}s {fixed_lat[-1]:>6.0f}s "
+              f"{baseline_missed.get(kind, 0):>4}/{len(fixed_lat):<5}")
+
+    stats = motion.get_stats()
+    print(f"Métrica del servicio: {stats['polls']:,} sondeos en lugar de {stats['baseline_polls']:,} "
+          f"({stats['polls_avoided']:,} evitados, {stats['reduction']}x), fixes escritos "
+          f"{stats['fixes_written']:,} de {stats['baseline_fixes']:,}; retenidos junto a geofence "
+          f"{stats['edge_holds']:,}")
+    print(f"Costo de la política: {elapsed / max(stats['polls'], 1) * 1e6:.1f} µs por sondeo")
+
+    ok = reductions.get("heavy_machinery", args.min_reduction) >= args.min_reduction
+    print(f"Reducción para maquinaria pesada: {reductions.get('heavy_machinery', 0):.1f}x "
+          f"(requerido {args.min_reduction:.0f}x) -> {'OK' if ok else 'FALLA'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sondeos GPS con intervalo fijo vs adaptativo al movimiento")
+    parser.add_argument("--machines", type=int, default=80, help="Maquinaria pesada")
+    parser.add_argument("--trucks", type=int, default=20, help="Camiones")
+    parser.add_argument("--hours", type=float, default=24.0, help="Horas simuladas")
+    parser.add_argument("--interval", type=float, default=30.0, help="Intervalo del dispositivo (segundos)")
+    parser.add_argument("--edge-parked", type=float, default=0.05,
+                        help="Fracción de la flota estacionada a menos de 80 m del borde del obrador")
+    parser.add_argument("--noise", type=float, default=4.0, help="Ruido del GPS (metros, desvío)")
+    parser.add_argument("--min-reduction", type=float, default=10.0, help="Reducción mínima para maquinaria")
+    parser.add_argument("--seed", type=int, default=3)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de codificación de la exportación GPS
+#
+# Pasa bloques sintéticos de filas de gps_locations por cada codificador de
+# /gps/export (como llegarían del cursor del servidor) y mide filas/s, bytes
+# por fila y el pico de memoria con tracemalloc (en corridas aparte, porque
+# tracemalloc frena la asignación), que no debe crecer con la cantidad de
+# filas. Relee la salida para verificar el conteo. No requiere
+# base de datos; Parquet requiere pyarrow.
+#   python scripts/benchmarks/gps_export_formats.py --rows 1000000
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_export import ENCODERS  # noqa: E402
+
+
+def chunks(total: int, chunk_size: int):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    produced = 0
+    while produced < total:
+        size = min(chunk_size, total - produced)
+        yield [
+            (produced + n, random.randint(1, 200), f"gps_{random.randint(1, 200)}", 7,
+             -34.6 + random.random() / 10, -58.4 + random.random() / 10, 25.0, 3.5,
+             random.uniform(0, 60), random.uniform(0, 360), 9, 0.9,
+             start + timedelta(seconds=5 * (produced + n)))
+            for n in range(size)
+        ]
+        produced += size
+
+
+def count_rows(fmt: str, data: bytes) -> int:
+    if fmt == "ndjson":
+        return sum(1 for line in data.splitlines() if json.loads(line))
+    if fmt == "csv":
+        return sum(1 for _ in csv.reader(io.StringIO(data.decode()))) - 1
+    import pyarrow.parquet as pq
+    return pq.read_metadata(io.BytesIO(data)).num_rows
+
+
+def run(fmt: str, rows: int, chunk_size: int, keep: bool = False, trace: bool = False):
+    random.seed(1)
+    if trace:
+        tracemalloc.start()
+    encoder = ENCODERS[fmt]()
+    output = io.BytesIO() if keep else None
+    written = 0
+    encode_s = 0.0
+    parts = [encoder.begin()]
+    for chunk in chunks(rows, chunk_size):
+        t0 = time.perf_counter()
+        parts.append(encoder.encode(chunk))
+        encode_s += time.perf_counter() - t0
+        for part in parts:
+            written += len(part)
+            if output is not None:
+                output.write(part)
+        parts = []
+    t0 = time.perf_counter()
+    tail = encoder.end()
+    encode_s += time.perf_counter() - t0
+    written += len(tail)
+    if output is not None:
+        output.write(tail)
+    peak = None
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return encode_s, written, peak, output.getvalue() if output is not None else None
+
+
+def main(args) -> int:
+    failures = 0
+    for fmt in args.formats:
+        try:
+            ENCODERS[fmt]()
+        except ImportError:
+            print(f"{fmt:<8} omitido (falta pyarrow)")
+            continue
+        encode_s, written, _, _ = run(fmt, args.rows, args.chunk_size)
+        # Memoria con 3 y 30 bloques: debe quedar igual
+        _, _, small_peak, _ = run(fmt, args.chunk_size * 3, args.chunk_size, trace=True)
+        _, _, large_peak, _ = run(fmt, args.chunk_size * 30, args.chunk_size, trace=True)
+        _, _, _, sample = run(fmt, args.chunk_size * 3, args.chunk_size, keep=True)
+        counted = count_rows(fmt, sample)
+        ok = counted == args.chunk_size * 3
+        failures += not ok
+        print(f"{fmt:<8} {args.rows / encode_s:12,.0f} filas/s  {written / args.rows:6.1f} B/fila  "
+              f"pico {small_peak / 2**20:5.1f} MiB con {args.chunk_size * 3} filas, "
+              f"{large_peak / 2**20:5.1f} MiB con {args.chunk_size * 30}"
+              f"{'' if ok else f'  CONTEO {counted}'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput de los codificadores de /gps/export")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--formats", nargs="+", default=list(ENCODERS), choices=list(ENCODERS))
+    sys.exit(main(parser.parse_args()))
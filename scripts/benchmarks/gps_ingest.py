@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de la ingesta masiva de fixes (/gps/ingest)
+#
+# Genera los buffers de muchos trackers (recorridos con fixes repetidos e
+# inválidos mezclados), los codifica en lotes JSON y binarios y los pasa por
+# GPSService.ingest_fixes con geofences sintéticas cargadas. Mide fixes/s
+# por etapa (lectura del cuerpo, validación y deduplicación, pipeline
+# completo) en un solo proceso y verifica que la cola de escritura reciba
+# exactamente los fixes válidos y únicos. No requiere base de datos; sin
+# Redis la deduplicación entre lotes se omite (se cuenta en watermark_errors).
+#   python scripts/benchmarks/gps_ingest.py --fixes 200000 --batch 5000
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from app.services.gps_ingest import encode_binary, parse_binary, parse_json  # noqa: E402
+from app.services.gps_service import GPSService  # noqa: E402
+
+CENTER = (-34.6037, -58.3816)
+
+
+def make_fixes(args):
+    """Fixes de todos los trackers, en el orden en que llegarían (por tracker)"""
+    now = datetime.now(timezone.utc)
+    fixes = []
+    per_device = args.fixes // args.devices
+    for d in range(args.devices):
+        lat = CENTER[0] + random.uniform(-0.2, 0.2)
+        lng = CENTER[1] + random.uniform(-0.2, 0.2)
+        start = now - timedelta(seconds=5 * per_device + random.uniform(0, 600))
+        for n in range(per_device):
+            lat += random.gauss(0, 0.0002)
+            lng += random.gauss(0, 0.0002)
+            fix = {
+                "device_id": f"tracker_{d}",
+                "timestamp": (start + timedelta(seconds=5 * n)).isoformat(),
+                "latitude": round(lat, 7), "longitude": round(lng, 7),
+                "altitude": round(random.uniform(10, 60), 2), "accuracy": round(random.uniform(2, 15), 1),
+                "speed": round(random.uniform(0, 60), 2), "heading": round(random.uniform(0, 359), 2),
+                "satellite_count": random.randint(5, 14)
+            }
+            roll = random.random()
+            if roll < args.invalid:
+                fix["latitude"] = fix["longitude"] = 0.0  # Receptor sin fix
+            fixes.append(fix)
+            if roll > 1 - args.duplicates:
+                fixes.append(dict(fix))  # Reenvío del mismo fix
+    return fixes
+
+
+def expected_rows(fixes) -> int:
+    return len({(f["device_id"], f["timestamp"]) for f in fixes if f["latitude"] != 0.0})
+
+
+def make_geofences(engine, count: int):
+    for n in range(count):
+        engine._add(SimpleNamespace(
+            id=n + 1, name=f"geofence_{n + 1}", geofence_type="worksite",
+            center_latitude=CENTER[0] + random.uniform(-0.2, 0.2),
+            center_longitude=CENTER[1] + random.uniform(-0.2, 0.2),
+            radius_meters=random.uniform(100, 1500), polygon_coordinates=None,
+            is_active=True, is_deleted=False, alert_on_enter=False, alert_on_exit=False
+        ))
+    engine.loaded_at = datetime.utcnow()
+
+
+def new_service(args) -> GPSService:
+    service = GPSService()
+    service.writer.max_queue = args.fixes * 2
+    service.positions.owner = True  # Como en el proceso anfitrión: sin publicar en Redis por lote
+    service.geofences._refresh_task = object()  # Ya cargadas: no consultar la base
+    make_geofences(service.geofences, args.geofences)
+    for d in range(int(args.devices * args.registered)):
+        service.vehicles[f"vehicle_{d}"] = {
+            "vehicle_id": f"vehicle_{d}", "name": f"Máquina {d}", "license_plate": f"AAA-{d:03d}",
+            "gps_device_id": f"tracker_{d}", "db_id": d + 1, "project_id": None, "enabled": True
+        }
+    return service
+
+
+async def run(args, fixes, fmt: str):
+    bodies = []
+    for start in range(0, len(fixes), args.batch):
+        body = json.dumps({"fixes": fixes[start:start + args.batch]}).encode()
+        if fmt == "binary":
+            body = encode_binary(parse_json(body))
+        bodies.append(body)
+    parse = parse_binary if fmt == "binary" else parse_json
+
+    t0 = time.perf_counter()
+    batches = [parse(body) for body in bodies]
+    parse_s = time.perf_counter() - t0
+
+    service = new_service(args)
+    t0 = time.perf_counter()
+    for batch in batches:
+        valid, _ = service.ingest.validate(batch)
+        service.ingest.dedupe(batch.take(valid))
+    prepare_s = time.perf_counter() - t0
+
+    service = new_service(args)
+    t0 = time.perf_counter()
+    for batch in batches:
+        await service.ingest_fixes(batch)
+    pipeline_s = time.perf_counter() - t0
+    return bodies, parse_s, prepare_s, pipeline_s, service
+
+
+async def main(args) -> int:
+    logging.disable(logging.WARNING)
+    random.seed(args.seed)
+    fixes = make_fixes(args)
+    expected = expected_rows(fixes)
+    print(f"{len(fixes)} fixes de {args.devices} trackers en lotes de {args.batch}, "
+          f"{args.geofences} geofences, {expected} válidos y únicos")
+
+    failures = 0
+    for fmt in ("json", "binary"):
+        bodies, parse_s, prepare_s, pipeline_s, service = await run(args, fixes, fmt)
+        stats = service.ingest.get_stats()
+        queued = service.writer.get_stats()["queued"]
+        ok = queued == expected
+        failures += not ok
+        size = sum(len(body) for body in bodies) / len(fixes)
+        print(f"{fmt:<7} {size:6.1f} B/fix  lectura {len(fixes) / parse_s:10,.0f} fixes/s  "
+              f"validación+dedupe {len(fixes) / prepare_s:10,.0f} fixes/s  "
+              f"pipeline {len(fixes) / pipeline_s:8,.0f} fixes/s  (+lectura: "
+              f"{len(fixes) / (parse_s + pipeline_s):8,.0f})")
+        print(f"        encolados {queued}, repetidos {stats['duplicates']}, rechazados {stats['rejected']}, "
+              f"resúmenes pendientes {len(service.rollups._pending)}"
+              f"{'' if ok else f'  ESPERADOS {expected}'}")
+        if args.check_rows and fmt == "binary":
+            rows = list(service.writer._queue)
+            sample = rows[np.random.randint(len(rows))]
+            print(f"        fila de ejemplo: {sample}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput de /gps/ingest por worker")
+    parser.add_argument("--fixes", type=int, default=200000)
+    parser.add_argument("--devices", type=int, default=400)
+    parser.add_argument("--batch", type=int, default=5000, help="Fixes por request")
+    parser.add_argument("--registered", type=float, default=0.9, help="Fracción de trackers con vehículo asignado")
+    parser.add_argument("--geofences", type=int, default=500)
+    parser.add_argument("--duplicates", type=float, default=0.02)
+    parser.add_argument("--invalid", type=float, default=0.01)
+    parser.add_argument("--check-rows", action="store_true", help="Mostrar una fila encolada")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark del reparto de posiciones en vivo (/gps/ws)
+#
+# Simula visores WebSocket conectados a un worker (la mayoría de toda la
+# flota, algunos con filtro y algunos lentos) y entrega ticks como los que
+# publica LivePublisher. Mide el costo de reparto por tick, los mensajes
+# enviados y cuántos se fusionaron en clientes lentos. Verifica que cada
+# cliente termine con la última posición de los vehículos que sigue. No
+# requiere Redis.
+#   python scripts/benchmarks/gps_live_fanout.py --clients 500 --vehicles 2000
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_live import LiveClient, LiveHub  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.messages = 0
+        self.bytes = 0
+        self.latest = {}
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        self.messages += 1
+        self.bytes += len(text)
+        self.latest.update(json.loads(text)["positions"])
+
+
+def make_tick(vehicles: int, changed: int, tick: int) -> str:
+    positions = {
+        f"vehicle_{n}": {"lat": -34.6 + random.random() / 10, "lng": -58.4 + random.random() / 10,
+                         "speed": random.uniform(0, 60), "heading": random.uniform(0, 360), "ts": tick}
+        for n in random.sample(range(vehicles), changed)
+    }
+    return json.dumps({"type": "positions", "positions": positions})
+
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    hub = LiveHub()
+    clients, tasks = [], []
+    for n in range(args.clients):
+        slow = n < args.clients * args.slow_fraction
+        websocket = FakeWebSocket(args.slow_delay if slow else 0.0)
+        filtered = random.random() < args.filtered_fraction
+        client = LiveClient(websocket)
+        client.subscribe(
+            [f"vehicle_{v}" for v in random.sample(range(args.vehicles), 20)] if filtered else None, {}
+        )
+        hub.clients.add(client)  # Sin suscripción a Redis: los ticks se entregan a mano
+        clients.append(client)
+        tasks.append(asyncio.create_task(client.run()))
+    await asyncio.sleep(0.01)
+
+    expected = {}
+    dispatch_ms = []
+    for tick in range(args.ticks):
+        raw = make_tick(args.vehicles, args.changed, tick)
+        expected.update(json.loads(raw)["positions"])
+        start = time.perf_counter()
+        hub.dispatch(raw)
+        dispatch_ms.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(args.tick)
+
+    await asyncio.sleep(args.slow_delay * 3 + 0.05)
+    for task in tasks:
+        task.cancel()
+
+    mismatches = 0
+    for client in clients:
+        wanted = client.vehicles if client.vehicles is not None else expected.keys()
+        latest = client.websocket.latest
+        mismatches += any(expected.get(v) != latest.get(v) for v in wanted if v in expected)
+
+    sent = sum(c.websocket.messages for c in clients)
+    coalesced = sum(c.coalesced for c in clients)
+    sent_bytes = sum(c.websocket.bytes for c in clients)
+    print(f"{args.clients} clientes, {args.ticks} ticks de {args.changed}/{args.vehicles} vehículos")
+    print(f"Reparto por tick: mediana {statistics.median(dispatch_ms):.2f} ms, máx {max(dispatch_ms):.2f} ms")
+    print(f"Mensajes enviados: {sent} ({sent_bytes / 2**20:.1f} MiB), fusionados en clientes lentos: {coalesced}")
+    print(f"Clientes con posiciones desactualizadas: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reparto de posiciones en vivo a visores WebSocket")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=300, help="Vehículos que cambian por tick")
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--tick", type=float, default=0.05, help="Segundos entre ticks")
+    parser.add_argument("--filtered-fraction", type=float, default=0.2)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=0.2, help="Segundos por envío de un cliente lento")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
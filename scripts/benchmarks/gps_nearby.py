@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de consultas de vehículos cercanos
+#
+# Compara la búsqueda anterior (haversine escalar con una corrutina por
+# vehículo) con el índice espacial en grilla: consultas por radio, k más
+# cercanos y costo de actualizar un fix. Verifica que ambos devuelvan los
+# mismos vehículos. No requiere base de datos ni Redis.
+#   python scripts/benchmarks/gps_nearby.py --vehicles 10000
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_service import GPSService  # noqa: E402
+from app.services.gps_spatial import SpatialIndex  # noqa: E402
+
+# Región de prueba alrededor de Buenos Aires
+CENTER = (-34.6037, -58.3816)
+
+
+def random_point(spread: float):
+    return (CENTER[0] + random.uniform(-spread, spread), CENTER[1] + random.uniform(-spread, spread))
+
+
+async def legacy_nearby(service: GPSService, locations: dict, lat: float, lng: float, radius_km: float):
+    """Implementación anterior: una corrutina de distancia por vehículo"""
+    nearby = []
+    for vehicle_id, location in locations.items():
+        distance = await service.calculate_distance(lat, lng, location["latitude"], location["longitude"])
+        if distance <= radius_km:
+            nearby.append((vehicle_id, distance))
+    nearby.sort(key=lambda x: x[1])
+    return nearby
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def report(name: str, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<28} media {statistics.mean(samples):8.3f} ms   p99 {p99:8.3f} ms")
+
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    service = GPSService()
+    index = SpatialIndex(cell_deg=args.cell_deg)
+    locations = {}
+    for n in range(args.vehicles):
+        lat, lng = random_point(args.spread)
+        locations[f"vehicle_{n}"] = {"latitude": lat, "longitude": lng}
+        index.update(f"vehicle_{n}", lat, lng)
+
+    queries = [random_point(args.spread) for _ in range(args.queries)]
+    legacy_ms, within_ms, nearest_ms = [], [], []
+    mismatches = 0
+
+    for lat, lng in queries:
+        start = time.perf_counter()
+        expected = await legacy_nearby(service, locations, lat, lng, args.radius)
+        legacy_ms.append((time.perf_counter() - start) * 1000)
+
+        result, elapsed = timed(index.within, lat, lng, args.radius)
+        within_ms.append(elapsed)
+        mismatches += [v for v, _ in result] != [v for v, _ in expected]
+
+        result, elapsed = timed(index.nearest, lat, lng, args.k)
+        nearest_ms.append(elapsed)
+        mismatches += [v for v, _ in result] != [v for v, _ in expected[:args.k]] and len(expected) >= args.k
+
+    # Costo de actualizar un fix (movimientos cortos, a veces cambian de celda)
+    keys = list(locations)
+    update_ns = []
+    for _ in range(args.queries * 100):
+        key = random.choice(keys)
+        lat = locations[key]["latitude"] + random.uniform(-0.001, 0.001)
+        lng = locations[key]["longitude"] + random.uniform(-0.001, 0.001)
+        start = time.perf_counter_ns()
+        index.update(key, lat, lng)
+        update_ns.append(time.perf_counter_ns() - start)
+
+    print(f"Vehículos: {args.vehicles}, radio: {args.radius} km, k: {args.k}, celdas: {index.get_stats()['cells']}")
+    report("anterior (radio)", legacy_ms)
+    report("índice (radio)", within_ms)
+    report("índice (k más cercanos)", nearest_ms)
+    print(f"{'actualización de fix':<28} media {statistics.mean(update_ns) / 1000:8.3f} µs")
+    print(f"Aceleración por radio: {statistics.mean(legacy_ms) / statistics.mean(within_ms):.0f}x")
+    print(f"Resultados distintos: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultas de vehículos cercanos")
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=5.0, help="km")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--spread", type=float, default=0.5, help="Grados alrededor del centro")
+    parser.add_argument("--cell-deg", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark del parser NMEA de receptores GPS serie
+#
+# Reproduce una grabación NMEA (por defecto fixtures/gps_serial_replay.nmea:
+# arranque sin fix, cruce de medianoche y líneas corruptas) entregándola al
+# parser en bloques del tamaño de una lectura del puerto, y mide sentencias/s.
+# Verifica los fixes contra un parser de referencia directo (split por
+# línea y checksum byte a byte). No requiere hardware.
+#   python scripts/benchmarks/gps_nmea_parser.py --chunk 64 256 4096
+#   python scripts/benchmarks/gps_nmea_parser.py --replay mi_grabacion.nmea --show 3
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from functools import reduce
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_nmea import NMEAParser  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "gps_serial_replay.nmea")
+
+
+def reference_fixes(data: bytes):
+    """(timestamp, lat, lng) por instante con posición válida, línea por línea"""
+    epochs = {}
+    order = []
+    for raw in data.splitlines():
+        line = raw.strip()
+        if not line.startswith(b"$") or b"*" not in line or line.count(b"$") != 1:
+            continue
+        body, checksum = line[1:].split(b"*", 1)
+        if reduce(lambda a, b: a ^ b, body, 0) != int(checksum[:2] or b"-1", 16):
+            continue
+        fields = body.decode().split(",")
+        kind = fields[0][2:]
+        if kind not in ("GGA", "RMC"):
+            continue
+        epoch = epochs.setdefault(fields[1], {})
+        if fields[1] not in order:
+            order.append(fields[1])
+        if kind == "GGA" and fields[6] not in ("", "0"):
+            lat = int(fields[2][:2]) + float(fields[2][2:]) / 60
+            lng = int(fields[4][:3]) + float(fields[4][3:]) / 60
+            epoch.setdefault("position", (-lat if fields[3] == "S" else lat, -lng if fields[5] == "W" else lng))
+        elif kind == "RMC":
+            epoch["date"] = fields[9]
+            if fields[2] == "A":
+                lat = int(fields[3][:2]) + float(fields[3][2:]) / 60
+                lng = int(fields[5][:3]) + float(fields[5][3:]) / 60
+                epoch.setdefault("position", (-lat if fields[4] == "S" else lat, -lng if fields[6] == "W" else lng))
+            else:
+                epoch["invalid"] = True
+    result = []
+    d = None
+    for utc in order:
+        epoch = epochs[utc]
+        d = epoch.get("date", d)  # RMC perdida: fecha del instante anterior
+        if "position" in epoch and not epoch.get("invalid") and d:
+            day = datetime(2000 + int(d[4:6]), int(d[2:4]), int(d[0:2]))
+            moment = day + timedelta(hours=int(utc[:2]), minutes=int(utc[2:4]), seconds=float(utc[4:]))
+            result.append((moment, *epoch["position"]))
+    return result
+
+
+def parse(data: bytes, chunk: int):
+    parser = NMEAParser("serial_1")
+    fixes = []
+    for offset in range(0, len(data), chunk):
+        fixes.extend(parser.feed(data[offset:offset + chunk]))
+    fixes.extend(parser.flush())
+    return parser, fixes
+
+
+def main(args) -> int:
+    with open(args.replay, "rb") as f:
+        data = f.read()
+
+    parser, fixes = parse(data, 4096)
+    reference = reference_fixes(data)
+    got = [(f["timestamp"], f["latitude"], f["longitude"]) for f in fixes]
+    mismatches = sum(
+        1 for a, b in zip(got, reference)
+        if a[0] != b[0] or abs(a[1] - b[1]) > 1e-9 or abs(a[2] - b[2]) > 1e-9
+    ) + abs(len(got) - len(reference))
+    stats = parser.get_stats()
+    print(f"{args.replay}: {len(data) / 1024:.0f} KiB, {stats['sentences']} sentencias")
+    print(f"Fixes {stats['fixes']} (referencia {len(reference)}), sin fix {stats['no_fix']}, "
+          f"checksum inválido {stats['checksum_errors']}, mal formadas {stats['malformed']}, "
+          f"otras {stats['ignored']}; diferencias {mismatches}")
+    if fixes:
+        print(f"Primer fix {fixes[0]['timestamp']}, último {fixes[-1]['timestamp']}")
+    for fix in fixes[:args.show]:
+        print(f"  {fix}")
+
+    repeats = max(1, args.sentences // max(stats["sentences"], 1))
+    for chunk in args.chunk:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            parse(data, chunk)
+        elapsed = time.perf_counter() - start
+        print(f"Bloques de {chunk:>5} B: {stats['sentences'] * repeats / elapsed:12,.0f} sentencias/s  "
+              f"({stats['fixes'] * repeats / elapsed:10,.0f} fixes/s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentencias NMEA por segundo y verificación de una grabación")
+    parser.add_argument("--replay", default=FIXTURE, help="Archivo NMEA grabado del puerto serie")
+    parser.add_argument("--chunk", type=int, nargs="+", default=[64, 512, 4096],
+                        help="Bytes por lectura del puerto")
+    parser.add_argument("--sentences", type=int, default=200000, help="Sentencias a procesar por tamaño de bloque")
+    parser.add_argument("--show", type=int, default=0, help="Fixes a mostrar")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de consultas por rango sobre historial GPS particionado
+#
+# Crea en un esquema temporal dos copias de un año de fixes sintéticos, una
+# en tabla simple y otra particionada por mes como gps_locations, y compara:
+#   - historial de un vehículo (un día y una semana)
+#   - agregado de toda la flota sobre un mes
+#   - retención de un mes: DELETE contra DETACH + DROP de la partición
+# Informa tiempos y cuántas particiones toca cada plan (poda).
+#   DATABASE_URL=postgresql://... python scripts/benchmarks/gps_partition_queries.py --vehicles 100
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+SCHEMA = "bench_gps_partitions"
+YEAR_START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+COLUMNS = """
+    id bigserial,
+    vehicle_id integer NOT NULL,
+    latitude double precision NOT NULL,
+    longitude double precision NOT NULL,
+    speed double precision,
+    created_at timestamptz NOT NULL
+"""
+
+LOAD = """
+    INSERT INTO {table} (vehicle_id, latitude, longitude, speed, created_at)
+    SELECT v, -34.6 + random() / 10, -58.4 + random() / 10, random() * 60,
+           CAST(:start AS timestamptz) + g * make_interval(secs => :interval)
+    FROM generate_series(1, :vehicles) v,
+         generate_series(0, :fixes_per_vehicle - 1) g
+"""
+
+QUERIES = [
+    ("vehículo, 1 día", """
+        SELECT latitude, longitude, speed, created_at FROM {table}
+        WHERE vehicle_id = :vehicle_id
+          AND created_at >= CAST(:day AS timestamptz) AND created_at < CAST(:day AS timestamptz) + interval '1 day'
+        ORDER BY created_at
+    """),
+    ("vehículo, 1 semana", """
+        SELECT latitude, longitude, speed, created_at FROM {table}
+        WHERE vehicle_id = :vehicle_id
+          AND created_at >= CAST(:day AS timestamptz) AND created_at < CAST(:day AS timestamptz) + interval '7 days'
+        ORDER BY created_at
+    """),
+    ("flota, agregado de 1 mes", """
+        SELECT vehicle_id, count(*), avg(speed) FROM {table}
+        WHERE created_at >= CAST(:month AS timestamptz) AND created_at < CAST(:month AS timestamptz) + interval '1 month'
+        GROUP BY vehicle_id
+    """),
+]
+
+
+def add_months(day: datetime, months: int) -> datetime:
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def scanned_relations(plan: dict) -> set:
+    found = set()
+    if plan.get("Relation Name"):
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found |= scanned_relations(child)
+    return found
+
+
+def setup(conn, args):
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS})"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.parted ({COLUMNS}) PARTITION BY RANGE (created_at)"))
+    for month in range(12):
+        start, end = add_months(YEAR_START, month), add_months(YEAR_START, month + 1)
+        conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.parted_p{start:%Y_%m} PARTITION OF {SCHEMA}.parted "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+
+    interval = 365 * 86400 / args.fixes_per_vehicle
+    for table in ("plain", "parted"):
+        start = time.perf_counter()
+        conn.execute(text(LOAD.format(table=f"{SCHEMA}.{table}")), {
+            "start": YEAR_START, "interval": interval,
+            "vehicles": args.vehicles, "fixes_per_vehicle": args.fixes_per_vehicle
+        })
+        conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (vehicle_id, created_at)"))
+        conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+        conn.commit()
+        print(f"Carga {table}: {args.vehicles * args.fixes_per_vehicle} filas en {time.perf_counter() - start:.1f} s")
+
+
+def run_queries(conn, args) -> int:
+    params = {
+        "vehicle_id": args.vehicles // 2 or 1,
+        "day": YEAR_START + timedelta(days=200),
+        "month": add_months(YEAR_START, 6),
+    }
+    failures = 0
+    for name, query in QUERIES:
+        for table in ("plain", "parted"):
+            sql = query.format(table=f"{SCHEMA}.{table}")
+            used = {k: v for k, v in params.items() if f":{k}" in sql}
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                conn.execute(text(sql), used).fetchall()
+                samples.append((time.perf_counter() - start) * 1000)
+            raw = conn.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"), used)
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            relations = scanned_relations(plan)
+            note = ""
+            if table == "parted":
+                pruned = len(relations) <= (2 if "semana" in name else 1)
+                failures += not pruned
+                note = f"  particiones: {len(relations)}{'' if pruned else ' (SIN PODA)'}"
+            print(f"{name:<26} {table:<7} mediana {statistics.median(samples):9.2f} ms{note}")
+    return failures
+
+
+def run_retention(conn):
+    month = YEAR_START
+    start = time.perf_counter()
+    conn.execute(text(
+        f"DELETE FROM {SCHEMA}.plain WHERE created_at < CAST(:end AS timestamptz)"
+    ), {"end": add_months(month, 1)})
+    conn.commit()
+    delete_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    conn.execute(text(f"ALTER TABLE {SCHEMA}.parted DETACH PARTITION {SCHEMA}.parted_p{month:%Y_%m}"))
+    conn.execute(text(f"DROP TABLE {SCHEMA}.parted_p{month:%Y_%m}"))
+    conn.commit()
+    drop_s = time.perf_counter() - start
+    print(f"Retención de 1 mes: DELETE {delete_s:.2f} s, DETACH + DROP {drop_s * 1000:.0f} ms")
+
+
+def main(args) -> int:
+    engine = create_engine(args.database_url)
+    with engine.connect() as conn:
+        try:
+            setup(conn, args)
+            failures = run_queries(conn, args)
+            run_retention(conn)
+        finally:
+            if not args.keep:
+                conn.rollback()
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+                conn.commit()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consultas por rango sobre historial GPS particionado")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--fixes-per-vehicle", type=int, default=35040, help="35040 = un fix cada 15 minutos")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="No borrar el esquema de prueba")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("se requiere --database-url o DATABASE_URL")
+    sys.exit(main(args))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Prueba del cliente de proveedores GPS contra un proveedor simulado
+#
+# Levanta un servidor HTTP local que imita la API del proveedor y ejercita
+# ProviderClient / GPSService: pool keep-alive, reintentos con backoff,
+# apertura y cierre del circuito, respaldo con la última posición conocida y
+# que un proveedor lento no bloquee el event loop. Sale con código 1 si
+# alguna verificación falla.
+#   python scripts/benchmarks/gps_provider_stub.py
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configuración acotada para que la prueba sea rápida (antes de importar la app)
+os.environ.setdefault("GPS_PROVIDER_TIMEOUT", "0.5")
+os.environ.setdefault("GPS_PROVIDER_RETRIES", "2")
+os.environ.setdefault("GPS_PROVIDER_BACKOFF", "0.05")
+os.environ.setdefault("GPS_PROVIDER_BREAKER_THRESHOLD", "3")
+os.environ.setdefault("GPS_PROVIDER_BREAKER_RESET", "1")
+os.environ.setdefault("SATELLITE_COMMUNICATION_ENABLED", "true")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_providers import ProviderUnavailable  # noqa: E402
+from app.services.gps_service import GPSService  # noqa: E402
+
+
+class StubState:
+    mode = "ok"  # ok | down | slow | flaky
+    flaky_failures = 0
+    requests = 0
+    connections = set()
+    lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with StubState.lock:
+            StubState.requests += 1
+            StubState.connections.add(self.client_address)
+            mode = StubState.mode
+            if mode == "flaky" and StubState.flaky_failures > 0:
+                StubState.flaky_failures -= 1
+                mode = "down"
+
+        if mode == "slow":
+            time.sleep(2)
+        if mode == "down":
+            return self._send(503, {"error": "unavailable"})
+
+        device_id = self.path.split("/")[2]
+        self._send(200, {
+            "device_id": device_id, "latitude": -34.6, "longitude": -58.38,
+            "speed": 12.5, "heading": 90, "satellite_count": 9
+        })
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente cortó por timeout
+
+
+def set_mode(mode: str, flaky_failures: int = 0):
+    with StubState.lock:
+        StubState.mode = mode
+        StubState.flaky_failures = flaky_failures
+
+
+async def loop_lag_during(coro) -> float:
+    """Máximo atraso del event loop (ms) mientras corre la corrutina"""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, (time.perf_counter() - start - 0.01) * 1000)
+
+    tick = asyncio.create_task(ticker())
+    try:
+        return await coro, lag
+    finally:
+        done = True
+        await tick
+
+
+async def main() -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+
+    service = GPSService()
+    device = {"device_id": "stub_1", "device_type": "satellite",
+              "api_endpoint": endpoint, "api_key": "test", "update_interval": 5, "enabled": True}
+    client = service.providers.client_for(device)
+    failures = 0
+
+    def check(name: str, ok: bool, detail: str = ""):
+        nonlocal failures
+        failures += not ok
+        print(f"[{'OK' if ok else 'FALLA'}] {name}{f' ({detail})' if detail else ''}")
+
+    # 1. Respuestas normales reutilizan conexiones del pool
+    set_mode("ok")
+    for _ in range(20):
+        location = await service._get_satellite_location("stub_1", device)
+    check("ubicación del proveedor", location and location["latitude"] == -34.6 and not location.get("stale"))
+    check("keep-alive", len(StubState.connections) <= 2, f"{len(StubState.connections)} conexiones para 20 pedidos")
+
+    # 2. Fallas transitorias se recuperan con reintentos
+    set_mode("flaky", flaky_failures=2)
+    location = await service._get_satellite_location("stub_1", device)
+    check("reintentos con backoff", location is not None and not location.get("stale"),
+          f"reintentos={client.retries}")
+
+    # 3. Proveedor caído: se abre el circuito y se responde con la última posición
+    set_mode("down")
+    for _ in range(3):
+        location = await service._get_satellite_location("stub_1", device)
+    check("respaldo con última posición", location is not None and location.get("stale") is True)
+    check("circuito abierto", client.breaker.state == "open", client.breaker.state)
+
+    before = StubState.requests
+    start = time.perf_counter()
+    try:
+        await client.get_location("stub_1")
+        short_circuit = False
+    except ProviderUnavailable:
+        short_circuit = True
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    check("falla rápida con circuito abierto", short_circuit and StubState.requests == before,
+          f"{elapsed_ms:.1f} ms")
+
+    # 4. Semiabierto: un intento exitoso cierra el circuito
+    set_mode("ok")
+    await asyncio.sleep(float(os.environ["GPS_PROVIDER_BREAKER_RESET"]) + 0.1)
+    location = await service._get_satellite_location("stub_1", device)
+    check("circuito cerrado tras recuperación",
+          client.breaker.state == "closed" and not location.get("stale"), client.breaker.state)
+
+    # 5. Un proveedor lento no congela el event loop
+    set_mode("slow")
+    _, lag_ms = await loop_lag_during(asyncio.gather(
+        *[service._get_satellite_location("stub_1", device) for _ in range(5)]
+    ))
+    check("event loop libre con proveedor lento", lag_ms < 100, f"atraso máximo {lag_ms:.1f} ms")
+
+    print(json.dumps(service.providers.get_stats(), indent=2))
+    await service.providers.close()
+    server.shutdown()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de simplificación de recorridos GPS
+#
+# Genera un día sintético de fixes (cada 5 s, con detenciones y ruido de GPS)
+# y mide el cálculo de importancia Douglas-Peucker vectorizado, el filtro por
+# zoom y una consulta servida desde la caché por día. Verifica contra un
+# Douglas-Peucker recursivo de referencia y que ningún punto descartado quede
+# a más de la tolerancia del recorrido simplificado. No requiere base de datos.
+#   python scripts/benchmarks/gps_track_simplify.py --interval 5
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.services.gps_tracks import (  # noqa: E402
+    M_PER_DEGREE, TrackCache, _segment_distance, dp_importance, select_points, zoom_tolerance_m
+)
+
+CENTER = (-34.6037, -58.3816)
+
+
+def synthetic_day(points: int, rng) -> dict:
+    heading = np.cumsum(rng.normal(0, 0.05, points))
+    moving = rng.random(points) > 0.2
+    step = rng.uniform(0, 15, points) * moving
+    lats = CENTER[0] + np.cumsum(np.cos(heading) * step) / M_PER_DEGREE + rng.normal(0, 2e-5, points)
+    lngs = CENTER[1] + np.cumsum(np.sin(heading) * step) / M_PER_DEGREE + rng.normal(0, 2e-5, points)
+    start = datetime(2025, 6, 1, tzinfo=timezone.utc).timestamp()
+    return {
+        "epoch": (start + np.arange(points) * 86400 / points).tolist(),
+        "latitude": lats.tolist(),
+        "longitude": lngs.tolist(),
+        "altitude": [None] * points,
+        "speed": (step * 3.6).tolist(),
+        "heading": np.degrees(heading % (2 * math.pi)).tolist()
+    }
+
+
+def project(lats, lngs):
+    y = lats * M_PER_DEGREE
+    x = lngs * M_PER_DEGREE * math.cos(math.radians(float(np.mean(lats))))
+    return x, y
+
+
+def reference_dp(lats, lngs, tolerance: float) -> list:
+    """Douglas-Peucker clásico con pila, un segmento por vez"""
+    x, y = project(lats, lngs)
+    keep = {0, len(lats) - 1}
+    stack = [(0, len(lats) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        d = _segment_distance(x[i + 1:j], y[i + 1:j], x[i], y[i], x[j], y[j])
+        k = int(np.argmax(d))
+        if d[k] > tolerance:
+            keep.add(i + 1 + k)
+            stack += [(i, i + 1 + k), (i + 1 + k, j)]
+    return sorted(keep)
+
+
+def max_deviation(lats, lngs, indices) -> float:
+    """Mayor distancia de un punto descartado a su tramo del recorrido simplificado"""
+    x, y = project(lats, lngs)
+    everything = np.arange(len(lats))
+    segment = np.clip(np.searchsorted(indices, everything, side="right") - 1, 0, len(indices) - 2)
+    a, b = indices[segment], indices[segment + 1]
+    return float(_segment_distance(x, y, x[a], y[a], x[b], y[b]).max())
+
+
+def main(args) -> int:
+    rng = np.random.default_rng(args.seed)
+    points = 86400 // args.interval
+    columns = synthetic_day(points, rng)
+    lats, lngs = np.array(columns["latitude"]), np.array(columns["longitude"])
+
+    start = time.perf_counter()
+    importance = dp_importance(lats, lngs)
+    dp_ms = (time.perf_counter() - start) * 1000
+    print(f"Día sintético: {points} puntos, importancia DP en {dp_ms:.1f} ms")
+
+    failures = 0
+    for zoom in (10, 12, 14, 16, 18):
+        tolerance = zoom_tolerance_m(zoom, CENTER[0])
+        t0 = time.perf_counter()
+        selected = select_points(importance, tolerance)
+        filter_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        expected = reference_dp(lats, lngs, tolerance)
+        reference_ms = (time.perf_counter() - t0) * 1000
+
+        deviation = max_deviation(lats, lngs, selected)
+        ok = selected.tolist() == expected and deviation <= tolerance + 1e-6
+        failures += not ok
+        print(f"zoom {zoom:>2} (tol {tolerance:7.2f} m): {selected.size:6d} puntos, filtro {filter_ms:.2f} ms, "
+              f"DP recursivo {reference_ms:7.1f} ms, desvío máx {deviation:.2f} m"
+              f"{'' if ok else '  DIFERENCIA'}")
+
+    selected = select_points(importance, None, args.max_points)
+    print(f"max_points={args.max_points}: {selected.size} puntos, "
+          f"desvío máx {max_deviation(lats, lngs, selected):.1f} m")
+
+    async def cached_queries():
+        cache = TrackCache(max_entries=8, today_ttl=60)
+        day = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+        async def loader(vehicle_id, day_start, day_end):
+            return columns
+
+        t0 = time.perf_counter()
+        await cache.get("vehicle_1", day, loader)
+        cold_ms = (time.perf_counter() - t0) * 1000
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            track = await cache.get("vehicle_1", day, loader)
+            track.points(select_points(track.importance, zoom_tolerance_m(14, CENTER[0])))
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"Caché por día: carga {cold_ms:.1f} ms, consulta zoom 14 desde caché "
+              f"{np.median(samples):.2f} ms ({cache.get_stats()})")
+
+    asyncio.run(cached_queries())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simplificación Douglas-Peucker de recorridos GPS")
+    parser.add_argument("--interval", type=int, default=5, help="Segundos entre fixes")
+    parser.add_argument("--max-points", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de tamaño del formato compacto para enlaces satelitales
+#
+# Genera recorridos de maquinaria (fix cada --interval segundos, velocidad y
+# rumbo suaves, tramos detenidos) y compara los bytes por trama de la
+# respuesta JSON de un proveedor, el lote binario v1 de /gps/ingest y la trama
+# compacta (gps_wire), para tramas de uno o varios fixes acumulados por el
+# equipo entre contactos. Verifica el error de cuantización de la trama
+# compacta y que los fixes decodificados pasen la validación de la ingesta.
+# Falla si la reducción frente a JSON es menor que --min-ratio.
+#   python scripts/benchmarks/gps_wire_size.py --frame 1 10 60 --devices 20
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from app.services.gps_ingest import GPSIngest, encode_binary, from_fixes  # noqa: E402
+from app.services.gps_wire import decode_frame, encode_frame  # noqa: E402
+
+CENTER = (-34.6037, -58.3816)
+
+
+def make_track(device_id: str, fixes: int, interval: float):
+    """Fixes de un equipo en el formato de _get_device_location"""
+    start = datetime.utcnow() - timedelta(seconds=interval * fixes)
+    lat = CENTER[0] + random.uniform(-0.3, 0.3)
+    lng = CENTER[1] + random.uniform(-0.3, 0.3)
+    altitude = random.uniform(10, 80)
+    heading = random.uniform(0, 360)
+    speed = 0.0
+    track = []
+    for n in range(fixes):
+        if random.random() < 0.05:
+            speed = 0.0 if speed else random.uniform(5, 35)  # Arranca o se detiene
+        if speed:
+            speed = max(1.0, speed + random.gauss(0, 2))
+            heading = (heading + random.gauss(0, 10)) % 360
+            step_km = speed * interval / 3600
+            lat += step_km / 111.32 * math.cos(math.radians(heading))
+            lng += step_km / (111.32 * math.cos(math.radians(lat))) * math.sin(math.radians(heading))
+            altitude += random.gauss(0, 0.5)
+        track.append({
+            "latitude": round(lat + random.gauss(0, 0.00002), 7),
+            "longitude": round(lng + random.gauss(0, 0.00002), 7),
+            "altitude": round(altitude, 1),
+            "accuracy": round(random.uniform(2.5, 8), 1),
+            "speed": round(speed, 1),
+            "heading": round(heading, 1) if speed else None,
+            "timestamp": start + timedelta(seconds=interval * n + random.uniform(0, 0.5)),
+            "device_id": device_id,
+            "signal_strength": None,
+            "satellite_count": random.randint(6, 12)
+        })
+    return track
+
+
+def json_frame(fixes) -> bytes:
+    """Respuesta JSON de un proveedor (un objeto por fix, como la consume parse_provider_location)"""
+    payload = [{**fix, "timestamp": fix["timestamp"].isoformat() + "Z"} for fix in fixes]
+    return json.dumps(payload[0] if len(payload) == 1 else {"fixes": payload}).encode()
+
+
+def position_error_m(decoded, original) -> float:
+    dlat = (decoded.latitude - original.latitude) * 111320
+    dlng = (decoded.longitude - original.longitude) * 111320 * np.cos(np.radians(original.latitude))
+    return float(np.hypot(dlat, dlng).max())
+
+
+def main(args) -> int:
+    random.seed(args.seed)
+    tracks = [make_track(f"sat_{d:03d}", args.fixes, args.interval) for d in range(args.devices)]
+    total = args.devices * args.fixes
+    print(f"{args.devices} equipos x {args.fixes} fixes (uno cada {args.interval:.0f} s), "
+          f"{args.decimals} decimales de lat/lng")
+    print(f"{'fixes/trama':>11} {'JSON':>10} {'JSON+zlib':>10} {'binario v1':>11} {'compacta':>10} "
+          f"{'B/fix':>7} {'vs JSON':>8} {'vs zlib':>8}")
+
+    worst = None
+    for size in args.frame:
+        sizes = {"json": 0, "zlib": 0, "binary": 0, "compact": 0}
+        frames = 0
+        for track in tracks:
+            for offset in range(0, len(track), size):
+                fixes = track[offset:offset + size]
+                raw = json_frame(fixes)
+                sizes["json"] += len(raw)
+                sizes["zlib"] += len(zlib.compress(raw, 9))
+                batch = from_fixes(fixes)
+                sizes["binary"] += len(encode_binary(batch))
+                sizes["compact"] += len(encode_frame(batch, args.decimals))
+                frames += 1
+        ratio = sizes["json"] / sizes["compact"]
+        worst = ratio if worst is None else min(worst, ratio)
+        print(f"{size:>11} {sizes['json'] / frames:>10.0f} {sizes['zlib'] / frames:>10.0f} "
+              f"{sizes['binary'] / frames:>11.0f} {sizes['compact'] / frames:>10.0f} "
+              f"{sizes['compact'] / (frames * min(size, args.fixes)):>7.1f} {ratio:>7.1f}x "
+              f"{sizes['zlib'] / sizes['compact']:>7.1f}x")
+
+    # Fidelidad: una trama con todos los equipos, contra el mismo lote ordenado
+    batch = from_fixes([fix for track in tracks for fix in track])
+    frame = encode_frame(batch, args.decimals)
+    decoded = decode_frame(frame)
+    original = batch.take(np.lexsort((batch.timestamp_ms, batch.device)))
+    heading_error = np.abs((decoded.heading - original.heading + 180) % 360 - 180)
+    print(f"Error máximo: posición {position_error_m(decoded, original):.2f} m, "
+          f"altitud {np.nanmax(np.abs(decoded.altitude - original.altitude)):.2f} m, "
+          f"velocidad {np.nanmax(np.abs(decoded.speed - original.speed)):.2f} km/h, "
+          f"rumbo {np.nanmax(heading_error):.2f}°, "
+          f"tiempo {np.abs(decoded.timestamp_ms - original.timestamp_ms).max()} ms")
+    missing_ok = all(
+        np.array_equal(np.isnan(getattr(decoded, name)), np.isnan(getattr(original, name)))
+        for name in ("altitude", "accuracy", "speed", "heading", "satellite_count")
+    )
+    mask, rejected = GPSIngest().validate(decoded)
+    print(f"Validación de la ingesta: {int(mask.sum())}/{len(decoded)} aceptados, rechazados {rejected}; "
+          f"datos faltantes {'conservados' if missing_ok else 'ALTERADOS'}")
+
+    repeats = max(1, args.rounds)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        encode_frame(batch, args.decimals)
+    encode_rate = total * repeats / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decode_frame(frame)
+    decode_rate = total * repeats / (time.perf_counter() - start)
+    print(f"Codificación {encode_rate:,.0f} fixes/s, decodificación {decode_rate:,.0f} fixes/s "
+          f"(trama de {total} fixes, {len(frame) / total:.1f} B/fix)")
+
+    ok = worst >= args.min_ratio and missing_ok and bool(mask.all())
+    print(f"Reducción mínima frente a JSON: {worst:.1f}x (requerido {args.min_ratio:.1f}x) -> "
+          f"{'OK' if ok else 'FALLA'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes por trama: JSON vs binario v1 vs formato compacto")
+    parser.add_argument("--devices", type=int, default=20, help="Equipos satelitales")
+    parser.add_argument("--fixes", type=int, default=600, help="Fixes por equipo")
+    parser.add_argument("--interval", type=float, default=30.0, help="Segundos entre fixes")
+    parser.add_argument("--frame", type=int, nargs="+", default=[1, 10, 60], help="Fixes por trama")
+    parser.add_argument("--decimals", type=int, default=5, help="Decimales de lat/lng (GPS_COMPACT_DECIMALS)")
+    parser.add_argument("--min-ratio", type=float, default=5.0, help="Reducción mínima exigida frente a JSON")
+    parser.add_argument("--rounds", type=int, default=20, help="Repeticiones de la medición de velocidad")
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(main(parser.parse_args()))
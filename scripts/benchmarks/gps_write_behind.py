@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Benchmark de escritura de fixes GPS
+#
+# Genera fixes sintéticos durante `--duration` segundos y mide cuántos por
+# segundo llegan a Postgres de forma sostenida con cada estrategia:
+#   row    -> un INSERT ORM por fix (lo que haría una implementación ingenua)
+#   insert -> GPSLocationWriter con INSERT multi-fila
+#   copy   -> GPSLocationWriter con COPY
+# Requiere una base con el esquema al día; las filas de prueba se borran al final.
+#   DATABASE_URL=postgresql://... python scripts/benchmarks/gps_write_behind.py --method copy
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from sqlalchemy import delete  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models.gps import GPSLocation  # noqa: E402
+from app.services.gps_writer import GPSLocationWriter  # noqa: E402
+
+DEVICE_PREFIX = "BENCH-"
+
+
+def make_fix(device: int) -> dict:
+    return {
+        "device_id": f"{DEVICE_PREFIX}{device}",
+        "latitude": -34.6 + random.random() / 100,
+        "longitude": -58.4 + random.random() / 100,
+        "speed": random.uniform(0, 60),
+        "heading": random.uniform(0, 360),
+        "timestamp": datetime.utcnow(),
+    }
+
+
+async def produce(args, sink) -> int:
+    """Generar fixes a la tasa pedida (0 = tan rápido como se pueda)"""
+    produced = 0
+    start = time.perf_counter()
+    end = start + args.duration
+    while time.perf_counter() < end:
+        for _ in range(args.burst):
+            await sink(make_fix(produced % args.devices))
+            produced += 1
+        if args.rate:
+            # Mantener la tasa objetivo
+            ahead = produced / args.rate - (time.perf_counter() - start)
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+        else:
+            await asyncio.sleep(0)
+    return produced
+
+
+async def run_row(args) -> dict:
+    async def sink(fix):
+        async with AsyncSessionLocal() as db:
+            db.add(GPSLocation(
+                device_id=fix["device_id"], latitude=fix["latitude"], longitude=fix["longitude"],
+                speed=fix["speed"], heading=fix["heading"], created_at=fix["timestamp"]
+            ))
+            await db.commit()
+
+    start = time.perf_counter()
+    produced = await produce(args, sink)
+    elapsed = time.perf_counter() - start
+    return {"produced": produced, "written": produced, "elapsed": elapsed}
+
+
+async def run_writer(args) -> dict:
+    writer = GPSLocationWriter(
+        max_queue=args.queue_size, batch_size=args.batch_size,
+        flush_interval=args.flush_interval, method=args.method
+    )
+    await writer.start()
+
+    async def sink(fix):
+        writer.enqueue(None, fix)
+
+    start = time.perf_counter()
+    produced = await produce(args, sink)
+    await writer.stop()
+    elapsed = time.perf_counter() - start
+    return {"produced": produced, "elapsed": elapsed, **writer.get_stats()}
+
+
+async def main(args):
+    try:
+        result = await (run_row(args) if args.method == "row" else run_writer(args))
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(GPSLocation).where(GPSLocation.device_id.like(f"{DEVICE_PREFIX}%")))
+            await db.commit()
+        await async_engine.dispose()
+
+    print(f"Método: {args.method}")
+    print(f"Generados: {result['produced']} en {result['elapsed']:.1f} s")
+    print(f"Escritos: {result['written']} ({result['written'] / result['elapsed']:.0f} fixes/s sostenidos)")
+    if args.method != "row":
+        print(f"Descartados: {result['dropped']}, lotes: {result['batches']}, "
+              f"último lote: {result['last_batch_ms']} ms, máximo en cola: {result['high_watermark']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput de persistencia de fixes GPS")
+    parser.add_argument("--method", choices=["row", "insert", "copy"], default="copy")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--rate", type=float, default=0, help="Fixes por segundo (0 = sin límite)")
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    parser.add_argument("--queue-size", type=int, default=50000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Prueba de carga: tormenta de logins vs. latencia del resto de la API
+#
+# Mide la latencia de un endpoint liviano sin carga y durante una tormenta de
+# logins fallidos. El p99 durante la tormenta no debería subir significativamente.
+# La tormenta usa cuentas reales (--targets, por defecto --email) con una
+# contraseña incorrecta, así cada intento llega a bcrypt. Para que el limitador
+# no corte la tormenta con 429, el servidor debe correr con límites altos
+# (MAX_LOGIN_ATTEMPTS y LOGIN_MAX_ATTEMPTS_PER_IP) o, con --spread-ips, detrás
+# de uvicorn --proxy-headers --forwarded-allow-ips='*' para que cada worker de
+# la tormenta use otra IP. Falla si menos de --min-hashed de los intentos
+# llegaron a verificar la contraseña (respuesta 401).
+#   MAX_LOGIN_ATTEMPTS=1000000 LOGIN_MAX_ATTEMPTS_PER_IP=1000000 uvicorn app.main:app
+#   python scripts/benchmarks/login_storm.py --email admin@empresa.com --password secret
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def probe(client: httpx.AsyncClient, path: str, duration: float, latencies: list):
+    """Medir la latencia de un endpoint durante `duration` segundos"""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def storm(client: httpx.AsyncClient, duration: float, worker: int, targets: list,
+                spread_ips: bool, statuses: Counter):
+    """Enviar logins con contraseña incorrecta a cuentas reales durante `duration` segundos"""
+    headers = {"X-Forwarded-For": f"10.{worker // 250 % 256}.{worker % 250}.1"} if spread_ips else {}
+    end = time.perf_counter() + duration
+    n = worker
+    while time.perf_counter() < end:
+        response = await client.post(
+            "/auth/login",
+            data={"username": targets[n % len(targets)], "password": "wrong-password"},
+            headers=headers
+        )
+        statuses[response.status_code] += 1
+        n += 1
+
+
+async def main(args):
+    targets = args.targets or [args.email]
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        response = await client.post("/auth/login", data={"username": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        async with httpx.AsyncClient(base_url=args.url, timeout=60, headers=headers) as probe_client:
+            baseline = []
+            await probe(probe_client, args.path, args.duration, baseline)
+
+            during = []
+            statuses = Counter()
+            await asyncio.gather(
+                probe(probe_client, args.path, args.duration, during),
+                *[storm(client, args.duration, i, targets, args.spread_ips, statuses)
+                  for i in range(args.concurrency)]
+            )
+
+    print(f"endpoint medido: {args.path}")
+    print(f"sin carga:  p50={percentile(baseline, 0.5):.1f} ms  p99={percentile(baseline, 0.99):.1f} ms  (n={len(baseline)})")
+    print(f"tormenta:   p50={percentile(during, 0.5):.1f} ms  p99={percentile(during, 0.99):.1f} ms  (n={len(during)})")
+    sent = sum(statuses.values())
+    hashed = statuses[401]  # Rechazados por contraseña: pasaron por bcrypt
+    print(f"logins enviados: {sent}  por estado: {dict(statuses)}")
+    ok = sent > 0 and hashed / sent >= args.min_hashed
+    print(f"intentos que verificaron contraseña: {hashed} ({hashed / max(sent, 1):.0%}, "
+          f"requerido {args.min_hashed:.0%}) -> {'OK' if ok else 'FALLA (¿límites de login activos?)'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tormenta de logins")
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/employees/present/count")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--targets", nargs="+", help="Emails existentes para la tormenta (por defecto --email)")
+    parser.add_argument("--spread-ips", action="store_true",
+                        help="Una IP por worker vía X-Forwarded-For (requiere --proxy-headers en uvicorn)")
+    parser.add_argument("--min-hashed", type=float, default=0.9,
+                        help="Fracción mínima de intentos que deben llegar a bcrypt")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Verificación de planes de ejecución de las consultas frecuentes
+#
+# Carga un dataset sintético dentro de una transacción, ejecuta ANALYZE y
+# EXPLAIN sobre cada consulta caliente y falla si alguna recurre a un
+# Seq Scan sobre su tabla principal. Al final se hace ROLLBACK.
+#
+# Requiere una base con el esquema al día (alembic upgrade head):
+#   DATABASE_URL=postgresql://... python scripts/db/check_query_plans.py
+import argparse
+import json
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+
+SEED = [
+    # Empleados y check-ins (uno abierto por empleado)
+    """
+    INSERT INTO employees (first_name, last_name, employee_id, role, is_present, is_active, is_deleted)
+    SELECT 'Nombre' || g, 'Apellido' || g, 'PLAN' || g, 'operator', false, true, false
+    FROM generate_series(1, :employees) g
+    """,
+    """
+    INSERT INTO check_ins (employee_id, check_in_time, check_out_time, method)
+    SELECT e.id,
+           now() - g * interval '8 hours',
+           CASE WHEN g = 1 THEN NULL ELSE now() - g * interval '8 hours' + interval '7 hours' END,
+           'manual'
+    FROM employees e, generate_series(1, :check_ins_per_employee) g
+    WHERE e.employee_id LIKE 'PLAN%'
+    """,
+    # Vehículos y ubicaciones GPS
+    """
+    INSERT INTO vehicles (name, license_plate, vehicle_type, is_active, is_deleted)
+    SELECT 'Vehículo ' || g, 'PLAN-' || g, 'truck', true, false
+    FROM generate_series(1, :vehicles) g
+    """,
+    """
+    INSERT INTO gps_locations (vehicle_id, latitude, longitude, speed, created_at)
+    SELECT v.id, -34.6 + random() / 100, -58.4 + random() / 100, random() * 60,
+           now() - g * interval '30 seconds'
+    FROM vehicles v, generate_series(1, :fixes_per_vehicle) g
+    WHERE v.license_plate LIKE 'PLAN-%'
+    """,
+    # Tags, lectores y transacciones RFID
+    """
+    INSERT INTO rfid_tags (tag_id, tag_type, is_active, is_deleted)
+    SELECT 'PLAN' || g, 'EMPLOYEE', true, false FROM generate_series(1, :tags) g
+    """,
+    """
+    INSERT INTO rfid_readers (reader_id, name, location, reader_type, is_active, is_deleted)
+    SELECT 'PLAN' || g, 'Lector ' || g, 'Ubicación ' || g, 'fixed', true, false
+    FROM generate_series(1, :readers) g
+    """,
+    """
+    INSERT INTO rfid_transactions (tag_id, reader_id, transaction_type, read_time)
+    SELECT t.id,
+           (SELECT min(id) FROM rfid_readers WHERE reader_id LIKE 'PLAN%') + (g % :readers),
+           'CHECK_IN',
+           now() - g * interval '1 minute'
+    FROM rfid_tags t, generate_series(1, :reads_per_tag) g
+    WHERE t.tag_id LIKE 'PLAN%'
+    """,
+    # Eventos: la gran mayoría resueltos
+    """
+    INSERT INTO events (event_type, title, status, detected_at)
+    SELECT 'SYSTEM_ERROR', 'Evento ' || g,
+           CASE WHEN g % 100 = 0 THEN 'PENDING'::eventstatus ELSE 'RESOLVED'::eventstatus END,
+           now() - g * interval '1 minute'
+    FROM generate_series(1, :events) g
+    """,
+]
+
+ANALYZE = ["employees", "check_ins", "vehicles", "gps_locations",
+           "rfid_tags", "rfid_readers", "rfid_transactions", "events"]
+
+# (nombre, tabla que no debe recorrerse secuencialmente, consulta)
+HOT_QUERIES = [
+    ("check-in abierto (check_out_employee)", "check_ins", """
+        SELECT * FROM check_ins
+        WHERE employee_id = :employee_id AND check_out_time IS NULL
+        LIMIT 1
+    """),
+    ("historial de check-ins (get_employee_check_ins)", "check_ins", """
+        SELECT * FROM check_ins
+        WHERE employee_id = :employee_id
+        ORDER BY check_in_time DESC
+        LIMIT 100
+    """),
+    ("historial GPS por vehículo", "gps_locations", """
+        SELECT * FROM gps_locations
+        WHERE vehicle_id = :vehicle_id AND created_at >= now() - interval '1 hour'
+        ORDER BY created_at
+    """),
+    ("transacciones RFID por tag", "rfid_transactions", """
+        SELECT * FROM rfid_transactions
+        WHERE tag_id = :tag_id AND read_time >= now() - interval '1 day'
+        ORDER BY read_time DESC
+    """),
+    ("transacciones RFID por lector", "rfid_transactions", """
+        SELECT * FROM rfid_transactions
+        WHERE reader_id = :reader_id AND read_time >= now() - interval '1 hour'
+        ORDER BY read_time DESC
+    """),
+    ("eventos pendientes recientes", "events", """
+        SELECT * FROM events
+        WHERE status = 'PENDING'
+        ORDER BY detected_at DESC
+        LIMIT 50
+    """),
+]
+
+
+def find_seq_scans(plan: dict, table: str) -> list:
+    """Recorrer el plan y devolver los Seq Scan sobre la tabla indicada"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == table:
+        found.append(plan)
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child, table))
+    return found
+
+
+def main(args) -> int:
+    engine = create_engine(args.database_url)
+    sizes = {
+        "employees": args.employees,
+        "check_ins_per_employee": args.check_ins_per_employee,
+        "vehicles": args.vehicles,
+        "fixes_per_vehicle": args.fixes_per_vehicle,
+        "tags": args.tags,
+        "readers": args.readers,
+        "reads_per_tag": args.reads_per_tag,
+        "events": args.events,
+    }
+
+    failures = 0
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            for statement in SEED:
+                conn.execute(text(statement), {k: v for k, v in sizes.items() if f":{k}" in statement})
+            for table in ANALYZE:
+                conn.execute(text(f"ANALYZE {table}"))
+
+            params = {
+                "employee_id": conn.scalar(text("SELECT max(id) FROM employees WHERE employee_id LIKE 'PLAN%'")),
+                "vehicle_id": conn.scalar(text("SELECT max(id) FROM vehicles WHERE license_plate LIKE 'PLAN-%'")),
+                "tag_id": conn.scalar(text("SELECT max(id) FROM rfid_tags WHERE tag_id LIKE 'PLAN%'")),
+                "reader_id": conn.scalar(text("SELECT max(id) FROM rfid_readers WHERE reader_id LIKE 'PLAN%'")),
+            }
+
+            for name, table, query in HOT_QUERIES:
+                used = {k: v for k, v in params.items() if f":{k}" in query}
+                raw = conn.scalar(text(f"EXPLAIN (FORMAT JSON) {query}"), used)
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                scans = find_seq_scans(plan, table)
+                status = "FALLA (Seq Scan)" if scans else "OK"
+                print(f"[{status}] {name}")
+                if scans or args.verbose:
+                    print(json.dumps(plan, indent=2))
+                failures += bool(scans)
+        finally:
+            trans.rollback()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verificar que las consultas frecuentes usan índices")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--check-ins-per-employee", type=int, default=100)
+    parser.add_argument("--vehicles", type=int, default=200)
+    parser.add_argument("--fixes-per-vehicle", type=int, default=2000)
+    parser.add_argument("--tags", type=int, default=1000)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--reads-per-tag", type=int, default=100)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("se requiere --database-url o DATABASE_URL")
+    sys.exit(main(args))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Mantenimiento manual de particiones de gps_locations
+#
+# Lo mismo que hace el servicio GPS una vez por día, para ejecutar desde cron
+# o a mano:
+#   DATABASE_URL=postgresql://... python scripts/db/gps_partitions.py list
+#   DATABASE_URL=postgresql://... python scripts/db/gps_partitions.py ensure --months-ahead 6
+#   DATABASE_URL=postgresql://... python scripts/db/gps_partitions.py retention --months 12
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.core.database import async_engine  # noqa: E402
+from app.services.gps_partitions import GPSPartitionManager  # noqa: E402
+
+
+async def main(args) -> int:
+    manager = GPSPartitionManager()
+    try:
+        async with async_engine.connect() as conn:
+            if args.command == "list":
+                for partition in await manager.list_partitions(conn):
+                    if partition["default"]:
+                        print(f"{partition['name']:<32} DEFAULT")
+                    else:
+                        start = partition["start"].date() if partition["start"] else "MINVALUE"
+                        end = partition["end"].date() if partition["end"] else "MAXVALUE"
+                        print(f"{partition['name']:<32} {start} -> {end}")
+            elif args.command == "ensure":
+                created = await manager.ensure_partitions(conn, args.months_ahead)
+                print(f"Particiones creadas: {', '.join(created) or 'ninguna'}")
+            elif args.command == "retention":
+                retired = await manager.apply_retention(conn, args.months)
+                print(f"Particiones retiradas: {', '.join(retired) or 'ninguna'}")
+    finally:
+        await async_engine.dispose()
+    return 1 if manager.last_error else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Particiones mensuales de gps_locations")
+    parser.add_argument("command", choices=["list", "ensure", "retention"])
+    parser.add_argument("--months-ahead", type=int, default=None,
+                        help="Meses a crear por adelantado (por defecto GPS_PARTITION_PREMAKE_MONTHS)")
+    parser.add_argument("--months", type=int, default=None,
+                        help="Meses de retención (por defecto GPS_RETENTION_MONTHS)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
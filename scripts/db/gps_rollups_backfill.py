@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# S.A.M.I. - Recalcular resúmenes GPS (gps_rollups) desde gps_locations
+#
+# Recorre el rango día por día (una transacción por día) y reemplaza los
+# resúmenes horarios y diarios con las mismas reglas que la ingesta. Sirve
+# para cargar el historial previo a gps_rollups o reparar días puntuales;
+# conviene no incluir el día en curso mientras la ingesta está activa.
+#   DATABASE_URL=postgresql://... python scripts/db/gps_rollups_backfill.py --start 2025-01-01 --end 2025-07-01
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+
+from app.core.database import async_engine  # noqa: E402
+from app.services.gps_rollups import backfill  # noqa: E402
+
+
+def parse_day(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+async def main(args) -> int:
+    start = parse_day(args.start)
+    end = parse_day(args.end) if args.end else datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    if end <= start:
+        print("--end debe ser posterior a --start")
+        return 1
+
+    total = 0
+    day = start
+    try:
+        while day < end:
+            began = time.perf_counter()
+            async with async_engine.begin() as conn:
+                rows = await backfill(conn, day, day + timedelta(days=1), args.device)
+            total += rows
+            print(f"{day.date()}: {rows} resúmenes en {time.perf_counter() - began:.2f} s")
+            day += timedelta(days=1)
+    finally:
+        await async_engine.dispose()
+
+    print(f"Total: {total} resúmenes")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcular gps_rollups desde gps_locations")
+    parser.add_argument("--start", required=True, help="Primer día (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", default=None, help="Día final exclusivo (por defecto hoy)")
+    parser.add_argument("--device", default=None, help="Solo este device_id")
+    sys.exit(asyncio.run(main(parser.parse_args())))